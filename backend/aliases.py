@@ -0,0 +1,185 @@
+"""
+Alias dictionary for tool names.
+
+Users search for "Postgres", "PG", "Kafka" or "Cassandra"; the catalog says
+"Amazon RDS for PostgreSQL", "Amazon MSK (Managed Kafka)" and "Amazon
+Keyspaces". Aliases are generated from each tool name by stripping vendor
+prefixes, splitting parenthesized qualifiers ("(Redis/Valkey)") and "X for Y"
+names, then merged with ``CURATED_ALIASES``, which win over generated ones.
+
+Everything is compiled once into a hash map from normalized alias to tool
+names (best match first) and a single regex for finding mentions in free
+text. Tool search, the search index, the knowledge graph, scenario tool
+resolution and pattern technology resolution all consult the same map.
+"""
+
+import re
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from database import SessionLocal
+from models import Tool
+
+VENDOR_PREFIXES = ("amazon ", "aws ")
+QUALIFIER_PREFIXES = ("managed ", "apache ", "for ")
+QUALIFIER_SUFFIXES = (" compatible",)
+# Parenthesized qualifiers that describe a variant rather than name a product
+VARIANT_QUALIFIERS = {"standard", "fifo"}
+# Fragments left over from splitting names that are too generic to be aliases
+GENERIC_ALIASES = {"service", "managed service"}
+
+# Curated aliases replace whatever was generated for the same alias. An empty
+# list removes a generated alias.
+CURATED_ALIASES: Dict[str, List[str]] = {
+    "postgres": ["Amazon RDS for PostgreSQL", "Amazon Aurora (MySQL/PostgreSQL compatible)"],
+    "pg": ["Amazon RDS for PostgreSQL"],
+    "mysql": ["Amazon Aurora (MySQL/PostgreSQL compatible)"],
+    "kafka": ["Amazon MSK (Managed Kafka)"],
+    "cassandra": ["Amazon Keyspaces"],
+    "redis": ["Amazon ElastiCache (Redis/Valkey)"],
+    "memcached": ["Amazon ElastiCache (Memcached)"],
+    "mongodb": ["Amazon DocumentDB"],
+    "mongo": ["Amazon DocumentDB"],
+    "elasticsearch": ["Amazon OpenSearch Service"],
+    "kubernetes": ["Amazon EKS"],
+    "k8s": ["Amazon EKS"],
+    "flink": ["Amazon Managed Service for Apache Flink"],
+    "rabbitmq": ["Amazon MQ (RabbitMQ/ActiveMQ)"],
+    "activemq": ["Amazon MQ (RabbitMQ/ActiveMQ)"],
+    "kinesis": ["Amazon Kinesis Data Streams", "Amazon Data Firehose"],
+    "firehose": ["Amazon Data Firehose"],
+    "cdn": ["Amazon CloudFront"],
+    "dns": ["Amazon Route 53"],
+    "cloudwatch": ["Amazon CloudWatch"],
+    "sqs": ["Amazon SQS (Standard)", "Amazon SQS (FIFO)"],
+    "ec2": [],
+}
+
+# Lower ranks are better matches for an alias
+RANK_NAME = 1
+RANK_NAME_PART = 2
+RANK_QUALIFIER = 3
+
+
+def normalize(text: str) -> str:
+    return " ".join(text.lower().replace("-", " ").split())
+
+
+def _strip_prefixes(text: str, prefixes: Iterable[str]) -> str:
+    for prefix in prefixes:
+        if text.startswith(prefix):
+            return text[len(prefix):]
+    return text
+
+
+def _clean_qualifier(text: str) -> str:
+    text = _strip_prefixes(text.strip(), QUALIFIER_PREFIXES)
+    for suffix in QUALIFIER_SUFFIXES:
+        if text.endswith(suffix):
+            text = text[:-len(suffix)]
+    return _strip_prefixes(text.strip(), QUALIFIER_PREFIXES).strip()
+
+
+def generate_aliases(name: str) -> Dict[str, int]:
+    """Return ``{alias: rank}`` for one tool name."""
+    aliases: Dict[str, int] = {}
+
+    def add(alias: str, rank: int):
+        alias = normalize(alias)
+        if len(alias) >= 2 and alias not in GENERIC_ALIASES and rank < aliases.get(alias, RANK_QUALIFIER + 1):
+            aliases[alias] = rank
+
+    full = normalize(name)
+    core = _strip_prefixes(full, VENDOR_PREFIXES)
+    add(full, RANK_NAME)
+    add(core, RANK_NAME)
+
+    bare = re.sub(r"\s*\([^)]*\)", "", core).strip()
+    add(bare, RANK_NAME)
+    for part in bare.split(" for "):
+        add(_clean_qualifier(part), RANK_NAME_PART)
+
+    for qualifier in re.findall(r"\(([^)]*)\)", core):
+        if qualifier in VARIANT_QUALIFIERS:
+            add(f"{bare} {qualifier}", RANK_NAME)
+            continue
+        for part in re.split(r"[/,]", qualifier):
+            add(_clean_qualifier(part), RANK_QUALIFIER)
+    return aliases
+
+
+class AliasMap:
+    def __init__(self, tool_names: List[str], curated: Optional[Dict[str, List[str]]] = None):
+        curated = CURATED_ALIASES if curated is None else curated
+        order = {name: i for i, name in enumerate(tool_names)}
+
+        ranked: Dict[str, List[Tuple[int, int, str]]] = {}
+        for name in tool_names:
+            for alias, rank in generate_aliases(name).items():
+                ranked.setdefault(alias, []).append((rank, order[name], name))
+
+        self.targets: Dict[str, Tuple[str, ...]] = {
+            alias: tuple(name for _, _, name in sorted(entries))
+            for alias, entries in ranked.items()
+        }
+        for alias, names in curated.items():
+            known = tuple(name for name in names if name in order)
+            if known:
+                self.targets[normalize(alias)] = known
+            else:
+                self.targets.pop(normalize(alias), None)
+
+        self.by_tool: Dict[str, List[str]] = {name: [] for name in tool_names}
+        for alias, names in self.targets.items():
+            for name in names:
+                self.by_tool[name].append(alias)
+
+        alternation = "|".join(re.escape(a).replace(r"\ ", r"[\s-]+") for a in sorted(self.targets, key=len, reverse=True))
+        self._mention_re = re.compile(rf"(?<![\w-])(?:{alternation})(?![\w-])", re.IGNORECASE) if alternation else None
+
+    def resolve(self, term: str) -> Tuple[str, ...]:
+        """Tool names an alias refers to, best match first."""
+        return self.targets.get(normalize(term), ())
+
+    def resolve_names(self, names: Iterable[str]) -> List[str]:
+        """Map each name (canonical or alias) to its best tool, dropping unknowns."""
+        resolved = []
+        for name in names:
+            if name in self.by_tool:
+                resolved.append(name)
+            else:
+                targets = self.resolve(name)
+                if targets:
+                    resolved.append(targets[0])
+        return list(dict.fromkeys(resolved))
+
+    def aliases_for(self, tool_name: str) -> List[str]:
+        return sorted(self.by_tool.get(tool_name, []))
+
+    def mentions(self, text: str) -> List[str]:
+        """Tool names mentioned anywhere in ``text``, in order of first mention."""
+        if self._mention_re is None:
+            return []
+        found = []
+        for match in self._mention_re.finditer(text):
+            found.extend(self.resolve(match.group(0)))
+        return list(dict.fromkeys(found))
+
+
+_alias_map: Optional[AliasMap] = None
+_alias_map_lock = threading.Lock()
+
+
+def get_alias_map() -> AliasMap:
+    """Return the process-wide alias map, building it from the database on first use."""
+    global _alias_map
+    if _alias_map is None:
+        with _alias_map_lock:
+            if _alias_map is None:
+                db = SessionLocal()
+                try:
+                    names = [name for (name,) in db.query(Tool.name).order_by(Tool.id).all()]
+                finally:
+                    db.close()
+                _alias_map = AliasMap(names)
+    return _alias_map
@@ -0,0 +1,134 @@
+"""
+Prefix index for search-as-you-type.
+
+Completions come from tool names, tool categories, scenario titles and
+pattern titles. Every label is inserted under each of its word starts, so
+"dyn" completes "Amazon DynamoDB" and "read" completes "Scaling Reads".
+
+The index is a compressed (radix) trie. Every node keeps a precomputed,
+de-duplicated top-k list of the best completions in its subtree, so a lookup
+walks at most ``len(prefix)`` characters and returns that list without
+scanning anything.
+"""
+
+import re
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from database import SessionLocal
+from models import Tool
+from scenario_data import SCENARIO_BLUEPRINTS
+from reference_data import COMMON_PATTERNS
+
+TOP_K = 10
+
+# Higher weight wins when completions tie on prefix position
+KIND_WEIGHTS = {"tool": 4, "scenario": 3, "pattern": 3, "category": 2}
+
+_WORD_START_RE = re.compile(r"(?<![a-z0-9])[a-z0-9]")
+
+
+class _Node:
+    __slots__ = ("edges", "top")
+
+    def __init__(self):
+        self.edges: Dict[str, Tuple[str, "_Node"]] = {}
+        self.top: List[Dict] = []
+
+
+class _BuildNode:
+    __slots__ = ("children", "entries")
+
+    def __init__(self):
+        self.children: Dict[str, "_BuildNode"] = {}
+        self.entries: List[Tuple[tuple, Dict]] = []
+
+
+def _rank(entry: Dict, word_position: int) -> tuple:
+    # Prefer matches at the start of the label, then heavier kinds, then shorter labels
+    return (word_position > 0, -KIND_WEIGHTS[entry["type"]], len(entry["text"]), entry["text"])
+
+
+def _merge_top(candidates: List[Tuple[tuple, Dict]]) -> List[Tuple[tuple, Dict]]:
+    best: Dict[tuple, Tuple[tuple, Dict]] = {}
+    for rank, entry in candidates:
+        key = (entry["type"], entry["id"])
+        if key not in best or rank < best[key][0]:
+            best[key] = (rank, entry)
+    return sorted(best.values(), key=lambda item: item[0])[:TOP_K]
+
+
+class PrefixIndex:
+    def __init__(self, entries: List[Dict]):
+        root = _BuildNode()
+        for entry in entries:
+            label = entry["text"].lower()
+            for position, match in enumerate(_WORD_START_RE.finditer(label)):
+                node = root
+                for char in label[match.start():]:
+                    node = node.children.setdefault(char, _BuildNode())
+                node.entries.append((_rank(entry, position), entry))
+        self.root, _ = self._compress(root)
+
+    def _compress(self, build: _BuildNode) -> Tuple[_Node, List[Tuple[tuple, Dict]]]:
+        node = _Node()
+        candidates = list(build.entries)
+        for char, child in build.children.items():
+            label = char
+            # Collapse single-child chains with no entries of their own; their
+            # top-k is identical to the chain's tail.
+            while len(child.children) == 1 and not child.entries:
+                (next_char, next_child), = child.children.items()
+                label += next_char
+                child = next_child
+            compressed, child_top = self._compress(child)
+            node.edges[char] = (label, compressed)
+            candidates.extend(child_top)
+        top = _merge_top(candidates)
+        node.top = [entry for _, entry in top]
+        return node, top
+
+    def complete(self, prefix: str, limit: int = TOP_K) -> List[Dict]:
+        prefix = prefix.lower()
+        node = self.root
+        i = 0
+        while i < len(prefix):
+            edge = node.edges.get(prefix[i])
+            if edge is None:
+                return []
+            label, child = edge
+            segment = prefix[i:i + len(label)]
+            if not label.startswith(segment):
+                return []
+            i += len(label)
+            node = child
+        return node.top[:limit]
+
+
+def collect_entries(tools: List[Tool]) -> List[Dict]:
+    entries = [{"text": t.name, "type": "tool", "id": f"tool:{t.id}"} for t in tools]
+    for category in sorted({t.category for t in tools if t.category}):
+        entries.append({"text": category, "type": "category", "id": f"category:{category}"})
+    for key, blueprint in SCENARIO_BLUEPRINTS.items():
+        entries.append({"text": blueprint["title"], "type": "scenario", "id": f"scenario:{key}"})
+    for key, pattern in COMMON_PATTERNS.items():
+        entries.append({"text": pattern["title"], "type": "pattern", "id": f"pattern:{key}"})
+    return entries
+
+
+_prefix_index: Optional[PrefixIndex] = None
+_prefix_index_lock = threading.Lock()
+
+
+def get_prefix_index() -> PrefixIndex:
+    """Return the process-wide prefix index, building it from the database on first use."""
+    global _prefix_index
+    if _prefix_index is None:
+        with _prefix_index_lock:
+            if _prefix_index is None:
+                db = SessionLocal()
+                try:
+                    _prefix_index = PrefixIndex(collect_entries(db.query(Tool).order_by(Tool.id).all()))
+                finally:
+                    db.close()
+    return _prefix_index
@@ -0,0 +1,322 @@
+"""
+Cache policy simulator.
+
+Replays synthetic request traces through LRU, LFU, ARC, W-TinyLFU and TTL
+caches and reports hit ratio against cache size, putting numbers behind the
+"Scaling Reads" caching strategy and the blueprints' caching deep dives.
+
+Traces are generated with NumPy:
+
+- ``zipf``: independent requests with Zipf popularity (rank ``r`` is
+  requested with probability proportional to ``1 / r**alpha``)
+- ``scan``: the Zipf trace with a quarter of the requests replaced by
+  sequential scans over cold keys that are never reused, which flush LRU
+- ``temporal``: Zipf popularity whose hot set moves every tenth of the
+  trace, which strands LFU on stale counts
+
+Every policy uses O(1) structures (``OrderedDict`` for recency order, dicts
+of frequency buckets for LFU, a count-min sketch with precomputed per-key
+indexes for TinyLFU). Each policy replays a whole trace in one tight loop
+over a Python list, at about 4M requests per second for LRU down to 0.7M
+for TinyLFU, so a 10M-request trace takes 2-15 seconds per cache size.
+Traces are renumbered to dense ids before replay, so per-key structures
+such as the TinyLFU indexes are sized by the keys the trace actually uses
+rather than the whole key space. A lab run replays the trace once per
+policy and size and builds the trace over the whole key space;
+``replay_work`` counts both, capped at ``MAX_REPLAYED_REQUESTS``, a few
+seconds of CPU.
+"""
+
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+TRACE_KINDS = ("zipf", "scan", "temporal")
+MAX_TRACE_LENGTH = 2_000_000
+# Trace length x cache sizes x policies allowed in one run
+MAX_REPLAYED_REQUESTS = 5_000_000
+# Building a trace costs about this many replayed requests per key of the key space
+KEY_WORK = 0.1
+MAX_KEYS = 10_000_000
+
+# Share of scan-trace requests that belong to a scan, and the scan length as a share of keys
+SCAN_SHARE = 0.25
+SCAN_LENGTH = 0.1
+TEMPORAL_PHASES = 10
+
+# W-TinyLFU: admission window and protected segment as shares of the cache,
+# and how many sketch increments (per cache entry) before counters are halved
+TINYLFU_WINDOW = 0.01
+TINYLFU_PROTECTED = 0.8
+TINYLFU_SAMPLE_FACTOR = 10
+SKETCH_DEPTH = 4
+SKETCH_MAX = 15
+
+# TTL entries live this many requests per cache entry unless ``ttl`` is given
+DEFAULT_TTL_FACTOR = 2
+
+
+def generate_trace(kind: str, length: int, keys: int, alpha: float = 1.0, seed: int = 0) -> np.ndarray:
+    """Key ids for ``length`` requests; scans use ids from ``keys`` to ``2 * keys``."""
+    if kind not in TRACE_KINDS:
+        raise ValueError(f"Unknown trace kind: {kind}")
+    rng = np.random.default_rng(seed)
+    weights = np.arange(1, keys + 1, dtype=np.float64) ** -alpha
+    cdf = np.cumsum(weights)
+    cdf /= cdf[-1]
+    ranks = np.searchsorted(cdf, rng.random(length), side="right")
+    np.minimum(ranks, keys - 1, out=ranks)
+
+    if kind == "temporal":
+        # Shift the popularity ranking to a new part of the key space each phase
+        phase = np.arange(length) * TEMPORAL_PHASES // length
+        ranks = (ranks + phase * (keys // TEMPORAL_PHASES)) % keys
+
+    # Popularity should not follow key order
+    trace = rng.permutation(keys)[ranks]
+
+    if kind == "scan":
+        scan_length = max(1, int(keys * SCAN_LENGTH))
+        period = int(scan_length / SCAN_SHARE)
+        i = np.arange(length)
+        in_scan = i % period < scan_length
+        scan_keys = keys + (i // period * scan_length + i % period) % keys
+        trace = np.where(in_scan, scan_keys, trace)
+    return trace
+
+
+def lru(trace: List[int], capacity: int, **_) -> int:
+    cache = OrderedDict()
+    move, evict = cache.move_to_end, cache.popitem
+    hits = 0
+    for key in trace:
+        if key in cache:
+            move(key)
+            hits += 1
+        else:
+            cache[key] = None
+            if len(cache) > capacity:
+                evict(last=False)
+    return hits
+
+
+def lfu(trace: List[int], capacity: int, **_) -> int:
+    """Least frequently used, ties broken by recency, with frequency buckets."""
+    counts: Dict[int, int] = {}
+    buckets: Dict[int, OrderedDict] = {}
+    min_count = 0
+    hits = 0
+    for key in trace:
+        count = counts.get(key)
+        if count is not None:
+            hits += 1
+            bucket = buckets[count]
+            del bucket[key]
+            if not bucket:
+                del buckets[count]
+                if min_count == count:
+                    min_count = count + 1
+            counts[key] = count + 1
+            following = buckets.get(count + 1)
+            if following is None:
+                following = buckets[count + 1] = OrderedDict()
+            following[key] = None
+        else:
+            if len(counts) >= capacity:
+                bucket = buckets[min_count]
+                victim, _ = bucket.popitem(last=False)
+                if not bucket:
+                    del buckets[min_count]
+                del counts[victim]
+            counts[key] = 1
+            min_count = 1
+            bucket = buckets.get(1)
+            if bucket is None:
+                bucket = buckets[1] = OrderedDict()
+            bucket[key] = None
+    return hits
+
+
+def arc(trace: List[int], capacity: int, **_) -> int:
+    """Adaptive Replacement Cache (Megiddo and Modha, 2003)."""
+    t1, t2, b1, b2 = OrderedDict(), OrderedDict(), OrderedDict(), OrderedDict()
+    target = 0.0
+    hits = 0
+
+    def replace(in_b2: bool):
+        if t1 and (len(t1) > target or (in_b2 and len(t1) == target)):
+            old, _ = t1.popitem(last=False)
+            b1[old] = None
+        else:
+            old, _ = t2.popitem(last=False)
+            b2[old] = None
+
+    for key in trace:
+        if key in t1:
+            del t1[key]
+            t2[key] = None
+            hits += 1
+        elif key in t2:
+            t2.move_to_end(key)
+            hits += 1
+        elif key in b1:
+            target = min(capacity, target + max(len(b2) / len(b1), 1))
+            replace(False)
+            del b1[key]
+            t2[key] = None
+        elif key in b2:
+            target = max(0.0, target - max(len(b1) / len(b2), 1))
+            replace(True)
+            del b2[key]
+            t2[key] = None
+        else:
+            l1 = len(t1) + len(b1)
+            if l1 == capacity:
+                if len(t1) < capacity:
+                    b1.popitem(last=False)
+                    replace(False)
+                else:
+                    t1.popitem(last=False)
+            elif l1 < capacity and l1 + len(t2) + len(b2) >= capacity:
+                if l1 + len(t2) + len(b2) == 2 * capacity:
+                    b2.popitem(last=False)
+                replace(False)
+            t1[key] = None
+    return hits
+
+
+def _sketch_indexes(keys: int, width: int, seed: int = 0) -> List[List[int]]:
+    """Flat count-min counter index for every key in each sketch row."""
+    rng = np.random.default_rng(seed)
+    ids = np.arange(keys, dtype=np.uint64)
+    rows = []
+    for row in range(SKETCH_DEPTH):
+        a, b = (int(x) | 1 for x in rng.integers(1, 2**31, 2))
+        mixed = (ids * np.uint64(a) + np.uint64(b)) >> np.uint64(7)
+        rows.append(((mixed % np.uint64(width)) + np.uint64(row * width)).astype(np.int64).tolist())
+    return rows
+
+
+def tinylfu(trace: List[int], capacity: int, keyspace: int = 0, **_) -> int:
+    """W-TinyLFU: an LRU admission window in front of a segmented LRU, with a
+    count-min sketch deciding whether a window victim may replace a main victim."""
+    if capacity < 3:
+        return lru(trace, capacity)
+    window_size = max(1, int(capacity * TINYLFU_WINDOW))
+    main_size = capacity - window_size
+    protected_size = max(1, int(main_size * TINYLFU_PROTECTED))
+
+    width = 1 << max(6, int(capacity).bit_length())
+    counters = [0] * (SKETCH_DEPTH * width)
+    r0, r1, r2, r3 = _sketch_indexes(keyspace or (max(trace) + 1), width)
+    sample_limit = TINYLFU_SAMPLE_FACTOR * capacity
+    samples = 0
+
+    window, probation, protected = OrderedDict(), OrderedDict(), OrderedDict()
+    hits = 0
+    for key in trace:
+        # Record the access, halving every counter once the sample is full
+        i0, i1, i2, i3 = r0[key], r1[key], r2[key], r3[key]
+        if counters[i0] < SKETCH_MAX:
+            counters[i0] += 1
+        if counters[i1] < SKETCH_MAX:
+            counters[i1] += 1
+        if counters[i2] < SKETCH_MAX:
+            counters[i2] += 1
+        if counters[i3] < SKETCH_MAX:
+            counters[i3] += 1
+        samples += 1
+        if samples >= sample_limit:
+            counters = [c >> 1 for c in counters]
+            samples //= 2
+
+        if key in window:
+            window.move_to_end(key)
+            hits += 1
+        elif key in protected:
+            protected.move_to_end(key)
+            hits += 1
+        elif key in probation:
+            del probation[key]
+            protected[key] = None
+            if len(protected) > protected_size:
+                demoted, _ = protected.popitem(last=False)
+                probation[demoted] = None
+            hits += 1
+        else:
+            window[key] = None
+            if len(window) <= window_size:
+                continue
+            candidate, _ = window.popitem(last=False)
+            if len(probation) + len(protected) < main_size:
+                probation[candidate] = None
+                continue
+            segment = probation if probation else protected
+            victim = next(iter(segment))
+            candidate_count = min(counters[r0[candidate]], counters[r1[candidate]],
+                                  counters[r2[candidate]], counters[r3[candidate]])
+            victim_count = min(counters[r0[victim]], counters[r1[victim]],
+                               counters[r2[victim]], counters[r3[victim]])
+            if candidate_count > victim_count:
+                segment.popitem(last=False)
+                probation[candidate] = None
+    return hits
+
+
+def ttl(trace: List[int], capacity: int, ttl: Optional[int] = None, **_) -> int:
+    """Entries expire ``ttl`` requests after they are written; hits do not extend
+    them. When full, the entry closest to expiry is evicted."""
+    lifetime = ttl or DEFAULT_TTL_FACTOR * capacity
+    # Insertion order is expiry order, since every entry gets the same lifetime
+    cache = OrderedDict()
+    evict = cache.popitem
+    hits = 0
+    for now, key in enumerate(trace):
+        expires = cache.get(key)
+        if expires is not None and expires > now:
+            hits += 1
+            continue
+        if expires is not None:
+            del cache[key]
+        cache[key] = now + lifetime
+        if len(cache) > capacity:
+            evict(last=False)
+    return hits
+
+
+POLICIES: Dict[str, Callable[..., int]] = {
+    "lru": lru,
+    "lfu": lfu,
+    "arc": arc,
+    "tinylfu": tinylfu,
+    "ttl": ttl,
+}
+
+
+def cache_sizes(keys: int, points: int, smallest: float = 0.001, largest: float = 0.1) -> List[int]:
+    """Cache sizes spaced geometrically between shares of the key space."""
+    sizes = np.unique(np.geomspace(keys * smallest, keys * largest, points).round().astype(int))
+    return [int(s) for s in sizes if s > 0]
+
+
+def replay_work(length: int, keys: int, points: int, policies: int) -> int:
+    """Work of a ``hit_ratio_curves`` run, in replayed requests."""
+    return length * points * policies + int(keys * KEY_WORK)
+
+
+@lru_cache(maxsize=32)
+def hit_ratio_curves(trace_kind: str, length: int = 1_000_000, keys: int = 100_000, alpha: float = 1.0,
+                     points: int = 5, policies: tuple = tuple(POLICIES), ttl: Optional[int] = None,
+                     seed: int = 0) -> Dict:
+    """Hit ratio of every policy at every cache size on one generated trace."""
+    # Dense ids: per-key structures then scale with the distinct keys seen, not the key space
+    distinct, trace = np.unique(generate_trace(trace_kind, length, keys, alpha, seed), return_inverse=True)
+    trace = trace.tolist()
+    sizes = cache_sizes(keys, points)
+    curves = {
+        name: [round(POLICIES[name](trace, size, keyspace=len(distinct), ttl=ttl) / length, 4) for size in sizes]
+        for name in policies
+    }
+    return {"sizes": sizes, "hit_ratios": curves}
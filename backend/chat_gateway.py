@@ -0,0 +1,455 @@
+"""
+WebSocket gateway load rig for chat fan-out and presence.
+
+Puts numbers behind the ``chat`` and ``whatsapp`` blueprints. A FastAPI
+WebSocket endpoint (``create_app``) fronts a ``Gateway`` holding every
+connection, the presence set and offline inboxes. Thousands of simulated
+clients talk to it over in-memory ASGI connections: no sockets are opened,
+but every frame goes through the same Starlette WebSocket code a server
+would run. Each client's receive buffer holds ``SOCKET_BUFFER`` frames, so
+a slow reader pushes back on whoever sends to it, like a full TCP window.
+
+A group message is delivered to every online member of the room; offline
+members get it from their inbox when they reconnect. Presence changes go to
+a user's online contacts. Three broadcast strategies:
+
+- ``per_connection``: the sender's handler awaits one send per recipient,
+  so a slow recipient holds up the rest of the room.
+- ``batched``: each connection has an outbox and a writer task that sends
+  whatever has queued up as one frame.
+- ``pubsub``: ``PubSub``, an in-process stand-in for Redis pub/sub, has a
+  channel per user that the gateway node holding their connection
+  subscribes to. Senders publish and return; each node's consumer sends to
+  its own connections.
+
+``benchmark`` runs the same workload under each strategy: a paced burst of
+group messages, offline delivery, and a presence storm where every client
+drops and reconnects at once, as after a gateway restart. It reports
+fan-out latency, frames per delivery, storm drain time and memory per
+connection.
+
+Each phase waits at most ``PHASE_TIMEOUT``. A phase that times out drops the
+backlog still queued at clients and the gateway, and the storm cancels
+handlers that have not finished by then, so one overloaded phase does not
+hold up the next. ``drain_seconds`` estimates how long the message phase
+takes to drain, which callers cap.
+"""
+
+import asyncio
+import json
+import time
+import tracemalloc
+from collections import defaultdict
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+import numpy as np
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+
+STRATEGIES = ("per_connection", "batched", "pubsub")
+MAX_USERS = 20_000
+MAX_MESSAGES = 50_000
+MAX_ROOM_SIZE = 256
+MAX_NODES = 16
+# Frames a client buffers before sends to it block
+SOCKET_BUFFER = 16
+# Time a slow client takes to read each frame, as on a poor mobile link
+SLOW_READ_SECONDS = 0.02
+PHASE_TIMEOUT = 60.0
+# Deliveries per second the gateway sustains with slow readers on one core
+DELIVERIES_PER_SECOND = 10_000
+# Message phase drain time per run, over every strategy
+MAX_DRAIN_SECONDS = 60.0
+
+
+class PubSub:
+    """In-process stand-in for Redis pub/sub with a channel per user. The
+    node holding a user's connection subscribes to their channel."""
+
+    __slots__ = ("queues", "channels", "published")
+
+    def __init__(self, nodes: int):
+        self.queues = [asyncio.Queue() for _ in range(nodes)]
+        self.channels: Dict[int, int] = {}
+        self.published = 0
+
+    def subscribe(self, user: int, node: int):
+        self.channels[user] = node
+
+    def unsubscribe(self, user: int):
+        self.channels.pop(user, None)
+
+    def publish(self, user: int, text: str, store: bool):
+        node = self.channels.get(user)
+        if node is not None:
+            self.published += 1
+            self.queues[node].put_nowait((user, text, store))
+
+
+class Gateway:
+    """Connections, presence and offline inboxes behind the WebSocket endpoint."""
+
+    __slots__ = ("strategy", "nodes", "rooms", "contacts", "sockets", "inboxes", "outboxes", "tasks",
+                 "broker", "stats")
+
+    def __init__(self, strategy: str, rooms: List[List[int]], contacts: List[List[int]], nodes: int = 4):
+        self.strategy = strategy
+        self.nodes = nodes
+        self.rooms = rooms
+        self.contacts = contacts
+        self.sockets: Dict[int, WebSocket] = {}
+        self.inboxes: Dict[int, List[str]] = defaultdict(list)
+        self.outboxes: Dict[int, asyncio.Queue] = {}
+        self.tasks: List[asyncio.Task] = []
+        self.broker: Optional[PubSub] = None
+        # items: messages and presence updates handed to a socket; frames: socket sends
+        self.stats = {"items": 0, "frames": 0, "stored": 0, "joins": 0}
+
+    def start(self):
+        """Start the node consumers; needs a running event loop."""
+        if self.strategy == "pubsub":
+            self.broker = PubSub(self.nodes)
+            for node, queue in enumerate(self.broker.queues):
+                self.tasks.append(asyncio.create_task(self._consume(queue)))
+
+    def close(self):
+        for task in self.tasks:
+            task.cancel()
+
+    async def join(self, user: int, websocket: WebSocket):
+        self.sockets[user] = websocket
+        if self.strategy == "batched":
+            outbox = self.outboxes[user] = asyncio.Queue()
+            self.tasks.append(asyncio.create_task(self._write(websocket, outbox)))
+        elif self.strategy == "pubsub":
+            self.broker.subscribe(user, user % self.nodes)
+        # Queued messages first, in order, then tell contacts
+        for text in self.inboxes.pop(user, ()):
+            await self.deliver((user,), text)
+        await self.deliver(self.contacts[user], _presence(user, True), store=False)
+        self.stats["joins"] += 1
+
+    async def leave(self, user: int):
+        self.sockets.pop(user, None)
+        if self.strategy == "batched":
+            # The writer sends what is already queued, then stops
+            self.outboxes.pop(user).put_nowait(None)
+        elif self.strategy == "pubsub":
+            self.broker.unsubscribe(user)
+        await self.deliver(self.contacts[user], _presence(user, False), store=False)
+
+    async def send(self, user: int, message: Dict):
+        room = message["room"]
+        text = json.dumps({"type": "message", "room": room, "from": user, "id": message["id"], "sent": message["sent"]})
+        await self.deliver([member for member in self.rooms[room] if member != user], text)
+
+    async def deliver(self, recipients, text: str, store: bool = True):
+        for user in recipients:
+            websocket = self.sockets.get(user)
+            if websocket is None:
+                if store:
+                    self.inboxes[user].append(text)
+                    self.stats["stored"] += 1
+            elif self.strategy == "per_connection":
+                await self._send(websocket, text, 1)
+            elif self.strategy == "batched":
+                self.outboxes[user].put_nowait(text)
+            else:
+                self.broker.publish(user, text, store)
+
+    async def _send(self, websocket: WebSocket, text: str, items: int):
+        self.stats["items"] += items
+        self.stats["frames"] += 1
+        try:
+            await websocket.send_text(text)
+        except asyncio.CancelledError:
+            # Cancelled while the client's buffer was full, so nothing was sent
+            self.stats["items"] -= items
+            self.stats["frames"] -= 1
+            raise
+
+    async def _write(self, websocket: WebSocket, outbox: asyncio.Queue):
+        """Send everything queued for one connection as a single frame,
+        until the ``None`` queued when it closes."""
+        closed = False
+        while not closed:
+            texts = [await outbox.get()]
+            while not outbox.empty():
+                texts.append(outbox.get_nowait())
+            closed = texts[-1] is None
+            texts = texts[:-1] if closed else texts
+            if texts:
+                await self._send(websocket, texts[0] if len(texts) == 1 else "[" + ",".join(texts) + "]", len(texts))
+        self.tasks.remove(asyncio.current_task())
+
+    async def _consume(self, queue: asyncio.Queue):
+        """One gateway node: send what the broker routes to its connections."""
+        while True:
+            user, text, store = await queue.get()
+            websocket = self.sockets.get(user)
+            if websocket is not None:
+                await self._send(websocket, text, 1)
+            elif store:
+                self.inboxes[user].append(text)
+                self.stats["stored"] += 1
+
+    def discard(self):
+        """Drop everything waiting in outboxes and broker queues, keeping the
+        markers that stop writers of closed connections."""
+        for queue in list(self.outboxes.values()) + (self.broker.queues if self.broker else []):
+            closing = False
+            while not queue.empty():
+                closing |= queue.get_nowait() is None
+            if closing:
+                queue.put_nowait(None)
+
+    def idle(self) -> bool:
+        """Nothing is waiting in an outbox or broker queue."""
+        queues = list(self.outboxes.values()) + (self.broker.queues if self.broker else [])
+        return all(queue.empty() for queue in queues)
+
+
+def _presence(user: int, online: bool) -> str:
+    return json.dumps({"type": "presence", "user": user, "online": online, "sent": time.perf_counter()})
+
+
+def create_app(gateway: Gateway) -> FastAPI:
+    """A FastAPI app with the gateway's WebSocket endpoint."""
+    app = FastAPI()
+
+    @app.websocket("/ws/{user_id}")
+    async def chat_socket(websocket: WebSocket, user_id: int):
+        await websocket.accept()
+        await gateway.join(user_id, websocket)
+        try:
+            while True:
+                await gateway.send(user_id, await websocket.receive_json())
+        except WebSocketDisconnect:
+            await gateway.leave(user_id)
+
+    return app
+
+
+class SimClient:
+    """One simulated client on an in-memory ASGI WebSocket connection."""
+
+    __slots__ = ("user", "slow", "incoming", "outgoing", "handler", "reader", "closed", "messages", "presence",
+                 "latencies", "presence_latencies")
+
+    def __init__(self, user: int, slow: bool):
+        self.user = user
+        self.slow = slow
+        self.closed = False
+        self.messages = self.presence = 0
+        self.latencies: List[float] = []
+        self.presence_latencies: List[float] = []
+
+    async def connect(self, app: FastAPI):
+        path = f"/ws/{self.user}"
+        scope = {"type": "websocket", "asgi": {"version": "3.0"}, "scheme": "ws", "path": path,
+                 "raw_path": path.encode(), "root_path": "", "query_string": b"", "headers": [],
+                 "client": ("client", self.user), "server": ("gateway", 80), "subprotocols": []}
+        self.incoming = asyncio.Queue()
+        self.outgoing = asyncio.Queue(SOCKET_BUFFER)
+        self.incoming.put_nowait({"type": "websocket.connect"})
+        self.handler = asyncio.create_task(app(scope, self.incoming.get, self.outgoing.put))
+        accepted = await self.outgoing.get()
+        assert accepted["type"] == "websocket.accept", accepted
+        self.reader = asyncio.create_task(self._read())
+
+    def send(self, payload: Dict):
+        self.incoming.put_nowait({"type": "websocket.receive", "text": json.dumps(payload)})
+
+    def disconnect(self) -> asyncio.Task:
+        """Hang up; the handler returned finishes once it has handled what
+        the client sent before."""
+        self.closed = True
+        self.incoming.put_nowait({"type": "websocket.disconnect", "code": 1000})
+        return self.handler
+
+    def discard(self):
+        """Drop messages sent but not yet read by the handler."""
+        while not self.incoming.empty():
+            self.incoming.get_nowait()
+
+    async def _read(self):
+        # Keeps draining after disconnect, so late sends to this socket never block
+        while True:
+            event = await self.outgoing.get()
+            received = time.perf_counter()
+            items = json.loads(event["text"])
+            for item in items if isinstance(items, list) else (items,):
+                if item["type"] == "message":
+                    self.messages += 1
+                    self.latencies.append(received - item["sent"])
+                else:
+                    self.presence += 1
+                    self.presence_latencies.append(received - item["sent"])
+            if self.slow and not self.closed:
+                await asyncio.sleep(SLOW_READ_SECONDS)
+
+
+async def _until(condition, timeout: float = PHASE_TIMEOUT) -> bool:
+    deadline = time.perf_counter() + timeout
+    while not condition():
+        if time.perf_counter() > deadline:
+            return False
+        await asyncio.sleep(0.001)
+    return True
+
+
+async def _settle(tasks: List[asyncio.Task], timeout: float = PHASE_TIMEOUT) -> bool:
+    """Wait for ``tasks``, cancelling those still running at the timeout."""
+    if not tasks:
+        return True
+    _, pending = await asyncio.wait(tasks, timeout=timeout)
+    for task in pending:
+        task.cancel()
+    return not pending
+
+
+def _discard(clients, gateway: Gateway):
+    """Drop the backlog of a phase that timed out."""
+    for client in clients:
+        client.discard()
+    gateway.discard()
+
+
+def drain_seconds(users: int, room_size: int, messages: int, slow_share: float) -> float:
+    """Rough time for the message phase to drain: the gateway's delivery rate,
+    or a slow reader taking ``SLOW_READ_SECONDS`` over each frame of its share
+    of deliveries, whichever is slower."""
+    deliveries = messages * (min(room_size, users) - 1)
+    slowest = deliveries / users * SLOW_READ_SECONDS if slow_share > 0 else 0.0
+    return max(deliveries / DELIVERIES_PER_SECOND, slowest)
+
+
+def _percentiles(latencies: List[float]) -> Dict:
+    if not latencies:
+        return {"p50_ms": None, "p99_ms": None, "max_ms": None}
+    ms = np.array(latencies) * 1000
+    return {"p50_ms": round(float(np.percentile(ms, 50)), 3), "p99_ms": round(float(np.percentile(ms, 99)), 3),
+            "max_ms": round(float(ms.max()), 3)}
+
+
+async def simulate(strategy: str, users: int = 1000, rooms: int = 100, room_size: int = 50, messages: int = 2000,
+                   rate: int = 2000, contacts: int = 20, offline_share: float = 0.1, slow_share: float = 0.05,
+                   nodes: int = 4, seed: int = 0) -> Dict:
+    """Connect clients, send paced group messages, reconnect offline users
+    and trigger a presence storm, measuring each phase."""
+    rng = np.random.default_rng(seed)
+    members = [sorted(rng.choice(users, min(room_size, users), replace=False).tolist()) for _ in range(rooms)]
+    friends = [rng.choice(users, contacts, replace=False).tolist() for _ in range(users)]
+    offline = set(np.flatnonzero(rng.random(users) < offline_share).tolist())
+    slow = rng.random(users) < slow_share
+    gateway = Gateway(strategy, members, friends, nodes)
+    gateway.start()
+    app = create_app(gateway)
+    clients = {user: SimClient(user, bool(slow[user])) for user in range(users)}
+    retired: List[SimClient] = []
+
+    # Connect everyone who starts online, tracing allocations. This counts both
+    # ends of each connection: handler task, WebSocket, queues and client reader
+    online = [user for user in range(users) if user not in offline]
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for user in online:
+        await clients[user].connect(app)
+    await _until(lambda: gateway.stats["joins"] == len(online))
+    bytes_per_connection = (tracemalloc.get_traced_memory()[0] - before) / max(len(online), 1)
+    if not tracing:
+        tracemalloc.stop()
+    await _until(gateway.idle)
+    for client in clients.values():
+        client.latencies.clear()
+        client.messages = 0
+
+    # Paced group messages from online members
+    expected, items_before, frames_before = 0, gateway.stats["items"], gateway.stats["frames"]
+    senders = []
+    for i in range(messages):
+        room = int(rng.integers(rooms))
+        candidates = [m for m in members[room] if m not in offline]
+        if candidates:
+            senders.append((clients[candidates[int(rng.integers(len(candidates)))]], room, i))
+            expected += len(candidates) - 1
+    started = time.perf_counter()
+    for sender, room, i in senders:
+        delay = started + i / rate - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        sender.send({"room": room, "id": i, "sent": time.perf_counter()})
+    delivered = await _until(lambda: sum(c.messages for c in clients.values()) >= expected)
+    if not delivered:
+        _discard(clients.values(), gateway)
+    elapsed = time.perf_counter() - started
+    latencies = [latency for client in clients.values() for latency in client.latencies]
+    items, frames = gateway.stats["items"] - items_before, gateway.stats["frames"] - frames_before
+    message_phase = {
+        "messages": len(senders),
+        "deliveries": len(latencies),
+        "expected_deliveries": expected,
+        "deliveries_per_second": round(len(latencies) / elapsed),
+        **_percentiles(latencies),
+        "frames_per_delivery": round(frames / max(items, 1), 3),
+    }
+
+    # Offline users reconnect and drain their inboxes
+    stored = gateway.stats["stored"]
+    for user in sorted(offline):
+        await clients[user].connect(app)
+    offline_delivered = await _until(lambda: sum(clients[u].messages for u in offline) >= stored)
+    offline_received = sum(clients[u].messages for u in offline)
+    if not await _until(lambda: gateway.stats["joins"] == users and gateway.idle()):
+        _discard(clients.values(), gateway)
+
+    # Presence storm: every client drops and reconnects at once
+    items_before = gateway.stats["items"]
+    received_before = sum(c.presence + c.messages for c in clients.values())
+    started = time.perf_counter()
+    await _settle([client.disconnect() for client in clients.values()])
+    retired.extend(clients.values())
+    clients = {user: SimClient(user, bool(slow[user])) for user in range(users)}
+    for client in clients.values():
+        await client.connect(app)
+    everyone = retired + list(clients.values())
+
+    def drained():
+        received = sum(c.presence + c.messages for c in everyone) - received_before
+        return gateway.stats["joins"] == 2 * users and gateway.idle() and received >= gateway.stats["items"] - items_before
+
+    await _until(drained)
+    storm_seconds = time.perf_counter() - started
+    updates = gateway.stats["items"] - items_before
+    storm = {
+        "updates": updates,
+        "seconds": round(storm_seconds, 3),
+        "updates_per_second": round(updates / storm_seconds),
+        **_percentiles([latency for c in clients.values() for latency in c.presence_latencies]),
+    }
+
+    for client in everyone:
+        client.reader.cancel()
+    gateway.close()
+    result = {
+        "bytes_per_connection": round(bytes_per_connection),
+        "messages": message_phase,
+        "offline": {"users": len(offline), "stored": stored, "delivered": offline_received},
+        "presence_storm": storm,
+        "all_delivered": delivered and offline_delivered,
+    }
+    if gateway.broker is not None:
+        result["broker_messages"] = gateway.broker.published
+    return result
+
+
+@lru_cache(maxsize=16)
+def benchmark(users: int = 1000, rooms: int = 100, room_size: int = 50, messages: int = 2000, rate: int = 2000,
+              contacts: int = 20, offline_share: float = 0.1, slow_share: float = 0.05, nodes: int = 4,
+              strategies: tuple = STRATEGIES, seed: int = 0) -> Dict:
+    """Run the same workload under each broadcast strategy."""
+    return {name: asyncio.run(simulate(name, users, rooms, room_size, messages, rate, contacts, offline_share,
+                                       slow_share, nodes, seed))
+            for name in strategies}
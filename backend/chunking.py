@@ -0,0 +1,294 @@
+"""
+Content-defined chunking and deduplication engine.
+
+Puts numbers behind the ``dropbox`` blueprint's chunked uploads and the
+"Handling Large Blobs" pattern. Files are memory-mapped and cut into chunks
+by one of three chunkers:
+
+- ``fixed``: a cut every ``avg_size`` bytes. An insertion shifts every
+  later boundary, so nothing after an edit deduplicates.
+- ``gear``: a cut wherever the Gear rolling hash matches one mask of
+  ``log2(avg_size)`` bits, at least ``avg_size / 4`` bytes into the chunk.
+  Boundaries depend on content, so they move with an edit and resync
+  straight after it.
+- ``fastcdc``: FastCDC's normalized chunking. A stricter mask below
+  ``avg_size`` and a looser one above it pull chunk sizes towards the
+  average.
+
+The Gear hash ``h = (h << 1) + GEAR[byte]`` forgets a byte after as many
+steps as it has bits, so the 32-bit hash here covers the last 32 bytes.
+That makes it computable for every position at once: ``log2(32)`` shifted
+adds over a cache-sized block, instead of a Python loop per byte. The
+minimum chunk size is larger than the window, so applying the minimum,
+normal and maximum sizes afterwards picks the same cut points as the
+byte-at-a-time algorithm.
+
+Chunks are fingerprinted with SHA-256 straight from the mapping, and a
+``DedupIndex`` keeps one entry per unique fingerprint. ``benchmark``
+replays a synthetic edit workload, a base file and versions of it with
+small inserts, deletes and overwrites, through each chunker and reports
+throughput, dedup ratio and the memory the fingerprint index takes. Every
+version is written to a temporary file and read by every chunker, so
+``chunked_bytes`` is what callers cap a run by.
+"""
+
+import hashlib
+import mmap
+import os
+import sys
+import tempfile
+import time
+from functools import lru_cache
+from typing import Dict, Iterator, List, Tuple
+
+import numpy as np
+
+CHUNKERS = ("fixed", "gear", "fastcdc")
+MAX_FILE_BYTES = 1 << 30
+MAX_VERSIONS = 8
+# Bytes chunked per run, over every version and chunker
+MAX_CHUNKED_BYTES = 2 << 30
+MAX_EDITS = 10_000
+MIN_AVG_SIZE = 1 << 10
+MAX_AVG_SIZE = 1 << 15
+HASH_BITS = 32
+# Hash this many positions at a time, so the working arrays stay in cache
+HASH_BLOCK = 1 << 15
+# Chunk boundaries are found this many bytes at a time
+SEGMENT = 1 << 23
+MAX_EDIT_BYTES = 512
+# Bytes per entry in a packed index: SHA-256 digest, file offset and length
+PACKED_ENTRY_BYTES = 32 + 8 + 4
+
+GEAR = np.random.default_rng(0x6765617200).integers(0, 1 << HASH_BITS, 256, dtype=np.uint64).astype(np.uint32)
+
+
+def mask(bits: int) -> int:
+    """A mask of ``bits`` ones spread across the hash word. The top bit is
+    always set, so every mask depends on the full 32-byte window."""
+    return sum(1 << (HASH_BITS - 1 - i * HASH_BITS // bits) for i in range(bits))
+
+
+def chunk_sizes(avg_size: int) -> Tuple[int, int, int]:
+    """Minimum, normal and maximum chunk size for an average size, as in FastCDC."""
+    return avg_size // 4, avg_size, avg_size * 8
+
+
+def gear_hashes(data: np.ndarray) -> np.ndarray:
+    """Gear hash after every byte of ``data``, as if hashing started at its first byte."""
+    hashes = np.take(GEAR, data)
+    shifted = np.empty_like(hashes)
+    width = 1
+    # After the pass for width w, each position holds the hash of its last 2w bytes
+    while width < HASH_BITS:
+        np.left_shift(hashes[:-width], width, out=shifted[:-width])
+        np.add(hashes[width:], shifted[:-width], out=hashes[width:])
+        width *= 2
+    return hashes
+
+
+def candidates(data: np.ndarray, start: int, end: int, masks: Tuple[int, ...]) -> List[np.ndarray]:
+    """Positions in ``[start, end)`` whose hash matches each mask, hashed
+    a block at a time."""
+    found = [[] for _ in masks]
+    words = [np.uint32(m) for m in masks]
+    for block in range(start, end, HASH_BLOCK):
+        # Back up a window so the first hashes in the block are complete
+        low = max(0, block - HASH_BITS + 1)
+        hashes = gear_hashes(data[low:min(block + HASH_BLOCK, end)])[block - low:]
+        for positions, word in zip(found, words):
+            hits = np.flatnonzero((hashes & word) == 0)
+            if len(hits):
+                positions.append(hits + block)
+    return [np.concatenate(p) if p else np.empty(0, dtype=np.int64) for p in found]
+
+
+def cut_points(data: np.ndarray, chunker: str, avg_size: int) -> Iterator[int]:
+    """End offsets of the chunks of ``data``, a segment at a time."""
+    size = len(data)
+    if chunker == "fixed":
+        yield from range(avg_size, size, avg_size)
+        if size:
+            yield size
+        return
+    min_size, normal, max_size = chunk_sizes(avg_size)
+    bits = avg_size.bit_length() - 1
+    # Normalized chunking: two bits stricter before the normal size, two looser after
+    masks = (mask(bits + 2), mask(bits - 2)) if chunker == "fastcdc" else (mask(bits),)
+    start = 0
+    while start < size:
+        end = min(start + SEGMENT, size)
+        strict, *loose = candidates(data, start, end, masks)
+        loose = loose[0] if loose else strict
+        # Cut while the chunk's maximum size is inside the segment, or at the end of the file
+        while start < size and (start + max_size <= end or end == size):
+            limit = min(start + max_size, size)
+            if limit - start <= min_size:
+                cut = limit
+            else:
+                # A match at position p ends the chunk after byte p
+                i = np.searchsorted(strict, start + min_size - 1)
+                if i < len(strict) and strict[i] < min(start + normal - 1, limit):
+                    cut = int(strict[i]) + 1
+                else:
+                    j = np.searchsorted(loose, max(start + normal - 1, start + min_size - 1))
+                    cut = int(loose[j]) + 1 if j < len(loose) and loose[j] < limit else limit
+            yield cut
+            start = cut
+
+
+def reference_cut_points(data: bytes, chunker: str, avg_size: int) -> List[int]:
+    """Byte-at-a-time Gear chunking, resetting the hash at every chunk, to check ``cut_points``."""
+    min_size, normal, max_size = chunk_sizes(avg_size)
+    bits = avg_size.bit_length() - 1
+    mask_s, mask_l = (mask(bits + 2), mask(bits - 2)) if chunker == "fastcdc" else (mask(bits),) * 2
+    gear = GEAR.tolist()
+    word = (1 << HASH_BITS) - 1
+    cuts, start = [], 0
+    while start < len(data):
+        limit = min(start + max_size, len(data))
+        cut, h = limit, 0
+        if limit - start > min_size:
+            for i in range(start, limit):
+                h = ((h << 1) + gear[data[i]]) & word
+                length = i - start + 1
+                if length >= min_size and not h & (mask_s if length < normal else mask_l):
+                    cut = i + 1
+                    break
+        cuts.append(cut)
+        start = cut
+    return cuts
+
+
+class DedupIndex:
+    """Unique chunks by SHA-256 fingerprint, with logical and stored byte counts."""
+
+    __slots__ = ("entries", "logical_bytes", "stored_bytes", "chunks")
+
+    def __init__(self):
+        self.entries: Dict[bytes, int] = {}
+        self.logical_bytes = 0
+        self.stored_bytes = 0
+        self.chunks = 0
+
+    def add(self, fingerprint: bytes, length: int) -> bool:
+        """Record one chunk; True if it is new and has to be stored."""
+        self.logical_bytes += length
+        self.chunks += 1
+        if fingerprint in self.entries:
+            return False
+        self.entries[fingerprint] = length
+        self.stored_bytes += length
+        return True
+
+    def memory_bytes(self) -> int:
+        """Bytes held by the dict, its digest keys and its length values."""
+        entries = self.entries
+        return sys.getsizeof(entries) + sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in entries.items())
+
+
+def write_versions(directory: str, size: int, versions: int, edits: int, seed: int = 0) -> List[str]:
+    """A random base file and ``versions`` edits of it. Each version applies
+    ``edits`` inserts, deletes and overwrites of up to ``MAX_EDIT_BYTES``
+    bytes to the one before."""
+    rng = np.random.default_rng(seed)
+    paths = [os.path.join(directory, "v0.bin")]
+    with open(paths[0], "wb") as f:
+        for offset in range(0, size, SEGMENT):
+            f.write(rng.bytes(min(SEGMENT, size - offset)))
+    for version in range(1, versions + 1):
+        paths.append(os.path.join(directory, f"v{version}.bin"))
+        with open(paths[-2], "rb") as src, open(paths[-1], "wb") as dst, \
+                mmap.mmap(src.fileno(), 0, access=mmap.ACCESS_READ) as previous:
+            view = memoryview(previous)
+            positions = np.sort(rng.integers(0, len(previous), edits)).tolist()
+            kinds = rng.integers(0, 3, edits).tolist()
+            lengths = rng.integers(1, MAX_EDIT_BYTES + 1, edits).tolist()
+            at = 0
+            for position, kind, length in zip(positions, kinds, lengths):
+                position = max(position, at)
+                dst.write(view[at:position])
+                at = position
+                if kind == 0:
+                    dst.write(rng.bytes(length))
+                elif kind == 1:
+                    at = min(at + length, len(previous))
+                else:
+                    dst.write(rng.bytes(min(length, len(previous) - at)))
+                    at = min(at + length, len(previous))
+            dst.write(view[at:])
+            view.release()
+    return paths
+
+
+def chunk_file(path: str, chunker: str, avg_size: int, index: DedupIndex) -> Dict:
+    """Chunk one file through a read-only mapping and fingerprint every chunk into ``index``."""
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        size = len(mapped)
+        data = np.frombuffer(mapped, dtype=np.uint8)
+        started = time.perf_counter()
+        cuts = np.fromiter(cut_points(data, chunker, avg_size), dtype=np.int64)
+        chunk_seconds = time.perf_counter() - started
+
+        view = memoryview(mapped)
+        new_bytes, start = 0, 0
+        started = time.perf_counter()
+        for end in cuts.tolist():
+            if index.add(hashlib.sha256(view[start:end]).digest(), end - start):
+                new_bytes += end - start
+            start = end
+        fingerprint_seconds = time.perf_counter() - started
+        view.release()
+        del data
+    return {
+        "bytes": size,
+        "sizes": np.diff(cuts, prepend=0),
+        "new_bytes": new_bytes,
+        "chunk_seconds": chunk_seconds,
+        "fingerprint_seconds": fingerprint_seconds,
+    }
+
+
+@lru_cache(maxsize=16)
+def chunked_bytes(size: int, versions: int, chunkers: int) -> int:
+    """Bytes a ``benchmark`` run chunks and fingerprints: the base file and
+    each version, once per chunker."""
+    return size * (versions + 1) * chunkers
+
+
+def benchmark(size: int = 32 << 20, versions: int = 3, edits: int = 100, avg_size: int = 8192,
+              chunkers: tuple = CHUNKERS, seed: int = 0) -> Dict:
+    """Chunk a base file and its edited versions with each chunker into a
+    fresh dedup index and report throughput, dedup and index memory."""
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        paths = write_versions(directory, size, versions, edits, seed)
+        for name in chunkers:
+            index = DedupIndex()
+            files = [chunk_file(path, name, avg_size, index) for path in paths]
+            total = sum(f["bytes"] for f in files)
+            sizes = np.concatenate([f["sizes"] for f in files])
+            chunk_seconds = sum(f["chunk_seconds"] for f in files)
+            fingerprint_seconds = sum(f["fingerprint_seconds"] for f in files)
+            edited = files[1:]
+            results[name] = {
+                "chunks": index.chunks,
+                "unique_chunks": len(index.entries),
+                "mean_chunk_bytes": round(float(sizes.mean()), 1),
+                "chunk_bytes_stddev": round(float(sizes.std()), 1),
+                "chunking_gb_per_second": round(total / chunk_seconds / 1e9, 3) if chunk_seconds else None,
+                "fingerprint_gb_per_second": round(total / fingerprint_seconds / 1e9, 3) if fingerprint_seconds else None,
+                "logical_bytes": index.logical_bytes,
+                "stored_bytes": index.stored_bytes,
+                "dedup_ratio": round(index.logical_bytes / index.stored_bytes, 3),
+                # Share of each edited version that has to be uploaded
+                "new_bytes_per_version": round(sum(f["new_bytes"] for f in edited) / sum(f["bytes"] for f in edited), 5)
+                if edited else None,
+                "index_bytes": index.memory_bytes(),
+                "index_bytes_per_chunk": round(index.memory_bytes() / len(index.entries), 1),
+                "packed_index_bytes": len(index.entries) * PACKED_ENTRY_BYTES,
+            }
+    return {
+        "workload": {"file_bytes": size, "versions": versions, "edits_per_version": edits, "avg_size": avg_size},
+        "chunkers": results,
+    }
@@ -0,0 +1,309 @@
+"""
+Seat reservation contention harness.
+
+Puts numbers behind the ``ticketmaster`` blueprint and the "Dealing with
+Contention" pattern. Thousands of client threads race to book seats in a
+real SQLite database. Each client goes for a popular seat, tries up to
+``SEAT_CHOICES`` seats and retries conflicts with backoff. Every strategy
+spends ``think`` seconds between reading a seat and writing it, standing in
+for the application work and round trips of a real booking. Strategies:
+
+- ``naive``: read, then write, with no concurrency control. This is the
+  baseline that shows the harness can catch double booking.
+- ``pessimistic``: ``BEGIN IMMEDIATE`` holds the write lock from the read
+  to the commit. SQLite locks the whole database rather than the row that
+  ``SELECT ... FOR UPDATE`` would lock, so this is the worst case for
+  throughput.
+- ``optimistic``: a version column, with a conditional
+  ``UPDATE ... WHERE version = ?``; a lost race aborts and retries.
+- ``distributed_lock``: ``LockService``, an in-process stand-in for Redis
+  ``SET NX PX``. Each lock comes with a fencing token, and writes carry the
+  token, so a lock that expired mid-booking cannot double book.
+- ``reservation``: an atomic hold with a TTL, then payment, then a confirm
+  that only succeeds while the hold is live. Failed payments leave holds to
+  expire.
+
+Clients share a pool of ``POOL_SIZE`` connections, like application servers
+in front of one database. ``benchmark`` reports throughput, abort and retry
+rates, and double bookings counted from the bookings table.
+
+``pessimistic`` books one seat at a time, each holding the write lock for
+``think``, so a run lasts at least ``serial_seconds``. Callers cap that, and
+keep it well under ``BUSY_TIMEOUT`` so queued writers do not time out.
+"""
+
+import os
+import queue
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+import numpy as np
+
+STRATEGIES = ("naive", "pessimistic", "optimistic", "distributed_lock", "reservation")
+MAX_CLIENTS = 2000
+MAX_SEATS = 100_000
+POOL_SIZE = 32
+BUSY_TIMEOUT = 10.0
+MAX_SERIAL_SECONDS = 5.0
+MAX_RETRIES = 5
+SEAT_CHOICES = 3
+# Seat popularity: better seats are wanted more, with Zipf weights
+SEAT_ALPHA = 0.8
+PAYMENT_FAILURE = 0.1
+
+BOOKED, TAKEN, ABANDONED = "booked", "taken", "abandoned"
+
+
+class Conflict(Exception):
+    """A booking attempt lost a race and may be retried."""
+
+
+class LockService:
+    """In-process stand-in for Redis locks: ``SET key token NX PX ttl`` to
+    acquire, compare-and-delete to release. Tokens increase with every grant,
+    so they double as fencing tokens."""
+
+    __slots__ = ("_mutex", "_owners", "_token")
+
+    def __init__(self):
+        self._mutex = threading.Lock()
+        self._owners: Dict[str, tuple] = {}
+        self._token = 0
+
+    def acquire(self, key: str, ttl: float) -> Optional[int]:
+        with self._mutex:
+            now = time.monotonic()
+            owner = self._owners.get(key)
+            if owner is not None and owner[1] > now:
+                return None
+            self._token += 1
+            self._owners[key] = (self._token, now + ttl)
+            return self._token
+
+    def release(self, key: str, token: int):
+        with self._mutex:
+            owner = self._owners.get(key)
+            if owner is not None and owner[0] == token:
+                del self._owners[key]
+
+
+class ConnectionPool:
+    """Fixed pool of autocommit connections shared by client threads."""
+
+    __slots__ = ("_idle",)
+
+    def __init__(self, path: str, size: int = POOL_SIZE):
+        self._idle = queue.Queue()
+        for _ in range(size):
+            conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT, isolation_level=None, check_same_thread=False)
+            self._idle.put(conn)
+
+    @contextmanager
+    def connection(self):
+        conn = self._idle.get()
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            self._idle.put(conn)
+
+    def close(self):
+        while not self._idle.empty():
+            self._idle.get().close()
+
+
+def create_venue(path: str, seats: int):
+    conn = sqlite3.connect(path, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("CREATE TABLE seats (id INTEGER PRIMARY KEY, status TEXT NOT NULL, version INTEGER NOT NULL, "
+                 "holder INTEGER, hold_until REAL, fence INTEGER NOT NULL)")
+    # No unique constraint on seat, so double bookings show up instead of failing
+    conn.execute("CREATE TABLE bookings (seat INTEGER NOT NULL, client INTEGER NOT NULL)")
+    conn.executemany("INSERT INTO seats VALUES (?, 'available', 0, NULL, NULL, 0)", ((i,) for i in range(seats)))
+    conn.close()
+
+
+class Booking:
+    """Shared settings for one run; strategy methods book one seat for one client."""
+
+    __slots__ = ("think", "locks", "lock_ttl", "hold_ttl")
+
+    def __init__(self, think: float, lock_ttl: float, hold_ttl: float):
+        self.think = think
+        self.locks = LockService()
+        self.lock_ttl = lock_ttl
+        self.hold_ttl = hold_ttl
+
+    def naive(self, conn, client: int, seat: int, rng: random.Random) -> str:
+        status, = conn.execute("SELECT status FROM seats WHERE id = ?", (seat,)).fetchone()
+        if status != "available":
+            return TAKEN
+        time.sleep(self.think)
+        conn.execute("UPDATE seats SET status = 'booked', holder = ? WHERE id = ?", (client, seat))
+        conn.execute("INSERT INTO bookings VALUES (?, ?)", (seat, client))
+        return BOOKED
+
+    def pessimistic(self, conn, client: int, seat: int, rng: random.Random) -> str:
+        conn.execute("BEGIN IMMEDIATE")
+        status, = conn.execute("SELECT status FROM seats WHERE id = ?", (seat,)).fetchone()
+        if status != "available":
+            conn.execute("ROLLBACK")
+            return TAKEN
+        time.sleep(self.think)
+        conn.execute("UPDATE seats SET status = 'booked', holder = ? WHERE id = ?", (client, seat))
+        conn.execute("INSERT INTO bookings VALUES (?, ?)", (seat, client))
+        conn.execute("COMMIT")
+        return BOOKED
+
+    def optimistic(self, conn, client: int, seat: int, rng: random.Random) -> str:
+        status, version = conn.execute("SELECT status, version FROM seats WHERE id = ?", (seat,)).fetchone()
+        if status != "available":
+            return TAKEN
+        time.sleep(self.think)
+        conn.execute("BEGIN")
+        updated = conn.execute("UPDATE seats SET status = 'booked', holder = ?, version = version + 1 "
+                               "WHERE id = ? AND version = ?", (client, seat, version)).rowcount
+        if not updated:
+            conn.execute("ROLLBACK")
+            raise Conflict
+        conn.execute("INSERT INTO bookings VALUES (?, ?)", (seat, client))
+        conn.execute("COMMIT")
+        return BOOKED
+
+    def distributed_lock(self, conn, client: int, seat: int, rng: random.Random) -> str:
+        key = f"seat:{seat}"
+        token = self.locks.acquire(key, self.lock_ttl)
+        if token is None:
+            raise Conflict
+        try:
+            status, = conn.execute("SELECT status FROM seats WHERE id = ?", (seat,)).fetchone()
+            if status != "available":
+                return TAKEN
+            time.sleep(self.think)
+            conn.execute("BEGIN")
+            # The fence rejects a holder whose lock expired and was granted again
+            updated = conn.execute("UPDATE seats SET status = 'booked', holder = ?, fence = ? "
+                                   "WHERE id = ? AND status = 'available' AND fence < ?",
+                                   (client, token, seat, token)).rowcount
+            if not updated:
+                conn.execute("ROLLBACK")
+                raise Conflict
+            conn.execute("INSERT INTO bookings VALUES (?, ?)", (seat, client))
+            conn.execute("COMMIT")
+            return BOOKED
+        finally:
+            self.locks.release(key, token)
+
+    def reservation(self, conn, client: int, seat: int, rng: random.Random) -> str:
+        held = conn.execute("UPDATE seats SET holder = ?, hold_until = ? WHERE id = ? AND status = 'available' "
+                            "AND (hold_until IS NULL OR hold_until < ?)",
+                            (client, time.time() + self.hold_ttl, seat, time.time())).rowcount
+        if not held:
+            return TAKEN
+        # Payment runs while the seat is held
+        time.sleep(self.think)
+        if rng.random() < PAYMENT_FAILURE:
+            return ABANDONED
+        conn.execute("BEGIN")
+        confirmed = conn.execute("UPDATE seats SET status = 'booked' WHERE id = ? AND holder = ? AND hold_until >= ?",
+                                 (seat, client, time.time())).rowcount
+        if not confirmed:
+            conn.execute("ROLLBACK")
+            raise Conflict
+        conn.execute("INSERT INTO bookings VALUES (?, ?)", (seat, client))
+        conn.execute("COMMIT")
+        return BOOKED
+
+
+def seat_choices(clients: int, seats: int, seed: int = 0) -> np.ndarray:
+    """``SEAT_CHOICES`` seats per client, drawn by seat popularity."""
+    rng = np.random.default_rng(seed)
+    cdf = np.cumsum(np.arange(1, seats + 1, dtype=np.float64) ** -SEAT_ALPHA)
+    cdf /= cdf[-1]
+    return np.minimum(np.searchsorted(cdf, rng.random((clients, SEAT_CHOICES)), side="right"), seats - 1)
+
+
+def serial_seconds(clients: int, seats: int, think: float) -> float:
+    """Lower bound on a ``pessimistic`` run: every seat that can sell holds
+    the write lock for ``think``, one after another."""
+    return min(clients, seats) * think
+
+
+def run(strategy: str, clients: int = 1000, seats: int = 100, think: float = 0.001, lock_ttl: float = 1.0,
+        hold_ttl: float = 1.0, seed: int = 0, path: Optional[str] = None) -> Dict:
+    """Start ``clients`` threads at once against a fresh venue and tally the outcome."""
+    with tempfile.TemporaryDirectory() as directory:
+        path = path or os.path.join(directory, "venue.db")
+        create_venue(path, seats)
+        pool = ConnectionPool(path)
+        booking = Booking(think, lock_ttl, hold_ttl)
+        attempt = getattr(booking, strategy)
+        choices = seat_choices(clients, seats, seed).tolist()
+        # Per client: booked, transactions, aborts, abandoned, latency
+        outcomes = [None] * clients
+        start = threading.Event()
+
+        def client_thread(client: int):
+            rng = random.Random(seed * MAX_CLIENTS + client)
+            start.wait()
+            began = time.perf_counter()
+            transactions = aborts = abandoned = 0
+            result = TAKEN
+            for seat in choices[client]:
+                for retry in range(MAX_RETRIES + 1):
+                    transactions += 1
+                    try:
+                        with pool.connection() as conn:
+                            result = attempt(conn, client, seat, rng)
+                        break
+                    except (Conflict, sqlite3.OperationalError):
+                        aborts += 1
+                        # Jittered exponential backoff before retrying the same seat
+                        time.sleep(rng.random() * max(think, 0.0005) * 2 ** retry)
+                abandoned += result == ABANDONED
+                if result in (BOOKED, ABANDONED):
+                    break
+            outcomes[client] = (result == BOOKED, transactions, aborts, abandoned, time.perf_counter() - began)
+
+        threads = [threading.Thread(target=client_thread, args=(c,)) for c in range(clients)]
+        for thread in threads:
+            thread.start()
+        began = time.perf_counter()
+        start.set()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - began
+        pool.close()
+
+        conn = sqlite3.connect(path)
+        bookings, = conn.execute("SELECT COUNT(*) FROM bookings").fetchone()
+        sold, = conn.execute("SELECT COUNT(DISTINCT seat) FROM bookings").fetchone()
+        conn.close()
+
+    booked, transactions, aborts, abandoned, latency = (np.array(column) for column in zip(*outcomes))
+    return {
+        "bookings": int(bookings),
+        "seats_sold": int(sold),
+        "double_bookings": int(bookings - sold),
+        "bookings_per_second": round(bookings / elapsed, 1),
+        "transactions_per_second": round(int(transactions.sum()) / elapsed, 1),
+        "abort_rate": round(float(aborts.sum() / transactions.sum()), 4),
+        "retries_per_client": round(float(aborts.mean()), 4),
+        "clients_without_seat": int(clients - booked.sum()),
+        "abandoned_holds": int(abandoned.sum()),
+        "p50_latency_ms": round(float(np.percentile(latency, 50)) * 1000, 2),
+        "p99_latency_ms": round(float(np.percentile(latency, 99)) * 1000, 2),
+        "elapsed_seconds": round(elapsed, 3),
+    }
+
+
+def benchmark(clients: int = 1000, seats: int = 100, think: float = 0.001, strategies: tuple = STRATEGIES,
+              seed: int = 0) -> Dict:
+    """Run every strategy on its own venue with the same clients and seat choices."""
+    return {name: run(name, clients, seats, think, seed=seed) for name in strategies}
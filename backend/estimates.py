@@ -0,0 +1,138 @@
+"""
+Back-of-envelope capacity estimates for scenario blueprints.
+
+Each blueprint carries numeric ``scale`` parameters (DAU, reads and writes
+per user per day, bytes per read and write, retention, peak-to-average
+factor). ``estimate`` turns them into QPS, peak QPS, storage growth,
+bandwidth, cache size and server counts, taking the remaining constants
+(per-server QPS, index overhead, CDN hit ratio) from ``NUMBERS_TO_KNOW``.
+
+Every formula is a NumPy broadcast, so any parameter may be an array: a
+sweep such as "DAU from 1M to 1B" is evaluated for all points in one call.
+"""
+
+from typing import Dict, Union
+
+import numpy as np
+
+from units import REFERENCE_NUMBERS
+
+SECONDS_PER_DAY = 86_400
+
+SCALE_PARAMS = (
+    "dau", "reads_per_user", "writes_per_user", "write_size_bytes",
+    "read_size_bytes", "retention_days", "peak_factor", "cache_hot_fraction",
+)
+
+DEFAULT_SCALE = {
+    "peak_factor": 3.0,
+    # 80/20 rule: cache the hottest 20% of a day's reads
+    "cache_hot_fraction": 0.2,
+}
+
+METRIC_UNITS = {
+    "avg_read_qps": "req/s",
+    "avg_write_qps": "req/s",
+    "avg_qps": "req/s",
+    "peak_qps": "req/s",
+    "storage_per_day": "bytes",
+    "storage_per_year": "bytes",
+    "storage_retained": "bytes",
+    "ingress_bandwidth": "bytes/s",
+    "egress_bandwidth": "bytes/s",
+    "origin_egress_with_cdn": "bytes/s",
+    "cache_size": "bytes",
+    "app_servers": "servers",
+}
+
+
+def reference_number(dimension: str, label: str) -> float:
+    """Lower bound of a ``NUMBERS_TO_KNOW`` value in SI units; percentages are fractions."""
+    index = REFERENCE_NUMBERS.resolve(label, dimension)
+    if index is None:
+        raise KeyError(f"{dimension}/{label}")
+    return REFERENCE_NUMBERS.quantities[index].value
+
+
+QPS_PER_SERVER = reference_number("capacity", "QPS per server (simple CRUD)")
+INDEX_OVERHEAD = reference_number("storage", "Index overhead")
+CDN_HIT_RATIO = reference_number("capacity", "CDN cache hit ratio target")
+
+Number = Union[float, np.ndarray]
+
+
+def estimate(params: Dict[str, Number]) -> Dict[str, np.ndarray]:
+    """Derive every metric in ``METRIC_UNITS`` from scale parameters."""
+    p = {**DEFAULT_SCALE, **params}
+    dau = np.asarray(p["dau"], dtype=np.float64)
+
+    reads_per_day = dau * p["reads_per_user"]
+    writes_per_day = dau * p["writes_per_user"]
+    read_qps = reads_per_day / SECONDS_PER_DAY
+    write_qps = writes_per_day / SECONDS_PER_DAY
+    avg_qps = read_qps + write_qps
+    peak_qps = avg_qps * p["peak_factor"]
+
+    storage_per_day = writes_per_day * p["write_size_bytes"] * (1 + INDEX_OVERHEAD)
+    egress = read_qps * p["read_size_bytes"]
+
+    return {
+        "avg_read_qps": read_qps,
+        "avg_write_qps": write_qps,
+        "avg_qps": avg_qps,
+        "peak_qps": peak_qps,
+        "storage_per_day": storage_per_day,
+        "storage_per_year": storage_per_day * 365,
+        "storage_retained": storage_per_day * p["retention_days"],
+        "ingress_bandwidth": write_qps * p["write_size_bytes"],
+        "egress_bandwidth": egress,
+        "origin_egress_with_cdn": egress * (1 - CDN_HIT_RATIO),
+        "cache_size": reads_per_day * p["read_size_bytes"] * p["cache_hot_fraction"],
+        "app_servers": np.maximum(np.ceil(peak_qps / QPS_PER_SERVER), 1),
+    }
+
+
+def sweep(params: Dict[str, float], parameter: str, start: float, stop: float,
+          points: int = 20, log: bool = True) -> Dict:
+    """Evaluate ``estimate`` with ``parameter`` swept from ``start`` to ``stop``."""
+    values = np.geomspace(start, stop, points) if log else np.linspace(start, stop, points)
+    results = estimate({**params, parameter: values})
+    return {
+        "parameter": parameter,
+        "values": values.tolist(),
+        "estimates": {metric: np.broadcast_to(v, values.shape).tolist() for metric, v in results.items()},
+    }
+
+
+_COUNT_SUFFIXES = ((1e12, "T"), (1e9, "B"), (1e6, "M"), (1e3, "K"))
+_BYTE_UNITS = ((1e18, "EB"), (1e15, "PB"), (1e12, "TB"), (1e9, "GB"), (1e6, "MB"), (1e3, "KB"))
+
+
+def _scaled(value: float, units, fallback: str) -> str:
+    for size, suffix in units:
+        if value >= size:
+            return f"{value / size:.3g}{suffix}"
+    return f"{value:.3g}{fallback}"
+
+
+def format_count(value: float) -> str:
+    return _scaled(float(value), _COUNT_SUFFIXES, "")
+
+
+def format_bytes(value: float) -> str:
+    return _scaled(float(value), [(s, f" {u}") for s, u in _BYTE_UNITS], " B")
+
+
+def scale_summary(params: Dict[str, float]) -> Dict[str, str]:
+    """Human-readable scale hints for test mode."""
+    result = {metric: float(v) for metric, v in estimate(params).items()}
+    summary = {
+        "daily_active_users": f"{format_count(params['dau'])} DAU",
+        "requests_per_second": f"Avg: {format_count(result['avg_qps'])}/s, Peak: {format_count(result['peak_qps'])}/s",
+    }
+    if result["storage_per_day"] > 0:
+        years = params["retention_days"] / 365
+        retained = f"over {years:.3g} year{'' if years == 1 else 's'}" if years >= 1 else "retained"
+        summary["data_size"] = f"{format_bytes(result['storage_per_day'])}/day, {format_bytes(result['storage_retained'])} {retained}"
+    summary["bandwidth"] = f"In: {format_bytes(result['ingress_bandwidth'])}/s, Out: {format_bytes(result['egress_bandwidth'])}/s"
+    return summary
@@ -0,0 +1,291 @@
+"""
+Feed fan-out simulator.
+
+Puts numbers behind the ``feed`` blueprint's hybrid fan-out argument. The
+follower graph has power-law popularity: followee ``r``, by popularity
+rank, gets a share of edges proportional to ``1 / r**alpha``. It is stored
+as CSR adjacency both ways, followers by author and followees by reader.
+Posts are replayed in time order under three strategies:
+
+- ``push`` (fan-out on write): every post is appended to each follower's
+  materialized timeline, capped at ``feed_size`` entries like a trimmed
+  Redis list. A read is one list fetch.
+- ``pull`` (fan-out on read): a post is appended only to its author's
+  recent-posts list. A read fetches the list of every followee and merges
+  them.
+- ``hybrid``: push, except authors with more than ``threshold`` followers
+  are not fanned out. Readers merge their timeline with the lists of the
+  celebrities they follow.
+
+The fan-out itself is vectorized. Each round of posts gathers its
+recipients from the CSR arrays and writes them into a ``users x
+feed_size`` ring buffer. Read cost is counted in lists fetched and entries
+merged per read, and turned into a latency proxy. After every round, a
+sample of readers' feeds is rebuilt under all three strategies to check
+that they agree.
+
+Run time and timeline memory grow with the number of deliveries, which
+``estimated_deliveries`` predicts from the parameters alone, so callers can
+cap it before building the graph.
+"""
+
+import time
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+STRATEGIES = ("push", "pull", "hybrid")
+MAX_USERS = 1_000_000
+MAX_EDGES = 20_000_000
+MAX_POSTS = 1_000_000
+MAX_FEED_SIZE = 50
+# Push fan-out timeline writes per run
+MAX_DELIVERIES = 50_000_000
+
+# Following counts are skewed too, but far less than follower counts
+FOLLOWING_ALPHA = 0.5
+# Authors post in proportion to (1 + followers) ** POST_SKEW
+POST_SKEW = 0.3
+ROUNDS = 10
+FEED_CHECKS_PER_ROUND = 20
+
+# Latency proxy: one pipelined round trip, server time per list, merge time per entry
+ROUND_TRIP_MS = 0.5
+LIST_MS = 0.02
+ENTRY_MS = 0.0002
+# Post id and timestamp per timeline entry
+ENTRY_BYTES = 16
+
+
+def _power_law(rng: np.random.Generator, n: int, size: int, alpha: float) -> np.ndarray:
+    """Ranks in ``[0, n)`` with density proportional to ``1 / (rank + 1)**alpha``,
+    by inverting the continuous power-law CDF."""
+    u = rng.random(size)
+    if abs(alpha - 1.0) < 1e-9:
+        x = np.exp(u * np.log(n + 1))
+    else:
+        x = (u * ((n + 1) ** (1 - alpha) - 1) + 1) ** (1 / (1 - alpha))
+    return np.minimum(x.astype(np.int64) - 1, n - 1)
+
+
+def estimated_deliveries(users: int, edges: int, posts: int, alpha: float = 1.0) -> float:
+    """Expected push fan-out writes: ``posts`` times the mean follower count
+    of an author, weighted by posting rate. Follower counts come from the
+    power-law CDF, less the repeated edges ``FollowerGraph`` drops."""
+    x = np.arange(1, users + 2, dtype=np.float64)
+    if abs(alpha - 1.0) < 1e-9:
+        cdf = np.log(x) / np.log(users + 1)
+    else:
+        cdf = (x ** (1 - alpha) - 1) / ((users + 1) ** (1 - alpha) - 1)
+    followers = users * -np.expm1(-edges * np.diff(cdf) / users)
+    weights = (1.0 + followers) ** POST_SKEW
+    return posts * float((weights * followers).sum() / weights.sum())
+
+
+def _csr(rows: np.ndarray, cols: np.ndarray, n: int) -> Tuple[np.ndarray, np.ndarray]:
+    order = np.argsort(rows, kind="stable")
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+    return indptr, cols[order]
+
+
+def _gather(indptr: np.ndarray, indices: np.ndarray, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Neighbours of every row in ``rows``, concatenated, and which entry of
+    ``rows`` each came from."""
+    counts = indptr[rows + 1] - indptr[rows]
+    total = int(counts.sum())
+    owner = np.repeat(np.arange(len(rows)), counts)
+    offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+    return indices[indptr[rows][owner] + offsets], owner
+
+
+class FollowerGraph:
+    """Follower graph as CSR adjacency: ``followers`` by author and
+    ``following`` by reader."""
+
+    __slots__ = ("users", "edges", "followers_indptr", "followers", "following_indptr", "following")
+
+    def __init__(self, users: int, edges: int, alpha: float = 1.0, seed: int = 0):
+        rng = np.random.default_rng(seed)
+        # Popularity should not follow user id
+        followee = rng.permutation(users)[_power_law(rng, users, edges, alpha)]
+        follower = rng.permutation(users)[_power_law(rng, users, edges, FOLLOWING_ALPHA)]
+        # Drop self-follows and repeated edges. Sorting the int64 edge keys
+        # groups them by follower, and is far faster than np.unique or argsort
+        keep = follower != followee
+        keys = np.sort(follower[keep] * users + followee[keep])
+        keys = keys[np.r_[True, keys[1:] != keys[:-1]]]
+        self.users, self.edges = users, len(keys)
+        self.following_indptr, self.following = self._adjacency(keys, users)
+        follower, followee = keys // users, keys % users
+        self.followers_indptr, self.followers = self._adjacency(np.sort(followee * users + follower), users)
+
+    @staticmethod
+    def _adjacency(keys: np.ndarray, users: int) -> Tuple[np.ndarray, np.ndarray]:
+        """CSR arrays from sorted ``row * users + column`` keys."""
+        indptr = np.zeros(users + 1, dtype=np.int64)
+        np.cumsum(np.bincount(keys // users, minlength=users), out=indptr[1:])
+        return indptr, keys % users
+
+    def follower_counts(self) -> np.ndarray:
+        return np.diff(self.followers_indptr)
+
+    def following_counts(self) -> np.ndarray:
+        return np.diff(self.following_indptr)
+
+
+class _Timelines:
+    """Materialized timelines as a ring buffer of the newest ``size`` post ids per user."""
+
+    __slots__ = ("entries", "delivered", "size")
+
+    def __init__(self, users: int, size: int):
+        self.entries = np.full((users, size), -1, dtype=np.int32)
+        self.delivered = np.zeros(users, dtype=np.int64)
+        self.size = size
+
+    def append(self, recipients: np.ndarray, posts: np.ndarray):
+        """Deliver posts, given in time order, to their recipients."""
+        if not len(recipients):
+            return
+        order = np.argsort(recipients, kind="stable")
+        recipients, posts = recipients[order], posts[order]
+        first = np.flatnonzero(np.r_[True, recipients[1:] != recipients[:-1]])
+        sizes = np.diff(np.r_[first, len(recipients)])
+        rank = np.arange(len(recipients)) - np.repeat(first, sizes)
+        # Only each recipient's newest ``size`` posts survive the chunk
+        keep = rank >= np.repeat(sizes, sizes) - self.size
+        slots = (self.delivered[recipients] + rank) % self.size
+        self.entries[recipients[keep], slots[keep]] = posts[keep]
+        self.delivered[recipients[first]] += sizes
+
+    def read(self, user: int) -> List[int]:
+        count = min(int(self.delivered[user]), self.size)
+        newest = int(self.delivered[user]) - 1
+        return [int(self.entries[user, (newest - i) % self.size]) for i in range(count)]
+
+
+def _recent(post_indptr: np.ndarray, post_ids: np.ndarray, authors: np.ndarray, before: int, size: int) -> np.ndarray:
+    """Each author's newest ``size`` posts with id below ``before``."""
+    lists = []
+    for author in authors.tolist():
+        ids = post_ids[post_indptr[author]:post_indptr[author + 1]]
+        end = np.searchsorted(ids, before)
+        lists.append(ids[max(0, end - size):end])
+    return np.concatenate(lists) if lists else np.empty(0, dtype=post_ids.dtype)
+
+
+def _newest(ids: np.ndarray, size: int) -> List[int]:
+    return np.sort(ids)[::-1][:size].tolist()
+
+
+def _read_cost(lists: np.ndarray, entries: np.ndarray) -> Dict:
+    latency = ROUND_TRIP_MS + lists * LIST_MS + entries * ENTRY_MS
+    return {
+        "lists_per_read": {"mean": round(float(lists.mean()), 2), "p99": float(np.percentile(lists, 99))},
+        "entries_merged_per_read": round(float(entries.mean()), 1),
+        "read_latency_ms": {
+            "p50": round(float(np.percentile(latency, 50)), 3),
+            "p99": round(float(np.percentile(latency, 99)), 3),
+        },
+    }
+
+
+@lru_cache(maxsize=16)
+def simulate(users: int = 100_000, edges: int = 1_000_000, posts: int = 100_000, reads: int = 100_000,
+             threshold: int = 10_000, feed_size: int = 20, alpha: float = 1.0, seed: int = 0) -> Dict:
+    """Write amplification, read cost and timeline memory for push, pull and
+    hybrid fan-out on one generated graph and workload."""
+    started = time.perf_counter()
+    graph = FollowerGraph(users, edges, alpha, seed)
+    build_seconds = time.perf_counter() - started
+
+    rng = np.random.default_rng(seed + 1)
+    follower_counts = graph.follower_counts()
+    weights = np.cumsum((1.0 + follower_counts) ** POST_SKEW)
+    authors = np.minimum(np.searchsorted(weights, rng.random(posts) * weights[-1], side="right"), users - 1)
+    post_indptr, post_ids = _csr(authors, np.arange(posts, dtype=np.int32), users)
+    celebrity = follower_counts > threshold
+    # Readers are drawn in proportion to how many accounts they follow
+    edge_follower = np.repeat(np.arange(users), graph.following_counts())
+
+    push, hybrid = _Timelines(users, feed_size), _Timelines(users, feed_size)
+    matches = checks = 0
+    started = time.perf_counter()
+    bounds = np.linspace(0, posts, ROUNDS + 1).astype(int)
+    for round_start, round_end in zip(bounds[:-1].tolist(), bounds[1:].tolist()):
+        ids = np.arange(round_start, round_end, dtype=np.int32)
+        recipients, owner = _gather(graph.followers_indptr, graph.followers, authors[ids])
+        push.append(recipients, ids[owner])
+        fanned = ~celebrity[authors[ids]][owner]
+        hybrid.append(recipients[fanned], ids[owner][fanned])
+
+        # Rebuild a sample of feeds as of the end of this round
+        for reader in edge_follower[rng.integers(0, graph.edges, FEED_CHECKS_PER_ROUND)].tolist():
+            followees = graph.following[graph.following_indptr[reader]:graph.following_indptr[reader + 1]]
+            pulled = _newest(_recent(post_indptr, post_ids, followees, round_end, feed_size), feed_size)
+            celebrities = followees[celebrity[followees]]
+            merged = np.concatenate([np.array(hybrid.read(reader), dtype=np.int32),
+                                     _recent(post_indptr, post_ids, celebrities, round_end, feed_size)])
+            matches += push.read(reader) == pulled == _newest(merged, feed_size)
+            checks += 1
+    fanout_seconds = time.perf_counter() - started
+
+    # Steady-state read cost, from list lengths at the end of the replay
+    readers = edge_follower[rng.integers(0, graph.edges, reads)]
+    author_lists = np.minimum(np.bincount(authors, minlength=users), feed_size)
+    pull_entries = np.bincount(edge_follower, weights=author_lists[graph.following], minlength=users)
+    celebrity_edges = celebrity[graph.following]
+    celebrity_lists = np.bincount(edge_follower[celebrity_edges], minlength=users)
+    celebrity_entries = np.bincount(edge_follower[celebrity_edges],
+                                    weights=author_lists[graph.following[celebrity_edges]], minlength=users)
+    push_timeline = np.minimum(push.delivered, feed_size)
+    hybrid_timeline = np.minimum(hybrid.delivered, feed_size)
+
+    writes = {
+        "push": int(push.delivered.sum()),
+        "pull": posts,
+        "hybrid": int(hybrid.delivered.sum()) + int(celebrity[authors].sum()),
+    }
+    stored = {
+        "push": int(push_timeline.sum()),
+        "pull": int(author_lists.sum()),
+        "hybrid": int(hybrid_timeline.sum()) + int(author_lists[celebrity].sum()),
+    }
+    costs = {
+        "push": _read_cost(np.ones(reads), push_timeline[readers]),
+        "pull": _read_cost(graph.following_counts()[readers], pull_entries[readers]),
+        "hybrid": _read_cost(1 + celebrity_lists[readers], hybrid_timeline[readers] + celebrity_entries[readers]),
+    }
+    fanout = follower_counts[authors]
+    max_writes = {
+        "push": int(fanout.max(initial=0)),
+        "pull": 1,
+        "hybrid": int(np.where(celebrity[authors], 1, fanout).max(initial=0)),
+    }
+    strategies = {
+        name: {
+            "writes": writes[name],
+            "write_amplification": round(writes[name] / posts, 2),
+            "max_writes_per_post": max_writes[name],
+            **costs[name],
+            "stored_entries": stored[name],
+            "memory_mb": round(stored[name] * ENTRY_BYTES / 2**20, 2),
+        }
+        for name in STRATEGIES
+    }
+
+    return {
+        "graph": {
+            "users": users,
+            "edges": graph.edges,
+            "max_followers": int(follower_counts.max()),
+            "celebrities": int(celebrity.sum()),
+            "build_seconds": round(build_seconds, 3),
+        },
+        "workload": {"posts": posts, "reads": reads, "feed_size": feed_size, "threshold": threshold},
+        "fanout_seconds": round(fanout_seconds, 3),
+        "feeds_match": round(matches / checks, 4),
+        "strategies": strategies,
+    }
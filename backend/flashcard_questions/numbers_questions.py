@@ -12,6 +12,10 @@ import os
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from flashcard_types import NumbersQuestion
+from units import REFERENCE_NUMBERS
+
+# Comparisons between reference numbers are generated from NUMBERS_TO_KNOW
+_compare = REFERENCE_NUMBERS.ratio_phrase
 
 NUMBERS_QUESTIONS: List[NumbersQuestion] = [
     {
@@ -19,14 +23,15 @@ NUMBERS_QUESTIONS: List[NumbersQuestion] = [
         "category": "Latency",
         "question": "What is the typical latency for a RAM access?",
         "answer": "100 nanoseconds (ns)",
-        "context": "This is 1,500x faster than SSD random read (150 μs)"
+        "context": f"This is {_compare('Main memory (RAM) reference', 'SSD random read', show_value=True)}"
     },
     {
         "id": "numbers-2",
         "category": "Latency",
         "question": "What is the typical latency for an SSD random read?",
         "answer": "150 microseconds (μs)",
-        "context": "This is 1,500x slower than RAM but 100x faster than HDD"
+        "context": f"This is {_compare('SSD random read', 'Main memory (RAM) reference', name='RAM')} "
+                   f"but {_compare('SSD random read', 'HDD seek', name='HDD')}"
     },
     {
         "id": "numbers-3",
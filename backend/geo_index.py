@@ -0,0 +1,484 @@
+"""
+Geospatial nearest-driver indexes.
+
+Puts numbers behind the ``uber`` blueprint's matching deep dive: drivers
+report their location every few seconds, and a ride request needs the k
+nearest drivers. Four indexes run the same workload:
+
+- ``geohash``: drivers bucketed by geohash cell, keyed by the interleaved
+  bits that Redis GEO stores as a sorted set score. k-nearest searches
+  rings of neighbouring cells until no closer driver can remain.
+- ``grid``: the same bucketing over uniform square cells in kilometres.
+- ``quadtree``: leaves split into four once they overflow. Queries are
+  best-first over node bounding boxes.
+- ``kdtree``: a static tree built with NumPy partitioning. Moved drivers
+  are masked out of the tree and scanned from a buffer until it holds
+  ``REBUILD_SHARE`` of the drivers, then the tree is rebuilt.
+
+``moving_drivers`` generates the workload. Drivers cluster around hotspots
+in a metro area, drift with a random heading and report every
+``UPDATE_INTERVAL`` seconds, while riders query near the same hotspots.
+Distances use an equirectangular projection, which is accurate to well
+under 1% at city scale. Every index answers queries exactly, and
+``benchmark`` checks this against a brute-force NumPy scan.
+"""
+
+import heapq
+import math
+import time
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+INDEXES = ("geohash", "grid", "quadtree", "kdtree")
+MAX_DRIVERS = 100_000
+
+# Metro area (the San Francisco Bay Area) and its hotspots: SF downtown, Oakland, San Jose, SFO
+LAT_RANGE = (37.2, 38.0)
+LON_RANGE = (-122.6, -121.8)
+HOTSPOTS = ((37.79, -122.41), (37.80, -122.27), (37.34, -121.89), (37.62, -122.38))
+HOTSPOT_SHARE = 0.7
+HOTSPOT_KM = 3.0
+
+KM_PER_DEG_LAT = 110.574
+KM_PER_DEG_LON = 111.320 * math.cos(math.radians(sum(LAT_RANGE) / 2))
+
+# Drivers report every few seconds while moving at city speeds
+UPDATE_INTERVAL = 4
+SPEED_KMH = (10, 50)
+
+GEOHASH_PRECISION = 6
+GRID_CELL_KM = 1.0
+QUAD_CAPACITY = 32
+QUAD_MAX_DEPTH = 16
+KD_LEAF_SIZE = 64
+REBUILD_SHARE = 0.05
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def _spread(v: int) -> int:
+    """Put the bits of a 32-bit integer on even positions."""
+    v &= 0xFFFFFFFF
+    v = (v | (v << 16)) & 0x0000FFFF0000FFFF
+    v = (v | (v << 8)) & 0x00FF00FF00FF00FF
+    v = (v | (v << 4)) & 0x0F0F0F0F0F0F0F0F
+    v = (v | (v << 2)) & 0x3333333333333333
+    return (v | (v << 1)) & 0x5555555555555555
+
+
+def _geohash_bits(precision: int) -> Tuple[int, int]:
+    """Latitude and longitude bits in a geohash; longitude takes the odd one."""
+    bits = 5 * precision
+    return bits // 2, bits - bits // 2
+
+
+def _interleave(lat_cell: int, lon_cell: int, precision: int) -> int:
+    """Geohash integer: bits alternate starting with longitude at the top."""
+    if precision * 5 % 2:
+        return _spread(lon_cell) | (_spread(lat_cell) << 1)
+    return (_spread(lon_cell) << 1) | _spread(lat_cell)
+
+
+def geohash(lat: float, lon: float, precision: int = GEOHASH_PRECISION) -> str:
+    """Base32 geohash of a point."""
+    lat_bits, lon_bits = _geohash_bits(precision)
+    lat_cell = min(int((lat + 90) / 180 * (1 << lat_bits)), (1 << lat_bits) - 1)
+    lon_cell = min(int((lon + 180) / 360 * (1 << lon_bits)), (1 << lon_bits) - 1)
+    code = _interleave(lat_cell, lon_cell, precision)
+    return "".join(_BASE32[(code >> shift) & 31] for shift in range(5 * (precision - 1), -1, -5))
+
+
+def to_km(lat, lon):
+    """Projected kilometres east and north of the metro area's south-west corner."""
+    return (lon - LON_RANGE[0]) * KM_PER_DEG_LON, (lat - LAT_RANGE[0]) * KM_PER_DEG_LAT
+
+
+def _hotspot_positions(rng: np.random.Generator, count: int) -> Tuple[np.ndarray, np.ndarray]:
+    lat = rng.uniform(*LAT_RANGE, count)
+    lon = rng.uniform(*LON_RANGE, count)
+    near = rng.random(count) < HOTSPOT_SHARE
+    centers = np.array(HOTSPOTS)[rng.integers(0, len(HOTSPOTS), count)]
+    lat = np.where(near, centers[:, 0] + rng.normal(0, HOTSPOT_KM / KM_PER_DEG_LAT, count), lat)
+    lon = np.where(near, centers[:, 1] + rng.normal(0, HOTSPOT_KM / KM_PER_DEG_LON, count), lon)
+    return np.clip(lat, *LAT_RANGE), np.clip(lon, *LON_RANGE)
+
+
+def moving_drivers(drivers: int, seconds: int, queries_per_second: int, seed: int = 0):
+    """Initial driver positions, and for each simulated second the location
+    reports ``(driver ids, lats, lons)`` and rider queries ``(lats, lons)``
+    as Python lists, ready to replay."""
+    rng = np.random.default_rng(seed)
+    lat, lon = _hotspot_positions(rng, drivers)
+    start = (lat.copy(), lon.copy())
+    heading = rng.uniform(0, 2 * np.pi, drivers)
+    speed = rng.uniform(*SPEED_KMH, drivers) / 3600
+    phase = rng.integers(0, UPDATE_INTERVAL, drivers)
+
+    ticks = []
+    for second in range(seconds):
+        heading += rng.normal(0, 0.3, drivers)
+        lat = lat + speed * np.sin(heading) / KM_PER_DEG_LAT
+        lon = lon + speed * np.cos(heading) / KM_PER_DEG_LON
+        # Turn around at the edge of the metro area
+        outside = (lat < LAT_RANGE[0]) | (lat > LAT_RANGE[1]) | (lon < LON_RANGE[0]) | (lon > LON_RANGE[1])
+        heading[outside] += np.pi
+        lat, lon = np.clip(lat, *LAT_RANGE), np.clip(lon, *LON_RANGE)
+
+        ids = np.flatnonzero(phase == second % UPDATE_INTERVAL)
+        query_lat, query_lon = _hotspot_positions(rng, queries_per_second)
+        ticks.append((ids.tolist(), lat[ids].tolist(), lon[ids].tolist(), query_lat.tolist(), query_lon.tolist()))
+    return start[0], start[1], ticks
+
+
+def brute_force_nearest(lat: np.ndarray, lon: np.ndarray, query_lat: float, query_lon: float, k: int) -> np.ndarray:
+    """Ids of the k nearest drivers by scanning all of them."""
+    x, y = to_km(lat, lon)
+    qx, qy = to_km(query_lat, query_lon)
+    d2 = (x - qx) ** 2 + (y - qy) ** 2
+    k = min(k, len(d2))
+    nearest = np.argpartition(d2, k - 1)[:k]
+    return nearest[np.argsort(d2[nearest])]
+
+
+class _CellIndex(ABC):
+    """Drivers bucketed by cell; k-nearest searches rings of cells outwards.
+
+    Subclasses set the cell grid: the origin, cells per degree and cell size
+    in kilometres along latitude (rows) and longitude (columns), and implement
+    ``_key``, which turns a cell into its bucket key.
+    """
+
+    __slots__ = ("x", "y", "cell_of", "cells", "origin", "cells_per_deg", "cell_km", "max_ring")
+
+    def __init__(self, lat: np.ndarray, lon: np.ndarray):
+        x, y = to_km(lat, lon)
+        self.x, self.y = x.tolist(), y.tolist()
+        width, height = to_km(LAT_RANGE[1], LON_RANGE[1])
+        self.max_ring = int(max(height / self.cell_km[0], width / self.cell_km[1])) + 1
+        self.cells: Dict[int, set] = {}
+        self.cell_of = []
+        for driver, (a, o) in enumerate(zip(lat.tolist(), lon.tolist())):
+            cell = self._cell(a, o)
+            self.cell_of.append(cell)
+            self.cells.setdefault(self._key(*cell), set()).add(driver)
+
+    def _cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        return (int((lat - self.origin[0]) * self.cells_per_deg[0]),
+                int((lon - self.origin[1]) * self.cells_per_deg[1]))
+
+    @abstractmethod
+    def _key(self, row: int, col: int) -> int:
+        """Bucket key of the cell at ``(row, col)``."""
+
+    def update(self, driver: int, lat: float, lon: float):
+        self.x[driver] = (lon - LON_RANGE[0]) * KM_PER_DEG_LON
+        self.y[driver] = (lat - LAT_RANGE[0]) * KM_PER_DEG_LAT
+        cell = self._cell(lat, lon)
+        old = self.cell_of[driver]
+        # Most reports land in the same cell and only move the coordinates
+        if cell != old:
+            self.cells[self._key(*old)].discard(driver)
+            self.cells.setdefault(self._key(*cell), set()).add(driver)
+            self.cell_of[driver] = cell
+
+    def nearest(self, lat: float, lon: float, k: int) -> List[int]:
+        row_at = (lat - self.origin[0]) * self.cells_per_deg[0]
+        col_at = (lon - self.origin[1]) * self.cells_per_deg[1]
+        row, col = int(row_at), int(col_at)
+        height, width = self.cell_km
+        # Unsearched drivers lie beyond the query cell's nearest edge plus the rings searched
+        edge = min(min(row_at - row, row + 1 - row_at) * height, min(col_at - col, col + 1 - col_at) * width)
+        step = min(height, width)
+        qx, qy = to_km(lat, lon)
+        xs, ys, cells, key = self.x, self.y, self.cells, self._key
+        found = []
+        for ring in range(self.max_ring + 1):
+            if ring == 0:
+                ring_cells = [(row, col)]
+            else:
+                ring_cells = [(row + dr, col + dc) for dr in range(-ring, ring + 1)
+                              for dc in (-ring, ring)]
+                ring_cells += [(row + dr, col + dc) for dr in (-ring, ring)
+                               for dc in range(-ring + 1, ring)]
+            for cell in ring_cells:
+                bucket = cells.get(key(*cell))
+                if bucket:
+                    found.extend(((xs[d] - qx) ** 2 + (ys[d] - qy) ** 2, d) for d in bucket)
+            if len(found) >= k:
+                bound = edge + ring * step
+                if heapq.nsmallest(k, found)[-1][0] <= bound * bound:
+                    break
+        return [d for _, d in heapq.nsmallest(k, found)]
+
+
+class GeohashIndex(_CellIndex):
+    """Cells are geohash cells, so bucket keys match the geohash bits."""
+
+    __slots__ = ("precision",)
+
+    def __init__(self, lat: np.ndarray, lon: np.ndarray, precision: int = GEOHASH_PRECISION):
+        self.precision = precision
+        lat_bits, lon_bits = _geohash_bits(precision)
+        self.origin = (-90.0, -180.0)
+        self.cells_per_deg = ((1 << lat_bits) / 180, (1 << lon_bits) / 360)
+        self.cell_km = (KM_PER_DEG_LAT / self.cells_per_deg[0], KM_PER_DEG_LON / self.cells_per_deg[1])
+        super().__init__(lat, lon)
+
+    def _key(self, row: int, col: int) -> int:
+        return _interleave(row, col, self.precision)
+
+
+class GridIndex(_CellIndex):
+    __slots__ = ()
+
+    def __init__(self, lat: np.ndarray, lon: np.ndarray, cell_km: float = GRID_CELL_KM):
+        self.origin = (LAT_RANGE[0], LON_RANGE[0])
+        self.cells_per_deg = (KM_PER_DEG_LAT / cell_km, KM_PER_DEG_LON / cell_km)
+        self.cell_km = (cell_km, cell_km)
+        super().__init__(lat, lon)
+
+    def _key(self, row: int, col: int) -> int:
+        return row * 1_000_003 + col
+
+
+class _Quad:
+    __slots__ = ("x0", "y0", "x1", "y1", "depth", "drivers", "children")
+
+    def __init__(self, x0: float, y0: float, x1: float, y1: float, depth: int):
+        self.x0, self.y0, self.x1, self.y1 = x0, y0, x1, y1
+        self.depth = depth
+        self.drivers = set()
+        self.children = None
+
+
+class QuadTreeIndex:
+    """Point quadtree; leaves split past ``QUAD_CAPACITY`` drivers and are
+    never merged, since drivers keep returning to the same areas."""
+
+    __slots__ = ("x", "y", "root", "leaf_of")
+
+    def __init__(self, lat: np.ndarray, lon: np.ndarray):
+        x, y = to_km(lat, lon)
+        self.x, self.y = x.tolist(), y.tolist()
+        width, height = to_km(LAT_RANGE[1], LON_RANGE[1])
+        self.root = _Quad(0.0, 0.0, width, height, 0)
+        self.leaf_of = [None] * len(self.x)
+        for driver in range(len(self.x)):
+            self._insert(driver)
+
+    def _insert(self, driver: int):
+        x, y = self.x[driver], self.y[driver]
+        node = self.root
+        while node.children:
+            node = node.children[(x >= (node.x0 + node.x1) / 2) + 2 * (y >= (node.y0 + node.y1) / 2)]
+        node.drivers.add(driver)
+        self.leaf_of[driver] = node
+        if len(node.drivers) > QUAD_CAPACITY and node.depth < QUAD_MAX_DEPTH:
+            self._split(node)
+
+    def _split(self, node: _Quad):
+        mx, my = (node.x0 + node.x1) / 2, (node.y0 + node.y1) / 2
+        depth = node.depth + 1
+        node.children = [
+            _Quad(node.x0, node.y0, mx, my, depth), _Quad(mx, node.y0, node.x1, my, depth),
+            _Quad(node.x0, my, mx, node.y1, depth), _Quad(mx, my, node.x1, node.y1, depth),
+        ]
+        drivers, node.drivers = node.drivers, set()
+        for driver in drivers:
+            self._insert(driver)
+
+    def update(self, driver: int, lat: float, lon: float):
+        x = self.x[driver] = (lon - LON_RANGE[0]) * KM_PER_DEG_LON
+        y = self.y[driver] = (lat - LAT_RANGE[0]) * KM_PER_DEG_LAT
+        leaf = self.leaf_of[driver]
+        if leaf.x0 <= x < leaf.x1 and leaf.y0 <= y < leaf.y1:
+            return
+        leaf.drivers.discard(driver)
+        self._insert(driver)
+
+    def nearest(self, lat: float, lon: float, k: int) -> List[int]:
+        qx, qy = to_km(lat, lon)
+        xs, ys = self.x, self.y
+        # Max-heap of the best k as (-distance², driver); nodes by distance² to their box
+        best: List[Tuple[float, int]] = []
+        nodes = [(0.0, 0, self.root)]
+        order = 1
+        while nodes:
+            d2, _, node = heapq.heappop(nodes)
+            if len(best) == k and d2 >= -best[0][0]:
+                break
+            if node.children:
+                for child in node.children:
+                    dx = max(child.x0 - qx, 0.0, qx - child.x1)
+                    dy = max(child.y0 - qy, 0.0, qy - child.y1)
+                    heapq.heappush(nodes, (dx * dx + dy * dy, order, child))
+                    order += 1
+                continue
+            for driver in node.drivers:
+                dist = (xs[driver] - qx) ** 2 + (ys[driver] - qy) ** 2
+                if len(best) < k:
+                    heapq.heappush(best, (-dist, driver))
+                elif dist < -best[0][0]:
+                    heapq.heapreplace(best, (-dist, driver))
+        return [driver for _, driver in sorted(best, reverse=True)]
+
+
+class KDTreeIndex:
+    """Static KD-tree over NumPy arrays with a buffer of moved drivers.
+
+    The tree is stored as flat lists: inner nodes hold a split axis and
+    value, leaves a slice of the tree-ordered coordinate arrays.
+    """
+
+    __slots__ = ("x", "y", "ids", "tree_x", "tree_y", "stale", "buffer", "buffered",
+                 "axis", "split", "left", "right", "start", "end", "rebuilds")
+
+    def __init__(self, lat: np.ndarray, lon: np.ndarray):
+        self.x, self.y = (np.asarray(v, dtype=np.float64) for v in to_km(lat, lon))
+        self.buffer = np.empty(len(self.x), dtype=np.int64)
+        self.rebuilds = 0
+        self._build()
+
+    def _build(self):
+        n = len(self.x)
+        self.axis, self.split, self.left, self.right, self.start, self.end = [], [], [], [], [], []
+        order = np.arange(n)
+        coords = (self.x, self.y)
+        # Build iteratively; each entry is (node, start, end) over ``order``
+        self._node(0, n)
+        pending = [(0, 0, n)]
+        while pending:
+            node, lo, hi = pending.pop()
+            if hi - lo <= KD_LEAF_SIZE:
+                continue
+            segment = order[lo:hi]
+            spread = [np.ptp(c[segment]) for c in coords]
+            axis = int(spread[1] > spread[0])
+            mid = (hi - lo) // 2
+            values = coords[axis][segment]
+            part = np.argpartition(values, mid)
+            order[lo:hi] = segment[part]
+            self.axis[node] = axis
+            self.split[node] = float(values[part[mid]])
+            self.left[node] = self._node(lo, lo + mid)
+            self.right[node] = self._node(lo + mid, hi)
+            pending.append((self.left[node], lo, lo + mid))
+            pending.append((self.right[node], lo + mid, hi))
+        self.ids = order
+        self.tree_x, self.tree_y = self.x[order], self.y[order]
+        self.stale = np.zeros(n, dtype=bool)
+        self.buffered = 0
+
+    def _node(self, start: int, end: int) -> int:
+        self.axis.append(-1)
+        self.split.append(0.0)
+        self.left.append(-1)
+        self.right.append(-1)
+        self.start.append(start)
+        self.end.append(end)
+        return len(self.axis) - 1
+
+    def update(self, driver: int, lat: float, lon: float):
+        self.x[driver] = (lon - LON_RANGE[0]) * KM_PER_DEG_LON
+        self.y[driver] = (lat - LAT_RANGE[0]) * KM_PER_DEG_LAT
+        if not self.stale[driver]:
+            self.stale[driver] = True
+            self.buffer[self.buffered] = driver
+            self.buffered += 1
+            if self.buffered > REBUILD_SHARE * len(self.x):
+                self._build()
+                self.rebuilds += 1
+
+    def nearest(self, lat: float, lon: float, k: int) -> List[int]:
+        qx, qy = to_km(lat, lon)
+        # Moved drivers first: their distances give the starting bound
+        moved = self.buffer[:self.buffered]
+        cand_d2 = [(self.x[moved] - qx) ** 2 + (self.y[moved] - qy) ** 2]
+        cand_ids = [moved]
+        worst = np.inf
+        if len(moved) >= k:
+            worst = np.partition(cand_d2[0], k - 1)[k - 1]
+
+        stack = [(0, 0.0)]
+        while stack:
+            node, bound = stack.pop()
+            if bound >= worst:
+                continue
+            axis = self.axis[node]
+            if axis < 0:
+                lo, hi = self.start[node], self.end[node]
+                d2 = (self.tree_x[lo:hi] - qx) ** 2 + (self.tree_y[lo:hi] - qy) ** 2
+                ids = self.ids[lo:hi]
+                keep = (d2 < worst) & ~self.stale[ids]
+                if keep.any():
+                    cand_d2.append(d2[keep])
+                    cand_ids.append(ids[keep])
+                    merged = np.concatenate(cand_d2)
+                    if len(merged) >= k:
+                        worst = np.partition(merged, k - 1)[k - 1]
+                continue
+            diff = (qx if axis == 0 else qy) - self.split[node]
+            near, far = (self.right[node], self.left[node]) if diff >= 0 else (self.left[node], self.right[node])
+            # Push the far side first so the near side is searched first
+            stack.append((far, max(bound, diff * diff)))
+            stack.append((near, bound))
+
+        d2, ids = np.concatenate(cand_d2), np.concatenate(cand_ids)
+        top = np.argsort(d2, kind="stable")[:k]
+        return ids[top].tolist()
+
+
+INDEX_TYPES = {
+    "geohash": GeohashIndex,
+    "grid": GridIndex,
+    "quadtree": QuadTreeIndex,
+    "kdtree": KDTreeIndex,
+}
+
+
+@lru_cache(maxsize=16)
+def benchmark(drivers: int = 10_000, seconds: int = 10, queries_per_second: int = 500, k: int = 5,
+              seed: int = 0, indexes: tuple = INDEXES) -> Dict:
+    """Build time, update and query throughput, and recall against brute force
+    (on the last second's queries) for each index on one moving-driver workload."""
+    lat, lon, ticks = moving_drivers(drivers, seconds, queries_per_second, seed)
+    final_lat, final_lon = lat.copy(), lon.copy()
+    for ids, lats, lons, _, _ in ticks:
+        final_lat[ids], final_lon[ids] = lats, lons
+    last_queries = list(zip(ticks[-1][3], ticks[-1][4]))
+    expected = [set(brute_force_nearest(final_lat, final_lon, a, o, k).tolist()) for a, o in last_queries]
+    updates = sum(len(tick[0]) for tick in ticks)
+    queries = seconds * queries_per_second
+
+    results = {}
+    for name in indexes:
+        started = time.perf_counter()
+        index = INDEX_TYPES[name](lat, lon)
+        build = time.perf_counter() - started
+
+        update_time = query_time = 0.0
+        for ids, lats, lons, query_lats, query_lons in ticks:
+            started = time.perf_counter()
+            for driver, a, o in zip(ids, lats, lons):
+                index.update(driver, a, o)
+            update_time += time.perf_counter() - started
+            started = time.perf_counter()
+            for a, o in zip(query_lats, query_lons):
+                index.nearest(a, o, k)
+            query_time += time.perf_counter() - started
+
+        matches = sum(set(index.nearest(a, o, k)) == want for (a, o), want in zip(last_queries, expected))
+        results[name] = {
+            "build_seconds": round(build, 4),
+            "updates_per_second": round(updates / update_time) if update_time else None,
+            "queries_per_second": round(queries / query_time) if query_time else None,
+            "recall": round(matches / len(expected), 4) if expected else None,
+        }
+
+    return {
+        "workload": {"drivers": drivers, "seconds": seconds, "updates": updates, "queries": queries, "k": k},
+        "indexes": results,
+    }
@@ -0,0 +1,246 @@
+"""
+Append-only activity journal with group commit and replay.
+
+User activity writes, such as favoriting a tool, go through one writer
+thread instead of each request committing on its own. A request puts its
+event on an in-memory queue and waits on a future. The writer takes the
+first event, gathers whatever else arrives within ``GROUP_COMMIT_MS`` (up
+to ``MAX_BATCH`` events), and commits the whole batch in two transactions:
+
+1. The events are appended to ``activity_journal``. This commit is the
+   durability point.
+2. Every journaled event past ``journal_checkpoint`` is applied to the
+   tables it changes, each inside its own savepoint, and the checkpoint is
+   moved to the last one in the same transaction, so an event is never
+   applied twice.
+
+Only then are the waiting requests answered, so they read their own writes.
+A request that gives up waiting cancels its future; an event still queued
+is then dropped before it reaches the journal, so a retry does not find it
+applied behind its back.
+A burst of N concurrent writes costs two commits, and two fsyncs, per batch
+rather than N. An applier that raises rolls back only its own savepoint:
+that request gets the error, the rest of the batch is applied, and the
+event counts as processed. If the process dies, or the second transaction
+fails, between the two, the events stay past the checkpoint and are applied
+by the next batch or by ``replay`` on the next start.
+
+An event kind is a key in ``APPLIERS``: a function that applies the event's
+payload in the writer's session and returns the response for the request.
+Appliers run one at a time on the writer thread, so checks and writes in
+one are never interleaved with another's.
+"""
+
+import json
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy.orm import Session, sessionmaker
+
+from database import engine as default_engine
+from models import ActivityEvent, Favorite, JournalCheckpoint
+
+GROUP_COMMIT_MS = 2.0
+MAX_BATCH = 256
+REPLAY_BATCH = 1000
+# How long a request waits for its event to be committed
+WRITE_TIMEOUT_SECONDS = 5.0
+
+
+def _add_favorite(session: Session, payload: Dict) -> Dict:
+    existing = session.query(Favorite).filter(Favorite.tool_id == payload["tool_id"]).first()
+    if existing:
+        return {"message": "Already favorited", "favorite_id": existing.id}
+    favorite = Favorite(tool_id=payload["tool_id"], pinned_order=session.query(Favorite).count() + 1)
+    session.add(favorite)
+    session.flush()
+    return {"message": "Favorited", "favorite_id": favorite.id}
+
+
+def _remove_favorite(session: Session, payload: Dict) -> Optional[Dict]:
+    favorite = session.query(Favorite).filter(Favorite.tool_id == payload["tool_id"]).first()
+    if not favorite:
+        return None
+    session.delete(favorite)
+    session.flush()
+    return {"message": "Unfavorited"}
+
+
+APPLIERS: Dict[str, Callable[[Session, Dict], Optional[Dict]]] = {
+    "favorite_added": _add_favorite,
+    "favorite_removed": _remove_favorite,
+}
+
+
+class ActivityJournal:
+    """Queue, group-commit writer thread and replay for activity events."""
+
+    __slots__ = ("sessions", "window", "queue", "lock", "thread", "events", "batches", "replayed", "failed")
+
+    def __init__(self, bind=default_engine, window_ms: float = GROUP_COMMIT_MS):
+        self.sessions = sessionmaker(bind=bind, autoflush=False, expire_on_commit=False)
+        self.window = window_ms / 1000
+        self.queue: "queue.Queue" = queue.Queue()
+        self.lock = threading.Lock()
+        self.thread: Optional[threading.Thread] = None
+        self.events = 0
+        self.batches = 0
+        self.replayed = 0
+        self.failed = 0
+
+    def submit(self, kind: str, payload: Dict) -> Future:
+        """Queue an event; the future resolves to its applier's result once it is committed.
+
+        Cancelling the future before the writer takes the event keeps it out of the journal.
+        """
+        if kind not in APPLIERS:
+            raise ValueError(f"Unknown activity event: {kind}")
+        if self.thread is None:
+            self.start()
+        future = Future()
+        self.queue.put((kind, payload, future))
+        return future
+
+    def _checkpoint(self, session: Session) -> JournalCheckpoint:
+        checkpoint = session.get(JournalCheckpoint, 1)
+        if checkpoint is None:
+            checkpoint = JournalCheckpoint(id=1, applied_seq=0)
+            session.add(checkpoint)
+            session.flush()
+        return checkpoint
+
+    def _pending(self, session: Session, through: Optional[int] = None) -> List[ActivityEvent]:
+        """Journaled events past the checkpoint, oldest first: up to ``through``, or the next ``REPLAY_BATCH``."""
+        query = (session.query(ActivityEvent).filter(ActivityEvent.seq > self._checkpoint(session).applied_seq)
+                 .order_by(ActivityEvent.seq))
+        if through is None:
+            return query.limit(REPLAY_BATCH).all()
+        return query.filter(ActivityEvent.seq <= through).all()
+
+    def _apply(self, session: Session, events: List[ActivityEvent]) -> Dict[int, tuple]:
+        """Apply journaled events and advance the checkpoint past them, in one transaction.
+
+        Returns ``(result, error)`` per sequence number. A failing event is
+        rolled back to its savepoint and still counts as processed.
+        """
+        # Write the checkpoint first: pysqlite only begins a transaction on a
+        # write, and the savepoints must nest inside it rather than start their own
+        self._checkpoint(session).applied_seq = events[-1].seq
+        session.flush()
+        outcomes = {}
+        for event in events:
+            try:
+                with session.begin_nested():
+                    outcomes[event.seq] = (APPLIERS[event.kind](session, json.loads(event.payload)), None)
+            except Exception as exc:
+                outcomes[event.seq] = (None, exc)
+                self.failed += 1
+        session.commit()
+        return outcomes
+
+    def _commit(self, batch: List[tuple]):
+        # Drop events whose request gave up; the rest can no longer be cancelled
+        batch = [item for item in batch if item[2].set_running_or_notify_cancel()]
+        if not batch:
+            return
+        session = self.sessions()
+        try:
+            try:
+                events = [ActivityEvent(kind=kind, payload=json.dumps(payload)) for kind, payload, _ in batch]
+                session.add_all(events)
+                session.commit()
+            except Exception as exc:
+                session.rollback()
+                for _, _, future in batch:
+                    future.set_exception(exc)
+                return
+            self.events += len(events)
+            self.batches += 1
+            try:
+                # Includes events journaled by an earlier batch whose apply failed
+                outcomes = self._apply(session, self._pending(session, through=events[-1].seq))
+            except Exception as exc:
+                session.rollback()
+                # Still past the checkpoint, so the next batch or replay applies them
+                for _, _, future in batch:
+                    future.set_exception(exc)
+                return
+        finally:
+            session.close()
+        for (_, _, future), event in zip(batch, events):
+            result, error = outcomes[event.seq]
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            first = self.queue.get()
+            if first is None:
+                break
+            batch = [first]
+            deadline = time.monotonic() + self.window
+            while len(batch) < MAX_BATCH:
+                try:
+                    item = self.queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._commit(batch)
+
+    def replay(self) -> int:
+        """Apply every journaled event past the checkpoint; returns how many there were."""
+        applied = 0
+        session = self.sessions()
+        try:
+            while True:
+                events = self._pending(session)
+                if not events:
+                    session.rollback()
+                    break
+                self._apply(session, events)
+                applied += len(events)
+        finally:
+            session.close()
+        self.replayed += applied
+        return applied
+
+    def start(self):
+        """Replay anything left over from a crash, then start the writer (idempotent)."""
+        with self.lock:
+            if self.thread is not None:
+                return
+            self.replay()
+            self.thread = threading.Thread(target=self._run, name="activity-journal-writer", daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        """Commit everything queued so far and stop the writer."""
+        with self.lock:
+            if self.thread is None:
+                return
+            self.queue.put(None)
+            self.thread.join()
+            self.thread = None
+
+
+_journal: Optional[ActivityJournal] = None
+_journal_lock = threading.Lock()
+
+
+def get_activity_journal() -> ActivityJournal:
+    """This API's activity journal, on the working database."""
+    global _journal
+    if _journal is None:
+        with _journal_lock:
+            if _journal is None:
+                _journal = ActivityJournal()
+    return _journal
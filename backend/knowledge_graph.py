@@ -0,0 +1,190 @@
+"""
+In-memory knowledge graph over the study content.
+
+Nodes are tools (rows of the ``tools`` table), scenario blueprints, common
+patterns and their approaches, technology quiz questions, flashcards and the
+categories they belong to. Edges come from:
+
+- explicit links (a blueprint's ``tools`` list, a pattern's approaches)
+- category links (a tool or question and its category)
+- name mentions (a tool name or alias appearing in scenario, pattern or
+  question text, found with the shared alias map)
+
+The graph is undirected and built once. Adjacency is stored as CSR arrays
+(``indptr`` / ``indices``) so neighbourhood and k-hop queries are a slice and
+a breadth-first walk over flat integer arrays.
+"""
+
+import re
+import threading
+from array import array
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from aliases import AliasMap, get_alias_map, normalize
+from database import SessionLocal
+from models import Tool
+from scenario_data import SCENARIO_BLUEPRINTS
+from reference_data import COMMON_PATTERNS
+from quiz_data import TECHNOLOGY_QUIZ_QUESTIONS
+from flashcard_questions import ALL_FLASHCARD_QUESTIONS
+
+NODE_TYPES = ("tool", "scenario", "pattern", "approach", "quiz", "flashcard", "category")
+
+
+def flatten_text(value) -> str:
+    """Join every string found in a nested dict/list structure."""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, dict):
+        return " ".join(flatten_text(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return " ".join(flatten_text(v) for v in value)
+    return ""
+
+
+def slugify(text: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")
+
+
+class KnowledgeGraph:
+    """Immutable undirected graph with CSR adjacency."""
+
+    def __init__(self, nodes: List[Dict], edges: Iterable[Tuple[int, int]]):
+        self.nodes = nodes
+        self.index: Dict[str, int] = {node["id"]: i for i, node in enumerate(nodes)}
+
+        adjacency: List[Set[int]] = [set() for _ in nodes]
+        for a, b in edges:
+            if a == b:
+                continue
+            adjacency[a].add(b)
+            adjacency[b].add(a)
+
+        self.indptr = array("i", [0])
+        self.indices = array("i")
+        for neighbours in adjacency:
+            self.indices.extend(sorted(neighbours))
+            self.indptr.append(len(self.indices))
+
+        self._labels: Dict[str, int] = {}
+        for i, node in enumerate(nodes):
+            self._labels.setdefault(normalize(node["label"]), i)
+            for alias in node.get("aliases", ()):
+                self._labels.setdefault(alias, i)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.indices) // 2
+
+    def resolve(self, key: str) -> Optional[int]:
+        """Look a node up by id (``tool:4``), label or tool alias."""
+        if key in self.index:
+            return self.index[key]
+        return self._labels.get(normalize(key))
+
+    def neighbors(self, node: int) -> array:
+        return self.indices[self.indptr[node]:self.indptr[node + 1]]
+
+    def k_hop(self, node: int, hops: int) -> List[Tuple[int, int]]:
+        """Breadth-first walk returning ``(node, distance)`` pairs within ``hops``."""
+        seen = {node: 0}
+        frontier = deque([node])
+        result = []
+        while frontier:
+            current = frontier.popleft()
+            distance = seen[current]
+            if distance == hops:
+                continue
+            for neighbour in self.indices[self.indptr[current]:self.indptr[current + 1]]:
+                if neighbour not in seen:
+                    seen[neighbour] = distance + 1
+                    result.append((neighbour, distance + 1))
+                    frontier.append(neighbour)
+        return result
+
+    def describe(self, node: int) -> Dict:
+        data = self.nodes[node]
+        return {"id": data["id"], "type": data["type"], "label": data["label"]}
+
+
+class _GraphBuilder:
+    def __init__(self):
+        self.nodes: List[Dict] = []
+        self.index: Dict[str, int] = {}
+        self.edges: Set[Tuple[int, int]] = set()
+        self.texts: List[Tuple[int, str]] = []
+
+    def add_node(self, node_id: str, node_type: str, label: str, **extra) -> int:
+        if node_id in self.index:
+            return self.index[node_id]
+        self.index[node_id] = len(self.nodes)
+        self.nodes.append({"id": node_id, "type": node_type, "label": label, **extra})
+        return self.index[node_id]
+
+    def link(self, a: int, b: int):
+        self.edges.add((min(a, b), max(a, b)))
+
+    def category(self, label: str) -> int:
+        return self.add_node(f"category:{label}", "category", label)
+
+
+def build_knowledge_graph(tools: List[Tool], alias_map: AliasMap) -> KnowledgeGraph:
+    builder = _GraphBuilder()
+
+    tool_by_name: Dict[str, int] = {}
+    for tool in tools:
+        aliases = alias_map.aliases_for(tool.name)
+        node = builder.add_node(f"tool:{tool.id}", "tool", tool.name, tool_id=tool.id, aliases=aliases)
+        tool_by_name[tool.name] = node
+        builder.link(node, builder.category(tool.category))
+
+    for key, blueprint in SCENARIO_BLUEPRINTS.items():
+        node = builder.add_node(f"scenario:{key}", "scenario", blueprint["title"])
+        for name in alias_map.resolve_names(blueprint["tools"]):
+            if name in tool_by_name:
+                builder.link(node, tool_by_name[name])
+        builder.texts.append((node, flatten_text(blueprint)))
+
+    for key, pattern in COMMON_PATTERNS.items():
+        node = builder.add_node(f"pattern:{key}", "pattern", pattern["title"])
+        builder.texts.append((node, flatten_text({k: v for k, v in pattern.items() if k not in ("approaches", "strategies")})))
+        for approach in pattern.get("approaches", []) + pattern.get("strategies", []):
+            child = builder.add_node(f"approach:{key}/{slugify(approach['name'])}", "approach", approach["name"])
+            builder.link(node, child)
+            builder.texts.append((child, flatten_text(approach)))
+
+    for question in TECHNOLOGY_QUIZ_QUESTIONS:
+        node = builder.add_node(f"quiz:{question['id']}", "quiz", question["question"])
+        builder.link(node, builder.category(question["category"]))
+        builder.texts.append((node, flatten_text(question)))
+
+    for card in ALL_FLASHCARD_QUESTIONS:
+        node = builder.add_node(f"flashcard:{card['id']}", "flashcard", card["question"])
+        builder.link(node, builder.category(card["category"]))
+        builder.texts.append((node, flatten_text(card)))
+
+    for node, text in builder.texts:
+        for name in alias_map.mentions(text):
+            if name in tool_by_name:
+                builder.link(node, tool_by_name[name])
+
+    return KnowledgeGraph(builder.nodes, builder.edges)
+
+
+_graph: Optional[KnowledgeGraph] = None
+_graph_lock = threading.Lock()
+
+
+def get_knowledge_graph() -> KnowledgeGraph:
+    """Return the process-wide graph, building it from the database on first use."""
+    global _graph
+    if _graph is None:
+        with _graph_lock:
+            if _graph is None:
+                db = SessionLocal()
+                try:
+                    _graph = build_knowledge_graph(db.query(Tool).order_by(Tool.id).all(), get_alias_map())
+                finally:
+                    db.close()
+    return _graph
@@ -0,0 +1,214 @@
+"""
+Monte Carlo latency model for scenario request flows.
+
+Each step of a blueprint's ``deep_dive["flows"]`` is classified by keyword
+(client hop, CDN, gateway, cache, database, search, queue, blob storage,
+warehouse query, external service, plain compute, or asynchronous and off
+the request path).
+Every kind has a lognormal latency distribution whose median is built from
+``NUMBERS_TO_KNOW`` ("Network within same datacenter", "SSD random read",
+...). Steps written as branches ("On cache miss: ...", "If new, ...") only
+run for a fraction of requests.
+
+Sampling is vectorized. Standard normal and uniform draws come from fixed
+banks generated once. Each step reads the bank at its own offset, so steps
+are independent while no random numbers are generated per request. Hit and
+miss branches of the same cache share their uniform draws, so exactly one
+of them runs. A million samples per flow takes tens of milliseconds, and
+results are cached per parameter set.
+"""
+
+import re
+import threading
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from scenario_data import SCENARIO_BLUEPRINTS
+from units import REFERENCE_NUMBERS
+
+MAX_SAMPLES = 1_000_000
+# Distance between the bank windows of consecutive steps
+BANK_STRIDE = 1009
+MAX_STEPS = 64
+BANK_SEED = 20240101
+
+CLIENT_REGIONS = {
+    "us": "Network: SF to NYC",
+    "europe": "Network: SF to Europe",
+    "asia": "Network: SF to Asia",
+}
+
+# kind -> ({reference number: multiple}, lognormal sigma)
+STEP_KINDS: Dict[str, Tuple[Dict[str, float], float]] = {
+    "client": ({"client": 0.5}, 0.35),
+    "cdn": ({"Network: SF to NYC": 0.25}, 0.5),
+    "gateway": ({"Network within same datacenter": 4}, 0.4),
+    "cache": ({"Network within same datacenter": 1, "Main memory (RAM) reference": 10}, 0.3),
+    "database": ({"Network within same datacenter": 2, "SSD random read": 4}, 0.5),
+    "search": ({"Network within same datacenter": 2, "SSD random read": 20}, 0.5),
+    "queue": ({"Network within same datacenter": 10}, 0.5),
+    "blob": ({"HDD seek": 3}, 0.6),
+    "external": ({"Network: SF to NYC": 5}, 0.8),
+    "warehouse": ({"SSD sequential read (1 MB)": 500}, 0.7),
+    "compute": ({"Main memory (RAM) reference": 2000}, 0.5),
+}
+
+# First match wins; anything unmatched is "compute". Named databases win over
+# the cache, which wins over generic storage verbs ("update", "record").
+STEP_RULES: List[Tuple[str, re.Pattern]] = [(kind, re.compile(pattern, re.IGNORECASE)) for kind, pattern in (
+    ("async", r"\btrigger|\bconsumer\b|webhook|notif|\bafter \d+|\bseparate\b|every \d+|\bbatch-|in batches|batches events into|"
+              r"transcodes|\bjob\b|background|\basync|\bpolls?\b|\bcron\b"),
+    ("external", r"card processor|third[- ]party|payment provider|oauth provider|\bapns\b|\bfcm\b|external|stripe"),
+    ("cdn", r"\bcdn\b|cloudfront|\bedge\b"),
+    ("warehouse", r"athena|redshift|data lake"),
+    ("search", r"opensearch|elasticsearch|search index|searchable"),
+    ("blob", r"\bs3\b|upload|download|presigned|\bchunks?\b|\bblob"),
+    ("queue", r"\bsqs\b|kinesis|kafka|\bsns\b|publish|\bqueue|eventbridge"),
+    ("database", r"postgres|dynamodb|database|\bdb\b|\bsql\b|cassandra|aurora|keyspaces"),
+    ("cache", r"redis|cache|memcached|elasticache"),
+    ("client", r"^(the )?(client|user|browser|rider|driver|passenger|sender)s?\b|^send (get|post|put|patch|delete)\b|"
+               r"\bto (the )?(client|rider|driver)\b|redirect"),
+    ("database", r"\brecord\b|\btable\b|\bstores?\b|persist|insert|\bupdates? \w+ (status|table|record)|\bquer(y|ies)\b"),
+    ("gateway", r"gateway|load balancer|\balb\b|\broutes?\b|authenticat|rate-limit"),
+)]
+
+_BRANCH_RE = re.compile(r"^(?:on ([^:]+):|if ([^,:]+)[,:])\s*", re.IGNORECASE)
+
+
+def classify_step(text: str) -> Tuple[str, Optional[str], str]:
+    """Return ``(kind, branch, body)`` for a flow step; ``branch`` is hit/miss/if or None."""
+    branch = None
+    match = _BRANCH_RE.match(text)
+    body = text
+    if match:
+        condition = (match.group(1) or match.group(2) or "").lower()
+        body = text[match.end():]
+        if "miss" in condition:
+            branch = "cdn_miss" if "cdn" in condition else "miss"
+        elif "hit" in condition:
+            branch = "cdn_hit" if "cdn" in condition else "hit"
+        elif match.group(2):
+            branch = "if"
+    for kind, pattern in STEP_RULES:
+        if pattern.search(body):
+            return kind, branch, body
+    return "compute", branch, body
+
+
+def kind_median(kind: str, client_region: str) -> float:
+    """Median latency of a step kind in seconds."""
+    parts, _ = STEP_KINDS[kind]
+    total = 0.0
+    for label, multiple in parts.items():
+        label = CLIENT_REGIONS[client_region] if label == "client" else label
+        total += multiple * REFERENCE_NUMBERS.quantities[REFERENCE_NUMBERS.resolve(label)].value
+    return total
+
+
+_banks: Optional[Tuple[np.ndarray, np.ndarray]] = None
+_banks_lock = threading.Lock()
+
+
+def _get_banks() -> Tuple[np.ndarray, np.ndarray]:
+    global _banks
+    if _banks is None:
+        with _banks_lock:
+            if _banks is None:
+                rng = np.random.default_rng(BANK_SEED)
+                size = MAX_SAMPLES + (MAX_STEPS + 2) * BANK_STRIDE
+                _banks = (rng.standard_normal(size, dtype=np.float32), rng.random(size, dtype=np.float32))
+    return _banks
+
+
+def quantiles(values: np.ndarray, qs: Tuple[float, ...]) -> List[float]:
+    """Nearest-rank quantiles for ascending ``qs``.
+
+    Each quantile partitions only the slice above the previous one, which is
+    several times cheaper than ``np.percentile`` on a million samples.
+    """
+    work = values.copy()
+    start = 0
+    result = []
+    for q in qs:
+        k = int(round(q * (len(work) - 1)))
+        work[start:].partition(k - start)
+        result.append(float(work[k]))
+        start = k
+    return result
+
+
+def simulate_flow(steps: List[str], samples: int, cache_hit_ratio: float, branch_probability: float,
+                  client_region: str) -> Dict:
+    normals, uniforms = _get_banks()
+    classified = [classify_step(text) for text in steps][:MAX_STEPS]
+    on_path = [i for i, (kind, _, _) in enumerate(classified) if kind != "async"]
+
+    matrix = np.zeros((max(len(on_path), 1), samples), dtype=np.float32)
+    step_info = []
+    for row, i in enumerate(on_path):
+        kind, branch, _ = classified[i]
+        median = kind_median(kind, client_region)
+        sigma = STEP_KINDS[kind][1]
+
+        out = matrix[row]
+        np.multiply(normals[i * BANK_STRIDE:i * BANK_STRIDE + samples], sigma, out=out)
+        out += np.float32(np.log(median))
+        np.exp(out, out=out)
+
+        probability = 1.0
+        if branch is not None:
+            # Hit/miss branches of the same cache read the same uniforms
+            group = 0 if branch.startswith("cdn") else (1 if branch in ("hit", "miss") else 2 + i)
+            u = uniforms[group * BANK_STRIDE:group * BANK_STRIDE + samples]
+            if branch.endswith("hit"):
+                probability, mask = cache_hit_ratio, u < cache_hit_ratio
+            elif branch.endswith("miss"):
+                probability, mask = 1 - cache_hit_ratio, u >= cache_hit_ratio
+            else:
+                probability, mask = branch_probability, u < branch_probability
+            out *= mask
+        step_info.append((i, kind, median, probability))
+
+    total = matrix.sum(axis=0)
+    p50, p95, p99 = quantiles(total, (0.5, 0.95, 0.99))
+    tail = total >= p99
+    tail_means = matrix[:, tail].mean(axis=1) if tail.any() else np.zeros(len(matrix))
+    tail_total = float(tail_means.sum()) or 1.0
+
+    step_results = []
+    for (i, kind, median, probability), tail_mean in zip(step_info, tail_means):
+        step_results.append({
+            "index": i,
+            "text": steps[i],
+            "kind": kind,
+            "probability": round(probability, 4),
+            "median_ms": round(median * 1000, 4),
+            "tail_share": round(float(tail_mean) / tail_total, 4),
+        })
+    for i, (kind, _, _) in enumerate(classified):
+        if kind == "async":
+            step_results.append({"index": i, "text": steps[i], "kind": kind, "probability": 0.0, "median_ms": 0.0, "tail_share": 0.0})
+    step_results.sort(key=lambda s: s["index"])
+
+    on_path_steps = [s for s in step_results if s["kind"] != "async"]
+    return {
+        "p50_ms": round(float(p50) * 1000, 3),
+        "p95_ms": round(float(p95) * 1000, 3),
+        "p99_ms": round(float(p99) * 1000, 3),
+        "mean_ms": round(float(total.mean()) * 1000, 3),
+        "tail_step": max(on_path_steps, key=lambda s: s["tail_share"]) if on_path_steps else None,
+        "steps": step_results,
+    }
+
+
+@lru_cache(maxsize=256)
+def simulate_scenario(scenario_type: str, samples: int = 100_000, cache_hit_ratio: float = 0.9,
+                      branch_probability: float = 0.5, client_region: str = "us") -> Tuple[Dict, ...]:
+    """Latency percentiles for every flow of a scenario, cached per parameter set."""
+    flows = SCENARIO_BLUEPRINTS[scenario_type]["deep_dive"].get("flows", [])
+    return tuple(
+        {"name": flow["name"], **simulate_flow(flow["steps"], samples, cache_hit_ratio, branch_probability, client_region)}
+        for flow in flows
+    )
@@ -1,8 +1,10 @@
-from fastapi import FastAPI, Depends, HTTPException, Query
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Depends, HTTPException, Query, Request
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.orm import Session
-from typing import Optional, List
-from pydantic import BaseModel
+from typing import Optional, List, Literal
+from pydantic import BaseModel, Field
 from datetime import datetime
 
 from database import get_db, init_db
@@ -11,10 +13,87 @@ from scenario_data import SCENARIO_BLUEPRINTS
 from reference_data import NUMBERS_TO_KNOW, DELIVERY_FRAMEWORK, ASSESSMENT_RUBRIC, COMMON_PATTERNS
 from quiz_data import TECHNOLOGY_QUIZ_QUESTIONS
 from flashcard_questions import CONCEPT_QUESTIONS, PATTERN_QUESTIONS, NUMBERS_QUESTIONS, ALL_FLASHCARD_QUESTIONS
+from knowledge_graph import NODE_TYPES, flatten_text, get_knowledge_graph
+from search_index import SOURCES, get_search_index, start_background_build
+from autocomplete import TOP_K, get_prefix_index
+from spelling import get_tool_speller
+from aliases import get_alias_map
+from recommender import DATA_SHAPES, get_recommender, requirement_weights
+from requirement_tags import get_requirement_analysis
+from units import DIMENSIONS, REFERENCE_NUMBERS, parse_quantity
+from estimates import METRIC_UNITS, SCALE_PARAMS, estimate, scale_summary, sweep
+from latency_sim import CLIENT_REGIONS, MAX_SAMPLES, simulate_scenario
+from queue_sim import MAX_DURATION, simulate_components
+from cache_sim import MAX_KEYS, MAX_REPLAYED_REQUESTS, MAX_TRACE_LENGTH, POLICIES, TRACE_KINDS, hit_ratio_curves, replay_work
+from rate_limit import STORES, benchmark as rate_limit_benchmark, get_api_limiter, request_cost
+from partitioning import MAX_KEYS as MAX_PARTITION_KEYS, MAX_NODES, MAX_VNODES, SCHEMES, simulate as simulate_partitioning
+from geo_index import INDEXES, MAX_DRIVERS, benchmark as geo_benchmark
+from contention import (
+    MAX_CLIENTS, MAX_SEATS, MAX_SERIAL_SECONDS, STRATEGIES, benchmark as contention_benchmark, serial_seconds,
+)
+from fanout import (
+    MAX_DELIVERIES, MAX_EDGES, MAX_FEED_SIZE, MAX_POSTS, MAX_USERS, estimated_deliveries,
+    simulate as simulate_fanout,
+)
+from chunking import (
+    CHUNKERS, MAX_AVG_SIZE, MAX_CHUNKED_BYTES, MAX_EDITS, MAX_FILE_BYTES, MAX_VERSIONS, MIN_AVG_SIZE,
+    benchmark as chunking_benchmark, chunked_bytes,
+)
+from streaming import (
+    ENGINES, MAX_BATCH, MAX_EVENTS, MAX_KEYS as MAX_STREAM_KEYS, MAX_WINDOW_SLIDES, MAX_WINDOW_UPDATES, WINDOWS,
+    benchmark as streaming_benchmark, window_updates,
+)
+from chat_gateway import (
+    MAX_DRAIN_SECONDS, MAX_MESSAGES, MAX_NODES as MAX_GATEWAY_NODES, MAX_ROOM_SIZE, MAX_USERS as MAX_CHAT_USERS,
+    STRATEGIES as BROADCAST_STRATEGIES, benchmark as chat_benchmark, drain_seconds,
+)
+from transcoding import MAX_DURATION as MAX_VIDEO_SECONDS, MAX_SWEEP_VALUES, MAX_SWEEP_WORK_SECONDS, MAX_WORKERS, benchmark as transcoding_benchmark, sweep_work_seconds
+from probabilistic import MAX_DISTINCT, MAX_ITEMS, MAX_PRECISION, MAX_TOP_K, MIN_PRECISION, STRUCTURES, benchmark as sketch_benchmark
+from journal import WRITE_TIMEOUT_SECONDS, get_activity_journal
+from telemetry import TOP_K as TELEMETRY_TOP_K, get_usage_telemetry, normalize_query
+from shortcode import GENERATORS, MAX_CODES, MAX_COLLISION_CODES, MAX_COUNTER_CODES, MAX_LENGTH as MAX_CODE_LENGTH, MAX_PROCESSES, generate, hash_collisions, redirect_benchmark
+import math
 import random
 
-app = FastAPI(title="System Design Reference API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    start_background_build()
+    get_knowledge_graph()
+    get_prefix_index()
+    get_alias_map()
+    get_tool_speller()
+    get_recommender()
+    get_requirement_analysis()
+    get_api_limiter()
+    get_usage_telemetry().start()
+    get_activity_journal().start()
+    yield
+    get_activity_journal().stop()
+    get_usage_telemetry().stop()
+
+app = FastAPI(title="System Design Reference API", lifespan=lifespan)
 
+@app.middleware("http")
+async def rate_limit_clients(request: Request, call_next):
+    """Per-client GCRA limit on /api routes, with labs costing more; 429 with Retry-After when exceeded."""
+    limiter = get_api_limiter()
+    if limiter is None or request.method == "OPTIONS" or not request.url.path.startswith("/api/"):
+        return await call_next(request)
+    
+    client = request.client.host if request.client else "unknown"
+    decision = limiter.allow(client, cost=request_cost(request.url.path))
+    if not decision.allowed:
+        return JSONResponse(
+            status_code=429,
+            content={"detail": "Too many requests"},
+            headers={"Retry-After": str(math.ceil(decision.retry_after))},
+        )
+    response = await call_next(request)
+    response.headers["X-RateLimit-Remaining"] = str(decision.remaining)
+    return response
+
+# Added last so it is the outermost middleware: 429s get CORS headers and
+# preflights are answered before the rate limiter sees them
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:3000"],
@@ -25,6 +104,92 @@ app.add_middleware(
 
 init_db()
 
+NODE_TYPE_PATTERN = "^(" + "|".join(NODE_TYPES) + ")$"
+_SOURCE_ALTERNATION = "(" + "|".join(SOURCES) + ")"
+SOURCE_LIST_PATTERN = f"^{_SOURCE_ALTERNATION}(,{_SOURCE_ALTERNATION})*$"
+DIMENSION_PATTERN = "^(" + "|".join(DIMENSIONS) + ")$"
+SCALE_PARAM_PATTERN = "^(" + "|".join(SCALE_PARAMS) + ")$"
+CLIENT_REGION_PATTERN = "^(" + "|".join(CLIENT_REGIONS) + ")$"
+TRACE_KIND_PATTERN = "^(" + "|".join(TRACE_KINDS) + ")$"
+STORE_PATTERN = "^(" + "|".join(STORES) + ")$"
+_POLICY_ALTERNATION = "(" + "|".join(POLICIES) + ")"
+POLICY_LIST_PATTERN = f"^{_POLICY_ALTERNATION}(,{_POLICY_ALTERNATION})*$"
+_SCHEME_ALTERNATION = "(" + "|".join(SCHEMES) + ")"
+SCHEME_LIST_PATTERN = f"^{_SCHEME_ALTERNATION}(,{_SCHEME_ALTERNATION})*$"
+_INDEX_ALTERNATION = "(" + "|".join(INDEXES) + ")"
+INDEX_LIST_PATTERN = f"^{_INDEX_ALTERNATION}(,{_INDEX_ALTERNATION})*$"
+_STRATEGY_ALTERNATION = "(" + "|".join(STRATEGIES) + ")"
+STRATEGY_LIST_PATTERN = f"^{_STRATEGY_ALTERNATION}(,{_STRATEGY_ALTERNATION})*$"
+_GENERATOR_ALTERNATION = "(" + "|".join(GENERATORS) + ")"
+GENERATOR_LIST_PATTERN = f"^{_GENERATOR_ALTERNATION}(,{_GENERATOR_ALTERNATION})*$"
+_CHUNKER_ALTERNATION = "(" + "|".join(CHUNKERS) + ")"
+CHUNKER_LIST_PATTERN = f"^{_CHUNKER_ALTERNATION}(,{_CHUNKER_ALTERNATION})*$"
+_WINDOW_ALTERNATION = "(" + "|".join(WINDOWS) + ")"
+WINDOW_LIST_PATTERN = f"^{_WINDOW_ALTERNATION}(,{_WINDOW_ALTERNATION})*$"
+_ENGINE_ALTERNATION = "(" + "|".join(ENGINES) + ")"
+ENGINE_LIST_PATTERN = f"^{_ENGINE_ALTERNATION}(,{_ENGINE_ALTERNATION})*$"
+_BROADCAST_ALTERNATION = "(" + "|".join(BROADCAST_STRATEGIES) + ")"
+BROADCAST_LIST_PATTERN = f"^{_BROADCAST_ALTERNATION}(,{_BROADCAST_ALTERNATION})*$"
+_STRUCTURE_ALTERNATION = "(" + "|".join(STRUCTURES) + ")"
+STRUCTURE_LIST_PATTERN = f"^{_STRUCTURE_ALTERNATION}(,{_STRUCTURE_ALTERNATION})*$"
+INTEGER_LIST_PATTERN = r"^\d+(,\d+)*$"
+NUMBER_LIST_PATTERN = r"^\d+(\.\d+)?(,\d+(\.\d+)?)*$"
+
+# Simulation endpoints linked from the pattern they put numbers behind
+PATTERN_LABS = {
+    "scaling_reads": [
+        {"title": "Cache policy hit ratios", "endpoint": "/api/labs/cache"},
+    ],
+    "scaling_writes": [
+        {"title": "Partitioning schemes: balance and keys moved", "endpoint": "/api/labs/partitioning"},
+    ],
+    "dealing_with_contention": [
+        {"title": "Seat booking under contention", "endpoint": "/api/labs/contention"},
+    ],
+    "handling_large_blobs": [
+        {"title": "Content-defined chunking and dedup", "endpoint": "/api/labs/chunking"},
+    ],
+    "managing_long_running_tasks": [
+        {"title": "Transcoding DAG: segment size against workers", "endpoint": "/api/labs/transcoding"},
+    ],
+}
+
+# Simulation endpoints linked from the scenario blueprint whose design claims they measure
+SCENARIO_LABS = {
+    "uber": [
+        {"title": "Nearest-driver spatial indexes", "endpoint": "/api/labs/geo"},
+    ],
+    "ticketmaster": [
+        {"title": "Seat booking under contention", "endpoint": "/api/labs/contention"},
+    ],
+    "feed": [
+        {"title": "Push, pull and hybrid fan-out", "endpoint": "/api/labs/fanout"},
+    ],
+    "bitly": [
+        {"title": "Short code generators and redirect caching", "endpoint": "/api/labs/shortcodes"},
+        {"title": "Bloom filters, HyperLogLog and count-min sketches", "endpoint": "/api/labs/sketches"},
+    ],
+    "dropbox": [
+        {"title": "Content-defined chunking and dedup", "endpoint": "/api/labs/chunking"},
+    ],
+    "youtube": [
+        {"title": "Transcoding DAG: segment size against workers", "endpoint": "/api/labs/transcoding"},
+    ],
+    "analytics": [
+        {"title": "Windowed stream aggregation", "endpoint": "/api/labs/streaming"},
+        {"title": "Bloom filters, HyperLogLog and count-min sketches", "endpoint": "/api/labs/sketches"},
+    ],
+    "search": [
+        {"title": "Bloom filters, HyperLogLog and count-min sketches", "endpoint": "/api/labs/sketches"},
+    ],
+    "chat": [
+        {"title": "WebSocket fan-out and presence", "endpoint": "/api/labs/chat"},
+    ],
+    "whatsapp": [
+        {"title": "WebSocket fan-out and presence", "endpoint": "/api/labs/chat"},
+    ],
+}
+
 class ToolResponse(BaseModel):
     id: int
     name: str
@@ -62,6 +227,20 @@ class ToolDetailResponse(ToolResponse):
     class Config:
         from_attributes = True
 
+class RecommendRequest(BaseModel):
+    read_write_ratio: Optional[float] = Field(None, gt=0, description="Reads per write, e.g. 100 for 100:1")
+    consistency: Optional[Literal["strong", "eventual"]] = None
+    cap_preference: Optional[Literal["CP", "AP"]] = None
+    latency_target_ms: Optional[float] = Field(None, gt=0)
+    aws_only: Optional[bool] = None
+    data_shape: Optional[Literal[DATA_SHAPES]] = None
+    limit: int = Field(10, ge=1, le=50)
+
+class RecommendationResponse(BaseModel):
+    tool: ToolResponse
+    score: float
+    matched: List[str]
+
 class FavoriteResponse(BaseModel):
     id: int
     tool_id: int
@@ -107,19 +286,46 @@ def get_tools(
     
     return results
 
-@app.get("/api/tools/search", response_model=List[ToolResponse])
-def search_tools(
-    q: str = Query(..., min_length=1),
-    db: Session = Depends(get_db)
-):
+def _like_search_tools(db: Session, q: str) -> List[Tool]:
     search_term = f"%{q}%"
-    tools = db.query(Tool).filter(
+    # Aliases ("postgres", "kafka") resolve to catalog names in the same query
+    alias_names = get_alias_map().resolve(q)
+    return db.query(Tool).filter(
         (Tool.name.like(search_term)) |
+        (Tool.name.in_(alias_names)) |
         (Tool.category.like(search_term)) |
         (Tool.interview_oneliner.like(search_term)) |
         (Tool.best_for.like(search_term)) |
         (Tool.tradeoffs.like(search_term))
     ).all()
+
+def _record_search(q: str, found: bool):
+    """Count a search, and separately when it found nothing even after correction."""
+    telemetry = get_usage_telemetry()
+    query = normalize_query(q)
+    telemetry.record("searches", query)
+    if not found:
+        telemetry.record("zero_result_searches", query)
+
+@app.get("/api/tools/search", response_model=List[ToolResponse])
+def search_tools(
+    q: str = Query(..., min_length=1),
+    db: Session = Depends(get_db)
+):
+    """
+    Search tools by name, category and description.
+    When nothing matches, misspelled words are corrected against the catalog
+    vocabulary and the corrected query is searched instead. The suggestions
+    themselves are returned by /api/search.
+    """
+    tools = _like_search_tools(db, q)
+    
+    if not tools:
+        corrected, did_you_mean = get_tool_speller().correct(q)
+        if did_you_mean:
+            tools = _like_search_tools(db, corrected)
+    
+    _record_search(q, bool(tools))
     
     favorite_tool_ids = {f.tool_id for f in db.query(Favorite.tool_id).all()}
     
@@ -131,12 +337,77 @@ def search_tools(
     
     return results
 
+@app.get("/api/search")
+def search_all(
+    q: str = Query(..., min_length=1),
+    source: Optional[str] = Query(None, regex=SOURCE_LIST_PATTERN),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    """
+    Search every content bank at once.
+    source: comma-separated list of sources to include (tool, scenario, pattern,
+    numbers, framework, rubric, quiz, flashcard); all sources by default
+    Results from all sources are ranked together. Tool hits carry the full tool.
+    When nothing matches, misspelled words are corrected against the catalog
+    vocabulary, the corrected query is searched instead and returned as
+    `corrected_query`, with up to three `did_you_mean` suggestions.
+    """
+    index = get_search_index()
+    if index is None:
+        raise HTTPException(status_code=503, detail="Search index is warming up")
+    
+    sources = source.split(",") if source else None
+    results = index.search(q, sources=sources, limit=limit)
+    
+    corrected_query = None
+    did_you_mean = []
+    if not results:
+        corrected, did_you_mean = get_tool_speller().correct(q)
+        if did_you_mean:
+            corrected_query = corrected
+            results = index.search(corrected, sources=sources, limit=limit)
+    _record_search(q, bool(results))
+    
+    tool_ids = [r["tool_id"] for r in results if r["source"] == "tool"]
+    if tool_ids:
+        tools = {t.id: t for t in db.query(Tool).filter(Tool.id.in_(tool_ids)).all()}
+        favorite_tool_ids = {f.tool_id for f in db.query(Favorite.tool_id).all()}
+        for result in results:
+            tool = tools.get(result.get("tool_id"))
+            if tool is not None:
+                tool_dict = ToolResponse.from_orm(tool).dict()
+                tool_dict["is_favorited"] = tool.id in favorite_tool_ids
+                result["tool"] = tool_dict
+    
+    return {
+        "query": q,
+        "corrected_query": corrected_query,
+        "did_you_mean": did_you_mean,
+        "results": results,
+        "total": len(results),
+    }
+
+@app.get("/api/autocomplete")
+def autocomplete(
+    prefix: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(TOP_K, ge=1, le=TOP_K)
+):
+    """
+    Get completions for search-as-you-type.
+    Matches the start of any word in tool names, categories, scenario titles
+    and pattern titles.
+    """
+    suggestions = get_prefix_index().complete(prefix, limit=limit)
+    return {"prefix": prefix, "suggestions": suggestions}
+
 @app.get("/api/tools/{tool_id}", response_model=ToolDetailResponse)
 def get_tool_detail(tool_id: int, db: Session = Depends(get_db)):
     tool = db.query(Tool).filter(Tool.id == tool_id).first()
     if not tool:
         raise HTTPException(status_code=404, detail="Tool not found")
     
+    get_usage_telemetry().record("tool_views", str(tool_id))
     favorite = db.query(Favorite).filter(Favorite.tool_id == tool_id).first()
     
     tool_dict = ToolDetailResponse.from_orm(tool).dict()
@@ -144,13 +415,43 @@ def get_tool_detail(tool_id: int, db: Session = Depends(get_db)):
     
     return ToolDetailResponse(**tool_dict)
 
+@app.post("/api/recommend", response_model=List[RecommendationResponse])
+def recommend_tools(requirements: RecommendRequest, db: Session = Depends(get_db)):
+    """
+    Rank tools against a set of requirements.
+    Each tool's precomputed feature vector is scored against the requirement
+    weights; `matched` lists the features that contributed positively.
+    """
+    weights = requirement_weights(
+        read_write_ratio=requirements.read_write_ratio,
+        consistency=requirements.consistency,
+        cap_preference=requirements.cap_preference,
+        latency_target_ms=requirements.latency_target_ms,
+        data_shape=requirements.data_shape,
+    )
+    if not weights.any():
+        raise HTTPException(status_code=400, detail="At least one requirement is required")
+    
+    ranked = get_recommender().recommend(weights, aws_only=requirements.aws_only, limit=requirements.limit)
+    tools = {t.id: t for t in db.query(Tool).filter(Tool.id.in_([r["tool_id"] for r in ranked])).all()}
+    favorite_tool_ids = {f.tool_id for f in db.query(Favorite.tool_id).all()}
+    
+    results = []
+    for r in ranked:
+        tool_dict = ToolResponse.from_orm(tools[r["tool_id"]]).dict()
+        tool_dict["is_favorited"] = r["tool_id"] in favorite_tool_ids
+        results.append(RecommendationResponse(tool=ToolResponse(**tool_dict), score=r["score"], matched=r["matched"]))
+    
+    return results
+
 @app.get("/api/scenarios/{scenario_type}")
 def get_scenario_suggestions(scenario_type: str, db: Session = Depends(get_db)):
     if scenario_type not in SCENARIO_BLUEPRINTS:
         raise HTTPException(status_code=404, detail="Scenario not found")
     
+    get_usage_telemetry().record("scenario_views", scenario_type)
     blueprint = SCENARIO_BLUEPRINTS[scenario_type]
-    tool_names = blueprint["tools"]
+    tool_names = get_alias_map().resolve_names(blueprint["tools"])
     
     tools = db.query(Tool).filter(Tool.name.in_(tool_names)).all()
     
@@ -172,9 +473,463 @@ def get_scenario_suggestions(scenario_type: str, db: Session = Depends(get_db)):
         "high_level": blueprint["high_level"],
         "deep_dive": blueprint["deep_dive"],
         "reasoning": blueprint["reasoning"],
+        "scale": blueprint["scale"],
         "tools": tool_results,
+        "labs": SCENARIO_LABS.get(scenario_type, []),
     }
 
+@app.get("/api/scenarios/{scenario_type}/requirements")
+def get_scenario_requirements(scenario_type: str):
+    """
+    Get a scenario's requirements tagged with the properties they ask for,
+    plus candidate tools ranked by how many tagged requirements they cover.
+    """
+    analysis = get_requirement_analysis()
+    if scenario_type not in analysis:
+        raise HTTPException(status_code=404, detail="Scenario not found")
+    
+    return {"scenario": scenario_type, **analysis[scenario_type]}
+
+@app.get("/api/scenarios/{scenario_type}/estimates")
+def get_scenario_estimates(
+    scenario_type: str,
+    sweep_param: Optional[str] = Query(None, alias="sweep", regex=SCALE_PARAM_PATTERN),
+    start: Optional[float] = Query(None, gt=0),
+    stop: Optional[float] = Query(None, gt=0),
+    points: int = Query(20, ge=2, le=200),
+    log: bool = Query(True)
+):
+    """
+    Back-of-envelope estimates (QPS, storage, bandwidth, cache size) from a
+    scenario's scale parameters.
+    sweep: scale parameter to vary, e.g. 'dau'
+    start, stop, points: sweep range; log=true spaces points geometrically
+    """
+    if scenario_type not in SCENARIO_BLUEPRINTS:
+        raise HTTPException(status_code=404, detail="Scenario not found")
+    
+    params = SCENARIO_BLUEPRINTS[scenario_type]["scale"]
+    result = {
+        "scenario": scenario_type,
+        "parameters": params,
+        "estimates": {metric: float(value) for metric, value in estimate(params).items()},
+        "units": METRIC_UNITS,
+        "sweep": None,
+    }
+    
+    if sweep_param:
+        if start is None or stop is None:
+            raise HTTPException(status_code=400, detail="start and stop are required for a sweep")
+        result["sweep"] = sweep(params, sweep_param, start, stop, points, log)
+    
+    return result
+
+@app.get("/api/scenarios/{scenario_type}/latency")
+def get_scenario_latency(
+    scenario_type: str,
+    samples: int = Query(100_000, ge=1000, le=MAX_SAMPLES),
+    cache_hit_ratio: float = Query(0.9, ge=0, le=1),
+    branch_probability: float = Query(0.5, ge=0, le=1),
+    client_region: str = Query("us", regex=CLIENT_REGION_PATTERN)
+):
+    """
+    Monte Carlo p50/p95/p99 latency for each of a scenario's request flows,
+    with the step that dominates the tail.
+    cache_hit_ratio: share of requests taking "On cache hit" branches
+    branch_probability: share of requests taking other conditional steps
+    """
+    if scenario_type not in SCENARIO_BLUEPRINTS:
+        raise HTTPException(status_code=404, detail="Scenario not found")
+    
+    return {
+        "scenario": scenario_type,
+        "parameters": {
+            "samples": samples,
+            "cache_hit_ratio": cache_hit_ratio,
+            "branch_probability": branch_probability,
+            "client_region": client_region,
+        },
+        "flows": list(simulate_scenario(scenario_type, samples, cache_hit_ratio, branch_probability, client_region)),
+    }
+
+@app.get("/api/scenarios/{scenario_type}/capacity")
+def get_scenario_capacity(
+    scenario_type: str,
+    load: float = Query(1.0, gt=0, le=3),
+    duration: float = Query(60, gt=0, le=MAX_DURATION),
+    target_utilization: float = Query(0.7, gt=0, lt=1)
+):
+    """
+    Discrete-event simulation of the scenario's components as M/M/c queues:
+    utilization, queue depth and latency percentiles per component, and the
+    load at which the first component saturates.
+    load: multiple of the scenario's peak QPS
+    duration: simulated seconds
+    target_utilization: utilization at peak that servers are sized for
+    """
+    if scenario_type not in SCENARIO_BLUEPRINTS:
+        raise HTTPException(status_code=404, detail="Scenario not found")
+    
+    return {
+        "scenario": scenario_type,
+        "parameters": {"load": load, "duration": duration, "target_utilization": target_utilization},
+        **simulate_components(scenario_type, load, duration, target_utilization),
+    }
+
+@app.get("/api/labs/rate-limit")
+def get_rate_limit_lab(
+    store: str = Query("memory", regex=STORE_PATTERN),
+    threads: int = Query(4, ge=1, le=16),
+    decisions: int = Query(20_000, ge=1000, le=200_000),
+    keys: int = Query(1000, ge=1, le=100_000),
+    limit: int = Query(100, ge=1, le=1000),
+    window: float = Query(1.0, gt=0, le=3600)
+):
+    """
+    Benchmark fixed window, sliding log, sliding window counter, token bucket
+    and GCRA limiters: decisions per second across threads, memory per key,
+    and accuracy on bursty traffic against the exact sliding log.
+    store: memory (striped locks) or sqlite (shared file, one transaction per decision)
+    limit, window: requests allowed per window of seconds
+    """
+    return {
+        "parameters": {"store": store, "threads": threads, "decisions": decisions, "keys": keys, "limit": limit, "window": window},
+        "algorithms": rate_limit_benchmark(store, threads, decisions, keys, limit, window),
+    }
+
+@app.get("/api/labs/partitioning")
+def get_partitioning_lab(
+    keys: int = Query(1_000_000, ge=1000, le=MAX_PARTITION_KEYS),
+    nodes: int = Query(10, ge=2, le=MAX_NODES),
+    vnodes: int = Query(100, ge=1, le=MAX_VNODES),
+    schemes: Optional[str] = Query(None, regex=SCHEME_LIST_PATTERN)
+):
+    """
+    Spread synthetic keys over nodes with each partitioning scheme and report
+    load imbalance and the share of keys that move when a node is added or
+    the last node is removed.
+    schemes: comma-separated list (modulo, ring, jump, rendezvous); all by default
+    vnodes: virtual nodes per node on the consistent hash ring
+    """
+    names = tuple(dict.fromkeys(schemes.split(","))) if schemes else SCHEMES
+    return {
+        "parameters": {"keys": keys, "nodes": nodes, "vnodes": vnodes},
+        **simulate_partitioning(keys, nodes, vnodes, schemes=names),
+    }
+
+@app.get("/api/labs/geo")
+def get_geo_lab(
+    drivers: int = Query(10_000, ge=100, le=MAX_DRIVERS),
+    seconds: int = Query(10, ge=1, le=60),
+    queries_per_second: int = Query(500, ge=1, le=5000),
+    k: int = Query(5, ge=1, le=100),
+    indexes: Optional[str] = Query(None, regex=INDEX_LIST_PATTERN)
+):
+    """
+    Replay moving drivers through geohash, uniform grid, quadtree and KD-tree
+    indexes and report build time, location updates and k-nearest queries per
+    second, and recall against a brute-force scan.
+    seconds: simulated seconds; each driver reports every 4 seconds
+    indexes: comma-separated list (geohash, grid, quadtree, kdtree); all by default
+    """
+    names = tuple(dict.fromkeys(indexes.split(","))) if indexes else INDEXES
+    return geo_benchmark(drivers, seconds, queries_per_second, k, indexes=names)
+
+@app.get("/api/labs/contention")
+def get_contention_lab(
+    clients: int = Query(500, ge=10, le=MAX_CLIENTS),
+    seats: int = Query(100, ge=1, le=MAX_SEATS),
+    think_ms: float = Query(1.0, ge=0, le=100),
+    strategies: Optional[str] = Query(None, regex=STRATEGY_LIST_PATTERN)
+):
+    """
+    Race concurrent client threads to book seats in SQLite with each
+    concurrency control strategy and report throughput, abort and retry
+    rates, and double bookings.
+    think_ms: time between reading a seat and writing it (payment, for reservations)
+    strategies: comma-separated list (naive, pessimistic, optimistic, distributed_lock, reservation); all by default
+    """
+    if serial_seconds(clients, seats, think_ms / 1000) > MAX_SERIAL_SECONDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"min(clients, seats) x think_ms must be at most {MAX_SERIAL_SECONDS * 1000:.0f} ms of serialized bookings"
+        )
+    names = tuple(dict.fromkeys(strategies.split(","))) if strategies else STRATEGIES
+    return {
+        "parameters": {"clients": clients, "seats": seats, "think_ms": think_ms},
+        "strategies": contention_benchmark(clients, seats, think_ms / 1000, names),
+    }
+
+@app.get("/api/labs/fanout")
+def get_fanout_lab(
+    users: int = Query(100_000, ge=1000, le=MAX_USERS),
+    edges: int = Query(1_000_000, ge=1000, le=MAX_EDGES),
+    posts: int = Query(100_000, ge=100, le=MAX_POSTS),
+    reads: int = Query(100_000, ge=100, le=MAX_POSTS),
+    threshold: int = Query(10_000, ge=1),
+    feed_size: int = Query(20, ge=1, le=MAX_FEED_SIZE),
+    alpha: float = Query(1.0, gt=0, le=3)
+):
+    """
+    Replay posts over a power-law follower graph with push, pull and hybrid
+    fan-out and report write amplification, read cost and timeline memory.
+    threshold: followers above which hybrid fan-out skips an author (fan-out on read)
+    alpha: skew of follower counts; followee rank r gets edges in proportion to 1 / r**alpha
+    """
+    if estimated_deliveries(users, edges, posts, alpha) > MAX_DELIVERIES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"posts x followers per post must be at most {MAX_DELIVERIES:,} timeline writes"
+        )
+    return simulate_fanout(users, edges, posts, reads, threshold, feed_size, alpha)
+
+@app.get("/api/labs/shortcodes")
+def get_shortcode_lab(
+    codes: int = Query(1_000_000, ge=1000, le=MAX_CODES),
+    processes: int = Query(4, ge=1, le=MAX_PROCESSES),
+    length: int = Query(7, ge=5, le=MAX_CODE_LENGTH),
+    generators: Optional[str] = Query(None, regex=GENERATOR_LIST_PATTERN),
+    collision_codes: int = Query(1_000_000, ge=1000, le=MAX_COLLISION_CODES),
+    urls: int = Query(100_000, ge=100, le=1_000_000),
+    lookups: int = Query(200_000, ge=100, le=1_000_000),
+    cache_size: int = Query(10_000, ge=1)
+):
+    """
+    Generate short codes with a per-code counter, counter ranges, Snowflake
+    ids and URL hashes across worker processes, count hash collisions, and
+    time redirect lookups from SQLite with and without an LRU cache.
+    generators: comma-separated list (counter, ranges, snowflake, hash); all by default,
+        leaving out counter above its own, lower, cap on codes
+    collision_codes: URLs hashed into 62**length codes for the collision count
+    """
+    if generators:
+        names = tuple(dict.fromkeys(generators.split(",")))
+        if "counter" in names and codes > MAX_COUNTER_CODES:
+            raise HTTPException(
+                status_code=400,
+                detail=f"The counter generator is limited to {MAX_COUNTER_CODES:,} codes"
+            )
+    else:
+        names = tuple(name for name in GENERATORS if name != "counter" or codes <= MAX_COUNTER_CODES)
+    return {
+        "parameters": {"codes": codes, "processes": processes, "length": length},
+        "generators": generate(codes, processes, length, names),
+        "collisions": hash_collisions(collision_codes, length),
+        "redirects": redirect_benchmark(urls, lookups, cache_size),
+    }
+
+@app.get("/api/labs/chunking")
+def get_chunking_lab(
+    size_mb: int = Query(32, ge=1, le=MAX_FILE_BYTES >> 20),
+    versions: int = Query(3, ge=0, le=MAX_VERSIONS),
+    edits: int = Query(100, ge=0, le=MAX_EDITS),
+    avg_size: int = Query(8192, ge=MIN_AVG_SIZE, le=MAX_AVG_SIZE),
+    chunkers: Optional[str] = Query(None, regex=CHUNKER_LIST_PATTERN)
+):
+    """
+    Chunk a memory-mapped file and edited versions of it with fixed-size,
+    Gear and FastCDC chunking, deduplicating SHA-256 fingerprints, and report
+    throughput, dedup ratio and fingerprint index memory.
+    edits: inserts, deletes and overwrites applied to each version to make the next
+    avg_size: target chunk size in bytes, a power of two
+    chunkers: comma-separated list (fixed, gear, fastcdc); all by default
+    """
+    if avg_size & (avg_size - 1):
+        raise HTTPException(status_code=400, detail="avg_size must be a power of two")
+    names = tuple(dict.fromkeys(chunkers.split(","))) if chunkers else CHUNKERS
+    if chunked_bytes(size_mb << 20, versions, len(names)) > MAX_CHUNKED_BYTES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"size_mb x (versions + 1) x chunkers must be at most {MAX_CHUNKED_BYTES >> 20} MB"
+        )
+    return chunking_benchmark(size_mb << 20, versions, edits, avg_size, names)
+
+@app.get("/api/labs/streaming")
+def get_streaming_lab(
+    events: int = Query(200_000, ge=1000, le=MAX_EVENTS),
+    keys: int = Query(100_000, ge=1, le=MAX_STREAM_KEYS),
+    batch: int = Query(10_000, ge=1, le=MAX_BATCH),
+    size_ms: int = Query(10_000, ge=1, le=3_600_000),
+    slide_ms: int = Query(2000, ge=1, le=3_600_000),
+    gap_ms: int = Query(5000, ge=1, le=3_600_000),
+    max_delay_ms: int = Query(2000, ge=0, le=600_000),
+    late_share: float = Query(0.01, ge=0, le=1),
+    windows: Optional[str] = Query(None, regex=WINDOW_LIST_PATTERN),
+    engines: Optional[str] = Query(None, regex=ENGINE_LIST_PATTERN)
+):
+    """
+    Count a synthetic out-of-order clickstream per user in tumbling, sliding
+    and session windows with watermarks, one event at a time and in NumPy
+    micro-batches, and report events per second, late events and state size.
+    batch: events per micro-batch; the watermark advances after each one
+    max_delay_ms: bounded out-of-orderness; the watermark trails the newest event time by this much
+    windows: comma-separated list (tumbling, sliding, session); all by default
+    engines: comma-separated list (per_event, batched); both by default
+    """
+    if size_ms % slide_ms:
+        raise HTTPException(status_code=400, detail="size_ms must be a multiple of slide_ms")
+    window_names = tuple(dict.fromkeys(windows.split(","))) if windows else WINDOWS
+    if "sliding" in window_names:
+        if size_ms // slide_ms > MAX_WINDOW_SLIDES:
+            raise HTTPException(
+                status_code=400,
+                detail=f"size_ms / slide_ms must be at most {MAX_WINDOW_SLIDES} for sliding windows"
+            )
+        if window_updates(events, size_ms, slide_ms) > MAX_WINDOW_UPDATES:
+            raise HTTPException(
+                status_code=400,
+                detail=f"events x size_ms / slide_ms must be at most {MAX_WINDOW_UPDATES:,} sliding window updates"
+            )
+    engine_names = tuple(dict.fromkeys(engines.split(","))) if engines else ENGINES
+    return streaming_benchmark(events, keys, batch, size_ms, slide_ms, gap_ms, max_delay_ms, late_share,
+                               window_names, engine_names)
+
+@app.get("/api/labs/chat")
+def get_chat_lab(
+    users: int = Query(1000, ge=10, le=MAX_CHAT_USERS),
+    rooms: int = Query(100, ge=1, le=10_000),
+    room_size: int = Query(50, ge=2, le=MAX_ROOM_SIZE),
+    messages: int = Query(1000, ge=1, le=MAX_MESSAGES),
+    rate: int = Query(2000, ge=1, le=100_000),
+    contacts: int = Query(20, ge=0, le=500),
+    offline_share: float = Query(0.1, ge=0, le=1),
+    slow_share: float = Query(0.05, ge=0, le=1),
+    nodes: int = Query(4, ge=1, le=MAX_GATEWAY_NODES),
+    strategies: Optional[str] = Query(None, regex=BROADCAST_LIST_PATTERN)
+):
+    """
+    Drive simulated clients against an in-process FastAPI WebSocket gateway
+    and report group message fan-out latency, offline delivery, presence
+    storm drain time and memory per connection for each broadcast strategy.
+    rate: group messages sent per second
+    slow_share: share of clients that read each frame slowly, pushing back on senders
+    nodes: gateway nodes subscribed to the pub/sub stand-in (pubsub strategy)
+    strategies: comma-separated list (per_connection, batched, pubsub); all by default
+    """
+    if contacts >= users or room_size > users:
+        raise HTTPException(status_code=400, detail="contacts and room_size must be smaller than users")
+    names = tuple(dict.fromkeys(strategies.split(","))) if strategies else BROADCAST_STRATEGIES
+    if drain_seconds(users, room_size, messages, slow_share) * len(names) > MAX_DRAIN_SECONDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"messages x room_size must drain within {MAX_DRAIN_SECONDS:.0f} s across strategies"
+        )
+    return chat_benchmark(users, rooms, room_size, messages, rate, contacts, offline_share, slow_share, nodes,
+                          names)
+
+@app.get("/api/labs/transcoding")
+def get_transcoding_lab(
+    duration: float = Query(60, gt=0, le=MAX_VIDEO_SECONDS),
+    segment_seconds: str = Query("1,2,5,15", regex=NUMBER_LIST_PATTERN),
+    workers: str = Query("1,2,4,8", regex=INTEGER_LIST_PATTERN),
+    failure_rate: float = Query(0.02, ge=0, le=0.5)
+):
+    """
+    Run the split, transcode, assemble and publish DAG of synthetic CPU-bound
+    tasks on a process pool for every segment size and worker count, with
+    work stealing and retries, and report makespan against its lower bounds.
+    duration: length of the uploaded video in seconds
+    segment_seconds: comma-separated segment lengths to sweep
+    workers: comma-separated worker counts to sweep
+    The whole sweep may use at most 20 CPU seconds of task work.
+    """
+    segments = tuple(dict.fromkeys(float(value) for value in segment_seconds.split(",")))
+    counts = tuple(dict.fromkeys(int(value) for value in workers.split(",")))
+    if len(segments) > MAX_SWEEP_VALUES or len(counts) > MAX_SWEEP_VALUES:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_SWEEP_VALUES} values per sweep")
+    if not all(0.5 <= value <= duration for value in segments):
+        raise HTTPException(status_code=400, detail="segment_seconds must be between 0.5 and duration")
+    if not all(1 <= value <= MAX_WORKERS for value in counts):
+        raise HTTPException(status_code=400, detail=f"workers must be between 1 and {MAX_WORKERS}")
+    if sweep_work_seconds(duration, segments, counts) > MAX_SWEEP_WORK_SECONDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Sweep needs more than {MAX_SWEEP_WORK_SECONDS} CPU seconds; use a shorter video, longer segments or fewer runs",
+        )
+    return transcoding_benchmark(duration, segments, counts, failure_rate)
+
+@app.get("/api/labs/sketches")
+def get_sketches_lab(
+    items: int = Query(1_000_000, ge=1, le=MAX_ITEMS),
+    distinct: int = Query(100_000, ge=1, le=MAX_DISTINCT),
+    error_rate: float = Query(0.01, gt=0, lt=0.5),
+    precision: int = Query(14, ge=MIN_PRECISION, le=MAX_PRECISION),
+    top_k: int = Query(100, ge=1, le=MAX_TOP_K),
+    structures: str = Query(",".join(STRUCTURES), regex=STRUCTURE_LIST_PATTERN)
+):
+    """
+    Stream Zipf-distributed keys through a Bloom filter, counting Bloom
+    filter, HyperLogLog, count-min sketch and Space-Saving top-k, and report
+    throughput, memory against an exact set or dict, and error against theory.
+    items: keys in the stream
+    distinct: size of the key space the stream draws from
+    error_rate: target false positive rate of the Bloom filters
+    precision: HyperLogLog register bits; 2^precision registers
+    top_k: counters kept by Space-Saving
+    """
+    if top_k > distinct:
+        raise HTTPException(status_code=400, detail="top_k must not exceed distinct")
+    return sketch_benchmark(items, distinct, error_rate, precision, top_k, tuple(dict.fromkeys(structures.split(","))))
+
+@app.get("/api/telemetry/tools")
+def get_most_viewed_tools(limit: int = Query(10, ge=1, le=TELEMETRY_TOP_K), db: Session = Depends(get_db)):
+    """
+    Most viewed tool detail pages, from the in-process usage sketches.
+    Counts may be high by at most `error` each; any tool viewed more than
+    `error_bound` times is always listed.
+    """
+    usage = get_usage_telemetry().heaviest("tool_views", limit)
+    tools = {t.id: t for t in db.query(Tool).filter(Tool.id.in_([int(r["key"]) for r in usage["results"]])).all()}
+    results = []
+    for r in usage["results"]:
+        tool = tools.get(int(r["key"]))
+        if tool:
+            results.append({"tool_id": tool.id, "name": tool.name, "category": tool.category,
+                            "views": r["count"], "error": r["error"]})
+    usage["results"] = results
+    return usage
+
+@app.get("/api/telemetry/searches")
+def get_top_searches(limit: int = Query(10, ge=1, le=TELEMETRY_TOP_K)):
+    """
+    Most frequent searches from /api/search and /api/tools/search,
+    lowercased with whitespace collapsed.
+    """
+    usage = get_usage_telemetry().heaviest("searches", limit)
+    usage["results"] = [{"query": r["key"], "count": r["count"], "error": r["error"]} for r in usage["results"]]
+    return usage
+
+@app.get("/api/telemetry/searches/zero-results")
+def get_zero_result_searches(limit: int = Query(10, ge=1, le=TELEMETRY_TOP_K)):
+    """
+    Most frequent searches that found nothing, even after spelling
+    correction: content the catalog is missing.
+    """
+    usage = get_usage_telemetry().heaviest("zero_result_searches", limit)
+    usage["results"] = [{"query": r["key"], "count": r["count"], "error": r["error"]} for r in usage["results"]]
+    return usage
+
+@app.get("/api/telemetry/scenarios")
+def get_most_viewed_scenarios(limit: int = Query(10, ge=1, le=TELEMETRY_TOP_K)):
+    """
+    Most fetched scenario blueprints.
+    """
+    usage = get_usage_telemetry().heaviest("scenario_views", limit)
+    usage["results"] = [{"scenario": r["key"], "views": r["count"], "error": r["error"]} for r in usage["results"]]
+    return usage
+
+def _journal_write(kind: str, payload: dict):
+    """Journal an activity event and wait for the group commit that applies it."""
+    future = get_activity_journal().submit(kind, payload)
+    try:
+        return future.result(timeout=WRITE_TIMEOUT_SECONDS)
+    except TimeoutError:
+        if future.cancel():
+            # Still queued, so it never reaches the journal and a retry starts afresh
+            raise HTTPException(status_code=503, detail="Activity journal is busy, try again")
+        # Already journaled: it will be applied, so a retry would see it
+        return JSONResponse(status_code=202, content={"message": "Write accepted and still pending"})
+
 @app.get("/api/favorites", response_model=List[FavoriteResponse])
 def get_favorites(db: Session = Depends(get_db)):
     favorites = db.query(Favorite).order_by(Favorite.pinned_order).all()
@@ -186,28 +941,15 @@ def add_favorite(tool_id: int, db: Session = Depends(get_db)):
     if not tool:
         raise HTTPException(status_code=404, detail="Tool not found")
     
-    existing = db.query(Favorite).filter(Favorite.tool_id == tool_id).first()
-    if existing:
-        return {"message": "Already favorited", "favorite_id": existing.id}
-    
-    max_order = db.query(Favorite).count()
-    favorite = Favorite(tool_id=tool_id, pinned_order=max_order + 1)
-    db.add(favorite)
-    db.commit()
-    db.refresh(favorite)
-    
-    return {"message": "Favorited", "favorite_id": favorite.id}
+    return _journal_write("favorite_added", {"tool_id": tool_id})
 
 @app.delete("/api/favorites/{tool_id}")
-def remove_favorite(tool_id: int, db: Session = Depends(get_db)):
-    favorite = db.query(Favorite).filter(Favorite.tool_id == tool_id).first()
-    if not favorite:
+def remove_favorite(tool_id: int):
+    result = _journal_write("favorite_removed", {"tool_id": tool_id})
+    if result is None:
         raise HTTPException(status_code=404, detail="Favorite not found")
     
-    db.delete(favorite)
-    db.commit()
-    
-    return {"message": "Unfavorited"}
+    return result
 
 @app.get("/api/categories")
 def get_categories(db: Session = Depends(get_db)):
@@ -219,6 +961,56 @@ def get_numbers_to_know():
     """Get system design numbers and metrics to memorize"""
     return NUMBERS_TO_KNOW
 
+def _resolve_reference_number(key: str) -> int:
+    index = REFERENCE_NUMBERS.resolve(key)
+    if index is None:
+        raise HTTPException(status_code=404, detail=f"Reference number not found: {key}")
+    return index
+
+@app.get("/api/reference/numbers/compare")
+def compare_reference_numbers(
+    x: str = Query(..., min_length=1),
+    y: str = Query(..., min_length=1)
+):
+    """
+    How many X fit in Y, e.g. how many SSD random reads fit in one HDD seek.
+    x, y: reference number id ('latency/3') or label (or a unique part of one)
+    """
+    x_index, y_index = _resolve_reference_number(x), _resolve_reference_number(y)
+    how_many = REFERENCE_NUMBERS.how_many(x_index, y_index)
+    if how_many is None:
+        raise HTTPException(status_code=400, detail="Reference numbers have different units")
+    
+    x_quantity, y_quantity = REFERENCE_NUMBERS.quantities[x_index], REFERENCE_NUMBERS.quantities[y_index]
+    return {
+        "x": x_quantity.to_dict(),
+        "y": y_quantity.to_dict(),
+        "how_many": how_many,
+        "statement": f"{y_quantity.label} is {REFERENCE_NUMBERS.ratio_phrase(y_quantity.id, x_quantity.id)}",
+    }
+
+@app.get("/api/reference/numbers/nearest")
+def nearest_reference_numbers(
+    value: str = Query(..., min_length=1),
+    dimension: Optional[str] = Query(None, regex=DIMENSION_PATTERN),
+    limit: int = Query(3, ge=1, le=10)
+):
+    """
+    Reference numbers closest to a value on a log scale.
+    value: a quantity with units, e.g. '2 ms', '3 GB', '250 MB/s', '50000'
+    dimension: only search one dimension
+    """
+    parsed = parse_quantity(value)
+    if parsed is None:
+        raise HTTPException(status_code=400, detail=f"Could not parse value: {value}")
+    
+    magnitude, _, unit = parsed
+    nearest = [
+        {**REFERENCE_NUMBERS.quantities[i].to_dict(), "ratio": ratio}
+        for i, ratio in REFERENCE_NUMBERS.nearest(magnitude, unit, dimension, limit)
+    ]
+    return {"query": {"value": magnitude, "unit": unit}, "nearest": nearest}
+
 @app.get("/api/reference/framework")
 def get_delivery_framework():
     """Get the structured interview delivery framework"""
@@ -240,7 +1032,46 @@ def get_pattern_detail(pattern_name: str):
     pattern = COMMON_PATTERNS.get(pattern_name)
     if not pattern:
         raise HTTPException(status_code=404, detail="Pattern not found")
-    return pattern
+    return {
+        **pattern,
+        "related_tools": get_alias_map().mentions(flatten_text(pattern)),
+        "labs": PATTERN_LABS.get(pattern_name, []),
+    }
+
+@app.get("/api/labs/cache")
+def get_cache_lab(
+    trace: str = Query("zipf", regex=TRACE_KIND_PATTERN),
+    length: int = Query(200_000, ge=1000, le=MAX_TRACE_LENGTH),
+    keys: int = Query(100_000, ge=1000, le=MAX_KEYS),
+    alpha: float = Query(1.0, gt=0, le=3),
+    points: int = Query(5, ge=1, le=10),
+    policies: Optional[str] = Query(None, regex=POLICY_LIST_PATTERN),
+    ttl: Optional[int] = Query(None, ge=1)
+):
+    """
+    Replay a synthetic trace through cache eviction policies and report hit
+    ratio against cache size (0.1% to 10% of the key space).
+    trace: zipf, scan (Zipf with one-off sequential scans) or temporal (moving hot set)
+    policies: comma-separated list (lru, lfu, arc, tinylfu, ttl); all by default
+    ttl: requests a TTL entry lives; twice the cache size by default
+    length x points x policies + keys / 10 may be at most 5M replayed requests
+    """
+    names = tuple(dict.fromkeys(policies.split(","))) if policies else tuple(POLICIES)
+    if replay_work(length, keys, points, len(names)) > MAX_REPLAYED_REQUESTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"length x points x policies + keys / 10 must be at most {MAX_REPLAYED_REQUESTS:,}",
+        )
+    result = hit_ratio_curves(trace, length, keys, alpha, points, names, ttl)
+    best = [
+        max(names, key=lambda name: result["hit_ratios"][name][i])
+        for i in range(len(result["sizes"]))
+    ]
+    return {
+        "trace": {"kind": trace, "length": length, "keys": keys, "alpha": alpha},
+        **result,
+        "best": best,
+    }
 
 @app.get("/api/quiz/question")
 def get_random_quiz_question(
@@ -258,7 +1089,7 @@ def get_random_quiz_question(
         scenario_types = list(SCENARIO_BLUEPRINTS.keys())
         selected_scenario = random.choice(scenario_types)
         blueprint = SCENARIO_BLUEPRINTS[selected_scenario]
-        tool_names = blueprint["tools"]
+        tool_names = get_alias_map().resolve_names(blueprint["tools"])
         tools = db.query(Tool).filter(Tool.name.in_(tool_names)).all()
         
         favorite_tool_ids = {f.tool_id for f in db.query(Favorite.tool_id).all()}
@@ -329,7 +1160,7 @@ def get_quiz_questions(
         used_scenarios.add(selected_scenario)
         
         blueprint = SCENARIO_BLUEPRINTS[selected_scenario]
-        tool_names = blueprint["tools"]
+        tool_names = get_alias_map().resolve_names(blueprint["tools"])
         tools = db.query(Tool).filter(Tool.name.in_(tool_names)).all()
         
         favorite_tool_ids = {f.tool_id for f in db.query(Favorite.tool_id).all()}
@@ -495,37 +1326,15 @@ def get_test_scenario(
     
     blueprint = SCENARIO_BLUEPRINTS[scenario_type]
     
-    scale_info = {}
-    if "DAU" in blueprint["description"] or "users" in blueprint["description"].lower():
-        if "uber" in scenario_type.lower() or "lyft" in scenario_type.lower():
-            scale_info = {
-                "daily_active_users": "100M DAU",
-                "requests_per_second": "Peak: 1M requests/second",
-                "data_size": "100+ PB ride history"
-            }
-        elif "whatsapp" in scenario_type.lower() or "messenger" in scenario_type.lower():
-            scale_info = {
-                "daily_active_users": "2B DAU",
-                "messages_per_day": "100B messages/day",
-                "data_size": "Multiple PB of messages"
-            }
-        elif "instagram" in scenario_type.lower() or "twitter" in scenario_type.lower():
-            scale_info = {
-                "daily_active_users": "500M+ DAU",
-                "posts_per_day": "100M+ posts/day",
-                "data_size": "Multiple PB of media"
-            }
+    scale_info = scale_summary(blueprint["scale"])
     
+    analysis = get_requirement_analysis()[scenario_type]
     hints = {
         "out_of_scope": blueprint["requirements"].get("out_of_scope", []),
-        "key_constraints": []
+        "key_constraints": analysis["key_constraints"],
+        "requirement_tags": analysis["tags"],
     }
     
-    if blueprint["requirements"].get("non_functional", []):
-        for req in blueprint["requirements"]["non_functional"]:
-            if "latency" in req.lower() or "consistency" in req.lower() or "availability" in req.lower():
-                hints["key_constraints"].append(req)
-    
     return {
         "scenario": scenario_type,
         "title": blueprint["title"],
@@ -534,6 +1343,50 @@ def get_test_scenario(
         "hints": hints
     }
 
+def _resolve_graph_node(node: str):
+    graph = get_knowledge_graph()
+    index = graph.resolve(node)
+    if index is None:
+        raise HTTPException(status_code=404, detail="Node not found")
+    return graph, index
+
+@app.get("/api/graph/neighbors")
+def get_graph_neighbors(
+    node: str = Query(..., min_length=1),
+    node_type: Optional[str] = Query(None, regex=NODE_TYPE_PATTERN)
+):
+    """
+    Get the direct neighbours of a knowledge graph node.
+    node: node id (e.g. 'tool:4', 'scenario:payments') or a tool name/label
+    node_type: only return neighbours of this type
+    """
+    graph, index = _resolve_graph_node(node)
+    neighbors = [graph.describe(n) for n in graph.neighbors(index)]
+    if node_type:
+        neighbors = [n for n in neighbors if n["type"] == node_type]
+    return {"node": graph.describe(index), "neighbors": neighbors, "total": len(neighbors)}
+
+@app.get("/api/graph/related")
+def get_graph_related(
+    node: str = Query(..., min_length=1),
+    hops: int = Query(2, ge=1, le=4),
+    node_type: Optional[str] = Query(None, regex=NODE_TYPE_PATTERN)
+):
+    """
+    Get everything within `hops` edges of a knowledge graph node,
+    e.g. everything related to DynamoDB within 2 hops.
+    Results are ordered by distance.
+    """
+    graph, index = _resolve_graph_node(node)
+    related = []
+    for other, distance in graph.k_hop(index, hops):
+        item = graph.describe(other)
+        if node_type and item["type"] != node_type:
+            continue
+        item["hops"] = distance
+        related.append(item)
+    return {"node": graph.describe(index), "hops": hops, "related": related, "total": len(related)}
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -47,3 +47,18 @@ class Favorite(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     
     tool = relationship("Tool", back_populates="favorites")
+
+class ActivityEvent(Base):
+    __tablename__ = "activity_journal"
+    __table_args__ = {"sqlite_autoincrement": True}
+    
+    seq = Column(Integer, primary_key=True, autoincrement=True)
+    kind = Column(String, nullable=False)
+    payload = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class JournalCheckpoint(Base):
+    __tablename__ = "journal_checkpoint"
+    
+    id = Column(Integer, primary_key=True)
+    applied_seq = Column(Integer, nullable=False, default=0)
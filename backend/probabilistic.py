@@ -0,0 +1,448 @@
+"""
+Probabilistic data structures and their benchmarks.
+
+Puts numbers behind the sketches the ``bitly``, ``search`` and
+``analytics`` blueprints lean on: "has this code been taken", "how many
+unique users", "which queries are hot". Each trades a bounded, known error
+for memory that does not grow with the number of keys:
+
+- ``BloomFilter``: set membership in ``-n ln p / ln(2)^2`` bits, with false
+  positives at rate ``p`` and no false negatives.
+- ``CountingBloomFilter``: a Bloom filter of 8-bit counters instead of bits,
+  so keys can be removed.
+- ``HyperLogLog``: distinct count from ``2^precision`` one-byte registers,
+  with a standard error of ``1.04 / sqrt(2^precision)``.
+- ``CountMinSketch``: per-key counts from a ``depth x width`` table. An
+  estimate is never low and is within ``e / width`` of the stream length
+  with probability ``1 - exp(-depth)``.
+- ``SpaceSaving``: the top-k heavy hitters from ``k`` counters. A count is
+  never low by anything and high by at most its recorded error, and every
+  key seen more than ``N / k`` times is kept.
+
+Keys are hashed once to 64 bits, by splitmix64 for integer ids and BLAKE2b
+for anything else, and every probe position is derived from that hash by
+double hashing. All inserts and queries take a batch of keys and run as
+NumPy array operations over bit and counter arrays, so the per-key cost is
+a few nanoseconds of vector work rather than a Python call.
+
+``benchmark`` streams Zipf-distributed keys through each structure and
+reports throughput, memory next to an exact Python set or dict, and the
+empirical error next to what theory predicts.
+"""
+
+import hashlib
+import math
+import sys
+import time
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from partitioning import splitmix64
+
+STRUCTURES = ("bloom", "counting_bloom", "hyperloglog", "count_min", "space_saving")
+MAX_ITEMS = 10_000_000
+MAX_DISTINCT = 2_000_000
+MIN_PRECISION = 4
+MAX_PRECISION = 18
+MAX_TOP_K = 10_000
+BATCH = 1 << 16
+# Keys inserted one call at a time, to show what batching saves
+SINGLE_OPS = 2_000
+COUNTER_MAX = 255
+
+Keys = Union[np.ndarray, Sequence]
+
+
+def hash_keys(keys: Keys) -> np.ndarray:
+    """64-bit hashes of a batch of keys: vectorized for integer arrays, one
+    BLAKE2b digest per key otherwise."""
+    if isinstance(keys, np.ndarray) and keys.dtype.kind in "iu":
+        return splitmix64(keys)
+    return np.fromiter(
+        (int.from_bytes(hashlib.blake2b(str(key).encode(), digest_size=8).digest(), "little") for key in keys),
+        dtype=np.uint64, count=len(keys))
+
+
+def probes(hashes: np.ndarray, count: int, size: int) -> np.ndarray:
+    """``count`` positions in ``[0, size)`` per hash, as ``h1 + i * h2``
+    (Kirsch and Mitzenmacher), one row per hash."""
+    step = splitmix64(hashes) | np.uint64(1)
+    return (hashes[:, None] + np.arange(count, dtype=np.uint64) * step[:, None]) % np.uint64(size)
+
+
+def runs(values: np.ndarray, weights: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Distinct values, their total weight and the index of each one's first
+    occurrence, by sorting instead of ``np.unique``."""
+    order = np.argsort(values, kind="stable")
+    ordered = values[order]
+    starts = np.flatnonzero(np.r_[len(values) > 0, ordered[1:] != ordered[:-1]])
+    if weights is None:
+        totals = np.diff(np.r_[starts, len(values)])
+    else:
+        totals = np.add.reduceat(weights[order], starts) if len(values) else weights[:0]
+    return ordered[starts], totals.astype(np.int64), order[starts]
+
+
+class BloomFilter:
+    """Set membership in a packed bit array."""
+
+    __slots__ = ("bits", "size", "hashes", "capacity")
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        self.capacity = capacity
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = np.zeros((self.size + 7) // 8, dtype=np.uint8)
+
+    def _positions(self, keys: Keys) -> np.ndarray:
+        return probes(hash_keys(keys), self.hashes, self.size)
+
+    def add(self, keys: Keys):
+        positions = self._positions(keys).ravel()
+        np.bitwise_or.at(self.bits, positions >> np.uint64(3), np.left_shift(1, positions & np.uint64(7)).astype(np.uint8))
+
+    def contains(self, keys: Keys) -> np.ndarray:
+        positions = self._positions(keys)
+        return ((self.bits[positions >> np.uint64(3)] >> (positions & np.uint64(7)).astype(np.uint8)) & 1).all(axis=1)
+
+    def fill_ratio(self) -> float:
+        """Share of bits set; a false positive needs all ``hashes`` of them."""
+        return float(np.unpackbits(self.bits)[:self.size].mean())
+
+    def expected_false_positive_rate(self, inserted: int) -> float:
+        return (1 - math.exp(-self.hashes * inserted / self.size)) ** self.hashes
+
+    @property
+    def nbytes(self) -> int:
+        return self.bits.nbytes
+
+
+class CountingBloomFilter:
+    """A Bloom filter of saturating 8-bit counters, which supports removal.
+
+    A counter that reaches ``COUNTER_MAX`` stays there, since its true count
+    is no longer known, so keys that share it can never cause a false
+    negative.
+    """
+
+    __slots__ = ("counters", "size", "hashes", "capacity")
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        self.capacity = capacity
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.counters = np.zeros(self.size, dtype=np.uint8)
+
+    def _positions(self, keys: Keys) -> np.ndarray:
+        return probes(hash_keys(keys), self.hashes, self.size)
+
+    def add(self, keys: Keys):
+        positions, counts, _ = runs(self._positions(keys).ravel())
+        self.counters[positions] = np.minimum(self.counters[positions] + counts, COUNTER_MAX)
+
+    def remove(self, keys: Keys):
+        """Remove keys that are present; absent ones are skipped rather than
+        decrementing counters other keys depend on."""
+        positions = self._positions(keys)
+        present = (self.counters[positions] > 0).all(axis=1)
+        positions, counts, _ = runs(positions[present].ravel())
+        current = self.counters[positions].astype(np.int64)
+        self.counters[positions] = np.where(current == COUNTER_MAX, COUNTER_MAX, np.maximum(current - counts, 0))
+
+    def contains(self, keys: Keys) -> np.ndarray:
+        return (self.counters[self._positions(keys)] > 0).all(axis=1)
+
+    def expected_false_positive_rate(self, inserted: int) -> float:
+        return (1 - math.exp(-self.hashes * inserted / self.size)) ** self.hashes
+
+    @property
+    def nbytes(self) -> int:
+        return self.counters.nbytes
+
+
+class HyperLogLog:
+    """Distinct count from the longest run of leading zeros per register."""
+
+    __slots__ = ("registers", "precision")
+
+    def __init__(self, precision: int = 14):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def add(self, keys: Keys):
+        hashes = hash_keys(keys)
+        width = 64 - self.precision
+        index = (hashes >> np.uint64(width)).astype(np.intp)
+        rest = hashes & np.uint64((1 << width) - 1)
+        # Bit length through the float exponent, less one where rounding reached the next power of two
+        length = np.frexp(rest.astype(np.float64))[1].astype(np.int64)
+        length -= (length > 0) & ((rest >> np.maximum(length - 1, 0).astype(np.uint64)) == 0)
+        np.maximum.at(self.registers, index, (width - length + 1).astype(np.uint8))
+
+    def merge(self, other: "HyperLogLog"):
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self) -> float:
+        m = len(self.registers)
+        alpha = {16: 0.673, 32: 0.697, 64: 0.709}.get(m, 0.7213 / (1 + 1.079 / m))
+        raw = alpha * m * m / float(np.ldexp(1.0, -self.registers.astype(np.int32)).sum())
+        zeros = int((self.registers == 0).sum())
+        # Linear counting is more accurate while many registers are still empty
+        if raw <= 2.5 * m and zeros:
+            return m * math.log(m / zeros)
+        return raw
+
+    def standard_error(self) -> float:
+        return 1.04 / math.sqrt(len(self.registers))
+
+    @property
+    def nbytes(self) -> int:
+        return self.registers.nbytes
+
+
+class CountMinSketch:
+    """Per-key counts as the minimum over ``depth`` rows of ``width`` counters."""
+
+    __slots__ = ("table", "width", "depth", "total")
+
+    def __init__(self, width: int = 2048, depth: int = 5):
+        self.width = width
+        self.depth = depth
+        self.table = np.zeros((depth, width), dtype=np.int64)
+        self.total = 0
+
+    @classmethod
+    def from_error(cls, epsilon: float, delta: float) -> "CountMinSketch":
+        """A sketch whose estimates are within ``epsilon`` of the total with probability ``1 - delta``."""
+        return cls(math.ceil(math.e / epsilon), math.ceil(math.log(1 / delta)))
+
+    def _cells(self, keys: Keys) -> np.ndarray:
+        rows = np.arange(self.depth, dtype=np.uint64) * np.uint64(self.width)
+        return (probes(hash_keys(keys), self.depth, self.width) + rows).astype(np.intp)
+
+    def add(self, keys: Keys, counts: Optional[np.ndarray] = None):
+        cells = self._cells(keys)
+        counts = np.ones(len(cells), dtype=np.int64) if counts is None else np.asarray(counts, dtype=np.int64)
+        np.add.at(self.table.reshape(-1), cells.ravel(), np.repeat(counts, self.depth))
+        self.total += int(counts.sum())
+
+    def estimate(self, keys: Keys) -> np.ndarray:
+        return self.table.reshape(-1)[self._cells(keys)].min(axis=1)
+
+    def merge(self, other: "CountMinSketch"):
+        self.table += other.table
+        self.total += other.total
+
+    def error_bound(self) -> float:
+        """Overestimate that holds with probability ``1 - exp(-depth)``."""
+        return math.e / self.width * self.total
+
+    @property
+    def nbytes(self) -> int:
+        return self.table.nbytes
+
+
+class SpaceSaving:
+    """The ``capacity`` heaviest keys, with a count and maximum overestimate each.
+
+    A batch is counted exactly and merged in as a second summary: keys
+    already kept add their batch count, new keys start from the smallest
+    kept count, which they may have had before being evicted, and the
+    heaviest ``capacity`` survive. Keys are kept sorted by hash for lookup.
+    """
+
+    __slots__ = ("capacity", "keys", "counts", "errors", "labels", "total")
+
+    def __init__(self, capacity: int = 100):
+        self.capacity = capacity
+        self.keys = np.empty(0, dtype=np.uint64)
+        self.counts = np.empty(0, dtype=np.int64)
+        self.errors = np.empty(0, dtype=np.int64)
+        self.labels: Dict[int, object] = {}
+        self.total = 0
+
+    def add(self, keys: Keys, counts: Optional[np.ndarray] = None):
+        hashes = hash_keys(keys)
+        weights = None if counts is None else np.asarray(counts, dtype=np.int64)
+        batch_keys, batch_counts, first = runs(hashes, weights)
+        self.total += int(batch_counts.sum())
+        floor = int(self.counts.min()) if len(self.keys) >= self.capacity else 0
+
+        position = np.minimum(np.searchsorted(self.keys, batch_keys), max(len(self.keys) - 1, 0))
+        kept = self.keys[position] == batch_keys if len(self.keys) else np.zeros(len(batch_keys), dtype=bool)
+        self.counts[position[kept]] += batch_counts[kept]
+        new = ~kept
+        merged_keys = np.concatenate([self.keys, batch_keys[new]])
+        merged_counts = np.concatenate([self.counts, batch_counts[new] + floor])
+        merged_errors = np.concatenate([self.errors, np.full(int(new.sum()), floor, dtype=np.int64)])
+        if len(merged_keys) > self.capacity:
+            top = np.argpartition(-merged_counts, self.capacity - 1)[:self.capacity]
+            merged_keys, merged_counts, merged_errors = merged_keys[top], merged_counts[top], merged_errors[top]
+        order = np.argsort(merged_keys)
+        self.keys, self.counts, self.errors = merged_keys[order], merged_counts[order], merged_errors[order]
+
+        originals = keys[first[new]].tolist() if isinstance(keys, np.ndarray) else [keys[i] for i in first[new].tolist()]
+        self.labels.update(zip(batch_keys[new].tolist(), originals))
+        if len(self.labels) > len(self.keys):
+            alive = set(self.keys.tolist())
+            self.labels = {key: label for key, label in self.labels.items() if key in alive}
+
+    def top(self, n: Optional[int] = None) -> List[Dict]:
+        """Heaviest keys first, as they were passed to ``add``."""
+        order = np.argsort(-self.counts, kind="stable")[:n]
+        return [{"key": self.labels.get(key, key), "count": count, "error": error}
+                for key, count, error in zip(self.keys[order].tolist(), self.counts[order].tolist(),
+                                             self.errors[order].tolist())]
+
+    def error_bound(self) -> float:
+        return self.total / self.capacity
+
+    @property
+    def nbytes(self) -> int:
+        return self.keys.nbytes + self.counts.nbytes + self.errors.nbytes
+
+
+def zipf_stream(items: int, distinct: int, alpha: float = 1.0, seed: int = 0) -> np.ndarray:
+    """``items`` key ids drawn from ``distinct`` with Zipf popularity."""
+    rng = np.random.default_rng(seed)
+    weights = np.cumsum(np.arange(1, distinct + 1, dtype=np.float64) ** -alpha)
+    ranks = np.minimum(np.searchsorted(weights, rng.random(items) * weights[-1], side="right"), distinct - 1)
+    return rng.permutation(distinct).astype(np.uint64)[ranks]
+
+
+def _timed(operation, keys: np.ndarray) -> float:
+    """Seconds to pass ``keys`` to ``operation`` in batches."""
+    started = time.perf_counter()
+    for start in range(0, len(keys), BATCH):
+        operation(keys[start:start + BATCH])
+    return time.perf_counter() - started
+
+
+def _single(make, operation_name: str, keys: np.ndarray) -> float:
+    """Operations per second calling a fresh structure once per key."""
+    structure = make()
+    operation = getattr(structure, operation_name)
+    keys = keys[:SINGLE_OPS]
+    started = time.perf_counter()
+    for i in range(len(keys)):
+        operation(keys[i:i + 1])
+    return len(keys) / (time.perf_counter() - started)
+
+
+def _set_bytes(keys: np.ndarray) -> int:
+    exact = set(splitmix64(keys).tolist())
+    return sys.getsizeof(exact) + sum(map(sys.getsizeof, exact))
+
+
+def _dict_bytes(keys: np.ndarray, counts: np.ndarray) -> int:
+    exact = dict(zip(splitmix64(keys).tolist(), counts.tolist()))
+    return sys.getsizeof(exact) + sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in exact.items())
+
+
+@lru_cache(maxsize=16)
+def benchmark(items: int = 1_000_000, distinct: int = 100_000, error_rate: float = 0.01, precision: int = 14,
+              top_k: int = 100, structures: tuple = STRUCTURES, alpha: float = 1.0, seed: int = 0) -> Dict:
+    """Throughput, memory and empirical error against theory for each structure
+    over one Zipf stream."""
+    stream = zipf_stream(items, distinct, alpha, seed)
+    counts = np.bincount(stream.astype(np.intp), minlength=distinct)
+    seen = np.flatnonzero(counts).astype(np.uint64)
+    # Ids outside the key space were never inserted
+    absent = np.arange(distinct, 2 * distinct, dtype=np.uint64)
+    set_bytes = _set_bytes(seen)
+    dict_bytes = _dict_bytes(seen, counts[seen.astype(np.intp)])
+
+    results = {}
+    for name in structures:
+        if name in ("bloom", "counting_bloom"):
+            kind = BloomFilter if name == "bloom" else CountingBloomFilter
+
+            def make():
+                return kind(distinct, error_rate)
+        elif name == "hyperloglog":
+            def make():
+                return HyperLogLog(precision)
+        elif name == "count_min":
+            def make():
+                # Width and depth for an error within 0.01% of the stream with 99% probability
+                return CountMinSketch.from_error(1e-4, 0.01)
+        else:
+            def make():
+                return SpaceSaving(top_k)
+
+        structure = make()
+        insert_seconds = _timed(structure.add, stream)
+        result = {
+            "bytes": structure.nbytes,
+            "insert_ops_per_second": round(items / insert_seconds) if insert_seconds else None,
+            "single_insert_ops_per_second": round(_single(make, "add", stream)),
+        }
+        queries = np.concatenate([seen, absent])
+        if name in ("bloom", "counting_bloom"):
+            query_seconds = _timed(structure.contains, queries)
+            false_positive_rate = float(structure.contains(absent).mean())
+            result.update({
+                "exact_bytes": set_bytes,
+                "query_ops_per_second": round(len(queries) / query_seconds) if query_seconds else None,
+                "bits_per_key": round(structure.nbytes * 8 / len(seen), 2),
+                "hashes": structure.hashes,
+                "false_negatives": int((~structure.contains(seen)).sum()),
+                "false_positive_rate": round(false_positive_rate, 5),
+                "expected_false_positive_rate": round(structure.expected_false_positive_rate(len(seen)), 5),
+            })
+            if name == "counting_bloom":
+                removed, remaining = seen[::2], seen[1::2]
+                # Undo every insertion of the removed keys, not just one
+                _timed(structure.remove, np.repeat(removed, counts[removed.astype(np.intp)]))
+                result.update({
+                    "saturated_counters": int((structure.counters == COUNTER_MAX).sum()),
+                    "false_negatives_after_remove": int((~structure.contains(remaining)).sum()),
+                    "false_positive_rate_after_remove": round(float(structure.contains(absent).mean()), 5),
+                    "expected_false_positive_rate_after_remove":
+                        round(structure.expected_false_positive_rate(len(remaining)), 5),
+                })
+        elif name == "hyperloglog":
+            estimate = structure.estimate()
+            result.update({
+                "exact_bytes": set_bytes,
+                "distinct": len(seen),
+                "estimate": round(estimate),
+                "relative_error": round(abs(estimate - len(seen)) / len(seen), 5),
+                "expected_standard_error": round(structure.standard_error(), 5),
+            })
+        elif name == "count_min":
+            query_seconds = _timed(structure.estimate, queries)
+            over = structure.estimate(seen) - counts[seen.astype(np.intp)]
+            bound = structure.error_bound()
+            result.update({
+                "exact_bytes": dict_bytes,
+                "query_ops_per_second": round(len(queries) / query_seconds) if query_seconds else None,
+                "width": structure.width,
+                "depth": structure.depth,
+                "underestimates": int((over < 0).sum()),
+                "mean_overestimate": round(float(over.mean()), 3),
+                "max_overestimate": int(over.max()),
+                "error_bound": round(bound, 1),
+                "within_bound": round(float((over <= bound).mean()), 5),
+                "expected_within_bound": round(1 - math.exp(-structure.depth), 5),
+            })
+        else:
+            reported = structure.top()
+            true_top = np.argsort(-counts, kind="stable")[:top_k]
+            kept = {entry["key"] for entry in reported}
+            over = [entry["count"] - int(counts[entry["key"]]) for entry in reported]
+            heavy = np.flatnonzero(counts > structure.error_bound())
+            result.update({
+                "exact_bytes": dict_bytes,
+                "top_k": top_k,
+                "recall": round(len(kept & set(true_top.tolist())) / top_k, 4),
+                "heavy_hitters": len(heavy),
+                "heavy_hitters_kept": len(kept & set(heavy.tolist())),
+                "max_overestimate": max(over),
+                "error_bound": round(structure.error_bound(), 1),
+                "overestimates_within_error": all(o <= entry["error"] for o, entry in zip(over, reported)),
+            })
+        results[name] = result
+    return {"workload": {"items": items, "distinct": len(seen), "alpha": alpha}, "structures": results}
@@ -0,0 +1,429 @@
+"""
+Rate limiting algorithms, storage backends and a benchmark harness.
+
+Algorithms follow the ``ratelimiter`` blueprint: fixed window, sliding log,
+sliding window counter, token bucket and GCRA (generic cell rate algorithm,
+a token bucket stored as one timestamp). Each is a pure transition
+``decide(state, now, cost) -> (Decision, new_state)``. The state is a small
+tuple (a list of timestamps for the sliding log) and survives a JSON round
+trip, so one algorithm runs unchanged on any store:
+
+- ``MemoryStore``: in-process dict split over striped locks, so threads
+  deciding on different keys rarely contend and never take a global lock.
+  Idle keys are pruned as the store grows.
+- ``SQLiteStore``: shared by every process using the same file, standing in
+  for Redis. Each decision is one ``BEGIN IMMEDIATE`` transaction, the
+  equivalent of a Redis Lua script.
+
+``RateLimiter`` pairs an algorithm with a store. ``get_api_limiter`` returns
+the GCRA limiter that protects this API, configured by ``API_RATE_LIMIT``
+(requests per second per client, 0 to disable) and ``API_RATE_BURST``.
+Lab simulations cost ``LAB_REQUEST_COST`` requests each (``request_cost``),
+so a client gets far fewer of them than cheap lookups.
+
+``benchmark`` reports decisions per second across threads, memory per key,
+and accuracy under bursty traffic against the exact sliding log.
+"""
+
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+STORES = ("memory", "sqlite")
+STRIPES = 64
+# Prune idle keys from a stripe once it holds this many
+PRUNE_THRESHOLD = 4096
+# Keys times limit in the accuracy trace, which has about 1.2 x limit requests per key and window
+ACCURACY_KEY_BUDGET = 2000
+# A lab run burns seconds of CPU, so it costs this many requests of the client's budget
+LAB_PATH_PREFIX = "/api/labs/"
+LAB_REQUEST_COST = 50
+
+
+class Decision:
+    __slots__ = ("allowed", "remaining", "retry_after")
+
+    def __init__(self, allowed: bool, remaining: int, retry_after: float = 0.0):
+        self.allowed = allowed
+        self.remaining = remaining
+        self.retry_after = retry_after
+
+    def to_dict(self) -> Dict:
+        return {"allowed": self.allowed, "remaining": self.remaining, "retry_after": round(self.retry_after, 6)}
+
+
+class FixedWindow:
+    """Count requests per aligned window; allows up to 2x the limit across a boundary."""
+
+    __slots__ = ("limit", "window")
+
+    def __init__(self, limit: int, window: float, burst: Optional[int] = None):
+        self.limit = limit
+        self.window = window
+
+    def decide(self, state, now: float, cost: int = 1):
+        index = int(now // self.window)
+        count = state[1] if state and state[0] == index else 0
+        if count + cost > self.limit:
+            return Decision(False, self.limit - count, (index + 1) * self.window - now), (index, count)
+        return Decision(True, self.limit - count - cost), (index, count + cost)
+
+    def idle(self, state, now: float) -> bool:
+        return int(now // self.window) != state[0]
+
+
+class SlidingLog:
+    """Keep every accepted timestamp of the last window; exact, but memory grows with the limit."""
+
+    __slots__ = ("limit", "window")
+
+    def __init__(self, limit: int, window: float, burst: Optional[int] = None):
+        self.limit = limit
+        self.window = window
+
+    def decide(self, state, now: float, cost: int = 1):
+        # A request costing more than the whole limit waits for an empty window
+        cost = min(cost, self.limit)
+        log = state if state is not None else []
+        cutoff = now - self.window
+        start = bisect_right(log, cutoff)
+        if start:
+            del log[:start]
+        if len(log) + cost > self.limit:
+            return Decision(False, self.limit - len(log), log[len(log) + cost - self.limit - 1] - cutoff), log
+        log.extend([now] * cost)
+        return Decision(True, self.limit - len(log)), log
+
+    def idle(self, state, now: float) -> bool:
+        return not state or state[-1] <= now - self.window
+
+
+class SlidingWindowCounter:
+    """Weight the previous window's count by how much of it still overlaps the sliding window."""
+
+    __slots__ = ("limit", "window")
+
+    def __init__(self, limit: int, window: float, burst: Optional[int] = None):
+        self.limit = limit
+        self.window = window
+
+    def decide(self, state, now: float, cost: int = 1):
+        index = int(now // self.window)
+        current = previous = 0
+        if state:
+            if state[0] == index:
+                current, previous = state[1], state[2]
+            elif state[0] == index - 1:
+                previous = state[1]
+        overlap = 1 - (now - index * self.window) / self.window
+        estimated = previous * overlap + current
+        if estimated + cost > self.limit:
+            # Wait for the previous window's weight to decay, or for the next window
+            excess = estimated + cost - self.limit
+            if previous and excess <= previous * overlap:
+                retry_after = excess * self.window / previous
+            else:
+                retry_after = (index + 1) * self.window - now
+            return Decision(False, max(0, int(self.limit - estimated)), retry_after), (index, current, previous)
+        return Decision(True, int(self.limit - estimated - cost)), (index, current + cost, previous)
+
+    def idle(self, state, now: float) -> bool:
+        return int(now // self.window) > state[0] + 1
+
+
+class TokenBucket:
+    """Refill ``limit`` tokens per window up to ``burst``; each request spends ``cost`` tokens."""
+
+    __slots__ = ("limit", "window", "burst", "rate")
+
+    def __init__(self, limit: int, window: float, burst: Optional[int] = None):
+        self.limit = limit
+        self.window = window
+        self.burst = burst or limit
+        self.rate = limit / window
+
+    def decide(self, state, now: float, cost: int = 1):
+        if state:
+            tokens = min(self.burst, state[0] + (now - state[1]) * self.rate)
+        else:
+            tokens = float(self.burst)
+        if tokens < cost:
+            return Decision(False, int(tokens), (cost - tokens) / self.rate), (tokens, now)
+        return Decision(True, int(tokens - cost)), (tokens - cost, now)
+
+    def idle(self, state, now: float) -> bool:
+        return state[0] + (now - state[1]) * self.rate >= self.burst
+
+
+class GCRA:
+    """Token bucket as a theoretical arrival time: one float per key, no refill arithmetic."""
+
+    __slots__ = ("limit", "window", "burst", "interval", "tolerance")
+
+    def __init__(self, limit: int, window: float, burst: Optional[int] = None):
+        self.limit = limit
+        self.window = window
+        self.burst = burst or limit
+        self.interval = window / limit
+        self.tolerance = self.interval * (self.burst - 1)
+
+    def decide(self, state, now: float, cost: int = 1):
+        tat = state if state is not None and state > now else now
+        new_tat = tat + self.interval * (cost - 1)
+        if new_tat - now > self.tolerance:
+            return Decision(False, 0, new_tat - now - self.tolerance), state
+        remaining = int((self.tolerance - (new_tat - now)) / self.interval)
+        return Decision(True, remaining), new_tat + self.interval
+
+    def idle(self, state, now: float) -> bool:
+        return state <= now
+
+
+ALGORITHMS = {
+    "fixed_window": FixedWindow,
+    "sliding_log": SlidingLog,
+    "sliding_window_counter": SlidingWindowCounter,
+    "token_bucket": TokenBucket,
+    "gcra": GCRA,
+}
+
+
+def _deep_size(value: Any) -> int:
+    size = sys.getsizeof(value)
+    if isinstance(value, (list, tuple)):
+        size += sum(sys.getsizeof(item) for item in value)
+    return size
+
+
+class MemoryStore:
+    """Per-key state in ``STRIPES`` dicts, each guarded by its own lock."""
+
+    def __init__(self, stripes: int = STRIPES):
+        self.stripes = stripes
+        self.locks = [threading.Lock() for _ in range(stripes)]
+        self.shards: List[Dict[str, Any]] = [{} for _ in range(stripes)]
+
+    def update(self, key: str, decide: Callable, idle: Callable, now: float):
+        stripe = hash(key) % self.stripes
+        shard = self.shards[stripe]
+        with self.locks[stripe]:
+            result, state = decide(shard.get(key), now)
+            shard[key] = state
+            if len(shard) > PRUNE_THRESHOLD:
+                for stale in [k for k, s in shard.items() if idle(s, now)]:
+                    del shard[stale]
+        return result
+
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self.shards)
+
+    def memory_per_key(self) -> float:
+        """Bytes per key: key string, state objects and the dict slot."""
+        keys = len(self)
+        if not keys:
+            return 0.0
+        total = sum(sys.getsizeof(shard) for shard in self.shards)
+        for shard in self.shards:
+            for key, state in shard.items():
+                total += sys.getsizeof(key) + _deep_size(state)
+        return total / keys
+
+
+class SQLiteStore:
+    """Per-key JSON state in an SQLite table; one connection per thread."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.local = threading.local()
+        with sqlite3.connect(path) as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("CREATE TABLE IF NOT EXISTS rate_limits (key TEXT PRIMARY KEY, state TEXT NOT NULL)")
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self.local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, isolation_level=None, timeout=30)
+            connection.execute("PRAGMA synchronous=OFF")
+            self.local.connection = connection
+        return connection
+
+    def update(self, key: str, decide: Callable, idle: Callable, now: float):
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = connection.execute("SELECT state FROM rate_limits WHERE key = ?", (key,)).fetchone()
+            result, state = decide(json.loads(row[0]) if row else None, now)
+            connection.execute(
+                "INSERT INTO rate_limits (key, state) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET state = excluded.state",
+                (key, json.dumps(state)),
+            )
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        return result
+
+    def __len__(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM rate_limits").fetchone()[0]
+
+    def memory_per_key(self) -> float:
+        """Bytes per key in the database file."""
+        connection = self._connection()
+        pages = connection.execute("PRAGMA page_count").fetchone()[0]
+        page_size = connection.execute("PRAGMA page_size").fetchone()[0]
+        keys = len(self)
+        return pages * page_size / keys if keys else 0.0
+
+
+class RateLimiter:
+    def __init__(self, algorithm, store, clock: Callable[[], float] = time.time):
+        self.algorithm = algorithm
+        self.store = store
+        self.clock = clock
+
+    def allow(self, key: str, cost: int = 1, now: Optional[float] = None) -> Decision:
+        now = self.clock() if now is None else now
+        decide = self.algorithm.decide
+        return self.store.update(key, lambda state, at: decide(state, at, cost), self.algorithm.idle, now)
+
+
+_api_limiter: Optional[RateLimiter] = None
+_api_limiter_configured = False
+_api_limiter_lock = threading.Lock()
+
+
+def get_api_limiter() -> Optional[RateLimiter]:
+    """GCRA limiter for this API's clients, or None when ``API_RATE_LIMIT`` is 0.
+
+    Raises ValueError when ``API_RATE_BURST`` is below ``LAB_REQUEST_COST``.
+    """
+    global _api_limiter, _api_limiter_configured
+    if not _api_limiter_configured:
+        with _api_limiter_lock:
+            if not _api_limiter_configured:
+                rate = float(os.environ.get("API_RATE_LIMIT", "100"))
+                burst = int(os.environ.get("API_RATE_BURST", "1000"))
+                if rate > 0 and burst < LAB_REQUEST_COST:
+                    # Otherwise no lab request could ever be allowed
+                    raise ValueError(f"API_RATE_BURST must be at least {LAB_REQUEST_COST}, the cost of a lab request")
+                if rate > 0:
+                    # GCRA only needs the interval between requests: one per 1 / rate seconds
+                    _api_limiter = RateLimiter(GCRA(1, 1 / rate, burst), MemoryStore(), time.monotonic)
+                _api_limiter_configured = True
+    return _api_limiter
+
+
+def request_cost(path: str) -> int:
+    """How many requests of the API limit a request to ``path`` uses."""
+    return LAB_REQUEST_COST if path.startswith(LAB_PATH_PREFIX) else 1
+
+
+def bursty_trace(keys: int, limit: int, window: float, duration: float, seed: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+    """``(times, key ids)`` of on/off traffic: each key alternates between
+    slots at 4x its limit and slots at a tenth of it, averaging about 1.2x."""
+    rng = np.random.default_rng(seed)
+    slot = window / 10
+    slots = int(np.ceil(duration / slot))
+    on = rng.random((keys, slots)) < 0.3
+    rate = np.where(on, 4.0, 0.1) * limit / window
+    counts = rng.poisson(rate * slot)
+    key_ids = np.repeat(np.arange(keys), counts.sum(axis=1))
+    slot_ids = np.concatenate([np.repeat(np.arange(slots), row) for row in counts]) if keys else np.array([], dtype=int)
+    times = (slot_ids + rng.random(len(slot_ids))) * slot
+    order = np.argsort(times, kind="stable")
+    return times[order], key_ids[order]
+
+
+def _max_window_count(times: np.ndarray, window: float) -> int:
+    """Most events in any half-open interval of length ``window``."""
+    if len(times) == 0:
+        return 0
+    return int(np.max(np.searchsorted(times, times + window, side="left") - np.arange(len(times))))
+
+
+@lru_cache(maxsize=64)
+def accuracy(name: str, limit: int, window: float, windows: int = 60, seed: int = 0) -> Dict:
+    """Decisions on ``windows`` windows of bursty traffic compared with the exact sliding log."""
+    # About 150K requests whatever the limit
+    keys = max(1, ACCURACY_KEY_BUDGET // limit)
+    times, key_ids = bursty_trace(keys, limit, window, windows * window, seed)
+    names = [f"k{k}" for k in key_ids.tolist()]
+    limiter = RateLimiter(ALGORITHMS[name](limit, window), MemoryStore())
+    reference = RateLimiter(SlidingLog(limit, window), MemoryStore())
+    allowed = np.array([limiter.allow(k, now=t).allowed for k, t in zip(names, times.tolist())], dtype=bool)
+    exact = np.array([reference.allow(k, now=t).allowed for k, t in zip(names, times.tolist())], dtype=bool)
+
+    overshoot = max(
+        (_max_window_count(times[allowed & (key_ids == k)], window) for k in range(keys)),
+        default=0,
+    )
+    return {
+        "requests": len(times),
+        "allowed_share": round(float(allowed.mean()), 4) if len(times) else 0.0,
+        "exact_allowed_share": round(float(exact.mean()), 4) if len(times) else 0.0,
+        "agreement": round(float((allowed == exact).mean()), 4) if len(times) else 1.0,
+        "false_allows": int((allowed & ~exact).sum()),
+        "false_denies": int((~allowed & exact).sum()),
+        # Most requests let through in any sliding window, as a multiple of the limit
+        "peak_window_load": round(overshoot / limit, 4),
+    }
+
+
+def throughput(name: str, store: str = "memory", threads: int = 4, decisions: int = 100_000, keys: int = 1000,
+               limit: int = 100, window: float = 1.0, path: Optional[str] = None) -> Dict:
+    """Decisions per second with ``threads`` threads deciding on random keys."""
+    backend = MemoryStore() if store == "memory" else SQLiteStore(path)
+    limiter = RateLimiter(ALGORITHMS[name](limit, window), backend)
+    # Zipf-skewed keys, so the hottest clients run into their limits
+    key_names = [f"user:{k}" for k in (np.random.default_rng(0).zipf(1.2, decisions) % keys).tolist()]
+    per_thread = max(1, decisions // threads)
+
+    def work(start: int) -> int:
+        allow = limiter.allow
+        allowed = 0
+        for key in key_names[start:start + per_thread]:
+            allowed += allow(key).allowed
+        return allowed
+
+    began = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        allowed = sum(pool.map(work, range(0, per_thread * threads, per_thread)))
+    elapsed = time.perf_counter() - began
+    total = per_thread * threads
+    return {
+        "store": store,
+        "threads": threads,
+        "decisions": total,
+        "decisions_per_second": round(total / elapsed, 1),
+        "allowed_share": round(allowed / total, 4),
+        "keys": len(backend),
+        "memory_per_key_bytes": round(backend.memory_per_key(), 1),
+    }
+
+
+def benchmark(store: str = "memory", threads: int = 4, decisions: int = 20_000, keys: int = 1000,
+              limit: int = 100, window: float = 1.0) -> Dict:
+    """Throughput, memory per key and bursty-traffic accuracy for every algorithm.
+
+    SQLite runs use a fresh database file per algorithm in a temporary directory.
+    """
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for name in ALGORITHMS:
+            path = os.path.join(directory, f"{name}.db") if store == "sqlite" else None
+            results[name] = {
+                **throughput(name, store, threads, decisions, keys, limit, window, path),
+                "accuracy": accuracy(name, limit, window),
+            }
+    return results
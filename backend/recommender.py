@@ -0,0 +1,254 @@
+"""
+Constraint-driven tool recommender.
+
+Turns the "which database would you choose" reasoning from the technology
+quiz into a scoring engine. At startup every tool is converted into a
+numeric feature vector:
+
+- data shape, from its category ("NoSQL (Document)" -> document)
+- CAP leaning and consistency model, from "CP"/"AP", "strong"/"ACID",
+  "eventual" and "tunable" in its descriptive text
+- latency class, from phrases like "sub-ms", "single-digit ms",
+  "tens of ms" and "seconds"
+- read-heavy / write-heavy fit, from phrases like "read replicas",
+  "caching", "write scale" and "ingestion"
+
+The importer stores each spreadsheet column one field to the right of its
+name (``best_for`` holds the "avoid when" text, ``avoid_when`` the CAP note,
+``official_docs_url`` the scaling pattern), so fields are mapped by what
+they actually hold. Features are read from the descriptive fields together;
+the "avoid when" text describes where a tool is a poor fit, so a phrase
+found only there counts against the tool instead of for it.
+
+A set of requirements becomes a weight vector over the same features, and
+scoring is a single matrix-vector product over the whole catalog (or a
+matrix-matrix product for a batch of requirement sets). Tools that score
+zero or less are not recommended.
+"""
+
+import math
+import re
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from database import SessionLocal
+from models import Tool
+
+DATA_SHAPES = (
+    "relational", "key_value", "document", "wide_column", "graph", "time_series",
+    "blob", "search", "analytics", "stream", "queue",
+)
+
+LATENCY_CLASSES = ("sub_ms", "single_ms", "tens_ms", "seconds")
+# Typical upper bound of each latency class, in milliseconds
+LATENCY_UPPER_MS = np.array([1.0, 10.0, 100.0, 5000.0])
+
+FEATURES = (
+    [f"shape_{shape}" for shape in DATA_SHAPES]
+    + ["cap_cp", "cap_ap", "consistency_strong", "consistency_eventual"]
+    + [f"latency_{c}" for c in LATENCY_CLASSES]
+    + ["read_heavy", "write_heavy"]
+)
+FEATURE_INDEX = {name: i for i, name in enumerate(FEATURES)}
+
+CATEGORY_SHAPES: Dict[str, Dict[str, float]] = {
+    "Relational DB": {"relational": 1.0},
+    "NoSQL (Key-Value)": {"key_value": 1.0, "document": 0.5},
+    "NoSQL (Document)": {"document": 1.0, "key_value": 0.3},
+    "NoSQL (Wide-column)": {"wide_column": 1.0, "time_series": 0.5, "key_value": 0.3},
+    "Graph DB": {"graph": 1.0},
+    "Time Series DB": {"time_series": 1.0},
+    "Cache / In-memory": {"key_value": 0.5},
+    "Object Storage": {"blob": 1.0},
+    "File Storage": {"blob": 0.5},
+    "Block Storage": {"blob": 0.3},
+    "Search": {"search": 1.0},
+    "Data Warehouse": {"analytics": 1.0},
+    "Query-in-place / Lake": {"analytics": 0.8},
+    "Streaming": {"stream": 1.0},
+    "Stream Processing": {"stream": 0.8},
+    "Queue": {"queue": 1.0},
+    "Messaging": {"queue": 0.8},
+    "Pub/Sub": {"queue": 0.6},
+    "Event Bus": {"queue": 0.5},
+}
+
+DEFAULT_WEIGHTS = {
+    "data_shape": 3.0,
+    "consistency": 2.0,
+    "cap": 1.5,
+    "latency": 2.0,
+    "read_write": 1.0,
+}
+
+# Tool columns by what the importer actually stores in them
+TEXT_FIELDS = (
+    "consistency_model",   # one-line summary
+    "interview_oneliner",  # best used for
+    "avoid_when",          # CAP leaning
+    "tradeoffs",           # consistency model
+    "scaling_pattern",     # latency
+    "official_docs_url",   # scaling pattern
+    "deep_dive_url_1",     # key tradeoffs
+)
+AVOID_FIELD = "best_for"   # avoid when
+# Weight of a phrase that only appears in the avoid-when text
+AVOID_EVIDENCE = -0.5
+
+_CP_RE = re.compile(r"\bCP(-ish)?\b")
+_AP_RE = re.compile(r"\bAP(-ish)?\b")
+_TUNABLE_RE = re.compile(r"\btunable\b", re.IGNORECASE)
+_STRONG_RE = re.compile(r"\b(strong(ly)? consisten\w*|strong \(|strong on\b|ACID|linearizab\w*)", re.IGNORECASE)
+_EVENTUAL_RE = re.compile(r"\beventual(ly)?\b", re.IGNORECASE)
+_LATENCY_RES = {
+    "sub_ms": re.compile(r"\bsub-ms\b|\bmicrosecond|\bμs\b", re.IGNORECASE),
+    "single_ms": re.compile(r"single-digit|\blow ms\b|(?<!tens of )(?<!tens )\bms\b|milliseconds", re.IGNORECASE),
+    "tens_ms": re.compile(r"\btens (of )?ms\b", re.IGNORECASE),
+    "seconds": re.compile(r"\bseconds\b|\bminutes\b", re.IGNORECASE),
+}
+_READ_HEAVY_RE = re.compile(r"read replicas|\bcach(e|ing)\b|read-heavy|\breads\b|edge cached", re.IGNORECASE)
+_WRITE_HEAVY_RE = re.compile(r"write-heavy|write scale|\bingestion\b|high write|\bappend|event streaming", re.IGNORECASE)
+
+
+def tool_text(tool: Tool) -> str:
+    return " ".join(v for v in (getattr(tool, f) for f in TEXT_FIELDS) if v)
+
+
+def text_features(text: str) -> np.ndarray:
+    """CAP, consistency, latency and read/write features found in ``text``."""
+    vector = np.zeros(len(FEATURES), dtype=np.float32)
+
+    cp, ap = _CP_RE.search(text), _AP_RE.search(text)
+    if cp:
+        vector[FEATURE_INDEX["cap_cp"]] = 0.7 if cp.group(1) else 1.0
+    if ap:
+        vector[FEATURE_INDEX["cap_ap"]] = 0.7 if ap.group(1) else 1.0
+    if _TUNABLE_RE.search(text):
+        vector[FEATURE_INDEX["cap_cp"]] = max(vector[FEATURE_INDEX["cap_cp"]], 0.5)
+        vector[FEATURE_INDEX["cap_ap"]] = max(vector[FEATURE_INDEX["cap_ap"]], 0.5)
+
+    if _STRONG_RE.search(text):
+        vector[FEATURE_INDEX["consistency_strong"]] = 1.0
+    if _EVENTUAL_RE.search(text):
+        vector[FEATURE_INDEX["consistency_eventual"]] = 1.0
+
+    latency = np.array([1.0 if _LATENCY_RES[c].search(text) else 0.0 for c in LATENCY_CLASSES])
+    if latency.any():
+        for i, c in enumerate(LATENCY_CLASSES):
+            vector[FEATURE_INDEX[f"latency_{c}"]] = latency[i] / latency.sum()
+
+    if _READ_HEAVY_RE.search(text):
+        vector[FEATURE_INDEX["read_heavy"]] = 1.0
+    if _WRITE_HEAVY_RE.search(text):
+        vector[FEATURE_INDEX["write_heavy"]] = 1.0
+
+    return vector
+
+
+_AVOIDABLE = np.array([name in ("cap_cp", "cap_ap", "consistency_strong", "consistency_eventual",
+                                "read_heavy", "write_heavy") for name in FEATURES])
+
+
+def tool_features(tool: Tool) -> np.ndarray:
+    vector = text_features(tool_text(tool))
+    avoid = text_features(getattr(tool, AVOID_FIELD) or "")
+    # "Avoid when you need strong consistency" is evidence against, not for
+    against = _AVOIDABLE & (avoid > 0) & (vector == 0)
+    vector[against] = AVOID_EVIDENCE
+
+    for shape, weight in CATEGORY_SHAPES.get(tool.category, {}).items():
+        vector[FEATURE_INDEX[f"shape_{shape}"]] = weight
+
+    return vector
+
+
+def requirement_weights(
+    read_write_ratio: Optional[float] = None,
+    consistency: Optional[str] = None,
+    cap_preference: Optional[str] = None,
+    latency_target_ms: Optional[float] = None,
+    data_shape: Optional[str] = None,
+    weights: Optional[Dict[str, float]] = None,
+) -> np.ndarray:
+    """Translate a set of requirements into a weight vector over ``FEATURES``."""
+    weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+    w = np.zeros(len(FEATURES), dtype=np.float32)
+
+    if data_shape:
+        w[FEATURE_INDEX[f"shape_{data_shape}"]] = weights["data_shape"]
+
+    if consistency == "strong":
+        w[FEATURE_INDEX["consistency_strong"]] = weights["consistency"]
+    elif consistency == "eventual":
+        w[FEATURE_INDEX["consistency_eventual"]] = weights["consistency"]
+
+    if cap_preference == "CP":
+        w[FEATURE_INDEX["cap_cp"]] = weights["cap"]
+        w[FEATURE_INDEX["cap_ap"]] = -0.5 * weights["cap"]
+    elif cap_preference == "AP":
+        w[FEATURE_INDEX["cap_ap"]] = weights["cap"]
+        w[FEATURE_INDEX["cap_cp"]] = -0.5 * weights["cap"]
+
+    if latency_target_ms:
+        # +1 for classes comfortably under the target, fading to -1 for
+        # classes an order of magnitude or more over it
+        fit = np.clip(np.log10(latency_target_ms / LATENCY_UPPER_MS) + 1.0, -1.0, 1.0)
+        for i, c in enumerate(LATENCY_CLASSES):
+            w[FEATURE_INDEX[f"latency_{c}"]] = weights["latency"] * fit[i]
+
+    if read_write_ratio:
+        # 1000:1 reads is fully read-heavy, 1:1000 fully write-heavy
+        lean = max(-1.0, min(1.0, math.log10(read_write_ratio) / 3.0))
+        w[FEATURE_INDEX["read_heavy"]] = weights["read_write"] * lean
+        w[FEATURE_INDEX["write_heavy"]] = -weights["read_write"] * lean
+
+    return w
+
+
+class Recommender:
+    def __init__(self, tools: List[Tool]):
+        self.tool_ids = np.array([t.id for t in tools], dtype=np.int64)
+        self.aws_only = np.array([bool(t.aws_only) for t in tools])
+        self.matrix = np.vstack([tool_features(t) for t in tools]) if tools else np.zeros((0, len(FEATURES)), dtype=np.float32)
+
+    def score(self, weights: np.ndarray) -> np.ndarray:
+        return self.matrix @ weights
+
+    def score_batch(self, weights: np.ndarray) -> np.ndarray:
+        """Score many requirement sets at once: ``(n_tools, n_requirements)``."""
+        return self.matrix @ weights.T
+
+    def recommend(self, weights: np.ndarray, aws_only: Optional[bool] = None, limit: int = 10) -> List[Dict]:
+        scores = self.score(weights)
+        candidates = np.arange(len(scores))
+        if aws_only is not None:
+            candidates = candidates[self.aws_only == aws_only]
+        candidates = candidates[scores[candidates] > 0]
+        order = candidates[np.lexsort((self.tool_ids[candidates], -scores[candidates]))][:limit]
+
+        results = []
+        for i in order:
+            contributions = self.matrix[i] * weights
+            matched = [FEATURES[j] for j in np.flatnonzero(contributions > 0)]
+            results.append({"tool_id": int(self.tool_ids[i]), "score": round(float(scores[i]), 4), "matched": matched})
+        return results
+
+
+_recommender: Optional[Recommender] = None
+_recommender_lock = threading.Lock()
+
+
+def get_recommender() -> Recommender:
+    """Return the process-wide recommender, building it from the database on first use."""
+    global _recommender
+    if _recommender is None:
+        with _recommender_lock:
+            if _recommender is None:
+                db = SessionLocal()
+                try:
+                    _recommender = Recommender(db.query(Tool).order_by(Tool.id).all())
+                finally:
+                    db.close()
+    return _recommender
@@ -0,0 +1,277 @@
+"""
+Requirement classifier for scenario blueprints.
+
+Every functional and non-functional requirement is tagged with the system
+properties it asks for (strong-consistency, low-latency, high-write,
+blob-heavy, ...). Tagging runs a single Aho–Corasick automaton built from
+``TAG_KEYWORDS``, so each requirement is scanned once no matter how many
+keywords there are.
+
+A keyword ending in ``*`` matches as a word prefix ("transcod*" matches
+"transcoded"); all other keywords must match whole words. When one match
+lies inside a longer one, only the longer one counts, so "availability over
+strict consistency" is read as a preference for availability rather than a
+request for strict consistency.
+
+Tags map to candidate tools through ``TAG_TOOLS``. Requirement tags, key
+constraints and matched tools for every blueprint are computed once and
+served from memory.
+"""
+
+import threading
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+from aliases import AliasMap, get_alias_map
+from database import SessionLocal
+from models import Tool
+from scenario_data import SCENARIO_BLUEPRINTS
+
+TAG_KEYWORDS: Dict[str, Tuple[str, ...]] = {
+    "strong-consistency": (
+        "strong consistency", "strongly consistent", "prioritize consistency", "cp in cap",
+        "acid", "financial transaction*", "double booking", "assigned multiple",
+    ),
+    "eventual-consistency": (
+        "eventual consistency", "eventually consistent", "availability over consistency",
+        "availability over strict consistency", "availability > consistency", "ap in cap",
+    ),
+    "exactly-once": (
+        "exactly once", "exactly-once", "idempoten*", "no duplicates", "double charge*",
+    ),
+    "high-availability": (
+        "high availability", "highly available", "available 99*", "99.9*", "uptime",
+        "downtime", "always be available", "network partition*", "graceful degradation",
+    ),
+    "low-latency": (
+        "latency", "low-latency", "minimal delay", "sub-second", "as fast as possible",
+        "start within", "within seconds",
+    ),
+    "real-time": (
+        "real time", "real-time", "presence", "typing indicator*", "websocket*",
+        "push notification*", "read receipts", "auto-refreshing", "live",
+    ),
+    "high-write": (
+        "ingest*", "events per second", "uploaded per minute", "messages per day",
+        "write-heavy", "index new",
+    ),
+    "high-read": (
+        "read-heavy", "read-to-write", "reads per", "watched per day", "redirect*",
+        "millions of viewers", "millions of followers",
+    ),
+    "high-throughput": (
+        "high throughput", "high-volume", "requests per second", "peak hours", "concurrent",
+    ),
+    "contention": (
+        "high-contention", "contention", "competing for", "double booking", "reserve*",
+        "assigned multiple",
+    ),
+    "blob-heavy": (
+        "upload*", "download*", "video*", "image*", "photo*", "media", "file*",
+        "attachment*",
+    ),
+    "archival": (
+        "retention", "petabyte*", "historical data", "cost-efficient storage", "export",
+    ),
+    "search": (
+        "search*", "full-text", "autocomplete", "typeahead", "fuzzy", "faceted", "keywords",
+    ),
+    "geospatial": ("location", "nearby", "proximity", "geospatial", "pickup"),
+    "analytics": (
+        "analytic*", "dashboard*", "aggregation*", "metrics", "funnel", "percentiles",
+        "view count",
+    ),
+    "async-processing": (
+        "transcod*", "webhook*", "notification*", "push notification*", "fire and forget",
+        "queue messages", "offline message delivery", "asynchronous", "background",
+    ),
+    "durability": (
+        "no data loss", "never lose", "recover files", "reliable", "at-least-once",
+        "at least once", "audit trail", "persist*",
+    ),
+    "security": (
+        "pci*", "encrypt*", "bcrypt", "password*", "brute force", "secure", "rbac",
+        "permission*", "oauth", "token*", "compliance",
+    ),
+    "rate-limiting": ("rate limit*", "brute force", "429", "whitelist*", "abuse"),
+    "ordering": ("ordering", "ordered", "in order"),
+    "multi-region": ("global*", "multi-region", "worldwide", "anywhere", "any device"),
+    "ttl": ("expiration", "expire*", "times out", "release reserved"),
+    "fan-out": (
+        "follow*", "followers", "group chats", "group conversations", "celebrity", "home feed",
+        "share",
+    ),
+    "uniqueness": ("uniqueness", "custom alias", "maps to exactly one"),
+}
+
+# Candidate tools per tag, as catalog names or aliases
+TAG_TOOLS: Dict[str, Tuple[str, ...]] = {
+    "strong-consistency": ("postgres", "aurora", "dynamodb"),
+    "eventual-consistency": ("dynamodb", "cassandra", "dynamodb global tables"),
+    "exactly-once": ("sqs fifo", "dynamodb", "step functions"),
+    "high-availability": ("dynamodb global tables", "aurora global database", "route 53", "alb"),
+    "low-latency": ("redis", "dynamodb", "cloudfront", "global accelerator"),
+    "real-time": ("api gateway", "appsync", "redis", "sns"),
+    "high-write": ("kinesis data streams", "kafka", "dynamodb", "cassandra"),
+    "high-read": ("redis", "cloudfront", "dynamodb"),
+    "high-throughput": ("alb", "nlb", "sqs standard", "kinesis data streams"),
+    "contention": ("dynamodb", "redis", "postgres"),
+    "blob-heavy": ("s3", "cloudfront"),
+    "archival": ("s3", "athena", "redshift", "firehose"),
+    "search": ("opensearch service",),
+    "geospatial": ("redis", "opensearch service"),
+    "analytics": ("redshift", "athena", "flink", "timestream"),
+    "async-processing": ("sqs standard", "sns", "lambda", "step functions", "eventbridge"),
+    "durability": ("s3", "dynamodb", "aurora"),
+    "security": ("iam", "kms", "secrets manager", "waf"),
+    "rate-limiting": ("redis", "api gateway", "waf"),
+    "ordering": ("sqs fifo", "kinesis data streams", "kafka"),
+    "multi-region": ("dynamodb global tables", "aurora global database", "route 53", "cloudfront", "global accelerator"),
+    "ttl": ("redis", "dynamodb"),
+    "fan-out": ("sns", "redis", "kinesis data streams"),
+    "uniqueness": ("dynamodb", "postgres"),
+}
+
+# Tags surfaced as "key constraints" in test mode
+CONSTRAINT_TAGS = ("strong-consistency", "eventual-consistency", "exactly-once", "high-availability", "low-latency")
+
+REQUIREMENT_KINDS = ("functional", "non_functional")
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+class KeywordAutomaton:
+    """Aho–Corasick automaton mapping keywords to tags."""
+
+    def __init__(self, keywords: Dict[str, Tuple[str, ...]]):
+        # keyword -> (tags, prefix match allowed)
+        entries: Dict[str, Tuple[List[str], bool]] = {}
+        for tag, words in keywords.items():
+            for word in words:
+                prefix = word.endswith("*")
+                word = word.rstrip("*").lower()
+                tags, prefix_ok = entries.get(word, ([], True))
+                tags.append(tag)
+                entries[word] = (tags, prefix_ok and prefix)
+
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.output: List[List[Tuple[int, Tuple[str, ...], bool]]] = [[]]
+
+        for word, (tags, prefix_ok) in entries.items():
+            state = 0
+            for ch in word:
+                if ch not in self.goto[state]:
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append([])
+                    self.goto[state][ch] = len(self.goto) - 1
+                state = self.goto[state][ch]
+            self.output[state].append((len(word), tuple(dict.fromkeys(tags)), prefix_ok))
+
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, child in self.goto[state].items():
+                queue.append(child)
+                fallback = self.fail[state]
+                while fallback and ch not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(ch, 0)
+                self.fail[child] = target if target != child else 0
+                self.output[child] = self.output[child] + self.output[self.fail[child]]
+
+    def matches(self, text: str) -> List[Tuple[int, int, Tuple[str, ...]]]:
+        """Whole-word keyword matches as ``(start, end, tags)``, longest matches only."""
+        text = text.lower()
+        found = []
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(ch, 0)
+            for length, tags, prefix_ok in self.output[state]:
+                start, end = i + 1 - length, i + 1
+                if start > 0 and _is_word_char(text[start - 1]) and _is_word_char(text[start]):
+                    continue
+                if not prefix_ok and end < len(text) and _is_word_char(text[end]) and _is_word_char(text[end - 1]):
+                    continue
+                found.append((start, end, tags))
+
+        return [
+            m for m in found
+            if not any(o is not m and o[0] <= m[0] and m[1] <= o[1] and (o[1] - o[0]) > (m[1] - m[0]) for o in found)
+        ]
+
+    def tags(self, text: str) -> List[str]:
+        """Tags for ``text`` in order of first match."""
+        return list(dict.fromkeys(tag for _, _, tags in self.matches(text) for tag in tags))
+
+
+def analyze_blueprint(blueprint: Dict, automaton: KeywordAutomaton, tag_tools: Dict[str, List[str]],
+                      tool_ids: Dict[str, int], alias_map: AliasMap) -> Dict:
+    requirements = []
+    tag_counts: Dict[str, int] = {}
+    for kind in REQUIREMENT_KINDS:
+        for text in blueprint["requirements"].get(kind, []):
+            tags = automaton.tags(text)
+            requirements.append({"text": text, "kind": kind, "tags": tags})
+            for tag in tags:
+                tag_counts[tag] = tag_counts.get(tag, 0) + 1
+
+    key_constraints = [
+        r["text"] for r in requirements
+        if r["kind"] == "non_functional" and any(t in CONSTRAINT_TAGS for t in r["tags"])
+    ]
+
+    # A tool scores one point per requirement carrying a tag it covers
+    candidates: Dict[str, Dict] = {}
+    for tag, count in tag_counts.items():
+        for name in tag_tools.get(tag, []):
+            entry = candidates.setdefault(name, {"name": name, "tool_id": tool_ids.get(name), "tags": [], "score": 0})
+            entry["tags"].append(tag)
+            entry["score"] += count
+
+    blueprint_tools = set(alias_map.resolve_names(blueprint["tools"]))
+    matched_tools = sorted(candidates.values(), key=lambda c: (-c["score"], c["tool_id"] or 0))
+    for entry in matched_tools:
+        entry["tags"].sort()
+        entry["in_blueprint"] = entry["name"] in blueprint_tools
+
+    return {
+        "requirements": requirements,
+        "tags": sorted(tag_counts),
+        "key_constraints": key_constraints,
+        "matched_tools": matched_tools,
+    }
+
+
+def build_requirement_analysis(tools: List[Tool], alias_map: AliasMap) -> Dict[str, Dict]:
+    automaton = KeywordAutomaton(TAG_KEYWORDS)
+    tag_tools = {tag: alias_map.resolve_names(names) for tag, names in TAG_TOOLS.items()}
+    tool_ids = {tool.name: tool.id for tool in tools}
+    return {
+        key: analyze_blueprint(blueprint, automaton, tag_tools, tool_ids, alias_map)
+        for key, blueprint in SCENARIO_BLUEPRINTS.items()
+    }
+
+
+_analysis: Optional[Dict[str, Dict]] = None
+_analysis_lock = threading.Lock()
+
+
+def get_requirement_analysis() -> Dict[str, Dict]:
+    """Return tags and matched tools for every blueprint, computing them on first use."""
+    global _analysis
+    if _analysis is None:
+        with _analysis_lock:
+            if _analysis is None:
+                db = SessionLocal()
+                try:
+                    tools = db.query(Tool).order_by(Tool.id).all()
+                finally:
+                    db.close()
+                _analysis = build_requirement_analysis(tools, get_alias_map())
+    return _analysis
@@ -148,6 +148,15 @@ SCENARIO_BLUEPRINTS = {
                 "Daily reconciliation job compares our records against Card Processor settlement reports"
             ]
         },
+        "scale": {
+            "dau": 10_000_000,
+            "reads_per_user": 5,
+            "writes_per_user": 2,
+            "write_size_bytes": 1000,
+            "read_size_bytes": 2000,
+            "retention_days": 2555,
+            "peak_factor": 5
+        },
         "tools": ["Amazon DynamoDB", "Amazon RDS for PostgreSQL", "Amazon SQS (Standard)", "AWS Lambda", "Amazon ElastiCache (Redis/Valkey)"],
         "reasoning": "Strong consistency for transactions, async processing for reconciliation, caching for fraud checks"
     },
@@ -293,6 +302,15 @@ SCENARIO_BLUEPRINTS = {
                 "Connection state: maintain in-memory map of userId -> WebSocket on each Chat Service node"
             ]
         },
+        "scale": {
+            "dau": 50_000_000,
+            "reads_per_user": 100,
+            "writes_per_user": 40,
+            "write_size_bytes": 500,
+            "read_size_bytes": 500,
+            "retention_days": 1825,
+            "peak_factor": 3
+        },
         "tools": ["Amazon DynamoDB", "Amazon ElastiCache (Redis/Valkey)", "Amazon Kinesis Data Streams", "AWS Lambda", "Amazon CloudFront"],
         "reasoning": "Low latency reads, real-time message delivery, global distribution"
     },
@@ -444,6 +462,15 @@ SCENARIO_BLUEPRINTS = {
                 "Unfollow triggers async cleanup: remove FeedItems from the unfollowed user in background"
             ]
         },
+        "scale": {
+            "dau": 500_000_000,
+            "reads_per_user": 20,
+            "writes_per_user": 0.2,
+            "write_size_bytes": 500_000,
+            "read_size_bytes": 20_000,
+            "retention_days": 3650,
+            "peak_factor": 3
+        },
         "tools": ["Amazon DynamoDB", "Amazon ElastiCache (Redis/Valkey)", "Amazon S3", "Amazon CloudFront", "AWS Lambda"],
         "reasoning": "Fast reads with eventual consistency, CDN for media, scalable fan-out"
     },
@@ -582,6 +609,15 @@ SCENARIO_BLUEPRINTS = {
                 "Late-arriving events: Lambda handles out-of-order events by re-aggregating the affected time bucket"
             ]
         },
+        "scale": {
+            "dau": 500_000_000,
+            "reads_per_user": 0.1,
+            "writes_per_user": 200,
+            "write_size_bytes": 500,
+            "read_size_bytes": 50_000,
+            "retention_days": 365,
+            "peak_factor": 2
+        },
         "tools": ["Amazon S3", "Amazon Athena", "Amazon Redshift", "Amazon Kinesis Data Streams", "AWS Lambda"],
         "reasoning": "Data lake for raw events, OLAP for aggregations, real-time streaming"
     },
@@ -719,6 +755,15 @@ SCENARIO_BLUEPRINTS = {
                 "Log all queries to SearchLog for future relevance tuning (click-through rate analysis)"
             ]
         },
+        "scale": {
+            "dau": 100_000_000,
+            "reads_per_user": 10,
+            "writes_per_user": 0.01,
+            "write_size_bytes": 10_000,
+            "read_size_bytes": 5000,
+            "retention_days": 3650,
+            "peak_factor": 3
+        },
         "tools": ["Amazon OpenSearch Service", "Amazon DynamoDB", "Amazon CloudFront", "AWS Lambda"],
         "reasoning": "Full-text search, metadata storage, edge caching for popular queries"
     },
@@ -893,6 +938,15 @@ SCENARIO_BLUEPRINTS = {
                 "Rate limiting at API Gateway level, not application level, to protect against DDoS"
             ]
         },
+        "scale": {
+            "dau": 50_000_000,
+            "reads_per_user": 2,
+            "writes_per_user": 1,
+            "write_size_bytes": 500,
+            "read_size_bytes": 1000,
+            "retention_days": 365,
+            "peak_factor": 5
+        },
         "tools": ["Amazon DynamoDB", "Amazon ElastiCache (Redis/Valkey)", "AWS Lambda", "Amazon CloudFront", "AWS IAM"],
         "reasoning": "Identity management, session storage, token caching, global availability"
     },
@@ -1079,6 +1133,15 @@ SCENARIO_BLUEPRINTS = {
                 "Location Service uses write-through cache: update Redis + PostgreSQL in parallel for durability"
             ]
         },
+        "scale": {
+            "dau": 100_000_000,
+            "reads_per_user": 50,
+            "writes_per_user": 200,
+            "write_size_bytes": 100,
+            "read_size_bytes": 1000,
+            "retention_days": 1825,
+            "peak_factor": 4
+        },
         "tools": ["Amazon RDS for PostgreSQL", "Amazon ElastiCache (Redis/Valkey)", "Amazon SQS (Standard)", "AWS Lambda", "AWS Step Functions"],
         "reasoning": "Geospatial queries for driver matching, high-frequency location updates, distributed locking for consistency, durable queues for peak load"
     },
@@ -1200,6 +1263,15 @@ SCENARIO_BLUEPRINTS = {
                 "Short code uniqueness guaranteed: single Redis counter with atomic increment ensures global uniqueness across all Write Service instances"
             ]
         },
+        "scale": {
+            "dau": 100_000_000,
+            "reads_per_user": 10,
+            "writes_per_user": 0.01,
+            "write_size_bytes": 500,
+            "read_size_bytes": 500,
+            "retention_days": 1825,
+            "peak_factor": 3
+        },
         "tools": ["Amazon RDS for PostgreSQL", "Amazon ElastiCache (Redis/Valkey)", "Amazon CloudFront", "AWS Lambda", "Amazon DynamoDB"],
         "reasoning": "High read throughput with caching, unique ID generation, simple key-value lookups, edge caching for viral links"
     },
@@ -1393,6 +1465,15 @@ SCENARIO_BLUEPRINTS = {
                 "S3 ListParts API: verify chunk uploads in progress, returns ETags for all uploaded parts"
             ]
         },
+        "scale": {
+            "dau": 100_000_000,
+            "reads_per_user": 10,
+            "writes_per_user": 2,
+            "write_size_bytes": 500_000,
+            "read_size_bytes": 500_000,
+            "retention_days": 3650,
+            "peak_factor": 2
+        },
         "tools": ["Amazon S3", "Amazon DynamoDB", "Amazon CloudFront", "AWS Lambda", "Amazon API Gateway"],
         "reasoning": "Blob storage for files, metadata storage, CDN for fast downloads, presigned URLs for direct upload/download"
     },
@@ -1532,6 +1613,15 @@ SCENARIO_BLUEPRINTS = {
                 "Monitoring: Alert on high 429 rates (potential DDoS or legitimate traffic spike)"
             ]
         },
+        "scale": {
+            "dau": 10_000_000,
+            "reads_per_user": 1000,
+            "writes_per_user": 0,
+            "write_size_bytes": 100,
+            "read_size_bytes": 100,
+            "retention_days": 1,
+            "peak_factor": 3
+        },
         "tools": ["Amazon ElastiCache (Redis/Valkey)", "Amazon DynamoDB", "Amazon API Gateway", "AWS Lambda", "Amazon CloudWatch"],
         "reasoning": "Low-latency counters, atomic operations, TTL support, high throughput"
     },
@@ -1715,6 +1805,15 @@ SCENARIO_BLUEPRINTS = {
                 "Offline message TTL: 30 days in MessageQueue, then moved to cold storage (Glacier)"
             ]
         },
+        "scale": {
+            "dau": 2_000_000_000,
+            "reads_per_user": 50,
+            "writes_per_user": 50,
+            "write_size_bytes": 200,
+            "read_size_bytes": 200,
+            "retention_days": 365,
+            "peak_factor": 3
+        },
         "tools": ["Amazon DynamoDB", "Amazon ElastiCache (Redis/Valkey)", "Amazon S3", "Amazon CloudFront", "Amazon SNS"],
         "reasoning": "Real-time messaging, presence tracking, media storage, push notifications, offline message queuing"
     },
@@ -1910,6 +2009,15 @@ SCENARIO_BLUEPRINTS = {
                 "Cold start optimization: Pre-warm CloudFront cache for trending videos by preloading chunks"
             ]
         },
+        "scale": {
+            "dau": 1_000_000_000,
+            "reads_per_user": 5,
+            "writes_per_user": 0.004,
+            "write_size_bytes": 2_000_000_000,
+            "read_size_bytes": 100_000_000,
+            "retention_days": 3650,
+            "peak_factor": 3
+        },
         "tools": ["Amazon S3", "AWS Elemental MediaConvert", "Amazon CloudFront", "Amazon DynamoDB", "Amazon Kinesis Data Streams"],
         "reasoning": "Blob storage for videos, transcoding service, global CDN delivery, metadata storage, real-time analytics ingestion"
     },
@@ -2164,6 +2272,15 @@ SCENARIO_BLUEPRINTS = {
                 "CDC benefits: Decouples write path (PostgreSQL) from read path (Elasticsearch), allows independent scaling, eventual consistency acceptable for search"
             ]
         },
+        "scale": {
+            "dau": 10_000_000,
+            "reads_per_user": 100,
+            "writes_per_user": 1,
+            "write_size_bytes": 1000,
+            "read_size_bytes": 10_000,
+            "retention_days": 1825,
+            "peak_factor": 20
+        },
         "tools": ["Amazon RDS for PostgreSQL", "Amazon ElastiCache (Redis/Valkey)", "Amazon OpenSearch Service", "AWS Lambda", "Amazon CloudFront"],
         "reasoning": "Amazon RDS for ACID transactions and relational data, Redis for distributed locking (ticket reservations) and caching (event data), OpenSearch for fast full-text search with node query caching, Lambda for CDC pipeline and async processing, CloudFront CDN for global content delivery"
     }
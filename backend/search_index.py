@@ -0,0 +1,236 @@
+"""
+Unified search over every content bank.
+
+One inverted index covers tools, scenario blueprints, common patterns,
+numbers to know, the delivery framework, the assessment rubric, technology
+quiz questions and flashcards. Every document is typed by its ``source`` so
+results from all banks can be ranked together with BM25.
+
+The index is split into shards by a stable hash of the term, so each term
+lives in exactly one shard and a query touches one dict lookup per term. The
+index is built in a background thread at startup; queries wait for it for a
+bounded time instead of blocking indefinitely. A failed build is logged and
+retried on a later query, at most once every ``RETRY_SECONDS``.
+
+Tool aliases ("postgres", "kafka") are expanded into the tool documents at
+build time, weighted like titles, so queries never need extra lookups.
+"""
+
+import logging
+import math
+import re
+import threading
+import time
+import zlib
+from array import array
+from collections import Counter
+from typing import Dict, List, Optional
+
+from database import SessionLocal
+from models import Tool
+from scenario_data import SCENARIO_BLUEPRINTS
+from reference_data import NUMBERS_TO_KNOW, DELIVERY_FRAMEWORK, ASSESSMENT_RUBRIC, COMMON_PATTERNS
+from quiz_data import TECHNOLOGY_QUIZ_QUESTIONS
+from flashcard_questions import ALL_FLASHCARD_QUESTIONS
+from aliases import AliasMap, get_alias_map
+from knowledge_graph import flatten_text
+from units import entry_label
+
+SOURCES = ("tool", "scenario", "pattern", "numbers", "framework", "rubric", "quiz", "flashcard")
+
+NUM_SHARDS = 8
+TITLE_WEIGHT = 3
+MAX_QUERY_TERMS = 16
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+TOOL_FIELDS = (
+    "cap_leaning", "consistency_model", "interview_oneliner", "best_for",
+    "avoid_when", "tradeoffs", "scaling_pattern",
+)
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+def shard_for(term: str) -> int:
+    return zlib.crc32(term.encode()) % NUM_SHARDS
+
+
+def _snippet(text: str, length: int = 160) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= length else text[:length].rsplit(" ", 1)[0] + "…"
+
+
+class _Shard:
+    """Postings for the subset of terms that hash to this shard."""
+
+    __slots__ = ("postings",)
+
+    def __init__(self):
+        self.postings: Dict[str, tuple] = {}
+
+
+class SearchIndex:
+    def __init__(self, documents: List[Dict]):
+        self.documents = documents
+        self.shards = [_Shard() for _ in range(NUM_SHARDS)]
+
+        staging: List[Dict[str, List[tuple]]] = [{} for _ in range(NUM_SHARDS)]
+        lengths = array("f")
+        for doc_id, doc in enumerate(documents):
+            counts = Counter(tokenize(doc["body"]))
+            for term in tokenize(doc["title"]) + tokenize(doc.get("keywords", "")):
+                counts[term] += TITLE_WEIGHT
+            lengths.append(sum(counts.values()))
+            for term, tf in counts.items():
+                staging[shard_for(term)].setdefault(term, []).append((doc_id, tf))
+
+        self.doc_lengths = lengths
+        self.avg_length = (sum(lengths) / len(lengths)) if lengths else 0.0
+
+        n = len(documents)
+        for shard, terms in zip(self.shards, staging):
+            for term, entries in terms.items():
+                idf = math.log(1 + (n - len(entries) + 0.5) / (len(entries) + 0.5))
+                shard.postings[term] = (idf, array("i", (d for d, _ in entries)), array("f", (tf for _, tf in entries)))
+
+    def search(self, query: str, sources: Optional[List[str]] = None, limit: int = 20) -> List[Dict]:
+        terms = list(dict.fromkeys(tokenize(query)))[:MAX_QUERY_TERMS]
+        scores: Dict[int, float] = {}
+        for term in terms:
+            posting = self.shards[shard_for(term)].postings.get(term)
+            if posting is None:
+                continue
+            idf, doc_ids, tfs = posting
+            for doc_id, tf in zip(doc_ids, tfs):
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self.doc_lengths[doc_id] / self.avg_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+        if sources:
+            scores = {d: s for d, s in scores.items() if self.documents[d]["source"] in sources}
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+        return [self.result(doc_id, score) for doc_id, score in ranked]
+
+    def result(self, doc_id: int, score: float) -> Dict:
+        doc = self.documents[doc_id]
+        item = {
+            "source": doc["source"],
+            "id": doc["id"],
+            "title": doc["title"],
+            "snippet": doc["snippet"],
+            "score": round(score, 4),
+        }
+        if "tool_id" in doc:
+            item["tool_id"] = doc["tool_id"]
+        return item
+
+
+def _document(source: str, doc_id: str, title: str, body, **extra) -> Dict:
+    text = flatten_text(body)
+    return {"source": source, "id": doc_id, "title": title, "body": text, "snippet": _snippet(text), **extra}
+
+
+def collect_documents(tools: List[Tool], alias_map: AliasMap) -> List[Dict]:
+    documents = []
+
+    for tool in tools:
+        fields = [getattr(tool, f) for f in TOOL_FIELDS]
+        # Only aliases that add words the name doesn't already contain
+        name_terms = set(tokenize(tool.name))
+        keywords = {t for alias in alias_map.aliases_for(tool.name) for t in tokenize(alias)} - name_terms
+        documents.append(_document(
+            "tool", f"tool:{tool.id}", tool.name,
+            [tool.category] + [f for f in fields if f],
+            tool_id=tool.id,
+            keywords=" ".join(sorted(keywords)),
+        ))
+
+    for key, blueprint in SCENARIO_BLUEPRINTS.items():
+        documents.append(_document("scenario", f"scenario:{key}", blueprint["title"], blueprint))
+
+    for key, pattern in COMMON_PATTERNS.items():
+        documents.append(_document("pattern", f"pattern:{key}", pattern["title"], pattern))
+
+    for dimension, entries in NUMBERS_TO_KNOW.items():
+        for i, entry in enumerate(entries):
+            documents.append(_document("numbers", f"numbers:{dimension}/{i}", entry_label(entry), entry, dimension=dimension))
+
+    for i, phase in enumerate(DELIVERY_FRAMEWORK["phases"]):
+        documents.append(_document("framework", f"framework:{i}", phase["phase"], phase))
+
+    for competency in ASSESSMENT_RUBRIC["competencies"]:
+        documents.append(_document(
+            "rubric", f"rubric:{competency['name'].lower().replace(' ', '-')}", competency["name"], competency
+        ))
+    documents.append(_document("rubric", "rubric:red-flags", "Red Flags", ASSESSMENT_RUBRIC["red_flags"]))
+    documents.append(_document("rubric", "rubric:green-flags", "Green Flags", ASSESSMENT_RUBRIC["green_flags"]))
+
+    for question in TECHNOLOGY_QUIZ_QUESTIONS:
+        documents.append(_document("quiz", f"quiz:{question['id']}", question["question"], question))
+
+    for card in ALL_FLASHCARD_QUESTIONS:
+        documents.append(_document("flashcard", f"flashcard:{card['id']}", card["question"], card))
+
+    return documents
+
+
+def build_search_index() -> SearchIndex:
+    db = SessionLocal()
+    try:
+        tools = db.query(Tool).order_by(Tool.id).all()
+        return SearchIndex(collect_documents(tools, get_alias_map()))
+    finally:
+        db.close()
+
+
+RETRY_SECONDS = 30.0
+
+logger = logging.getLogger(__name__)
+
+_index: Optional[SearchIndex] = None
+_ready = threading.Event()
+_start_lock = threading.Lock()
+_builder: Optional[threading.Thread] = None
+_failed_at: Optional[float] = None
+
+
+def _build():
+    global _index, _builder, _failed_at
+    try:
+        _index = build_search_index()
+    except Exception:
+        logger.exception("Search index build failed; retrying in %.0f s", RETRY_SECONDS)
+        with _start_lock:
+            _builder = None
+            _failed_at = time.monotonic()
+    finally:
+        # Wake waiters either way, so a failed build answers 503 at once instead of after a timeout
+        _ready.set()
+
+
+def start_background_build():
+    """Kick off the index build on a daemon thread (idempotent), or retry a
+    failed one once ``RETRY_SECONDS`` have passed."""
+    global _builder
+    with _start_lock:
+        if _builder is None and (_failed_at is None or time.monotonic() - _failed_at >= RETRY_SECONDS):
+            _ready.clear()
+            _builder = threading.Thread(target=_build, name="search-index-build", daemon=True)
+            _builder.start()
+
+
+def get_search_index(timeout: float = 2.0) -> Optional[SearchIndex]:
+    """
+    Return the index, waiting at most ``timeout`` seconds for the build.
+
+    Starts the build if nothing has yet (e.g. when the app runs without its
+    lifespan). Returns None if the index is still warming up.
+    """
+    start_background_build()
+    _ready.wait(timeout)
+    return _index
@@ -0,0 +1,313 @@
+"""
+Short code generation and redirect benchmarks.
+
+Puts numbers behind the ``bitly`` blueprint: unique 7-character base62
+codes for a billion URLs, read a thousand times for every write. Four ID
+generators run in parallel worker processes:
+
+- ``counter``: one shared counter incremented for every code, standing in
+  for Redis ``INCR``. Every code is one round of coordination.
+- ``ranges``: workers take ``RANGE_SIZE`` ids at a time from the same
+  counter, like a ticket server or ZooKeeper range allocation. This is one
+  round of coordination per range.
+- ``snowflake``: 41 bits of milliseconds, 10 bits of worker id and 12 bits
+  of sequence, so there is no coordination. A worker that uses up a
+  millisecond's 4096 sequence numbers waits for the next millisecond.
+- ``hash``: each URL is hashed and truncated to the code space. Codes need
+  no coordination to generate but can collide. ``hash_collisions``
+  measures this at scale, retrying colliding codes with a salt until every
+  code is unique.
+
+Ids are generated and base62-encoded in NumPy batches, so one box gets
+through 100M codes in seconds for every generator but ``counter``, whose
+per-code lock is the cost being measured. It manages about half a million
+codes per second, so it has its own, much lower, cap. The hash is a 64-bit mixer over
+the URL's id, standing in for a digest of the URL; collisions depend only
+on the hash being uniform.
+
+``redirect_benchmark`` measures the read path: Zipf-popular codes looked up
+in a SQLite table, with and without an in-process LRU cache in front.
+"""
+
+import multiprocessing
+import os
+import sqlite3
+import tempfile
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+import numpy as np
+
+GENERATORS = ("counter", "ranges", "snowflake", "hash")
+ALPHABET = b"0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ"
+CODE_LENGTH = 7
+# 62**10 is the largest code space that fits the uint64 hash arithmetic; 62**11 does not
+MAX_LENGTH = 10
+MAX_CODES = 100_000_000
+MAX_COUNTER_CODES = 2_000_000
+MAX_COLLISION_CODES = 20_000_000
+MAX_PROCESSES = 16
+BATCH = 100_000
+RANGE_SIZE = 100_000
+# Twitter's Snowflake epoch, in milliseconds
+SNOWFLAKE_EPOCH_MS = 1_288_834_974_657
+SEQUENCE_BITS = 12
+WORKER_BITS = 10
+
+_ALPHABET = np.frombuffer(ALPHABET, dtype=np.uint8)
+_MIX1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX2 = np.uint64(0x94D049BB133111EB)
+
+# Counter shared with worker processes, set by ``_init_worker``
+_counter = None
+
+
+def base62(value: int, width: int = CODE_LENGTH) -> str:
+    """Fixed-width base62 code of a non-negative integer."""
+    digits = []
+    for _ in range(width):
+        value, digit = divmod(value, 62)
+        digits.append(ALPHABET[digit])
+    return bytes(reversed(digits)).decode()
+
+
+def base62_batch(values: np.ndarray, width: int = CODE_LENGTH) -> np.ndarray:
+    """Vectorized ``base62`` returning a fixed-width bytes array."""
+    values = values.astype(np.uint64)
+    digits = np.empty((len(values), width), dtype=np.uint8)
+    for position in range(width - 1, -1, -1):
+        digits[:, position] = _ALPHABET[(values % np.uint64(62)).astype(np.intp)]
+        values //= np.uint64(62)
+    return digits.view(f"S{width}").ravel()
+
+
+def url_hash(url_ids: np.ndarray, salt: int = 0) -> np.ndarray:
+    """64-bit mix of URL ids and a retry salt."""
+    z = (url_ids.astype(np.uint64) + np.uint64(1)) * np.uint64(0x9E3779B97F4A7C15)
+    z += np.uint64(salt * 0xBF58476D1CE4E5B9 % 2**64)
+    z = (z ^ (z >> np.uint64(30))) * _MIX1
+    z = (z ^ (z >> np.uint64(27))) * _MIX2
+    return z ^ (z >> np.uint64(31))
+
+
+def _init_worker(counter):
+    global _counter
+    _counter = counter
+
+
+def _counter_ids(count: int) -> np.ndarray:
+    ids = np.empty(count, dtype=np.int64)
+    lock = _counter.get_lock()
+    for i in range(count):
+        with lock:
+            ids[i] = _counter.value
+            _counter.value += 1
+    return ids
+
+
+def _generate(name: str, worker: int, url_start: int, count: int, length: int, collect: bool) -> Dict:
+    """Generate and encode one worker's share of codes, in batches.
+
+    A hashing worker hashes URL ids ``url_start`` to ``url_start + count``.
+    """
+    space = 62 ** length
+    produced = coordination = waits = 0
+    range_next = range_end = 0
+    collected: List[np.ndarray] = []
+    last_ms, sequence = -1, 0
+    started = time.perf_counter()
+    while produced < count:
+        size = min(BATCH, count - produced)
+        if name == "counter":
+            ids = _counter_ids(size)
+            coordination += size
+        elif name == "ranges":
+            parts = []
+            while size:
+                if range_next == range_end:
+                    with _counter.get_lock():
+                        range_next = _counter.value
+                        _counter.value += RANGE_SIZE
+                    range_end = range_next + RANGE_SIZE
+                    coordination += 1
+                take = min(size, range_end - range_next)
+                parts.append(np.arange(range_next, range_next + take, dtype=np.int64))
+                range_next += take
+                size -= take
+            ids = np.concatenate(parts)
+        elif name == "snowflake":
+            parts = []
+            while size:
+                now = time.time_ns() // 1_000_000
+                if now == last_ms and sequence == 1 << SEQUENCE_BITS:
+                    # Sequence used up: spin until the next millisecond
+                    waits += 1
+                    while now == last_ms:
+                        now = time.time_ns() // 1_000_000
+                if now != last_ms:
+                    last_ms, sequence = now, 0
+                take = min(size, (1 << SEQUENCE_BITS) - sequence)
+                prefix = ((now - SNOWFLAKE_EPOCH_MS) << (WORKER_BITS + SEQUENCE_BITS)) | (worker << SEQUENCE_BITS)
+                parts.append(prefix + np.arange(sequence, sequence + take, dtype=np.int64))
+                sequence += take
+                size -= take
+            ids = np.concatenate(parts)
+        else:
+            url_ids = np.arange(url_start + produced, url_start + produced + size, dtype=np.uint64)
+            ids = url_hash(url_ids) % np.uint64(space)
+        # Snowflake ids are too wide for 7 characters; they are encoded in full, 11 characters
+        codes = base62_batch(ids, length if name != "snowflake" else 11)
+        if collect:
+            collected.append(codes)
+        produced += len(codes)
+    return {
+        "codes": produced,
+        "seconds": time.perf_counter() - started,
+        "coordination": coordination,
+        "waits": waits,
+        "collected": np.concatenate(collected) if collect else None,
+    }
+
+
+def generate(codes: int = 1_000_000, processes: int = 4, length: int = CODE_LENGTH,
+             generators: tuple = GENERATORS, collect: bool = False) -> Dict:
+    """Codes per second and coordination per million codes for each
+    generator, with ``processes`` workers sharing the work.
+
+    Throughput is total codes over the slowest worker's time, which leaves
+    out process start-up.
+    """
+    context = multiprocessing.get_context("spawn")
+    counter = context.Value("q", 0)
+    shares = [codes // processes + (w < codes % processes) for w in range(processes)]
+    # Each worker hashes its own contiguous block of URL ids
+    url_starts = [sum(shares[:w]) for w in range(processes)]
+    results = {}
+    with ProcessPoolExecutor(processes, mp_context=context, initializer=_init_worker, initargs=(counter,)) as pool:
+        for name in generators:
+            counter.value = 0
+            futures = [pool.submit(_generate, name, w, url_starts[w], share, length, collect)
+                       for w, share in enumerate(shares)]
+            parts = [future.result() for future in futures]
+            seconds = max(part["seconds"] for part in parts)
+            results[name] = {
+                "codes": sum(part["codes"] for part in parts),
+                "codes_per_second": round(codes / seconds) if seconds else None,
+                "coordination_per_million": round(sum(part["coordination"] for part in parts) * 1e6 / codes, 1),
+                "sequence_waits": sum(part["waits"] for part in parts),
+            }
+            if collect:
+                results[name]["collected"] = np.concatenate([part["collected"] for part in parts])
+    return results
+
+
+def hash_collisions(codes: int = 1_000_000, length: int = CODE_LENGTH) -> Dict:
+    """Collisions when ``codes`` URLs are hashed into ``62**length`` codes,
+    and the salted retries needed until every code is unique."""
+    space = 62 ** length
+    values = np.sort(url_hash(np.arange(codes, dtype=np.uint64)) % np.uint64(space))
+    duplicate = np.r_[False, values[1:] == values[:-1]]
+    first_try = int(duplicate.sum())
+    unique = values[~duplicate]
+
+    # Rehash the losers with the next salt until none collide with taken codes or each other
+    pending = np.flatnonzero(duplicate).astype(np.uint64)
+    retries, attempts = 0, 1
+    while len(pending):
+        attempts += 1
+        retries += len(pending)
+        candidates = url_hash(pending, attempts - 1) % np.uint64(space)
+        taken = unique[np.minimum(np.searchsorted(unique, candidates), len(unique) - 1)] == candidates
+        order = np.argsort(candidates, kind="stable")
+        repeat = np.zeros(len(candidates), dtype=bool)
+        repeat[order[1:]] = candidates[order][1:] == candidates[order][:-1]
+        accepted = ~(taken | repeat)
+        unique = np.sort(np.concatenate([unique, candidates[accepted]]))
+        pending = pending[~accepted]
+
+    return {
+        "codes": codes,
+        "code_space": space,
+        "first_try_collisions": first_try,
+        "collision_rate": round(first_try / codes, 8),
+        # Birthday bound: expected codes that land on an already used one
+        "expected_collisions": round(float(codes - space * -np.expm1(-codes / space)), 2),
+        "retries": retries,
+        "max_attempts": attempts,
+        "unique_codes": len(unique),
+    }
+
+
+class LRUCache:
+    __slots__ = ("entries", "capacity")
+
+    def __init__(self, capacity: int):
+        self.entries = OrderedDict()
+        self.capacity = capacity
+
+    def get(self, key):
+        value = self.entries.get(key)
+        if value is not None:
+            self.entries.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        self.entries[key] = value
+        if len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+
+
+def redirect_benchmark(urls: int = 100_000, lookups: int = 200_000, cache_size: int = 10_000,
+                       alpha: float = 1.0, seed: int = 0, path: Optional[str] = None) -> Dict:
+    """Lookups per second and latency for Zipf-popular codes, from SQLite alone
+    and through an in-process LRU cache."""
+    rng = np.random.default_rng(seed)
+    codes = [c.decode() for c in base62_batch(np.arange(urls, dtype=np.int64) * 7919 % (62 ** CODE_LENGTH))]
+    weights = np.cumsum(np.arange(1, urls + 1, dtype=np.float64) ** -alpha)
+    ranks = np.minimum(np.searchsorted(weights, rng.random(lookups) * weights[-1], side="right"), urls - 1)
+    trace = [codes[i] for i in rng.permutation(urls)[ranks].tolist()]
+
+    with tempfile.TemporaryDirectory() as directory:
+        conn = sqlite3.connect(path or os.path.join(directory, "urls.db"))
+        conn.execute("CREATE TABLE urls (code TEXT PRIMARY KEY, url TEXT NOT NULL) WITHOUT ROWID")
+        conn.executemany("INSERT INTO urls VALUES (?, ?)",
+                         ((code, f"https://example.com/articles/{i}") for i, code in enumerate(codes)))
+        conn.commit()
+        query = "SELECT url FROM urls WHERE code = ?"
+
+        def lookup_db(code):
+            return conn.execute(query, (code,)).fetchone()[0]
+
+        cache = LRUCache(cache_size)
+        misses = 0
+
+        def lookup_cached(code):
+            nonlocal misses
+            url = cache.get(code)
+            if url is None:
+                misses += 1
+                url = lookup_db(code)
+                cache.put(code, url)
+            return url
+
+        results = {}
+        for name, lookup in (("sqlite", lookup_db), ("lru_sqlite", lookup_cached)):
+            latency = np.empty(lookups)
+            clock = time.perf_counter
+            started = clock()
+            for i, code in enumerate(trace):
+                began = clock()
+                lookup(code)
+                latency[i] = clock() - began
+            elapsed = clock() - started
+            results[name] = {
+                "lookups_per_second": round(lookups / elapsed),
+                "p50_us": round(float(np.percentile(latency, 50)) * 1e6, 2),
+                "p99_us": round(float(np.percentile(latency, 99)) * 1e6, 2),
+            }
+        conn.close()
+
+    results["lru_sqlite"]["hit_ratio"] = round(1 - misses / lookups, 4)
+    return results
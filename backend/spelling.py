@@ -0,0 +1,192 @@
+"""
+Spelling correction for tool search (SymSpell).
+
+The vocabulary is every word in the tool catalog. At build time each word is
+expanded into its deletion neighbourhood (every string reachable by deleting
+up to ``MAX_EDIT_DISTANCE`` characters from its first ``PREFIX_LENGTH``
+characters), stored in one hash map from delete to words. A lookup generates
+the same neighbourhood for the query term and probes that map, so the cost
+depends on the length of the term rather than the size of the vocabulary.
+
+Prefixes of tool-name words are indexed too and resolve to the full word,
+so "dyanmo" corrects to "dynamodb" via "dynamo". Words from tool aliases
+are part of the vocabulary, so "kafak" corrects to "kafka".
+
+Words from tool descriptions count as spelled correctly, but only tool
+name, category and alias words are offered as corrections, so "dyn" does
+not suggest common English words such as "don" or "can".
+"""
+
+import re
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from aliases import AliasMap, get_alias_map
+from database import SessionLocal
+from models import Tool
+
+MAX_EDIT_DISTANCE = 2
+PREFIX_LENGTH = 7
+MIN_WORD_LENGTH = 3
+MIN_NAME_PREFIX = 4
+
+TOOL_TEXT_FIELDS = (
+    "category", "cap_leaning", "consistency_model", "interview_oneliner",
+    "best_for", "avoid_when", "tradeoffs", "scaling_pattern",
+)
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def words(text: str) -> List[str]:
+    return _WORD_RE.findall(text.lower())
+
+
+def damerau_levenshtein(a: str, b: str, max_distance: int) -> int:
+    """Optimal string alignment distance, or ``max_distance + 1`` once exceeded."""
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    previous_previous: List[int] = []
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        row_min = current[0]
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous_previous[j - 2] + 1)
+            row_min = min(row_min, current[j])
+        if row_min > max_distance:
+            return max_distance + 1
+        previous_previous, previous = previous, current
+    return previous[-1]
+
+
+def deletes(word: str, max_distance: int) -> Set[str]:
+    """Every string reachable by deleting up to ``max_distance`` characters."""
+    result = {word}
+    frontier = {word}
+    for _ in range(max_distance):
+        next_frontier = set()
+        for candidate in frontier:
+            for i in range(len(candidate)):
+                next_frontier.add(candidate[:i] + candidate[i + 1:])
+        result |= next_frontier
+        frontier = next_frontier
+    return result
+
+
+class SymSpell:
+    def __init__(self, frequencies: Dict[str, int], aliases: Optional[Dict[str, str]] = None,
+                 suggestable: Optional[Set[str]] = None):
+        """
+        frequencies: word -> count
+        aliases: extra indexed strings that resolve to a vocabulary word
+        suggestable: the words lookups may return; every word by default
+        """
+        self.frequencies = frequencies
+        self.canonical: Dict[str, str] = {w: w for w in frequencies}
+        for alias, word in (aliases or {}).items():
+            self.canonical.setdefault(alias, word)
+
+        self.deletes: Dict[str, List[str]] = {}
+        for term in self.canonical:
+            if suggestable is not None and self.canonical[term] not in suggestable:
+                continue
+            for delete in deletes(term[:PREFIX_LENGTH], MAX_EDIT_DISTANCE):
+                self.deletes.setdefault(delete, []).append(term)
+
+    def __contains__(self, word: str) -> bool:
+        return word in self.frequencies
+
+    def lookup(self, word: str, max_distance: int = MAX_EDIT_DISTANCE, limit: int = 3) -> List[Tuple[str, int]]:
+        """Return ``(suggestion, distance)`` pairs, closest and most frequent first."""
+        word = word.lower()
+        if word in self.frequencies:
+            return [(word, 0)]
+
+        best: Dict[str, int] = {}
+        checked: Set[str] = set()
+        for delete in deletes(word[:PREFIX_LENGTH], max_distance):
+            for term in self.deletes.get(delete, ()):
+                if term in checked:
+                    continue
+                checked.add(term)
+                distance = damerau_levenshtein(word, term, max_distance)
+                if distance > max_distance:
+                    continue
+                target = self.canonical[term]
+                if distance < best.get(target, max_distance + 1):
+                    best[target] = distance
+
+        ranked = sorted(best.items(), key=lambda item: (item[1], -self.frequencies[item[0]], item[0]))
+        return ranked[:limit]
+
+    def correct(self, text: str) -> Tuple[str, List[str]]:
+        """
+        Correct every unknown word in ``text``.
+
+        Returns the best corrected text and up to three "did you mean"
+        suggestions. The suggestion list is empty when nothing was corrected.
+        """
+        tokens = words(text)
+        options: List[List[str]] = []
+        for token in tokens:
+            if token in self or len(token) < MIN_WORD_LENGTH:
+                options.append([token])
+                continue
+            suggestions = [s for s, _ in self.lookup(token)]
+            options.append(suggestions or [token])
+
+        best = " ".join(o[0] for o in options)
+        if best == " ".join(tokens):
+            return best, []
+
+        did_you_mean = [best]
+        for i, alternatives in enumerate(options):
+            for alternative in alternatives[1:]:
+                variant = " ".join(alternative if j == i else o[0] for j, o in enumerate(options))
+                if variant not in did_you_mean:
+                    did_you_mean.append(variant)
+        return best, did_you_mean[:3]
+
+
+def build_tool_speller(tools: Iterable[Tool], alias_map: AliasMap) -> SymSpell:
+    frequencies: Counter = Counter()
+    aliases: Dict[str, str] = {}
+    suggestable: Set[str] = set()
+    for alias in alias_map.targets:
+        frequencies.update(w for w in words(alias) if len(w) >= MIN_WORD_LENGTH)
+        suggestable.update(w for w in words(alias) if len(w) >= MIN_WORD_LENGTH)
+    for tool in tools:
+        name_words = words(tool.name)
+        frequencies.update(w for w in name_words if len(w) >= MIN_WORD_LENGTH)
+        suggestable.update(w for w in name_words + words(tool.category or "") if len(w) >= MIN_WORD_LENGTH)
+        for word in name_words:
+            for end in range(MIN_NAME_PREFIX, len(word)):
+                aliases.setdefault(word[:end], word)
+        for field in TOOL_TEXT_FIELDS:
+            value = getattr(tool, field)
+            if value:
+                frequencies.update(w for w in words(value) if len(w) >= MIN_WORD_LENGTH)
+    return SymSpell(dict(frequencies), aliases, suggestable)
+
+
+_speller: Optional[SymSpell] = None
+_speller_lock = threading.Lock()
+
+
+def get_tool_speller() -> SymSpell:
+    """Return the process-wide speller, building it from the database on first use."""
+    global _speller
+    if _speller is None:
+        with _speller_lock:
+            if _speller is None:
+                db = SessionLocal()
+                try:
+                    _speller = build_tool_speller(db.query(Tool).all(), get_alias_map())
+                finally:
+                    db.close()
+    return _speller
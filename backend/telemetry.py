@@ -0,0 +1,242 @@
+"""
+Usage telemetry for this API, aggregated in process and flushed to SQLite.
+
+Tool detail views, searches, searches that found nothing and scenario
+fetches are counted per stream. A request only appends its key to an
+in-memory buffer. Buffers are folded a batch at a time into a
+``CountMinSketch``, for the count of any key, and a ``SpaceSaving``
+summary, for the heaviest keys, so memory stays fixed however many
+distinct tools, queries or scenarios are seen.
+
+A daemon thread flushes every ``TELEMETRY_FLUSH_SECONDS`` seconds. One
+transaction per flush writes each changed stream's sketch as a blob and
+replaces its top keys, so SQLite sees a bounded write every few seconds
+instead of an ``INSERT`` per request. Flushed state is loaded back on
+start, so counts survive restarts; events since the last flush are lost
+in a crash.
+"""
+
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from database import WORKING_DB
+from probabilistic import CountMinSketch, SpaceSaving, hash_keys
+
+STREAMS = ("tool_views", "searches", "zero_result_searches", "scenario_views")
+TOP_K = 200
+SKETCH_WIDTH = 2048
+SKETCH_DEPTH = 5
+# Fold on the request path past this many buffered keys, so the buffer stays small under load
+MAX_PENDING = 10_000
+MAX_KEY_LENGTH = 200
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS usage_sketches (
+    stream TEXT PRIMARY KEY,
+    total INTEGER NOT NULL,
+    width INTEGER NOT NULL,
+    depth INTEGER NOT NULL,
+    counters BLOB NOT NULL,
+    flushed_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS usage_top_keys (
+    stream TEXT NOT NULL,
+    key TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    error INTEGER NOT NULL,
+    PRIMARY KEY (stream, key)
+);
+"""
+
+
+def normalize_query(query: str) -> str:
+    """Search queries are counted case- and whitespace-insensitively."""
+    return re.sub(r"\s+", " ", query.strip().lower())[:MAX_KEY_LENGTH]
+
+
+class StreamCounter:
+    """Counts for one stream: a count-min sketch over every key and Space-Saving over the heaviest."""
+
+    __slots__ = ("sketch", "top", "dirty")
+
+    def __init__(self, top_k: int = TOP_K, width: int = SKETCH_WIDTH, depth: int = SKETCH_DEPTH):
+        self.sketch = CountMinSketch(width, depth)
+        self.top = SpaceSaving(top_k)
+        self.dirty = False
+
+    def add(self, keys: List[str]):
+        self.sketch.add(keys)
+        self.top.add(keys)
+        self.dirty = True
+
+    def heaviest(self, limit: int) -> List[Dict]:
+        """Top keys with both sketches' counts; each is an upper bound, so the smaller is kept."""
+        entries = self.top.top(limit)
+        if not entries:
+            return []
+        estimates = self.sketch.estimate([entry["key"] for entry in entries]).tolist()
+        return [{"key": entry["key"], "count": min(entry["count"], estimate), "error": entry["error"]}
+                for entry, estimate in zip(entries, estimates)]
+
+
+class UsageTelemetry:
+    """Buffers usage events, folds them into per-stream sketches and flushes
+    those to SQLite from a background thread."""
+
+    __slots__ = ("path", "interval", "streams", "pending", "lock", "flush_lock", "stopping", "thread",
+                 "flushes", "last_flush")
+
+    def __init__(self, path: str = WORKING_DB, interval: float = 10.0, top_k: int = TOP_K):
+        self.path = path
+        self.interval = interval
+        self.streams = {name: StreamCounter(top_k) for name in STREAMS}
+        self.pending: Dict[str, List[str]] = {name: [] for name in STREAMS}
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.stopping = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+        self.flushes = 0
+        self.last_flush: Optional[float] = None
+
+    def record(self, stream: str, key: str):
+        """Count one event. Only appends to a buffer, unless the buffer is full."""
+        with self.lock:
+            buffer = self.pending[stream]
+            buffer.append(key[:MAX_KEY_LENGTH])
+            if len(buffer) >= MAX_PENDING:
+                self._fold(stream)
+
+    def _fold(self, stream: str):
+        """Add a stream's buffered keys to its sketches, as one batch. Call with ``lock`` held."""
+        keys, self.pending[stream] = self.pending[stream], []
+        if keys:
+            self.streams[stream].add(keys)
+
+    def heaviest(self, stream: str, limit: int = 10) -> Dict:
+        with self.lock:
+            self._fold(stream)
+            counter = self.streams[stream]
+            return {
+                "total": counter.top.total,
+                # Any count may be high by this much; keys seen more often are never missed
+                "error_bound": round(counter.top.error_bound(), 2),
+                "results": counter.heaviest(limit),
+            }
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=5.0)
+        conn.executescript(_SCHEMA)
+        return conn
+
+    def load(self):
+        """Restore every stream from its last flush, replacing what it holds."""
+        conn = self._connect()
+        try:
+            sketches = conn.execute("SELECT stream, total, width, depth, counters FROM usage_sketches").fetchall()
+            rows = conn.execute("SELECT stream, key, count, error FROM usage_top_keys").fetchall()
+        finally:
+            conn.close()
+        with self.lock:
+            for stream, total, width, depth, counters in sketches:
+                if stream not in self.streams:
+                    continue
+                sketch = CountMinSketch(width, depth)
+                sketch.table = np.frombuffer(counters, dtype=np.int64).reshape(depth, width).copy()
+                sketch.total = total
+                self.streams[stream].sketch = sketch
+                self.streams[stream].top.total = total
+            for stream in self.streams:
+                entries = [(key, count, error) for name, key, count, error in rows if name == stream]
+                if not entries:
+                    continue
+                top = self.streams[stream].top
+                labels = [key for key, _, _ in entries]
+                hashes = hash_keys(labels)
+                order = np.argsort(hashes)
+                top.keys = hashes[order]
+                top.counts = np.array([count for _, count, _ in entries], dtype=np.int64)[order]
+                top.errors = np.array([error for _, _, error in entries], dtype=np.int64)[order]
+                top.labels = dict(zip(hashes.tolist(), labels))
+
+    def flush(self) -> int:
+        """Write every stream that changed since the last flush in one transaction; returns streams written."""
+        with self.flush_lock:
+            with self.lock:
+                snapshot = []
+                for stream, counter in self.streams.items():
+                    self._fold(stream)
+                    if counter.dirty:
+                        counter.dirty = False
+                        snapshot.append((stream, counter.sketch.total, counter.sketch.width, counter.sketch.depth,
+                                         counter.sketch.table.tobytes(), counter.top.top()))
+            if not snapshot:
+                return 0
+            now = time.time()
+            try:
+                conn = self._connect()
+                try:
+                    with conn:
+                        for stream, total, width, depth, counters, top in snapshot:
+                            conn.execute("INSERT OR REPLACE INTO usage_sketches VALUES (?, ?, ?, ?, ?, ?)",
+                                         (stream, total, width, depth, counters, now))
+                            conn.execute("DELETE FROM usage_top_keys WHERE stream = ?", (stream,))
+                            conn.executemany("INSERT INTO usage_top_keys VALUES (?, ?, ?, ?)",
+                                             [(stream, e["key"], e["count"], e["error"]) for e in top])
+                finally:
+                    conn.close()
+            except sqlite3.Error:
+                # Nothing was written, so the next flush has to write these streams again
+                with self.lock:
+                    for stream, *_ in snapshot:
+                        self.streams[stream].dirty = True
+                raise
+            self.flushes += 1
+            self.last_flush = now
+            return len(snapshot)
+
+    def _run(self):
+        while not self.stopping.wait(self.interval):
+            try:
+                self.flush()
+            except sqlite3.Error:
+                # Try again next interval; the sketches still hold everything
+                pass
+
+    def start(self):
+        """Load flushed state and start the flush thread (idempotent)."""
+        with self.flush_lock:
+            if self.thread is not None:
+                return
+            self.stopping.clear()
+            self.thread = threading.Thread(target=self._run, name="usage-telemetry-flush", daemon=True)
+        self.load()
+        self.thread.start()
+
+    def stop(self):
+        """Stop the flush thread and flush what is left."""
+        thread = self.thread
+        if thread is not None:
+            self.stopping.set()
+            thread.join()
+            self.thread = None
+        self.flush()
+
+
+_telemetry: Optional[UsageTelemetry] = None
+_telemetry_lock = threading.Lock()
+
+
+def get_usage_telemetry() -> UsageTelemetry:
+    """This API's telemetry, flushing every ``TELEMETRY_FLUSH_SECONDS`` (default 10)."""
+    global _telemetry
+    if _telemetry is None:
+        with _telemetry_lock:
+            if _telemetry is None:
+                _telemetry = UsageTelemetry(interval=float(os.environ.get("TELEMETRY_FLUSH_SECONDS", "10")))
+    return _telemetry
@@ -0,0 +1,11 @@
+"""
+Shared test setup.
+
+Every TestClient request comes from the host "testclient", so with the API
+rate limit on, the whole suite would share one client's budget. It is
+turned off here; tests of the limit install their own limiter.
+"""
+
+import os
+
+os.environ["API_RATE_LIMIT"] = "0"
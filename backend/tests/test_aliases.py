@@ -0,0 +1,94 @@
+"""
+Tests for the tool alias dictionary and alias-aware search.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app
+from aliases import AliasMap, generate_aliases
+
+client = TestClient(app)
+
+
+class TestAliasGeneration:
+    """Test aliases generated from tool names."""
+
+    def test_vendor_prefix_stripped(self):
+        assert "dynamodb" in generate_aliases("Amazon DynamoDB")
+
+    def test_parenthesized_products_split(self):
+        aliases = generate_aliases("Amazon ElastiCache (Redis/Valkey)")
+        assert {"elasticache", "redis", "valkey"} <= set(aliases)
+
+    def test_for_names_split(self):
+        aliases = generate_aliases("Amazon RDS for PostgreSQL")
+        assert {"rds", "postgresql"} <= set(aliases)
+
+    def test_managed_and_compatible_qualifiers_stripped(self):
+        assert "kafka" in generate_aliases("Amazon MSK (Managed Kafka)")
+        assert "mysql" in generate_aliases("Amazon Aurora (MySQL/PostgreSQL compatible)")
+
+    def test_variant_qualifiers_are_not_aliases(self):
+        aliases = generate_aliases("Amazon SQS (FIFO)")
+        assert "fifo" not in aliases
+        assert "sqs fifo" in aliases
+
+
+class TestAliasMap:
+    """Test the compiled alias map."""
+
+    def setup_method(self):
+        self.aliases = AliasMap(
+            ["Amazon RDS for PostgreSQL", "Amazon Aurora (MySQL/PostgreSQL compatible)", "Amazon Keyspaces"],
+            curated={"pg": ["Amazon RDS for PostgreSQL"], "cassandra": ["Amazon Keyspaces"], "aurora": []},
+        )
+
+    def test_name_ranks_above_qualifier(self):
+        """A tool named after the alias ranks above one that only mentions it."""
+        assert self.aliases.resolve("PostgreSQL")[0] == "Amazon RDS for PostgreSQL"
+
+    def test_curated_aliases(self):
+        assert self.aliases.resolve("PG") == ("Amazon RDS for PostgreSQL",)
+        assert self.aliases.resolve("cassandra") == ("Amazon Keyspaces",)
+
+    def test_curated_removal(self):
+        assert self.aliases.resolve("aurora") == ()
+
+    def test_resolve_names_keeps_canonical_names(self):
+        assert self.aliases.resolve_names(["Amazon Keyspaces", "pg", "unknown"]) == [
+            "Amazon Keyspaces", "Amazon RDS for PostgreSQL"
+        ]
+
+    def test_mentions(self):
+        found = self.aliases.mentions("Write to Cassandra, then replicate to PG")
+        assert found == ["Amazon Keyspaces", "Amazon RDS for PostgreSQL"]
+
+
+class TestAliasSearch:
+    """Test alias expansion in the search endpoints."""
+
+    @pytest.mark.parametrize("query,expected", [
+        ("Postgres", "Amazon RDS for PostgreSQL"),
+        ("PG", "Amazon RDS for PostgreSQL"),
+        ("Kafka", "Amazon MSK (Managed Kafka)"),
+        ("Redis", "Amazon ElastiCache (Redis/Valkey)"),
+        ("Cassandra", "Amazon Keyspaces"),
+    ])
+    def test_tool_search_resolves_aliases(self, query, expected):
+        response = client.get(f'/api/tools/search?q={query}')
+        assert response.status_code == 200
+        assert expected in [t['name'] for t in response.json()]
+
+    def test_unified_search_indexes_aliases(self):
+        response = client.get('/api/search?q=cassandra&source=tool')
+        assert response.json()['results'][0]['title'] == 'Amazon Keyspaces'
+
+    def test_pattern_detail_resolves_technologies(self):
+        response = client.get('/api/reference/patterns/dealing_with_contention')
+        assert response.status_code == 200
+        assert 'Amazon MSK (Managed Kafka)' in response.json()['related_tools']
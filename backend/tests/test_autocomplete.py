@@ -0,0 +1,72 @@
+"""
+Tests for the prefix index and /api/autocomplete.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app
+from autocomplete import PrefixIndex, TOP_K
+
+client = TestClient(app)
+
+
+class TestPrefixIndex:
+    """Test the compressed trie directly."""
+
+    def setup_method(self):
+        self.index = PrefixIndex([
+            {"text": "Amazon DynamoDB", "type": "tool", "id": "tool:1"},
+            {"text": "DynamoDB Global Tables", "type": "tool", "id": "tool:2"},
+            {"text": "Scaling Reads", "type": "pattern", "id": "pattern:scaling_reads"},
+        ])
+
+    def test_matches_any_word_start(self):
+        """Prefixes match the start of every word, not just the label."""
+        texts = [s["text"] for s in self.index.complete("dyn")]
+        assert texts == ["DynamoDB Global Tables", "Amazon DynamoDB"]
+
+    def test_prefix_ending_inside_compressed_edge(self):
+        """A prefix that stops mid-edge still resolves to that subtree."""
+        texts = [s["text"] for s in self.index.complete("amazon dynam")]
+        assert texts == ["Amazon DynamoDB"]
+
+    def test_no_duplicates(self):
+        """A label reachable through several words is returned once."""
+        ids = [s["id"] for s in self.index.complete("")]
+        assert len(ids) == len(set(ids))
+
+    def test_mismatch_returns_empty(self):
+        assert self.index.complete("dynamx") == []
+
+
+class TestAutocompleteEndpoint:
+    """Test the /api/autocomplete endpoint."""
+
+    def test_tool_completion(self):
+        response = client.get('/api/autocomplete?prefix=dyn')
+        assert response.status_code == 200
+
+        suggestions = response.json()['suggestions']
+        assert any(s['text'] == 'Amazon DynamoDB' for s in suggestions)
+        assert all(s['type'] == 'tool' for s in suggestions)
+
+    def test_mixed_kinds(self):
+        """Scenario and pattern titles are completed too."""
+        assert client.get('/api/autocomplete?prefix=scal').json()['suggestions'][0]['type'] == 'pattern'
+        assert client.get('/api/autocomplete?prefix=pay').json()['suggestions'][0]['type'] == 'scenario'
+
+    def test_limit(self):
+        suggestions = client.get('/api/autocomplete?prefix=a').json()['suggestions']
+        assert len(suggestions) == TOP_K
+
+        suggestions = client.get('/api/autocomplete?prefix=a&limit=3').json()['suggestions']
+        assert len(suggestions) == 3
+
+    def test_limit_above_top_k(self):
+        response = client.get(f'/api/autocomplete?prefix=a&limit={TOP_K + 1}')
+        assert response.status_code == 422
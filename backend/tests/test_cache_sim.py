@@ -0,0 +1,136 @@
+"""
+Tests for the cache policy simulator.
+
+Covers:
+- Zipf, scan and temporal trace generation
+- LRU, LFU, ARC, W-TinyLFU and TTL policies on hand-written and generated traces
+- Cache lab endpoint (/api/labs/cache) and its link from the caching pattern
+"""
+
+import pytest
+import numpy as np
+from fastapi.testclient import TestClient
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app
+import cache_sim
+from cache_sim import POLICIES, arc, generate_trace, hit_ratio_curves, lfu, lru, tinylfu, ttl
+
+client = TestClient(app)
+
+
+@pytest.fixture(scope="module")
+def traces():
+    return {kind: generate_trace(kind, 200_000, 20_000).tolist() for kind in ("zipf", "scan", "temporal")}
+
+
+class TestTraces:
+    """Test synthetic trace generation."""
+
+    def test_zipf_popularity(self):
+        """The most popular key gets about 1 / H(n) of the requests."""
+        trace = generate_trace("zipf", 200_000, 1000)
+        counts = np.bincount(trace, minlength=1000)
+        harmonic = np.sum(1 / np.arange(1, 1001))
+        assert counts.max() / len(trace) == pytest.approx(1 / harmonic, rel=0.05)
+
+    def test_scan_uses_cold_keys(self):
+        """A quarter of a scan trace reads keys outside the Zipf key space."""
+        trace = generate_trace("scan", 100_000, 1000)
+        assert np.mean(trace >= 1000) == pytest.approx(0.25, abs=0.01)
+
+    def test_temporal_hot_set_moves(self):
+        """The most requested key changes between the first and last phase."""
+        trace = generate_trace("temporal", 100_000, 1000)
+        first = np.bincount(trace[:10_000]).argmax()
+        last = np.bincount(trace[-10_000:]).argmax()
+        assert first != last
+
+    def test_unknown_kind(self):
+        """Unknown trace kinds are rejected."""
+        with pytest.raises(ValueError):
+            generate_trace("bursty", 10, 10)
+
+
+class TestPolicies:
+    """Test eviction behaviour."""
+
+    def test_lru_evicts_least_recent(self):
+        """1 is touched again, so 2 is evicted when 3 arrives."""
+        assert lru([1, 2, 1, 3, 1, 2], 2) == 2
+
+    def test_lfu_keeps_frequent(self):
+        """1 has the highest count and survives the stream of new keys."""
+        assert lfu([1, 1, 1, 2, 3, 4, 1], 2) == 3
+
+    def test_ttl_expires_entries(self):
+        """Entries stop hitting once their lifetime has passed."""
+        assert ttl([1, 1, 1, 1], 10, ttl=2) == 2
+
+    def test_large_cache_only_misses_cold(self, traces):
+        """With room for every key, only first accesses miss."""
+        trace = traces["zipf"][:20_000]
+        distinct = len(set(trace))
+        for name in ("lru", "lfu", "arc", "tinylfu"):
+            assert POLICIES[name](trace, 50_000, keyspace=40_000) == len(trace) - distinct, name
+
+    def test_hit_ratio_grows_with_size(self, traces):
+        """Every policy hits more with a bigger cache."""
+        for name, policy in POLICIES.items():
+            small = policy(traces["zipf"], 100, keyspace=40_000)
+            large = policy(traces["zipf"], 2000, keyspace=40_000)
+            assert large > small, name
+
+    def test_scan_resistance(self, traces):
+        """ARC and TinyLFU keep the hot set through scans; LRU does not."""
+        lru_hits = lru(traces["scan"], 500)
+        assert arc(traces["scan"], 500) > lru_hits * 1.1
+        assert tinylfu(traces["scan"], 500, keyspace=40_000) > lru_hits * 1.1
+
+    def test_lfu_stale_on_moving_hot_set(self, traces):
+        """LFU keeps keys that were popular in earlier phases."""
+        assert lfu(traces["temporal"], 500) < lru(traces["temporal"], 500)
+
+
+class TestCacheLabEndpoint:
+    """Test the API surface."""
+
+    def test_curves(self):
+        """One hit ratio per size for each requested policy."""
+        response = client.get('/api/labs/cache?trace=scan&length=20000&keys=5000&points=3&policies=lru,arc')
+        assert response.status_code == 200
+
+        data = response.json()
+        assert set(data['hit_ratios']) == {'lru', 'arc'}
+        assert len(data['sizes']) == 3
+        assert len(data['hit_ratios']['lru']) == 3
+        assert data['best'][0] in ('lru', 'arc')
+
+    def test_invalid_parameters(self):
+        """Unknown traces and policies are rejected."""
+        assert client.get('/api/labs/cache?trace=bursty').status_code == 422
+        assert client.get('/api/labs/cache?policies=lru,mru').status_code == 422
+
+    def test_work_budget(self):
+        """Runs replaying more requests than the budget are rejected before any work."""
+        assert client.get('/api/labs/cache?length=2000000&points=10').status_code == 400
+        assert client.get('/api/labs/cache?length=10000000').status_code == 422
+        # The default replay alone is at the budget, so a huge key space tips it over
+        assert client.get('/api/labs/cache?keys=10000000').status_code == 400
+
+    def test_sketch_sized_by_distinct_keys(self, monkeypatch):
+        """TinyLFU's per-key indexes cover the keys in the trace, not the key space."""
+        sized = []
+        sketch_indexes = cache_sim._sketch_indexes
+        monkeypatch.setattr(cache_sim, "_sketch_indexes", lambda keys, width: sized.append(keys) or sketch_indexes(keys, width))
+        hit_ratio_curves("zipf", 1000, 5_000_000, 1.0, 2, ("tinylfu",), seed=7)
+        assert sized and max(sized) <= 1000
+
+    def test_linked_from_pattern(self):
+        """The scaling reads pattern links to the cache lab."""
+        response = client.get('/api/reference/patterns/scaling_reads')
+        endpoints = [lab['endpoint'] for lab in response.json()['labs']]
+        assert '/api/labs/cache' in endpoints
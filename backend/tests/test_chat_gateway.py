@@ -0,0 +1,135 @@
+"""
+Tests for the WebSocket gateway load rig.
+
+Covers:
+- Pub/sub stand-in routing to the subscribed node
+- WebSocket endpoint: presence, group messages and offline inboxes
+- Complete delivery under each broadcast strategy with slow clients
+- Chat lab endpoint (/api/labs/chat) and its links from the chat and whatsapp scenarios
+"""
+
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+from starlette.testclient import TestClient as GatewayClient
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app
+from chat_gateway import SLOW_READ_SECONDS, STRATEGIES, Gateway, PubSub, _settle, create_app, drain_seconds, simulate
+
+client = TestClient(app)
+
+
+class TestPubSub:
+    """Test the pub/sub stand-in."""
+
+    def test_routes_to_subscribed_node(self):
+        """A publish reaches the node holding the user and nothing else."""
+        async def scenario():
+            broker = PubSub(2)
+            broker.subscribe(7, 1)
+            broker.publish(7, "hello", True)
+            broker.publish(8, "lost", True)
+            return broker.published, broker.queues[0].qsize(), broker.queues[1].get_nowait()
+
+        assert asyncio.run(scenario()) == (1, 0, (7, "hello", True))
+
+
+class TestGatewayEndpoint:
+    """Test the WebSocket endpoint with a real test client."""
+
+    def test_presence_and_messages(self):
+        """Contacts see each other come online, chat, and go offline."""
+        gateway = Gateway("per_connection", rooms=[[0, 1]], contacts=[[1], [0]])
+        with GatewayClient(create_app(gateway)) as ws_client:
+            with ws_client.websocket_connect("/ws/0") as alice:
+                with ws_client.websocket_connect("/ws/1") as bob:
+                    assert alice.receive_json()["online"] is True
+                    bob.send_json({"room": 0, "id": 1, "sent": 0.0})
+                    message = alice.receive_json()
+                    assert (message["type"], message["from"], message["id"]) == ("message", 1, 1)
+                presence = alice.receive_json()
+                assert (presence["user"], presence["online"]) == (1, False)
+
+    def test_offline_inbox(self):
+        """Messages to an offline member are delivered when they connect."""
+        gateway = Gateway("batched", rooms=[[0, 1]], contacts=[[], []])
+        with GatewayClient(create_app(gateway)) as ws_client:
+            with ws_client.websocket_connect("/ws/0") as alice:
+                alice.send_json({"room": 0, "id": 1, "sent": 0.0})
+                alice.send_json({"room": 0, "id": 2, "sent": 0.0})
+                with ws_client.websocket_connect("/ws/1") as bob:
+                    received = bob.receive_json()
+                    received = received if isinstance(received, list) else [received, bob.receive_json()]
+                    assert [m["id"] for m in received] == [1, 2]
+        assert gateway.stats["stored"] == 2
+
+
+class TestSimulation:
+    """Test the load rig end to end."""
+
+    @pytest.mark.parametrize("strategy", STRATEGIES)
+    def test_complete_delivery(self, strategy):
+        """Every online member gets every message; offline members get them on reconnect."""
+        result = asyncio.run(simulate(strategy, users=200, rooms=20, room_size=20, messages=200, rate=5000,
+                                      contacts=5, slow_share=0.05))
+        assert result["all_delivered"]
+        assert result["messages"]["deliveries"] == result["messages"]["expected_deliveries"] > 0
+        assert result["offline"]["delivered"] == result["offline"]["stored"] > 0
+        assert result["presence_storm"]["updates"] > 0
+        assert result["bytes_per_connection"] > 0
+        if strategy == "batched":
+            assert result["messages"]["frames_per_delivery"] <= 1
+        else:
+            assert result["messages"]["frames_per_delivery"] == 1
+
+    def test_stuck_handlers_are_cancelled(self):
+        """Handlers still busy when a phase times out are cancelled."""
+        async def settle():
+            stuck = asyncio.create_task(asyncio.sleep(60))
+            done = asyncio.create_task(asyncio.sleep(0))
+            settled = await _settle([stuck, done], timeout=0.05)
+            await asyncio.sleep(0)
+            return settled, stuck.cancelled(), done.done()
+
+        assert asyncio.run(settle()) == (False, True, True)
+
+    def test_drain_estimate(self):
+        """A room of slow readers drains one frame per slow read."""
+        assert drain_seconds(100, 100, 1000, 1.0) == pytest.approx(1000 * 99 / 100 * SLOW_READ_SECONDS)
+        assert drain_seconds(100, 100, 1000, 0.0) < drain_seconds(100, 100, 1000, 1.0)
+
+
+class TestChatEndpoint:
+    """Test the API surface."""
+
+    def test_lab(self):
+        """Requested strategies are run."""
+        response = client.get('/api/labs/chat?users=100&rooms=10&room_size=10&messages=50&contacts=5'
+                              '&strategies=batched,pubsub')
+        assert response.status_code == 200
+
+        data = response.json()
+        assert set(data) == {'batched', 'pubsub'}
+        assert data['pubsub']['broker_messages'] > 0
+
+    def test_invalid_parameters(self):
+        """Unknown strategies, oversized runs and impossible rooms are rejected."""
+        assert client.get('/api/labs/chat?strategies=multicast').status_code == 422
+        assert client.get('/api/labs/chat?users=1000000').status_code == 422
+        assert client.get('/api/labs/chat?users=20&room_size=50').status_code == 400
+
+    def test_drain_time_is_capped(self):
+        """Runs whose message backlog would take too long to drain are rejected."""
+        assert client.get('/api/labs/chat?messages=50000').status_code == 400
+        assert client.get('/api/labs/chat?users=100&room_size=100&slow_share=1&messages=5000'
+                          '&strategies=per_connection').status_code == 400
+
+    def test_linked_from_scenarios(self):
+        """The chat and whatsapp scenarios link to the lab."""
+        for scenario in ('chat', 'whatsapp'):
+            endpoints = [lab['endpoint'] for lab in client.get(f'/api/scenarios/{scenario}').json()['labs']]
+            assert '/api/labs/chat' in endpoints
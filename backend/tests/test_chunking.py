@@ -0,0 +1,126 @@
+"""
+Tests for the content-defined chunking and dedup engine.
+
+Covers:
+- Vectorized Gear hashing against the byte-at-a-time hash
+- Cut points matching byte-at-a-time Gear and FastCDC chunking, across segments
+- Chunk size bounds and normalized chunk size spread
+- Dedup index accounting and edit workload generation
+- Dedup of edited versions with fixed-size and content-defined chunking
+- Chunking lab endpoint (/api/labs/chunking) and its links
+"""
+
+import pytest
+import numpy as np
+from fastapi.testclient import TestClient
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app
+import chunking
+from chunking import GEAR, DedupIndex, benchmark, chunk_sizes, cut_points, gear_hashes, reference_cut_points
+
+client = TestClient(app)
+
+
+def random_bytes(size, seed=0):
+    return np.random.default_rng(seed).bytes(size)
+
+
+class TestGearHash:
+    """Test the vectorized rolling hash."""
+
+    def test_matches_rolling_hash(self):
+        """Every position matches the hash rolled one byte at a time."""
+        data = random_bytes(2000)
+        h, expected = 0, []
+        for byte in data:
+            h = ((h << 1) + int(GEAR[byte])) & 0xFFFFFFFF
+            expected.append(h)
+        assert gear_hashes(np.frombuffer(data, dtype=np.uint8)).tolist() == expected
+
+
+class TestCutPoints:
+    """Test chunk boundaries."""
+
+    @pytest.mark.parametrize("chunker", ["gear", "fastcdc"])
+    @pytest.mark.parametrize("avg_size", [1024, 8192])
+    def test_matches_reference(self, chunker, avg_size):
+        """Boundaries match the byte-at-a-time algorithm, including short files."""
+        for size in (0, 100, 3000, 200_000):
+            data = random_bytes(size, seed=size)
+            assert list(cut_points(np.frombuffer(data, dtype=np.uint8), chunker, avg_size)) == \
+                reference_cut_points(data, chunker, avg_size)
+
+    def test_across_segments(self, monkeypatch):
+        """Chunks spanning a segment boundary are cut as in one pass."""
+        monkeypatch.setattr(chunking, "SEGMENT", 1 << 16)
+        data = random_bytes(500_000, seed=1)
+        assert list(cut_points(np.frombuffer(data, dtype=np.uint8), "fastcdc", 4096)) == \
+            reference_cut_points(data, "fastcdc", 4096)
+
+    def test_size_bounds_and_normalization(self):
+        """Chunks stay within bounds, and FastCDC sizes spread less than Gear's."""
+        data = np.frombuffer(random_bytes(4 << 20, seed=2), dtype=np.uint8)
+        min_size, _, max_size = chunk_sizes(4096)
+        spread = {}
+        for chunker in ("gear", "fastcdc"):
+            sizes = np.diff(list(cut_points(data, chunker, 4096)), prepend=0)
+            assert sizes[:-1].min() >= min_size and sizes.max() <= max_size
+            spread[chunker] = sizes.std()
+        assert spread["fastcdc"] < spread["gear"]
+
+
+class TestDedup:
+    """Test the dedup index and edit workloads."""
+
+    def test_index_accounting(self):
+        """Repeated fingerprints count as logical bytes but are stored once."""
+        index = DedupIndex()
+        assert index.add(b"a" * 32, 100)
+        assert not index.add(b"a" * 32, 100)
+        assert index.add(b"b" * 32, 50)
+        assert (index.logical_bytes, index.stored_bytes, index.chunks) == (250, 150, 3)
+        assert index.memory_bytes() > 64
+
+    def test_content_defined_survives_edits(self):
+        """Inserts shift fixed-size chunks; content-defined chunks resync after an edit."""
+        result = benchmark(2 << 20, 2, 20, 4096)
+        fixed, fastcdc = result["chunkers"]["fixed"], result["chunkers"]["fastcdc"]
+        assert fastcdc["dedup_ratio"] > 2.5
+        assert fixed["dedup_ratio"] < 1.5
+        assert fastcdc["new_bytes_per_version"] < 0.2 < fixed["new_bytes_per_version"]
+        assert fastcdc["unique_chunks"] * chunking.PACKED_ENTRY_BYTES == fastcdc["packed_index_bytes"]
+
+
+class TestChunkingEndpoint:
+    """Test the API surface."""
+
+    def test_lab(self):
+        """Requested chunkers are benchmarked."""
+        response = client.get('/api/labs/chunking?size_mb=1&versions=1&edits=10&chunkers=fixed,fastcdc')
+        assert response.status_code == 200
+
+        data = response.json()
+        assert set(data['chunkers']) == {'fixed', 'fastcdc'}
+        assert data['chunkers']['fastcdc']['chunking_gb_per_second'] > 0
+
+    def test_invalid_parameters(self):
+        """Unknown chunkers, oversized files and uneven chunk sizes are rejected."""
+        assert client.get('/api/labs/chunking?chunkers=rabin').status_code == 422
+        assert client.get('/api/labs/chunking?size_mb=4096').status_code == 422
+        assert client.get('/api/labs/chunking?avg_size=5000').status_code == 400
+
+    def test_chunked_bytes_are_capped(self):
+        """Runs that would chunk too many bytes across versions and chunkers are rejected."""
+        assert client.get('/api/labs/chunking?size_mb=1024&versions=8').status_code == 400
+        assert client.get('/api/labs/chunking?size_mb=1024&versions=1&chunkers=gear,fastcdc').status_code == 400
+
+    def test_linked_from_scenario_and_pattern(self):
+        """Dropbox and the large blobs pattern link to the lab."""
+        scenario = client.get('/api/scenarios/dropbox').json()
+        pattern = client.get('/api/reference/patterns/handling_large_blobs').json()
+        assert '/api/labs/chunking' in [lab['endpoint'] for lab in scenario['labs']]
+        assert '/api/labs/chunking' in [lab['endpoint'] for lab in pattern['labs']]
@@ -0,0 +1,112 @@
+"""
+Tests for the seat reservation contention harness.
+
+Covers:
+- Lock service grants, expiry and compare-and-delete release
+- Double booking detection with no concurrency control
+- No double booking under pessimistic, optimistic, distributed lock and reservation strategies
+- Fencing when locks expire mid-booking, and abandoned reservation holds
+- Contention lab endpoint (/api/labs/contention) and its links
+"""
+
+import pytest
+import time
+from fastapi.testclient import TestClient
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app
+from contention import LockService, run, seat_choices
+
+client = TestClient(app)
+
+
+class TestLockService:
+    """Test the Redis lock stand-in."""
+
+    def test_exclusive_until_expiry(self):
+        """A held lock is refused to others until its TTL passes."""
+        locks = LockService()
+        first = locks.acquire("seat:1", 0.05)
+        assert first is not None
+        assert locks.acquire("seat:1", 0.05) is None
+        time.sleep(0.06)
+        assert locks.acquire("seat:1", 0.05) > first
+
+    def test_release_checks_token(self):
+        """Only the current holder can release a lock."""
+        locks = LockService()
+        token = locks.acquire("seat:1", 10)
+        locks.release("seat:1", token + 1)
+        assert locks.acquire("seat:1", 10) is None
+        locks.release("seat:1", token)
+        assert locks.acquire("seat:1", 10) is not None
+
+
+class TestStrategies:
+    """Test bookings under concurrent clients."""
+
+    def test_seat_choices_favour_front_rows(self):
+        """Lower-numbered seats are chosen more often."""
+        choices = seat_choices(2000, 100)
+        assert (choices < 10).mean() > (choices >= 90).mean()
+
+    def test_naive_double_books(self):
+        """Read-then-write with no control sells some seats twice."""
+        assert run("naive", clients=300, seats=20)["double_bookings"] > 0
+
+    @pytest.mark.parametrize("strategy", ["pessimistic", "optimistic", "distributed_lock", "reservation"])
+    def test_no_double_booking(self, strategy):
+        """Every controlled strategy sells each seat at most once."""
+        result = run(strategy, clients=300, seats=20)
+        assert result["double_bookings"] == 0
+        assert result["bookings"] == result["seats_sold"] <= 20
+        assert result["bookings"] + result["clients_without_seat"] == 300
+
+    def test_optimistic_aborts_on_conflict(self):
+        """Clients racing for the same seats lose version checks."""
+        assert run("optimistic", clients=300, seats=5)["abort_rate"] > 0
+
+    def test_fencing_with_expired_locks(self):
+        """Locks that expire mid-booking still never double book."""
+        result = run("distributed_lock", clients=200, seats=10, think=0.002, lock_ttl=0.0005)
+        assert result["double_bookings"] == 0
+
+    def test_failed_payments_leave_holds(self):
+        """Some holds are abandoned, so not every seat sells in the run."""
+        result = run("reservation", clients=300, seats=50, hold_ttl=60)
+        assert result["abandoned_holds"] > 0
+        assert result["seats_sold"] + result["abandoned_holds"] <= 50
+
+
+class TestContentionEndpoint:
+    """Test the API surface."""
+
+    def test_lab(self):
+        """Requested strategies report throughput and violations."""
+        response = client.get('/api/labs/contention?clients=50&seats=10&strategies=pessimistic,optimistic')
+        assert response.status_code == 200
+
+        data = response.json()['strategies']
+        assert set(data) == {'pessimistic', 'optimistic'}
+        assert data['pessimistic']['double_bookings'] == 0
+        assert data['optimistic']['bookings_per_second'] > 0
+
+    def test_invalid_parameters(self):
+        """Unknown strategies and oversized runs are rejected."""
+        assert client.get('/api/labs/contention?strategies=serializable').status_code == 422
+        assert client.get('/api/labs/contention?clients=100000').status_code == 422
+
+    def test_serialized_bookings_are_capped(self):
+        """Pessimistic locking's serial booking time is bounded up front."""
+        response = client.get('/api/labs/contention?clients=1000&seats=10000&think_ms=20')
+        assert response.status_code == 400
+
+    def test_linked_from_scenario_and_pattern(self):
+        """Ticketmaster and the contention pattern link to the lab."""
+        scenario = client.get('/api/scenarios/ticketmaster').json()
+        pattern = client.get('/api/reference/patterns/dealing_with_contention').json()
+        assert '/api/labs/contention' in [lab['endpoint'] for lab in scenario['labs']]
+        assert '/api/labs/contention' in [lab['endpoint'] for lab in pattern['labs']]
@@ -0,0 +1,101 @@
+"""
+Tests for back-of-envelope estimates.
+
+Covers:
+- Scale metadata on every blueprint
+- Vectorized estimates and parameter sweeps
+- Test mode scale hints and /api/scenarios/{type}/estimates
+"""
+
+import pytest
+import numpy as np
+from fastapi.testclient import TestClient
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app
+from estimates import SCALE_PARAMS, estimate, format_bytes, format_count, sweep
+from scenario_data import SCENARIO_BLUEPRINTS
+
+client = TestClient(app)
+
+
+class TestEstimates:
+    """Test the estimate engine."""
+
+    def test_every_blueprint_has_scale(self):
+        """Every blueprint carries numeric scale parameters."""
+        for blueprint in SCENARIO_BLUEPRINTS.values():
+            scale = blueprint["scale"]
+            assert scale["dau"] > 0
+            assert set(scale) <= set(SCALE_PARAMS)
+
+    def test_qps_from_dau(self):
+        """100M DAU making 10 reads a day is ~11.6K reads per second."""
+        result = estimate({
+            "dau": 100_000_000, "reads_per_user": 10, "writes_per_user": 0,
+            "write_size_bytes": 0, "read_size_bytes": 500, "retention_days": 1,
+        })
+        assert result["avg_read_qps"] == pytest.approx(11_574, rel=1e-3)
+        assert result["peak_qps"] == pytest.approx(3 * result["avg_qps"])
+
+    def test_sweep_matches_pointwise_estimates(self):
+        """A sweep evaluates the same formulas for every point at once."""
+        params = SCENARIO_BLUEPRINTS["bitly"]["scale"]
+        result = sweep(params, "dau", 1e6, 1e9, points=4)
+
+        assert result["values"] == pytest.approx([1e6, 1e7, 1e8, 1e9])
+        for i, dau in enumerate(result["values"]):
+            single = estimate({**params, "dau": dau})
+            assert result["estimates"]["storage_per_day"][i] == pytest.approx(float(single["storage_per_day"]))
+
+    def test_formatting(self):
+        """Counts and byte sizes use decimal suffixes."""
+        assert format_count(100_000_000) == "100M"
+        assert format_bytes(2.5e12) == "2.5 TB"
+
+
+class TestEstimateEndpoints:
+    """Test the API surface."""
+
+    def test_estimates(self):
+        """Baseline estimates come back with units."""
+        response = client.get('/api/scenarios/whatsapp/estimates')
+        assert response.status_code == 200
+
+        data = response.json()
+        assert data['parameters']['dau'] == 2_000_000_000
+        assert data['estimates']['peak_qps'] > data['estimates']['avg_qps']
+        assert data['units']['storage_per_day'] == 'bytes'
+        assert data['sweep'] is None
+
+    def test_sweep(self):
+        """A DAU sweep returns one value per point for every metric."""
+        response = client.get('/api/scenarios/feed/estimates?sweep=dau&start=1000000&stop=1000000000&points=10')
+        assert response.status_code == 200
+
+        sweep_data = response.json()['sweep']
+        assert len(sweep_data['values']) == 10
+        qps = sweep_data['estimates']['avg_qps']
+        assert len(qps) == 10
+        assert np.all(np.diff(qps) > 0)
+
+    def test_sweep_requires_range(self):
+        """A sweep without start/stop is rejected."""
+        response = client.get('/api/scenarios/feed/estimates?sweep=dau')
+        assert response.status_code == 400
+
+    def test_invalid_sweep_param(self):
+        """Only scale parameters can be swept."""
+        response = client.get('/api/scenarios/feed/estimates?sweep=bogus&start=1&stop=2')
+        assert response.status_code == 422
+
+    def test_test_scenario_scale(self):
+        """Every test scenario gets derived scale hints."""
+        for scenario in SCENARIO_BLUEPRINTS:
+            response = client.get(f'/api/test/scenario?scenario_type={scenario}')
+            scale = response.json()['scale']
+            assert scale['daily_active_users'].endswith('DAU')
+            assert 'Peak' in scale['requests_per_second']
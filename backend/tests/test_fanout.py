@@ -0,0 +1,125 @@
+"""
+Tests for the feed fan-out simulator.
+
+Covers:
+- Power-law follower graph generation and CSR adjacency
+- Capped timeline ring buffers
+- Push, pull and hybrid write amplification, read cost and agreement of feeds
+- Fan-out lab endpoint (/api/labs/fanout) and its link from the feed scenario
+"""
+
+import pytest
+import numpy as np
+from fastapi.testclient import TestClient
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app
+from fanout import FollowerGraph, _Timelines, estimated_deliveries, simulate
+
+client = TestClient(app)
+
+
+class TestGraph:
+    """Test follower graph generation."""
+
+    @pytest.fixture(scope="class")
+    def graph(self):
+        return FollowerGraph(5000, 50_000)
+
+    def test_adjacency_is_consistent(self, graph):
+        """Both CSR directions hold the same edges, with no self-follows or repeats."""
+        following = graph.following_counts()
+        follower = np.repeat(np.arange(graph.users), following)
+        out_edges = set(zip(follower.tolist(), graph.following.tolist()))
+        followee = np.repeat(np.arange(graph.users), graph.follower_counts())
+        in_edges = set(zip(graph.followers.tolist(), followee.tolist()))
+        assert out_edges == in_edges
+        assert len(out_edges) == graph.edges
+        assert all(a != b for a, b in out_edges)
+
+    def test_followers_are_skewed(self, graph):
+        """The most followed user has far more followers than the median."""
+        counts = graph.follower_counts()
+        assert counts.max() > 50 * np.median(counts)
+
+
+class TestTimelines:
+    """Test materialized timelines."""
+
+    def test_keeps_newest(self):
+        """Timelines return the newest posts first, capped at their size."""
+        timelines = _Timelines(3, 2)
+        timelines.append(np.array([0, 1, 0, 0]), np.array([10, 11, 12, 13]))
+        timelines.append(np.array([0]), np.array([14]))
+        assert timelines.read(0) == [14, 13]
+        assert timelines.read(1) == [11]
+        assert timelines.read(2) == []
+
+
+class TestStrategies:
+    """Test the fan-out comparison."""
+
+    @pytest.fixture(scope="class")
+    def result(self):
+        return simulate(20_000, 200_000, 20_000, 10_000, threshold=500)
+
+    def test_feeds_agree(self, result):
+        """Push, pull and hybrid build the same feeds."""
+        assert result["feeds_match"] == 1.0
+
+    def test_write_amplification(self, result):
+        """Push writes the most, pull one entry per post, hybrid in between."""
+        strategies = result["strategies"]
+        assert strategies["pull"]["write_amplification"] == 1.0
+        assert strategies["push"]["writes"] > strategies["hybrid"]["writes"] > strategies["pull"]["writes"]
+        assert strategies["hybrid"]["max_writes_per_post"] <= 500
+
+    def test_read_cost(self, result):
+        """Push reads one list, pull one per followee, hybrid adds celebrities only."""
+        strategies = result["strategies"]
+        assert strategies["push"]["lists_per_read"]["p99"] == 1
+        assert strategies["pull"]["lists_per_read"]["mean"] > strategies["hybrid"]["lists_per_read"]["mean"] > 1
+        assert strategies["pull"]["read_latency_ms"]["p99"] > strategies["hybrid"]["read_latency_ms"]["p99"]
+
+    def test_threshold_controls_hybrid(self):
+        """A threshold above every follower count makes hybrid the same as push."""
+        result = simulate(20_000, 200_000, 20_000, 10_000, threshold=10**9)
+        assert result["graph"]["celebrities"] == 0
+        assert result["strategies"]["hybrid"]["writes"] == result["strategies"]["push"]["writes"]
+
+    def test_deliveries_estimated_up_front(self, result):
+        """The delivery estimate is close to the push writes of a run."""
+        estimate = estimated_deliveries(20_000, 200_000, 20_000)
+        assert estimate == pytest.approx(result["strategies"]["push"]["writes"], rel=0.2)
+
+
+class TestFanoutEndpoint:
+    """Test the API surface."""
+
+    def test_lab(self):
+        """The lab reports every strategy for the requested graph."""
+        response = client.get('/api/labs/fanout?users=2000&edges=20000&posts=2000&reads=1000&threshold=100')
+        assert response.status_code == 200
+
+        data = response.json()
+        assert set(data['strategies']) == {'push', 'pull', 'hybrid'}
+        assert data['workload']['threshold'] == 100
+
+    def test_invalid_parameters(self):
+        """Oversized graphs and feeds are rejected."""
+        assert client.get('/api/labs/fanout?edges=100000000').status_code == 422
+        assert client.get('/api/labs/fanout?feed_size=1000').status_code == 422
+
+    def test_deliveries_are_capped(self):
+        """Runs whose fan-out would exceed the delivery budget are rejected."""
+        response = client.get('/api/labs/fanout?users=1000000&edges=20000000&posts=1000000&alpha=2')
+        assert response.status_code == 400
+
+    def test_linked_from_scenario(self):
+        """The feed scenario links to the fan-out lab."""
+        response = client.get('/api/scenarios/feed')
+        endpoints = [lab['endpoint'] for lab in response.json()['labs']]
+        assert '/api/labs/fanout' in endpoints
@@ -0,0 +1,130 @@
+"""
+Tests for the geospatial nearest-driver indexes.
+
+Covers:
+- Geohash encoding
+- Moving-driver workload generation
+- Exact k-nearest results from every index after location updates
+- KD-tree rebuilds and the benchmark harness
+- Geo lab endpoint (/api/labs/geo) and its link from the uber scenario
+"""
+
+import pytest
+import numpy as np
+from fastapi.testclient import TestClient
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app
+from geo_index import (
+    INDEX_TYPES, LAT_RANGE, LON_RANGE, REBUILD_SHARE, KDTreeIndex, benchmark,
+    brute_force_nearest, geohash, moving_drivers, _CellIndex,
+)
+
+client = TestClient(app)
+
+
+class TestGeohash:
+    """Test geohash encoding."""
+
+    def test_known_value(self):
+        """Matches the reference example from the geohash description."""
+        assert geohash(57.64911, 10.40744, 11) == "u4pruydqqvj"
+
+    def test_prefix_of_longer_hash(self):
+        """A shorter geohash is a prefix of a longer one for the same point."""
+        assert geohash(37.7749, -122.4194, 9).startswith(geohash(37.7749, -122.4194, 5))
+
+
+class TestWorkload:
+    """Test the moving-driver generator."""
+
+    def test_every_driver_reports(self):
+        """Each driver reports once every four seconds, inside the metro area."""
+        lat, lon, ticks = moving_drivers(1000, 8, 10)
+        reports = np.concatenate([tick[0] for tick in ticks])
+        assert np.bincount(reports, minlength=1000).tolist() == [2] * 1000
+        lats = np.concatenate([tick[1] for tick in ticks])
+        assert lats.min() >= LAT_RANGE[0] and lats.max() <= LAT_RANGE[1]
+        assert len(ticks[0][3]) == 10
+
+    def test_drivers_move_slowly(self):
+        """Reports four seconds apart are within city driving distance."""
+        lat, lon, ticks = moving_drivers(1000, 5, 1)
+        first, later = ticks[0], ticks[4]
+        assert first[0] == later[0]
+        moved_km = np.abs(np.array(later[1]) - np.array(first[1])) * 110.574
+        assert moved_km.max() < 4 * 50 / 3600 + 1e-9
+
+
+class TestIndexes:
+    """Test k-nearest results against a brute-force scan."""
+
+    @pytest.mark.parametrize("name", list(INDEX_TYPES))
+    def test_exact_after_updates(self, name):
+        """Every index returns the brute-force nearest drivers, in order."""
+        lat, lon, ticks = moving_drivers(3000, 6, 50, seed=1)
+        index = INDEX_TYPES[name](lat, lon)
+        lat, lon = lat.copy(), lon.copy()
+        for ids, lats, lons, _, _ in ticks:
+            for driver, a, o in zip(ids, lats, lons):
+                index.update(driver, a, o)
+            lat[ids], lon[ids] = lats, lons
+        for a, o in zip(ticks[-1][3], ticks[-1][4]):
+            assert index.nearest(a, o, 8) == brute_force_nearest(lat, lon, a, o, 8).tolist()
+
+    @pytest.mark.parametrize("name", list(INDEX_TYPES))
+    def test_query_outside_hotspots(self, name):
+        """A query in an empty corner still finds the closest drivers."""
+        lat = np.array([37.5, 37.6, 37.9])
+        lon = np.array([-122.0, -122.3, -122.5])
+        index = INDEX_TYPES[name](lat, lon)
+        assert index.nearest(LAT_RANGE[0], LON_RANGE[1], 2) == [0, 1]
+
+    def test_kdtree_rebuilds(self):
+        """The KD-tree rebuilds once the moved-driver buffer fills."""
+        lat, lon, ticks = moving_drivers(1000, 4, 1)
+        index = KDTreeIndex(lat, lon)
+        ids, lats, lons = ticks[0][:3]
+        for driver, a, o in zip(ids, lats, lons):
+            index.update(driver, a, o)
+        assert index.rebuilds > 0
+        assert index.buffered <= REBUILD_SHARE * 1000
+
+    def test_cell_index_is_abstract(self):
+        """The cell index base class cannot be built without a cell key."""
+        lat, lon, _ = moving_drivers(10, 1, 1)
+        with pytest.raises(TypeError):
+            _CellIndex(lat, lon)
+
+
+class TestGeoBenchmark:
+    """Test the benchmark harness and API surface."""
+
+    def test_benchmark(self):
+        """Every index reports throughput and full recall."""
+        result = benchmark(2000, 4, 100)
+        assert result["workload"]["updates"] == 2000
+        for name, stats in result["indexes"].items():
+            assert stats["recall"] == 1.0, name
+            assert stats["updates_per_second"] > 0
+            assert stats["queries_per_second"] > 0
+
+    def test_lab(self):
+        """Requested indexes are benchmarked."""
+        response = client.get('/api/labs/geo?drivers=1000&seconds=2&queries_per_second=50&indexes=grid,quadtree')
+        assert response.status_code == 200
+        assert set(response.json()['indexes']) == {'grid', 'quadtree'}
+
+    def test_invalid_parameters(self):
+        """Unknown indexes and oversized workloads are rejected."""
+        assert client.get('/api/labs/geo?indexes=rtree').status_code == 422
+        assert client.get('/api/labs/geo?drivers=10000000').status_code == 422
+
+    def test_linked_from_scenario(self):
+        """The uber scenario links to the geo lab."""
+        response = client.get('/api/scenarios/uber')
+        endpoints = [lab['endpoint'] for lab in response.json()['labs']]
+        assert '/api/labs/geo' in endpoints
@@ -0,0 +1,197 @@
+"""
+Tests for the activity journal.
+
+Covers:
+- Events answered with their applier's result after commit
+- Group commit: a burst of events shares one batch
+- Journal rows, checkpoint and applied changes
+- Replay of journaled events left unapplied by a crash, exactly once
+- A failing applier rolls back only its own event; a failed apply is picked up by the next batch
+- Stopping the writer after draining the queue
+- Cancelled events kept out of the journal, and 503s for writes that were dropped
+- Favorite endpoints (/api/favorites) writing through the journal
+"""
+
+import pytest
+from concurrent.futures import wait
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main
+from main import app
+from database import Base
+import journal as journal_module
+from journal import ActivityJournal
+from models import ActivityEvent, Favorite, JournalCheckpoint
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'journal.db'}")
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+class TestGroupCommit:
+    """Test the writer thread."""
+
+    def test_results_after_commit(self, engine):
+        """Each event gets its applier's result and is applied once committed."""
+        journal = ActivityJournal(engine)
+        assert journal.submit("favorite_added", {"tool_id": 3}).result(5)["message"] == "Favorited"
+        assert journal.submit("favorite_added", {"tool_id": 3}).result(5)["message"] == "Already favorited"
+        assert journal.submit("favorite_removed", {"tool_id": 3}).result(5) == {"message": "Unfavorited"}
+        assert journal.submit("favorite_removed", {"tool_id": 3}).result(5) is None
+        journal.stop()
+        with journal.sessions() as session:
+            assert session.query(ActivityEvent).count() == 4
+            assert session.get(JournalCheckpoint, 1).applied_seq == 4
+            assert session.query(Favorite).count() == 0
+
+    def test_burst_shares_a_commit(self, engine):
+        """Events arriving within the commit window are committed as one batch."""
+        journal = ActivityJournal(engine, window_ms=500)
+        journal.start()
+        futures = [journal.submit("favorite_added", {"tool_id": i}) for i in range(1, 101)]
+        wait(futures, timeout=10)
+        journal.stop()
+        assert journal.events == 100
+        assert journal.batches == 1
+        orders = sorted(future.result()["favorite_id"] for future in futures)
+        assert orders == list(range(1, 101))
+
+    def test_stop_drains_queue(self, engine):
+        """Stopping commits every event queued before it."""
+        journal = ActivityJournal(engine, window_ms=0)
+        futures = [journal.submit("favorite_added", {"tool_id": i}) for i in range(1, 21)]
+        journal.stop()
+        assert all(future.done() for future in futures)
+        assert journal.thread is None
+
+    def test_unknown_kind(self, engine):
+        """Events without an applier are refused before they reach the journal."""
+        with pytest.raises(ValueError):
+            ActivityJournal(engine).submit("review_posted", {})
+
+
+class TestCancel:
+    """Test giving up on a write."""
+
+    def test_cancelled_event_is_not_journaled(self, engine):
+        """An event cancelled while still queued never reaches the journal."""
+        journal = ActivityJournal(engine, window_ms=500)
+        journal.start()
+        kept = journal.submit("favorite_added", {"tool_id": 1})
+        dropped = journal.submit("favorite_added", {"tool_id": 2})
+        assert dropped.cancel()
+        assert kept.result(5)["message"] == "Favorited"
+        journal.stop()
+        assert journal.events == 1
+        with journal.sessions() as session:
+            assert [f.tool_id for f in session.query(Favorite).all()] == [1]
+
+    def test_timed_out_write_is_dropped(self, engine, monkeypatch):
+        """A write that times out in the queue is a 503 and is never applied."""
+        journal = ActivityJournal(engine, window_ms=2000)
+        monkeypatch.setattr(main, "get_activity_journal", lambda: journal)
+        monkeypatch.setattr(main, "WRITE_TIMEOUT_SECONDS", 0.05)
+        tool_id = client.get('/api/tools').json()[0]['id']
+        assert client.post(f'/api/favorites/{tool_id}').status_code == 503
+        journal.stop()
+        assert journal.events == 0
+
+
+class TestReplay:
+    """Test crash recovery."""
+
+    def test_replay_applies_unapplied_events(self, engine):
+        """Events journaled past the checkpoint are applied on start, and only once."""
+        journal = ActivityJournal(engine)
+        with journal.sessions() as session:
+            # As if the process died after the journal commit and before applying
+            session.add_all([ActivityEvent(kind="favorite_added", payload='{"tool_id": 7}'),
+                             ActivityEvent(kind="favorite_added", payload='{"tool_id": 8}'),
+                             ActivityEvent(kind="favorite_removed", payload='{"tool_id": 7}')])
+            session.commit()
+        journal.start()
+        journal.stop()
+        assert journal.replayed == 3
+        assert journal.replay() == 0
+        with journal.sessions() as session:
+            assert [f.tool_id for f in session.query(Favorite).all()] == [8]
+            assert session.get(JournalCheckpoint, 1).applied_seq == 3
+
+
+class TestFailures:
+    """Test that failures never leave events behind the checkpoint."""
+
+    def test_failing_applier_only_fails_its_event(self, engine, monkeypatch):
+        """The failing event's writes are rolled back; the rest of its batch is applied."""
+        def flaky(session, payload):
+            session.add(Favorite(tool_id=payload["tool_id"], pinned_order=99))
+            session.flush()
+            raise RuntimeError("applier failed")
+        monkeypatch.setitem(journal_module.APPLIERS, "flaky", flaky)
+        journal = ActivityJournal(engine, window_ms=500)
+        journal.start()
+        failing = journal.submit("flaky", {"tool_id": 1})
+        succeeding = journal.submit("favorite_added", {"tool_id": 2})
+        with pytest.raises(RuntimeError):
+            failing.result(5)
+        assert succeeding.result(5)["message"] == "Favorited"
+        journal.stop()
+        assert journal.batches == 1
+        assert journal.failed == 1
+        assert journal.replay() == 0
+        with journal.sessions() as session:
+            assert [f.tool_id for f in session.query(Favorite).all()] == [2]
+            assert session.get(JournalCheckpoint, 1).applied_seq == 2
+
+    def test_failed_apply_is_not_skipped(self, engine, monkeypatch):
+        """Events journaled by a batch whose apply failed are applied by the next batch."""
+        apply = ActivityJournal._apply
+        calls = []
+
+        def apply_failing_once(self, session, events):
+            calls.append([event.seq for event in events])
+            if len(calls) == 1:
+                raise RuntimeError("apply failed")
+            return apply(self, session, events)
+        monkeypatch.setattr(ActivityJournal, "_apply", apply_failing_once)
+        journal = ActivityJournal(engine)
+        with pytest.raises(RuntimeError):
+            journal.submit("favorite_added", {"tool_id": 1}).result(5)
+        assert journal.submit("favorite_added", {"tool_id": 2}).result(5)["message"] == "Favorited"
+        journal.stop()
+        assert calls == [[1], [1, 2]]
+        with journal.sessions() as session:
+            assert sorted(f.tool_id for f in session.query(Favorite).all()) == [1, 2]
+            assert session.get(JournalCheckpoint, 1).applied_seq == 2
+
+
+class TestFavoritesEndpoints:
+    """Test the favorite endpoints through the journal."""
+
+    def test_toggle(self):
+        """Favoriting and unfavoriting are visible as soon as the requests return."""
+        tool_id = client.get('/api/tools').json()[-1]['id']
+        client.delete(f'/api/favorites/{tool_id}')
+        response = client.post(f'/api/favorites/{tool_id}')
+        assert response.status_code == 200
+        assert response.json()['message'] == 'Favorited'
+        assert tool_id in [f['tool_id'] for f in client.get('/api/favorites').json()]
+        assert client.post(f'/api/favorites/{tool_id}').json()['message'] == 'Already favorited'
+        assert client.delete(f'/api/favorites/{tool_id}').json() == {'message': 'Unfavorited'}
+        assert tool_id not in [f['tool_id'] for f in client.get('/api/favorites').json()]
+
+    def test_not_found(self):
+        """Unknown tools and missing favorites are 404s."""
+        assert client.post('/api/favorites/999999').status_code == 404
+        assert client.delete('/api/favorites/999999').status_code == 404
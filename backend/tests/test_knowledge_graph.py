@@ -0,0 +1,102 @@
+"""
+Tests for the knowledge graph and its endpoints.
+
+Covers:
+- CSR adjacency structure
+- Name-mention and explicit scenario edges
+- Neighbourhood and k-hop endpoints (/api/graph/neighbors, /api/graph/related)
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app
+from knowledge_graph import get_knowledge_graph
+
+client = TestClient(app)
+
+
+class TestKnowledgeGraph:
+    """Test graph construction."""
+
+    def test_csr_arrays_are_consistent(self):
+        """indptr has one entry per node plus one and indexes into indices."""
+        graph = get_knowledge_graph()
+        assert len(graph.indptr) == len(graph.nodes) + 1
+        assert graph.indptr[-1] == len(graph.indices)
+        assert len(graph.indices) == graph.edge_count * 2
+
+    def test_edges_are_symmetric(self):
+        """Every edge appears in both endpoints' adjacency lists."""
+        graph = get_knowledge_graph()
+        for node in range(len(graph.nodes)):
+            for neighbour in graph.neighbors(node):
+                assert node in graph.neighbors(neighbour)
+
+    def test_scenario_links_to_blueprint_tools(self):
+        """Scenario nodes link to the tools listed in the blueprint."""
+        graph = get_knowledge_graph()
+        payments = graph.resolve("scenario:payments")
+        neighbour_labels = {graph.nodes[n]["label"] for n in graph.neighbors(payments)}
+        assert "Amazon DynamoDB" in neighbour_labels
+        assert "Amazon SQS (Standard)" in neighbour_labels
+
+    def test_resolve_by_alias(self):
+        """Tool nodes resolve by any alias from the alias map."""
+        graph = get_knowledge_graph()
+        node = graph.resolve("Kafka")
+        assert node is not None
+        assert graph.nodes[node]["label"] == "Amazon MSK (Managed Kafka)"
+
+
+class TestGraphEndpoints:
+    """Test graph query API endpoints."""
+
+    def test_neighbors_by_tool_name(self):
+        """A tool can be looked up by its short name."""
+        response = client.get('/api/graph/neighbors?node=DynamoDB')
+        assert response.status_code == 200
+
+        data = response.json()
+        assert data['node']['type'] == 'tool'
+        assert data['total'] == len(data['neighbors'])
+        assert any(n['id'] == 'scenario:payments' for n in data['neighbors'])
+
+    def test_neighbors_filtered_by_type(self):
+        """node_type restricts neighbours to a single type."""
+        response = client.get('/api/graph/neighbors?node=DynamoDB&node_type=scenario')
+        assert response.status_code == 200
+
+        data = response.json()
+        assert data['total'] > 0
+        assert all(n['type'] == 'scenario' for n in data['neighbors'])
+
+    def test_related_within_two_hops(self):
+        """Two-hop results include tools that share a scenario."""
+        response = client.get('/api/graph/related?node=DynamoDB&hops=2&node_type=tool')
+        assert response.status_code == 200
+
+        data = response.json()
+        assert all(item['hops'] <= 2 for item in data['related'])
+        names = {item['label'] for item in data['related']}
+        assert 'Amazon SQS (Standard)' in names
+
+    def test_related_ordered_by_distance(self):
+        """Results come back in breadth-first order."""
+        response = client.get('/api/graph/related?node=scenario:payments&hops=3')
+        hops = [item['hops'] for item in response.json()['related']]
+        assert hops == sorted(hops)
+
+    def test_unknown_node(self):
+        """Unknown nodes return 404."""
+        response = client.get('/api/graph/neighbors?node=not-a-node')
+        assert response.status_code == 404
+
+    def test_invalid_hops(self):
+        """hops outside 1-4 is rejected."""
+        response = client.get('/api/graph/related?node=DynamoDB&hops=5')
+        assert response.status_code == 422
@@ -0,0 +1,116 @@
+"""
+Tests for the Monte Carlo latency model.
+
+Covers:
+- Classifying flow steps into latency kinds and branches
+- Percentiles, branch probabilities and tail attribution
+- Latency endpoint (/api/scenarios/{type}/latency)
+"""
+
+import pytest
+import numpy as np
+from fastapi.testclient import TestClient
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app
+from latency_sim import classify_step, quantiles, simulate_flow, simulate_scenario
+from scenario_data import SCENARIO_BLUEPRINTS
+
+client = TestClient(app)
+
+
+class TestClassification:
+    """Test flow step classification."""
+
+    def test_kinds(self):
+        """Steps are classified by the component they touch."""
+        assert classify_step("Read Service checks Redis cache for short code")[0] == "cache"
+        assert classify_step("Send authorization request to Card Processor")[0] == "external"
+        assert classify_step("Publish PaymentAuthorized event to SQS")[0] == "queue"
+        assert classify_step("Webhook Service notifies merchant")[0] == "async"
+
+    def test_branches(self):
+        """'On cache miss:' and 'If ...,' prefixes mark conditional steps."""
+        assert classify_step("On cache miss: query database for shortCode")[:2] == ("database", "miss")
+        assert classify_step("On CDN miss: request routes through Load Balancer")[:2] == ("gateway", "cdn_miss")
+        assert classify_step("If new, validate payment method and amount")[1] == "if"
+
+    def test_every_flow_has_request_path_steps(self):
+        """Every flow has at least one step on the request path."""
+        for blueprint in SCENARIO_BLUEPRINTS.values():
+            for flow in blueprint["deep_dive"].get("flows", []):
+                kinds = [classify_step(step)[0] for step in flow["steps"]]
+                assert any(kind != "async" for kind in kinds), flow["name"]
+
+
+class TestSimulation:
+    """Test sampling and aggregation."""
+
+    def test_quantiles_match_sorted_ranks(self):
+        """Partition-based quantiles pick the same ranks as a full sort."""
+        values = np.random.default_rng(0).random(10_001)
+        expected = np.sort(values)[[5000, 9500, 9900]]
+        assert quantiles(values, (0.5, 0.95, 0.99)) == pytest.approx(expected)
+
+    def test_percentiles_are_ordered(self):
+        """p50 <= p95 <= p99 for every flow."""
+        for flow in simulate_scenario("uber"):
+            assert 0 < flow["p50_ms"] <= flow["p95_ms"] <= flow["p99_ms"]
+
+    def test_hit_and_miss_are_complementary(self):
+        """Cache hit and miss branches split requests by the hit ratio."""
+        flow = simulate_flow(
+            ["On cache hit: return value from Redis", "On cache miss: query database"],
+            samples=10_000, cache_hit_ratio=0.8, branch_probability=0.5, client_region="us",
+        )
+        hit, miss = flow["steps"]
+        assert hit["probability"] == pytest.approx(0.8)
+        assert miss["probability"] == pytest.approx(0.2)
+
+    def test_misses_raise_latency(self):
+        """A colder cache makes the redirect flow slower."""
+        warm = simulate_scenario("bitly", 20_000, 0.99)
+        cold = simulate_scenario("bitly", 20_000, 0.0)
+        assert cold[1]["p50_ms"] > warm[1]["p50_ms"]
+
+    def test_tail_step(self):
+        """The card processor dominates the payment flow's tail."""
+        flow = simulate_scenario("payments")[0]
+        assert "Card Processor" in flow["tail_step"]["text"]
+
+    def test_results_are_cached(self):
+        """Repeated calls with the same parameters reuse the result."""
+        assert simulate_scenario("chat", 5000) is simulate_scenario("chat", 5000)
+
+
+class TestLatencyEndpoint:
+    """Test the API surface."""
+
+    def test_latency(self):
+        """Per-flow percentiles come back with their parameters."""
+        response = client.get('/api/scenarios/payments/latency?samples=20000&client_region=asia')
+        assert response.status_code == 200
+
+        data = response.json()
+        assert data['parameters']['client_region'] == 'asia'
+        assert len(data['flows']) == len(SCENARIO_BLUEPRINTS['payments']['deep_dive']['flows'])
+        assert data['flows'][0]['p99_ms'] >= data['flows'][0]['p50_ms']
+
+    def test_farther_region_is_slower(self):
+        """Clients in Asia see higher latency than clients in the US."""
+        us = client.get('/api/scenarios/bitly/latency?samples=20000').json()
+        asia = client.get('/api/scenarios/bitly/latency?samples=20000&client_region=asia').json()
+        assert asia['flows'][0]['p50_ms'] > us['flows'][0]['p50_ms']
+
+    def test_unknown_scenario(self):
+        """Unknown scenarios return 404."""
+        response = client.get('/api/scenarios/nope/latency')
+        assert response.status_code == 404
+
+    def test_invalid_parameters(self):
+        """Out-of-range ratios and unknown regions are rejected."""
+        assert client.get('/api/scenarios/bitly/latency?cache_hit_ratio=1.5').status_code == 422
+        assert client.get('/api/scenarios/bitly/latency?client_region=mars').status_code == 422
@@ -0,0 +1,115 @@
+"""
+Tests for the partitioning simulator.
+
+Covers:
+- Jump consistent hash against the scalar reference algorithm
+- Ring, jump and rendezvous assignments for several node counts
+- Load balance and keys moved on node add and remove
+- Partitioning lab endpoint (/api/labs/partitioning) and its link from the sharding pattern
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app
+from partitioning import SCHEMES, jump, key_hashes, ring, rendezvous, simulate
+
+client = TestClient(app)
+
+
+def _jump_reference(key: int, buckets: int) -> int:
+    """Lamping and Veach's loop on Python integers."""
+    b, j = -1, 0
+    while j < buckets:
+        b = j
+        key = (key * 2862933555777941757 + 1) % 2**64
+        j = int((b + 1) * (float(1 << 31) / float((key >> 33) + 1)))
+    return b
+
+
+class TestSchemes:
+    """Test key assignment."""
+
+    def test_jump_matches_reference(self):
+        """Vectorized jump hash gives the same bucket as the scalar loop."""
+        hashes = key_hashes(2000)
+        counts = (1, 7, 8, 50)
+        for n, buckets in zip(counts, jump(hashes, counts)):
+            assert buckets.tolist() == [_jump_reference(int(h), n) for h in hashes], n
+
+    def test_ring_moves_only_to_new_node(self):
+        """Adding a node only takes the arcs in front of its virtual nodes."""
+        hashes = key_hashes(50_000)
+        small, large = ring(hashes, (3, 4), vnodes=10)
+        assert set(large[small != large].tolist()) == {3}
+
+    def test_rendezvous_moves_only_to_new_node(self):
+        """Adding a node only takes keys for the new node."""
+        hashes = key_hashes(50_000)
+        small, large = rendezvous(hashes, (5, 6))
+        assert set(large[small != large].tolist()) == {5}
+
+    def test_assignments_in_range(self):
+        """Every key lands on one of the nodes."""
+        for name in SCHEMES:
+            result = simulate(20_000, 7, 20, schemes=(name,))
+            assert result["schemes"][name]["load"]["min_over_mean"] > 0, name
+
+
+class TestMovement:
+    """Test balance and keys moved."""
+
+    @pytest.fixture(scope="class")
+    def result(self):
+        return simulate(200_000, 10, 100)
+
+    def test_modulo_moves_most_keys(self, result):
+        """Changing the modulus reassigns about N / (N + 1) of the keys."""
+        assert result["schemes"]["modulo"]["moved_on_add"] > 0.85
+        assert result["schemes"]["modulo"]["moved_on_remove"] > 0.85
+
+    @pytest.mark.parametrize("name", ["ring", "jump", "rendezvous"])
+    def test_consistent_schemes_move_one_share(self, result, name):
+        """Consistent schemes move close to the ideal share of keys."""
+        scheme, ideal = result["schemes"][name], result["ideal"]
+        assert scheme["moved_on_add"] == pytest.approx(ideal["moved_on_add"], abs=0.03)
+        assert scheme["moved_on_remove"] == pytest.approx(ideal["moved_on_remove"], abs=0.03)
+
+    def test_vnodes_even_out_ring(self):
+        """More virtual nodes per node lower the ring's imbalance."""
+        few = simulate(200_000, 10, 1, schemes=("ring",))["schemes"]["ring"]["load"]
+        many = simulate(200_000, 10, 200, schemes=("ring",))["schemes"]["ring"]["load"]
+        assert many["max_over_mean"] < few["max_over_mean"]
+
+    def test_jump_is_balanced(self, result):
+        """Jump hash spreads keys almost perfectly."""
+        assert result["schemes"]["jump"]["load"]["max_over_mean"] < 1.05
+
+
+class TestPartitioningEndpoint:
+    """Test the API surface."""
+
+    def test_lab(self):
+        """Requested schemes report load and movement against the ideal."""
+        response = client.get('/api/labs/partitioning?keys=20000&nodes=5&schemes=jump,modulo')
+        assert response.status_code == 200
+
+        data = response.json()
+        assert set(data['schemes']) == {'jump', 'modulo'}
+        assert data['ideal']['moved_on_add'] == pytest.approx(1 / 6, abs=1e-4)
+        assert data['schemes']['jump']['keys_evaluated'] == 20000
+
+    def test_invalid_parameters(self):
+        """Unknown schemes and a single node are rejected."""
+        assert client.get('/api/labs/partitioning?schemes=ring,range').status_code == 422
+        assert client.get('/api/labs/partitioning?nodes=1').status_code == 422
+
+    def test_linked_from_pattern(self):
+        """The scaling writes pattern links to the partitioning lab."""
+        response = client.get('/api/reference/patterns/scaling_writes')
+        endpoints = [lab['endpoint'] for lab in response.json()['labs']]
+        assert '/api/labs/partitioning' in endpoints
@@ -0,0 +1,164 @@
+"""
+Tests for the probabilistic data structures.
+
+Covers:
+- Key hashing and double-hashed probe positions
+- Bloom filter false positives against theory, and no false negatives
+- Counting Bloom filter removal and saturated counters
+- HyperLogLog distinct counts and merging
+- Count-min sketch estimates and their error bound
+- Space-Saving heavy hitters, labels and error bounds
+- Sketches lab endpoint (/api/labs/sketches) and its links
+"""
+
+import numpy as np
+from fastapi.testclient import TestClient
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app
+from probabilistic import (COUNTER_MAX, BloomFilter, CountingBloomFilter, CountMinSketch, HyperLogLog, SpaceSaving,
+                           hash_keys, probes, zipf_stream)
+
+client = TestClient(app)
+
+
+class TestHashing:
+    """Test key hashing."""
+
+    def test_integer_and_string_keys(self):
+        """Integer arrays and strings hash deterministically to distinct 64-bit values."""
+        ints = hash_keys(np.arange(1000))
+        strings = hash_keys([f"key-{i}" for i in range(1000)])
+        assert ints.dtype == strings.dtype == np.uint64
+        assert len(set(ints.tolist())) == len(set(strings.tolist())) == 1000
+        assert (hash_keys(["key-7"]) == strings[7]).all()
+
+    def test_probes_in_range(self):
+        """Every probe falls inside the array, one row of probes per key."""
+        positions = probes(hash_keys(np.arange(500)), 7, 1000)
+        assert positions.shape == (500, 7)
+        assert positions.max() < 1000
+
+
+class TestBloomFilter:
+    """Test the Bloom filters."""
+
+    def test_false_positive_rate(self):
+        """No inserted key is missed and the false positive rate is close to theory."""
+        bloom = BloomFilter(20_000, 0.01)
+        bloom.add(np.arange(20_000))
+        assert bloom.contains(np.arange(20_000)).all()
+        rate = bloom.contains(np.arange(20_000, 120_000)).mean()
+        assert abs(rate - bloom.expected_false_positive_rate(20_000)) < 0.004
+        assert bloom.nbytes * 8 / 20_000 < 10
+
+    def test_counting_remove(self):
+        """Removed keys are gone while the others stay present."""
+        bloom = CountingBloomFilter(10_000, 0.01)
+        bloom.add(np.arange(10_000))
+        bloom.remove(np.arange(0, 10_000, 2))
+        assert bloom.contains(np.arange(1, 10_000, 2)).all()
+        assert bloom.contains(np.arange(0, 10_000, 2)).mean() < 0.01
+
+    def test_saturated_counters_stick(self):
+        """A counter at its maximum is not decremented, so no false negatives appear."""
+        bloom = CountingBloomFilter(100, 0.01)
+        bloom.add(np.zeros(COUNTER_MAX + 10, dtype=np.int64))
+        bloom.remove(np.zeros(COUNTER_MAX + 10, dtype=np.int64))
+        assert bloom.contains(np.zeros(1, dtype=np.int64)).all()
+
+
+class TestHyperLogLog:
+    """Test HyperLogLog."""
+
+    def test_estimate_within_error(self):
+        """Estimates are within a few standard errors, small and large."""
+        for distinct in (100, 50_000, 1_000_000):
+            hll = HyperLogLog(14)
+            hll.add(np.arange(distinct))
+            assert abs(hll.estimate() / distinct - 1) < 4 * hll.standard_error()
+
+    def test_merge(self):
+        """Merging two sketches estimates the union, counting shared keys once."""
+        left, right = HyperLogLog(12), HyperLogLog(12)
+        left.add(np.arange(0, 60_000))
+        right.add(np.arange(40_000, 100_000))
+        left.merge(right)
+        assert abs(left.estimate() / 100_000 - 1) < 4 * left.standard_error()
+
+
+class TestCountMinSketch:
+    """Test the count-min sketch."""
+
+    def test_never_underestimates(self):
+        """Estimates are never low and stay within the error bound."""
+        stream = zipf_stream(200_000, 20_000)
+        sketch = CountMinSketch.from_error(0.001, 0.01)
+        sketch.add(stream)
+        keys = np.arange(20_000, dtype=np.uint64)
+        over = sketch.estimate(keys) - np.bincount(stream.astype(np.intp), minlength=20_000)
+        assert over.min() >= 0
+        assert (over <= sketch.error_bound()).mean() > 0.99
+
+    def test_weighted_string_keys(self):
+        """Counts can be added in bulk for string keys."""
+        sketch = CountMinSketch()
+        sketch.add(["/api/tools", "/api/search", "/api/tools"], [5, 2, 1])
+        assert sketch.estimate(["/api/tools", "/api/search"]).tolist() == [6, 2]
+        assert sketch.total == 8
+
+
+class TestSpaceSaving:
+    """Test Space-Saving top-k."""
+
+    def test_heavy_hitters_kept(self):
+        """Every key above N / k is kept and counts are high by at most their error."""
+        stream = zipf_stream(300_000, 50_000)
+        summary = SpaceSaving(100)
+        for start in range(0, len(stream), 10_000):
+            summary.add(stream[start:start + 10_000])
+        counts = np.bincount(stream.astype(np.intp))
+        kept = {entry["key"] for entry in summary.top()}
+        assert set(np.flatnonzero(counts > summary.error_bound()).tolist()) <= kept
+        for entry in summary.top():
+            assert 0 <= entry["count"] - counts[entry["key"]] <= entry["error"]
+
+    def test_labels_and_order(self):
+        """String keys come back as given, heaviest first."""
+        summary = SpaceSaving(2)
+        summary.add(["kafka", "redis", "kafka", "dynamodb"])
+        summary.add(["redis", "redis"])
+        top = summary.top()
+        assert [entry["key"] for entry in top] == ["redis", "kafka"]
+        assert len(summary.labels) == 2
+
+
+class TestSketchesLab:
+    """Test the sketches lab endpoint."""
+
+    def test_lab(self):
+        """Each structure reports throughput, memory and error against theory."""
+        response = client.get('/api/labs/sketches?items=50000&distinct=5000&top_k=20')
+        assert response.status_code == 200
+        structures = response.json()['structures']
+        assert structures['bloom']['false_negatives'] == 0
+        assert structures['bloom']['bytes'] < structures['bloom']['exact_bytes']
+        assert structures['counting_bloom']['false_negatives_after_remove'] == 0
+        assert structures['count_min']['underestimates'] == 0
+        assert structures['space_saving']['overestimates_within_error']
+        assert 'expected_standard_error' in structures['hyperloglog']
+
+    def test_invalid_parameters(self):
+        """Unknown structures are rejected, as is a top-k above the key space."""
+        assert client.get('/api/labs/sketches?structures=bloom,cuckoo').status_code == 422
+        assert client.get('/api/labs/sketches?precision=30').status_code == 422
+        assert client.get('/api/labs/sketches?distinct=10&top_k=20').status_code == 400
+
+    def test_linked_from_scenarios(self):
+        """The bitly, search and analytics scenarios link to the lab."""
+        for scenario in ('bitly', 'search', 'analytics'):
+            labs = client.get(f'/api/scenarios/{scenario}').json()['labs']
+            assert '/api/labs/sketches' in [lab['endpoint'] for lab in labs]
@@ -0,0 +1,143 @@
+"""
+Tests for the discrete-event queueing model.
+
+Covers:
+- Mapping blueprint components to stations
+- Engine results against M/M/1 and Erlang C formulas
+- Saturation point and overload behaviour
+- Capacity endpoint (/api/scenarios/{type}/capacity)
+"""
+
+import pytest
+import numpy as np
+from fastapi.testclient import TestClient
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app
+from queue_sim import Station, build_stations, component_kind, erlang_c_sojourn, run, simulate_components
+
+client = TestClient(app)
+
+
+def _single_station(arrival_rate, mean_service, servers, duration, seed=1):
+    rng = np.random.default_rng(seed)
+    count = int(arrival_rate * duration)
+    arrivals = np.cumsum(rng.exponential(1 / arrival_rate, count)).tolist()
+    station = Station("test", "compute", servers, mean_service, arrival_rate)
+    service_times = [rng.exponential(mean_service, count + 1).tolist()]
+    events = run([station], arrivals, [(0,)] * count, service_times, arrivals[-1])
+    return station, events
+
+
+class TestStations:
+    """Test building stations from blueprints."""
+
+    def test_component_kinds(self):
+        """Component names decide the station kind."""
+        assert component_kind("Redis - idempotency key store, session cache") == ("Redis", "cache")
+        assert component_kind("Card Processor (external) - Stripe/Adyen")[1] == "external"
+        assert component_kind("Lambda - async processors for notifications")[1] == "async"
+
+    def test_off_path_components_are_skipped(self):
+        """CDNs and async workers are not stations."""
+        stations, _, _, _ = build_stations("payments", 0.7)
+        names = [station.name for station in stations]
+        assert "Webhook Service" not in names
+        assert "API Gateway" in names
+
+    def test_read_and_write_services_split_traffic(self):
+        """bitly's write tier only sees the writes, about one request in a thousand."""
+        stations, _, _, cell = build_stations("bitly", 0.7)
+        rates = {station.name: station.arrival_rate for station in stations}
+        assert rates["Write Service"] == pytest.approx(cell["cell_rate"] * (1 - cell["read_share"]))
+        assert rates["Read Service"] == pytest.approx(cell["cell_rate"] * cell["read_share"])
+        assert rates["Write Service"] < rates["Read Service"] / 500
+
+    def test_servers_sized_for_target(self):
+        """Every station is at or below the target utilization at peak."""
+        stations, _, _, cell = build_stations("chat", 0.7)
+        assert cell["cell_rate"] <= 2000
+        for station in stations:
+            assert station.arrival_rate * station.mean_service / station.servers <= 0.7
+
+
+class TestEngine:
+    """Test the simulation core against queueing theory."""
+
+    def test_mm1_sojourn(self):
+        """M/M/1 at 80% utilization has mean time in system 1 / (mu - lambda)."""
+        station, events = _single_station(800, 1 / 1000, 1, 200)
+        assert np.mean(station.sojourns) == pytest.approx(1 / (1000 - 800), rel=0.1)
+        assert events == pytest.approx(3 * 800 * 200, rel=0.01)
+
+    def test_mmc_matches_erlang_c(self):
+        """M/M/4 mean time in system matches the Erlang C formula."""
+        station, _ = _single_station(3000, 1 / 1000, 4, 50)
+        expected = erlang_c_sojourn(3000, 1 / 1000, 4)
+        assert np.mean(station.sojourns) == pytest.approx(expected, rel=0.1)
+
+    def test_queued_at_horizon_counts_toward_depth(self):
+        """Requests still waiting when the run ends add their wait so far to the queue depth."""
+        station = Station("test", "compute", 1, 1.0, 1.0)
+        run([station], [0.0] * 4, [(0,)] * 4, [[1.0] * 5], 2.5)
+        # Queue length is 3 for one second, 2 for one second and 1 for half a second
+        assert station.wait_time == pytest.approx(5.5)
+        assert station.queued == 1
+        assert station.max_queue == 3
+
+    def test_unstable_queue(self):
+        """Erlang C has no steady state past saturation."""
+        assert erlang_c_sojourn(1000, 1 / 500, 1) is None
+
+
+class TestSimulation:
+    """Test scenario simulations."""
+
+    def test_utilization_near_target(self):
+        """At peak, the busiest station runs near the sizing target."""
+        result = simulate_components("bitly", duration=20)
+        busiest = max(c["utilization"] for c in result["components"])
+        assert 0.55 < busiest < 0.8
+
+    def test_saturation_point(self):
+        """Past the saturation load, the bottleneck's queue grows."""
+        result = simulate_components("payments", duration=20)
+        saturation = result["saturation"]
+        assert saturation["load"] > 1
+
+        overloaded = simulate_components("payments", load=saturation["load"] * 1.2, duration=20)
+        bottleneck = next(c for c in overloaded["components"] if c["name"] == saturation["component"])
+        assert bottleneck["saturated"]
+        assert bottleneck["max_queue_depth"] > 100
+
+    def test_percentiles_are_ordered(self):
+        """p50 <= p95 <= p99 at every station."""
+        for component in simulate_components("search", duration=10)["components"]:
+            assert component["p50_ms"] <= component["p95_ms"] <= component["p99_ms"]
+
+
+class TestCapacityEndpoint:
+    """Test the API surface."""
+
+    def test_capacity(self):
+        """Per-component results come back with the saturation point."""
+        response = client.get('/api/scenarios/auth/capacity?duration=10')
+        assert response.status_code == 200
+
+        data = response.json()
+        assert data['parameters']['load'] == 1.0
+        assert data['events'] > data['requests']
+        assert data['saturation']['component'] in [c['name'] for c in data['components']]
+
+    def test_unknown_scenario(self):
+        """Unknown scenarios return 404."""
+        response = client.get('/api/scenarios/nope/capacity')
+        assert response.status_code == 404
+
+    def test_invalid_parameters(self):
+        """Loads and durations outside the limits are rejected."""
+        assert client.get('/api/scenarios/auth/capacity?load=10').status_code == 422
+        assert client.get('/api/scenarios/auth/capacity?target_utilization=1').status_code == 422
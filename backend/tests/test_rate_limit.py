@@ -0,0 +1,201 @@
+"""
+Tests for the rate limiting algorithms.
+
+Covers:
+- Fixed window, sliding log, sliding window counter, token bucket and GCRA decisions
+- Memory and SQLite stores, including concurrent use
+- Accuracy on bursty traffic and the benchmark harness
+- API middleware and rate limit lab endpoint (/api/labs/rate-limit)
+"""
+
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from fastapi.testclient import TestClient
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import rate_limit
+from main import app
+from rate_limit import (
+    ALGORITHMS, GCRA, FixedWindow, MemoryStore, RateLimiter, SlidingLog,
+    SlidingWindowCounter, SQLiteStore, TokenBucket, accuracy,
+)
+
+client = TestClient(app)
+
+
+def _allowed(limiter, times, key="user"):
+    return [limiter.allow(key, now=t).allowed for t in times]
+
+
+class TestAlgorithms:
+    """Test decisions at chosen timestamps."""
+
+    @pytest.mark.parametrize("name", list(ALGORITHMS))
+    def test_limit_within_window(self, name):
+        """Every algorithm allows the limit and rejects the next request."""
+        limiter = RateLimiter(ALGORITHMS[name](5, 10.0), MemoryStore())
+        assert _allowed(limiter, [0.1 * i for i in range(6)]) == [True] * 5 + [False]
+
+    def test_fixed_window_boundary_burst(self):
+        """Fixed windows let a full limit through on each side of a boundary."""
+        limiter = RateLimiter(FixedWindow(3, 1.0), MemoryStore())
+        assert _allowed(limiter, [0.9, 0.9, 0.9, 1.0, 1.0, 1.0]) == [True] * 6
+
+    def test_sliding_log_is_exact(self):
+        """The log frees capacity exactly one window after each request."""
+        limiter = RateLimiter(SlidingLog(2, 1.0), MemoryStore())
+        assert _allowed(limiter, [0.0, 0.5, 0.9, 1.0, 1.4, 1.6]) == [True, True, False, True, False, True]
+
+    def test_sliding_log_cost_over_limit(self):
+        """A cost above the limit is clamped to it instead of indexing past the log."""
+        limiter = RateLimiter(SlidingLog(3, 1.0), MemoryStore())
+        assert limiter.allow("user", now=0.0).allowed
+        decision = limiter.allow("user", cost=10, now=0.5)
+        assert not decision.allowed
+        assert decision.retry_after == pytest.approx(0.5)
+        assert limiter.allow("user", cost=10, now=1.1).allowed
+
+    def test_sliding_window_counter_weights_previous(self):
+        """Half-way through a window, half of the previous count still counts."""
+        limiter = RateLimiter(SlidingWindowCounter(4, 1.0), MemoryStore())
+        assert _allowed(limiter, [0.5] * 4 + [1.5, 1.5, 1.5]) == [True] * 4 + [True, True, False]
+
+    def test_token_bucket_refills(self):
+        """Tokens come back at limit / window per second."""
+        limiter = RateLimiter(TokenBucket(2, 1.0), MemoryStore())
+        assert _allowed(limiter, [0.0, 0.0, 0.0, 0.5, 0.5]) == [True, True, False, True, False]
+
+    def test_gcra_retry_after(self):
+        """A rejected GCRA request is told when the next one will pass."""
+        limiter = RateLimiter(GCRA(10, 1.0, burst=1), MemoryStore())
+        assert limiter.allow("user", now=0.0).allowed
+        decision = limiter.allow("user", now=0.02)
+        assert not decision.allowed
+        assert decision.retry_after == pytest.approx(0.08)
+
+    def test_keys_are_independent(self):
+        """One client's usage does not affect another's."""
+        limiter = RateLimiter(GCRA(1, 1.0), MemoryStore())
+        assert limiter.allow("a", now=0).allowed
+        assert not limiter.allow("a", now=0).allowed
+        assert limiter.allow("b", now=0).allowed
+
+
+class TestStores:
+    """Test storage backends."""
+
+    def test_concurrent_memory_store(self):
+        """Threads sharing one key never exceed the limit."""
+        limiter = RateLimiter(FixedWindow(1000, 3600.0), MemoryStore())
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda _: limiter.allow("shared", now=1.0).allowed, range(4000)))
+        assert sum(results) == 1000
+
+    def test_sqlite_store(self, tmp_path):
+        """SQLite state is shared by limiters using the same file."""
+        path = str(tmp_path / "limits.db")
+        first = RateLimiter(SlidingLog(2, 10.0), SQLiteStore(path))
+        second = RateLimiter(SlidingLog(2, 10.0), SQLiteStore(path))
+        assert first.allow("user", now=1.0).allowed
+        assert second.allow("user", now=2.0).allowed
+        assert not first.allow("user", now=3.0).allowed
+
+    def test_idle_keys_are_pruned(self, monkeypatch):
+        """Full stripes drop keys whose state has expired."""
+        monkeypatch.setattr(rate_limit, "PRUNE_THRESHOLD", 10)
+        store = MemoryStore(stripes=1)
+        limiter = RateLimiter(GCRA(10, 1.0), store)
+        for i in range(20):
+            limiter.allow(f"user{i}", now=float(i))
+        assert len(store) <= 11
+
+
+class TestAccuracy:
+    """Test behaviour on bursty traffic."""
+
+    def test_sliding_log_is_reference(self):
+        """The sliding log agrees with itself and never exceeds the limit."""
+        result = accuracy("sliding_log", 50, 1.0)
+        assert result["agreement"] == 1.0
+        assert result["peak_window_load"] == 1.0
+
+    def test_fixed_window_overshoots(self):
+        """Fixed windows let close to twice the limit through some window."""
+        assert accuracy("fixed_window", 50, 1.0)["peak_window_load"] > 1.5
+
+    def test_counter_beats_fixed_window(self):
+        """The sliding window counter tracks the exact log more closely."""
+        assert accuracy("sliding_window_counter", 50, 1.0)["agreement"] > accuracy("fixed_window", 50, 1.0)["agreement"]
+
+
+class TestRateLimitEndpoints:
+    """Test the API surface."""
+
+    def test_lab(self):
+        """Every algorithm reports throughput, memory and accuracy."""
+        response = client.get('/api/labs/rate-limit?decisions=2000&threads=2&limit=200')
+        assert response.status_code == 200
+
+        data = response.json()['algorithms']
+        assert set(data) == set(ALGORITHMS)
+        assert data['gcra']['decisions_per_second'] > 0
+        assert data['gcra']['memory_per_key_bytes'] < data['sliding_log']['memory_per_key_bytes']
+
+    def test_invalid_store(self):
+        """Only memory and sqlite stores exist."""
+        assert client.get('/api/labs/rate-limit?store=redis').status_code == 422
+
+    def test_api_is_rate_limited(self, monkeypatch):
+        """Clients over the API limit get 429 with Retry-After."""
+        monkeypatch.setattr(rate_limit, "_api_limiter", RateLimiter(GCRA(1, 60.0, burst=2), MemoryStore()))
+        monkeypatch.setattr(rate_limit, "_api_limiter_configured", True)
+
+        assert client.get('/api/reference/patterns').status_code == 200
+        assert client.get('/api/reference/patterns').headers['X-RateLimit-Remaining'] == '0'
+        response = client.get('/api/reference/patterns')
+        assert response.status_code == 429
+        assert int(response.headers['Retry-After']) > 0
+
+    def test_labs_cost_more(self, monkeypatch):
+        """A lab request uses LAB_REQUEST_COST requests of the client's budget."""
+        limiter = RateLimiter(GCRA(1, 60.0, burst=rate_limit.LAB_REQUEST_COST + 1), MemoryStore())
+        monkeypatch.setattr(rate_limit, "_api_limiter", limiter)
+        monkeypatch.setattr(rate_limit, "_api_limiter_configured", True)
+
+        lab = '/api/labs/rate-limit?threads=1&decisions=1000&keys=10'
+        assert client.get(lab).headers['X-RateLimit-Remaining'] == '1'
+        assert client.get(lab).status_code == 429
+        assert client.get('/api/reference/patterns').status_code == 200
+        assert client.get('/api/reference/patterns').status_code == 429
+
+    def test_limited_responses_allow_cors(self, monkeypatch):
+        """429s carry CORS headers and preflights are not charged."""
+        monkeypatch.setattr(rate_limit, "_api_limiter", RateLimiter(GCRA(1, 60.0, burst=1), MemoryStore()))
+        monkeypatch.setattr(rate_limit, "_api_limiter_configured", True)
+
+        origin = {'Origin': 'http://localhost:3000'}
+        preflight = {**origin, 'Access-Control-Request-Method': 'GET'}
+        assert client.options('/api/reference/patterns', headers=preflight).status_code == 200
+        assert client.get('/api/reference/patterns', headers=origin).status_code == 200
+        response = client.get('/api/reference/patterns', headers=origin)
+        assert response.status_code == 429
+        assert response.headers['Access-Control-Allow-Origin'] == 'http://localhost:3000'
+
+    def test_burst_below_lab_cost_is_rejected(self, monkeypatch):
+        """A burst too small for any lab request is a configuration error."""
+        monkeypatch.setattr(rate_limit, "_api_limiter", None)
+        monkeypatch.setattr(rate_limit, "_api_limiter_configured", False)
+        monkeypatch.setenv("API_RATE_LIMIT", "100")
+        monkeypatch.setenv("API_RATE_BURST", str(rate_limit.LAB_REQUEST_COST - 1))
+        with pytest.raises(ValueError):
+            rate_limit.get_api_limiter()
+        monkeypatch.setenv("API_RATE_BURST", str(rate_limit.LAB_REQUEST_COST))
+        assert rate_limit.get_api_limiter() is not None
+
+    def test_request_cost(self):
+        """Only lab paths cost more than one request."""
+        assert rate_limit.request_cost('/api/labs/cache') == rate_limit.LAB_REQUEST_COST
+        assert rate_limit.request_cost('/api/tools') == 1
@@ -0,0 +1,101 @@
+"""
+Tests for the constraint-driven tool recommender and /api/recommend.
+"""
+
+import pytest
+import numpy as np
+from fastapi.testclient import TestClient
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app
+from recommender import FEATURE_INDEX, get_recommender, requirement_weights
+
+client = TestClient(app)
+
+
+class TestRequirementWeights:
+    """Test requirement-to-weight translation."""
+
+    def test_empty_requirements(self):
+        assert not requirement_weights().any()
+
+    def test_latency_target_prefers_faster_classes(self):
+        w = requirement_weights(latency_target_ms=5)
+        assert w[FEATURE_INDEX["latency_sub_ms"]] > w[FEATURE_INDEX["latency_tens_ms"]]
+        assert w[FEATURE_INDEX["latency_seconds"]] < 0
+
+    def test_read_heavy_ratio(self):
+        w = requirement_weights(read_write_ratio=1000)
+        assert w[FEATURE_INDEX["read_heavy"]] > 0
+        assert w[FEATURE_INDEX["write_heavy"]] < 0
+
+    def test_batch_scoring_matches_single(self):
+        recommender = get_recommender()
+        batch = np.vstack([
+            requirement_weights(consistency="strong"),
+            requirement_weights(data_shape="blob"),
+        ])
+        scores = recommender.score_batch(batch)
+        assert scores.shape == (len(recommender.tool_ids), 2)
+        np.testing.assert_allclose(scores[:, 1], recommender.score(batch[1]))
+
+
+class TestRecommendEndpoint:
+    """Test the /api/recommend endpoint."""
+
+    def test_strong_relational(self):
+        response = client.post('/api/recommend', json={
+            'consistency': 'strong', 'cap_preference': 'CP', 'data_shape': 'relational',
+        })
+        assert response.status_code == 200
+
+        results = response.json()
+        assert results[0]['tool']['category'] == 'Relational DB'
+        assert 'consistency_strong' in results[0]['matched']
+
+    def test_feed_quiz_question(self):
+        """db-selection-1: 10:1 reads, eventual consistency, nested documents."""
+        response = client.post('/api/recommend', json={
+            'read_write_ratio': 10, 'consistency': 'eventual', 'data_shape': 'document', 'limit': 3,
+        })
+        names = [r['tool']['name'] for r in response.json()]
+        assert 'Amazon DynamoDB' in names
+
+    def test_results_are_ranked(self):
+        response = client.post('/api/recommend', json={'latency_target_ms': 100, 'limit': 20})
+        scores = [r['score'] for r in response.json()]
+        assert 0 < len(scores) <= 20
+        assert scores == sorted(scores, reverse=True)
+
+    def test_only_positive_scores(self):
+        """Results are not padded out to the limit with tools that do not fit."""
+        response = client.post('/api/recommend', json={'latency_target_ms': 1, 'limit': 20})
+        assert all(r['score'] > 0 for r in response.json())
+
+    def test_avoid_when_is_not_a_match(self):
+        """Global Tables' reason to avoid ("cross-region strong consistency") counts against it."""
+        names = [r['tool']['name'] for r in client.post('/api/recommend', json={'consistency': 'strong'}).json()]
+        assert 'DynamoDB Global Tables' not in names
+        assert 'Amazon Aurora (MySQL/PostgreSQL compatible)' in names
+
+    def test_features_read_from_the_right_columns(self):
+        recommender = get_recommender()
+        tools = {t['name']: t['id'] for t in client.get('/api/tools').json()}
+        rds = recommender.matrix[list(recommender.tool_ids).index(tools['Amazon RDS for PostgreSQL'])]
+        assert rds[FEATURE_INDEX["write_heavy"]] < 0
+        assert rds[FEATURE_INDEX["read_heavy"]] > 0
+
+    def test_aws_only_filter(self):
+        response = client.post('/api/recommend', json={'data_shape': 'stream', 'aws_only': True})
+        assert all(r['tool']['aws_only'] == 1 for r in response.json())
+
+    def test_no_requirements(self):
+        response = client.post('/api/recommend', json={})
+        assert response.status_code == 400
+
+    def test_invalid_data_shape(self):
+        response = client.post('/api/recommend', json={'data_shape': 'spreadsheet'})
+        assert response.status_code == 422
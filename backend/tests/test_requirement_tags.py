@@ -0,0 +1,104 @@
+"""
+Tests for the requirement classifier.
+
+Covers:
+- Aho–Corasick keyword matching (whole words, prefixes, longest match)
+- Blueprint tagging and tag-to-tool matching
+- Test mode hints and /api/scenarios/{type}/requirements
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app
+from requirement_tags import TAG_KEYWORDS, KeywordAutomaton, get_requirement_analysis
+from scenario_data import SCENARIO_BLUEPRINTS
+
+client = TestClient(app)
+
+
+class TestKeywordAutomaton:
+    """Test keyword matching."""
+
+    def test_matches_whole_words_only(self):
+        """'live' does not match inside 'delivery'."""
+        automaton = KeywordAutomaton(TAG_KEYWORDS)
+        assert "real-time" not in automaton.tags("Offline delivery of messages")
+        assert "real-time" in automaton.tags("Live scores")
+
+    def test_prefix_keywords(self):
+        """Keywords ending in * match word prefixes."""
+        automaton = KeywordAutomaton(TAG_KEYWORDS)
+        assert "async-processing" in automaton.tags("Videos are transcoded")
+
+    def test_longest_match_wins(self):
+        """'availability over strict consistency' is not a strong-consistency requirement."""
+        automaton = KeywordAutomaton(TAG_KEYWORDS)
+        tags = automaton.tags("High availability over strict consistency")
+        assert "eventual-consistency" in tags
+        assert "high-availability" in tags
+        assert "strong-consistency" not in tags
+
+    def test_overlapping_keywords(self):
+        """Overlapping keywords are found, minus those inside a longer match."""
+        automaton = KeywordAutomaton({"a": ("she",), "b": ("he",), "c": ("hers",)})
+        assert automaton.tags("she hers") == ["a", "c"]
+
+
+class TestRequirementAnalysis:
+    """Test blueprint tagging."""
+
+    def test_every_scenario_is_analyzed(self):
+        """Every blueprint has tags and matched tools."""
+        analysis = get_requirement_analysis()
+        assert set(analysis) == set(SCENARIO_BLUEPRINTS)
+        for scenario in analysis.values():
+            assert scenario["tags"]
+            assert scenario["matched_tools"]
+
+    def test_payments_tags(self):
+        """Payments asks for strong consistency and exactly-once processing."""
+        tags = get_requirement_analysis()["payments"]["tags"]
+        assert "strong-consistency" in tags
+        assert "exactly-once" in tags
+
+    def test_matched_tools_are_ranked(self):
+        """Matched tools come back best first and flag blueprint tools."""
+        matched = get_requirement_analysis()["dropbox"]["matched_tools"]
+        scores = [m["score"] for m in matched]
+        assert scores == sorted(scores, reverse=True)
+        s3 = next(m for m in matched if m["name"] == "Amazon S3")
+        assert "blob-heavy" in s3["tags"]
+        assert s3["in_blueprint"] is True
+
+
+class TestRequirementEndpoints:
+    """Test the API surface."""
+
+    def test_test_scenario_hints(self):
+        """Test mode hints come from the classifier."""
+        response = client.get('/api/test/scenario?scenario_type=chat')
+        assert response.status_code == 200
+
+        hints = response.json()['hints']
+        assert "Sub-100ms message delivery latency" in hints['key_constraints']
+        assert "real-time" in hints['requirement_tags']
+
+    def test_scenario_requirements(self):
+        """Each requirement is returned with its tags."""
+        response = client.get('/api/scenarios/ticketmaster/requirements')
+        assert response.status_code == 200
+
+        data = response.json()
+        assert data['scenario'] == 'ticketmaster'
+        booking = next(r for r in data['requirements'] if 'double booking' in r['text'])
+        assert "contention" in booking['tags']
+
+    def test_unknown_scenario(self):
+        """Unknown scenarios return 404."""
+        response = client.get('/api/scenarios/nope/requirements')
+        assert response.status_code == 404
@@ -0,0 +1,122 @@
+"""
+Tests for the unified cross-content search index and /api/search.
+
+Covers:
+- Shard routing and document coverage of every content bank
+- Ranking across sources
+- Source filtering and validation
+- Logging and retrying a failed background build
+"""
+
+import logging
+import pytest
+from fastapi.testclient import TestClient
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app
+import search_index
+from search_index import SOURCES, get_search_index, shard_for
+
+client = TestClient(app)
+
+
+class TestSearchIndex:
+    """Test index construction."""
+
+    def test_every_source_is_indexed(self):
+        """Each content bank contributes documents."""
+        index = get_search_index(timeout=10)
+        assert index is not None
+        indexed_sources = {doc["source"] for doc in index.documents}
+        assert indexed_sources == set(SOURCES)
+
+    def test_terms_live_in_their_shard(self):
+        """Every term is stored only in the shard its hash routes to."""
+        index = get_search_index(timeout=10)
+        for shard_id, shard in enumerate(index.shards):
+            for term in shard.postings:
+                assert shard_for(term) == shard_id
+
+    def test_title_match_ranks_first(self):
+        """A query matching a numbers entry title ranks that entry first."""
+        index = get_search_index(timeout=10)
+        results = index.search("SSD random read")
+        assert results[0]["source"] == "numbers"
+        assert results[0]["title"] == "SSD random read"
+
+
+class TestSearchEndpoint:
+    """Test the /api/search endpoint."""
+
+    def test_results_span_sources(self):
+        """A broad query returns results from several banks."""
+        response = client.get('/api/search?q=rate limiting&limit=50')
+        assert response.status_code == 200
+
+        data = response.json()
+        assert data['total'] == len(data['results'])
+        assert len({r['source'] for r in data['results']}) > 1
+
+    def test_results_are_ranked(self):
+        """Scores are non-increasing."""
+        response = client.get('/api/search?q=consistency')
+        scores = [r['score'] for r in response.json()['results']]
+        assert scores == sorted(scores, reverse=True)
+
+    def test_tool_hits_include_tool(self):
+        """Tool results carry the full tool payload."""
+        response = client.get('/api/search?q=dynamodb&source=tool')
+        assert response.status_code == 200
+
+        results = response.json()['results']
+        assert len(results) > 0
+        for result in results:
+            assert result['source'] == 'tool'
+            assert result['tool']['id'] == result['tool_id']
+            assert 'is_favorited' in result['tool']
+
+    def test_source_filter(self):
+        """Multiple sources can be requested at once."""
+        response = client.get('/api/search?q=cache&source=quiz,flashcard')
+        assert response.status_code == 200
+        assert {r['source'] for r in response.json()['results']} <= {'quiz', 'flashcard'}
+
+    def test_invalid_source(self):
+        """Unknown sources are rejected."""
+        response = client.get('/api/search?q=cache&source=tool,unknown')
+        assert response.status_code == 422
+
+    def test_no_matches(self):
+        """Queries with no matching terms return an empty list."""
+        response = client.get('/api/search?q=zzzzqqq')
+        assert response.status_code == 200
+        assert response.json()['total'] == 0
+
+
+class TestBackgroundBuild:
+    """Test build failures."""
+
+    def test_failed_build_is_logged_and_retried(self, monkeypatch, caplog):
+        """A failed build answers at once, is logged, and is retried after the back-off."""
+        index = get_search_index(timeout=10)
+        monkeypatch.setattr(search_index, "_index", None)
+        monkeypatch.setattr(search_index, "_builder", None)
+        monkeypatch.setattr(search_index, "_failed_at", None)
+
+        def broken():
+            raise RuntimeError("database is locked")
+
+        monkeypatch.setattr(search_index, "build_search_index", broken)
+        with caplog.at_level(logging.ERROR, logger="search_index"):
+            assert get_search_index(timeout=10) is None
+        assert "Search index build failed" in caplog.text
+        assert client.get('/api/search?q=kafka').status_code == 503
+
+        monkeypatch.setattr(search_index, "build_search_index", lambda: index)
+        # Still inside the back-off: no new build is started
+        assert get_search_index(timeout=0.1) is None
+        monkeypatch.setattr(search_index, "_failed_at", search_index._failed_at - search_index.RETRY_SECONDS)
+        assert get_search_index(timeout=10) is index
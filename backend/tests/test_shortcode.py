@@ -0,0 +1,152 @@
+"""
+Tests for the short code generators and redirect benchmark.
+
+Covers:
+- Base62 encoding, scalar and vectorized
+- Unique codes from every generator across worker processes
+- Coordination per generator and Snowflake sequence waits
+- Hash collisions against the birthday bound, resolved by salted retries
+- Redirect lookups with and without an LRU cache
+- Short code lab endpoint (/api/labs/shortcodes) and its link from the bitly scenario
+"""
+
+import numpy as np
+from fastapi.testclient import TestClient
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main
+from main import app
+from shortcode import RANGE_SIZE, LRUCache, base62, base62_batch, generate, hash_collisions, redirect_benchmark
+
+client = TestClient(app)
+
+
+class TestBase62:
+    """Test base62 encoding."""
+
+    def test_known_values(self):
+        """Codes are fixed width, most significant digit first."""
+        assert base62(0) == "0000000"
+        assert base62(61) == "000000Z"
+        assert base62(62) == "0000010"
+        assert base62(62 ** 7 - 1) == "ZZZZZZZ"
+
+    def test_batch_matches_scalar(self):
+        """The vectorized encoder agrees with the scalar one."""
+        values = np.array([0, 61, 62, 123456789, 62 ** 7 - 1])
+        assert [code.decode() for code in base62_batch(values)] == [base62(v) for v in values.tolist()]
+
+
+class TestGenerators:
+    """Test the id generators across worker processes."""
+
+    def test_codes_unique(self):
+        """Every generator hands out distinct codes across workers."""
+        result = generate(20_000, processes=2, collect=True)
+        for name, stats in result.items():
+            codes = stats["collected"]
+            assert stats["codes"] == len(codes) == 20_000, name
+            # Hash codes may collide before retries; at this size they should not
+            assert len(np.unique(codes)) == 20_000, name
+
+    def test_uneven_shares_hash_distinct_urls(self):
+        """Workers with uneven shares hash disjoint blocks of URL ids."""
+        codes = generate(10, processes=4, generators=("hash",), collect=True)["hash"]["collected"]
+        assert len(np.unique(codes)) == 10
+
+    def test_coordination(self):
+        """The counter coordinates per code, ranges per range, the rest never."""
+        result = generate(RANGE_SIZE * 2, processes=2, generators=("counter", "ranges", "snowflake"))
+        assert result["counter"]["coordination_per_million"] == 1e6
+        assert result["ranges"]["coordination_per_million"] == 2 * 1e6 / (RANGE_SIZE * 2)
+        assert result["snowflake"]["coordination_per_million"] == 0
+        assert result["snowflake"]["sequence_waits"] > 0
+
+    def test_snowflake_codes_full_width(self):
+        """Snowflake ids are encoded in full, which takes 11 characters."""
+        codes = generate(10_000, processes=1, generators=("snowflake",), collect=True)["snowflake"]["collected"]
+        assert {len(code) for code in codes.tolist()} == {11}
+
+
+class TestHashCollisions:
+    """Test collisions when hashing into the code space."""
+
+    def test_near_birthday_bound(self):
+        """Collisions track the expected count and retries resolve them."""
+        result = hash_collisions(1_000_000, 5)
+        assert abs(result["first_try_collisions"] - result["expected_collisions"]) < 100
+        assert result["retries"] >= result["first_try_collisions"]
+        assert result["unique_codes"] == 1_000_000
+
+    def test_no_collisions_in_large_space(self):
+        """A small batch in the 7-character space rarely collides at all."""
+        assert hash_collisions(10_000)["first_try_collisions"] == 0
+
+
+class TestRedirects:
+    """Test the redirect read path."""
+
+    def test_lru_evicts_least_recent(self):
+        """The cache drops the entry used longest ago."""
+        cache = LRUCache(2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+
+    def test_cache_hits_popular_codes(self):
+        """Zipf-popular codes are mostly served from the cache."""
+        result = redirect_benchmark(5000, 20_000, 500)
+        assert result["lru_sqlite"]["hit_ratio"] > 0.5
+        assert result["lru_sqlite"]["p50_us"] < result["sqlite"]["p50_us"]
+
+
+class TestShortcodeEndpoint:
+    """Test the API surface."""
+
+    def test_lab(self):
+        """Requested generators are run alongside collisions and redirects."""
+        response = client.get('/api/labs/shortcodes?codes=10000&processes=2&generators=ranges,hash'
+                              '&collision_codes=10000&urls=1000&lookups=2000&cache_size=100')
+        assert response.status_code == 200
+
+        data = response.json()
+        assert set(data['generators']) == {'ranges', 'hash'}
+        assert 'collected' not in data['generators']['hash']
+        assert data['collisions']['unique_codes'] == 10000
+        assert data['redirects']['lru_sqlite']['hit_ratio'] > 0
+
+    def test_invalid_parameters(self):
+        """Unknown generators and oversized runs are rejected."""
+        assert client.get('/api/labs/shortcodes?generators=uuid').status_code == 422
+        assert client.get('/api/labs/shortcodes?codes=1000000000').status_code == 422
+        assert client.get('/api/labs/shortcodes?length=4').status_code == 422
+        assert client.get('/api/labs/shortcodes?length=11').status_code == 422
+
+    def test_counter_has_its_own_cap(self, monkeypatch):
+        """The per-code counter is rejected, or left out by default, above its cap."""
+        assert client.get('/api/labs/shortcodes?codes=3000000&generators=counter,hash').status_code == 400
+
+        swept = []
+        monkeypatch.setattr(main, 'generate', lambda codes, processes, length, names: swept.extend(names) or {})
+        response = client.get('/api/labs/shortcodes?codes=3000000&collision_codes=1000&urls=100&lookups=100')
+        assert response.status_code == 200
+        assert swept == ['ranges', 'snowflake', 'hash']
+
+    def test_longest_codes(self):
+        """The widest code space still fits the hash arithmetic."""
+        response = client.get('/api/labs/shortcodes?length=10&codes=1000&collision_codes=1000&urls=100'
+                              '&lookups=100&generators=snowflake,hash&processes=1')
+        assert response.status_code == 200
+        assert response.json()['collisions']['code_space'] == 62 ** 10
+
+    def test_linked_from_scenario(self):
+        """The bitly scenario links to the short code lab."""
+        response = client.get('/api/scenarios/bitly')
+        endpoints = [lab['endpoint'] for lab in response.json()['labs']]
+        assert '/api/labs/shortcodes' in endpoints
@@ -0,0 +1,102 @@
+"""
+Tests for SymSpell spelling correction and typo-tolerant tool search.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app
+from spelling import SymSpell, damerau_levenshtein
+
+client = TestClient(app)
+
+
+class TestSymSpell:
+    """Test the deletion-index speller directly."""
+
+    def setup_method(self):
+        self.speller = SymSpell(
+            {"kinesis": 3, "kafka": 5, "dynamodb": 4, "redis": 6},
+            aliases={"dynamo": "dynamodb"},
+        )
+
+    def test_transposition_counts_as_one_edit(self):
+        assert damerau_levenshtein("dyanmo", "dynamo", 2) == 1
+
+    def test_distance_is_capped(self):
+        assert damerau_levenshtein("kafka", "dynamodb", 2) == 3
+
+    def test_exact_word(self):
+        assert self.speller.lookup("redis") == [("redis", 0)]
+
+    def test_single_edit(self):
+        assert self.speller.lookup("kinsis")[0] == ("kinesis", 1)
+
+    def test_alias_resolves_to_word(self):
+        assert self.speller.lookup("dyanmo")[0] == ("dynamodb", 1)
+
+    def test_too_far(self):
+        assert self.speller.lookup("zookeeper") == []
+
+    def test_correct_phrase(self):
+        corrected, did_you_mean = self.speller.correct("redsi kafak")
+        assert corrected == "redis kafka"
+        assert did_you_mean[0] == "redis kafka"
+
+    def test_correct_leaves_known_words(self):
+        assert self.speller.correct("redis") == ("redis", [])
+
+    def test_only_suggestable_words_are_offered(self):
+        speller = SymSpell({"dynamodb": 4, "don": 9, "can": 9}, aliases={"dyna": "dynamodb"},
+                           suggestable={"dynamodb"})
+        assert speller.correct("dyn") == ("dynamodb", ["dynamodb"])
+        assert speller.correct("can") == ("can", [])
+
+
+class TestTypoTolerantSearch:
+    """Test /api/tools/search and /api/search with misspelled queries."""
+
+    @pytest.mark.parametrize("query,expected", [
+        ("dyanmo", "Amazon DynamoDB"),
+        ("postgress", "Amazon RDS for PostgreSQL"),
+        ("kinsis", "Amazon Kinesis Data Streams"),
+    ])
+    def test_misspelled_queries_find_tools(self, query, expected):
+        response = client.get(f'/api/tools/search?q={query}')
+        assert response.status_code == 200
+        assert expected in [t['name'] for t in response.json()]
+
+    def test_tool_search_returns_a_list(self):
+        response = client.get('/api/tools/search?q=DynamoDB')
+        data = response.json()
+        assert isinstance(data, list)
+        assert len(data) > 0
+
+    @pytest.mark.parametrize("query,expected", [
+        ("dyanmo", "Amazon DynamoDB"),
+        ("kinsis", "Amazon Kinesis Data Streams"),
+    ])
+    def test_unified_search_suggests_corrections(self, query, expected):
+        response = client.get(f'/api/search?q={query}')
+        assert response.status_code == 200
+
+        data = response.json()
+        assert data['corrected_query'] is not None
+        assert len(data['did_you_mean']) > 0
+        assert expected in [r['title'] for r in data['results']]
+
+    def test_suggestions_come_from_the_catalog(self):
+        """Common words from tool descriptions are never suggested."""
+        data = client.get('/api/search?q=dyn').json()
+        assert data['did_you_mean'][0] == 'dynamodb'
+        assert not {'don', 'can'} & set(data['did_you_mean'])
+
+    def test_exact_query_is_not_corrected(self):
+        data = client.get('/api/search?q=DynamoDB').json()
+        assert data['corrected_query'] is None
+        assert data['did_you_mean'] == []
+        assert data['total'] > 0
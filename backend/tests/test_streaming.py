@@ -0,0 +1,131 @@
+"""
+Tests for the windowed stream aggregation engine.
+
+Covers:
+- Out-of-order clickstream generation
+- Tumbling, sliding and session window contents
+- Watermarks: firing closed windows and dropping late events
+- Matching output from the per-event and batched engines
+- Streaming lab endpoint (/api/labs/streaming) and its link from the analytics scenario
+"""
+
+import pytest
+import numpy as np
+from fastapi.testclient import TestClient
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app
+from streaming import ENGINE_TYPES, benchmark, clickstream, run
+
+client = TestClient(app)
+
+
+def fire_all(engine, kind, users, times, watermark=-np.inf, **sizes):
+    """Process one batch and flush every window, as sorted rows."""
+    params = {"size": 10, "slide": 5, "gap": 3, **sizes}
+    state = ENGINE_TYPES[engine](kind, params["size"], params["slide"], params["gap"], 10)
+    if engine == "batched":
+        state.process(np.array(users), np.array(times), watermark)
+        return sorted(zip(*(column.tolist() for column in state.fire(np.inf)))), state.late
+    state.process(users, times, watermark)
+    return sorted(state.fire(np.inf)), state.late
+
+
+class TestClickstream:
+    """Test the synthetic event stream."""
+
+    def test_out_of_order_within_bounds(self):
+        """Event times trail arrival; only the late share exceeds the delay bound."""
+        users, times = clickstream(50_000, 1000, max_delay=1000, late_share=0.05)
+        assert users.min() >= 0 and users.max() < 1000
+        behind = np.maximum.accumulate(times) - times
+        assert (behind > 0).mean() > 0.5
+        assert 0 < (behind > 1000).mean() < 0.05
+
+
+class TestWindows:
+    """Test window assignment and watermarks in both engines."""
+
+    @pytest.mark.parametrize("engine", list(ENGINE_TYPES))
+    def test_tumbling(self, engine):
+        """Each event lands in exactly one window."""
+        rows, _ = fire_all(engine, "tumbling", [1, 1, 2, 1], [0, 9, 9, 10])
+        assert rows == [(1, 0, 10, 2), (1, 10, 20, 1), (2, 0, 10, 1)]
+
+    @pytest.mark.parametrize("engine", list(ENGINE_TYPES))
+    def test_sliding(self, engine):
+        """Each event lands in size / slide overlapping windows."""
+        rows, _ = fire_all(engine, "sliding", [1, 1], [4, 7])
+        assert rows == [(1, -5, 5, 1), (1, 0, 10, 2), (1, 5, 15, 1)]
+
+    @pytest.mark.parametrize("engine", list(ENGINE_TYPES))
+    def test_sessions_merge(self, engine):
+        """An out-of-order event bridges two sessions into one."""
+        rows, _ = fire_all(engine, "session", [1, 1, 1, 2], [0, 8, 4, 1], gap=5)
+        assert rows == [(1, 0, 13, 3), (2, 1, 6, 1)]
+
+    @pytest.mark.parametrize("engine", list(ENGINE_TYPES))
+    def test_late_events_dropped(self, engine):
+        """Events whose windows the watermark has passed are counted as late."""
+        rows, late = fire_all(engine, "tumbling", [1, 1, 1], [3, 12, 25], watermark=20)
+        assert rows == [(1, 20, 30, 1)]
+        assert late == 2
+
+    @pytest.mark.parametrize("kind", ["tumbling", "sliding", "session"])
+    def test_engines_agree(self, kind):
+        """Both engines fire the same windows over a full stream."""
+        users, times = clickstream(30_000, 500, max_delay=200, late_share=0.02)
+        sizes = {"batch": 1000, "size": 500, "slide": 100, "gap": 200, "max_delay": 200}
+        per_event = run("per_event", kind, users, times, 500, **sizes)
+        batched = run("batched", kind, users, times, 500, **sizes)
+        assert sorted(per_event["fired"]) == sorted(batched["fired"])
+        assert per_event["late_events"] == batched["late_events"] > 0
+        assert per_event["peak_state_entries"] == batched["peak_state_entries"]
+
+    def test_counts_conserved(self):
+        """Every on-time event is counted in exactly one tumbling window."""
+        users, times = clickstream(20_000, 100)
+        result = run("batched", "tumbling", users, times, 100, batch=500)
+        assert sum(row[3] for row in result["fired"]) + result["late_events"] == 20_000
+
+
+class TestStreamingBenchmark:
+    """Test the benchmark harness and API surface."""
+
+    def test_benchmark(self):
+        """Outputs match and batching is faster."""
+        result = benchmark(50_000, 1000)
+        for kind, stats in result["windows"].items():
+            assert stats["outputs_match"], kind
+            assert stats["batched"]["events_per_second"] > stats["per_event"]["events_per_second"]
+
+    def test_lab(self):
+        """Requested windows and engines are run."""
+        response = client.get('/api/labs/streaming?events=5000&keys=100&windows=session&engines=batched')
+        assert response.status_code == 200
+
+        data = response.json()['windows']
+        assert set(data) == {'session'}
+        assert set(data['session']) == {'batched'}
+
+    def test_invalid_parameters(self):
+        """Unknown windows, oversized streams and uneven slides are rejected."""
+        assert client.get('/api/labs/streaming?windows=hopping').status_code == 422
+        assert client.get('/api/labs/streaming?events=100000000').status_code == 422
+        assert client.get('/api/labs/streaming?size_ms=10000&slide_ms=3000').status_code == 400
+
+    def test_sliding_work_is_capped(self):
+        """Sliding windows are limited in slides per window and in window updates."""
+        assert client.get('/api/labs/streaming?size_ms=200000&slide_ms=1000').status_code == 400
+        assert client.get('/api/labs/streaming?events=2000000').status_code == 400
+        response = client.get('/api/labs/streaming?events=1000&keys=10&windows=tumbling&size_ms=200000&slide_ms=1000')
+        assert response.status_code == 200
+
+    def test_linked_from_scenario(self):
+        """The analytics scenario links to the streaming lab."""
+        response = client.get('/api/scenarios/analytics')
+        endpoints = [lab['endpoint'] for lab in response.json()['labs']]
+        assert '/api/labs/streaming' in endpoints
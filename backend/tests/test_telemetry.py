@@ -0,0 +1,172 @@
+"""
+Tests for usage telemetry.
+
+Covers:
+- Buffering on record and folding into the sketches on read
+- Heavy hitters with the smaller of the two sketches' counts
+- Flushing changed streams to SQLite in one transaction, and loading them back
+- The background flush thread and the final flush on stop
+- Telemetry endpoints for tools, searches, zero-result searches and scenarios
+"""
+
+import sqlite3
+import time
+from fastapi.testclient import TestClient
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app
+from telemetry import MAX_PENDING, UsageTelemetry, get_usage_telemetry, normalize_query
+
+client = TestClient(app)
+
+
+def _rows(path, table):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute(f"SELECT * FROM {table}").fetchall()
+    finally:
+        conn.close()
+
+
+class TestAggregation:
+    """Test in-process aggregation."""
+
+    def test_record_only_buffers(self):
+        """Recording appends to a buffer; reading folds it into the sketches."""
+        telemetry = UsageTelemetry(path=":memory:")
+        for key in ["kafka", "redis", "kafka"]:
+            telemetry.record("searches", key)
+        assert telemetry.pending["searches"] == ["kafka", "redis", "kafka"]
+        top = telemetry.heaviest("searches")
+        assert telemetry.pending["searches"] == []
+        assert top["total"] == 3
+        assert [(r["key"], r["count"]) for r in top["results"]] == [("kafka", 2), ("redis", 1)]
+
+    def test_full_buffer_folds(self):
+        """A full buffer is folded straight away, so it never grows past its limit."""
+        telemetry = UsageTelemetry(path=":memory:")
+        for i in range(MAX_PENDING + 5):
+            telemetry.record("tool_views", str(i % 7))
+        assert len(telemetry.pending["tool_views"]) == 5
+        assert telemetry.streams["tool_views"].top.total == MAX_PENDING
+
+    def test_heavy_hitters_in_a_long_tail(self):
+        """Popular keys are reported with bounded error among many rare ones."""
+        telemetry = UsageTelemetry(path=":memory:", top_k=20)
+        for i in range(5000):
+            telemetry.record("searches", f"rare {i}")
+            if i % 10 == 0:
+                telemetry.record("searches", "dynamodb")
+        top = telemetry.heaviest("searches", 1)
+        assert top["results"][0]["key"] == "dynamodb"
+        assert 500 <= top["results"][0]["count"] <= 500 + top["results"][0]["error"]
+
+    def test_normalize_query(self):
+        """Queries differing in case and spacing count as one."""
+        assert normalize_query("  Kafka   Streams ") == normalize_query("kafka streams") == "kafka streams"
+
+
+class TestFlush:
+    """Test flushing to SQLite."""
+
+    def test_flush_and_load(self, tmp_path):
+        """Flushed sketches and top keys are restored by a fresh instance."""
+        path = str(tmp_path / "usage.db")
+        telemetry = UsageTelemetry(path=path)
+        for key in ["1", "2", "1", "1"]:
+            telemetry.record("tool_views", key)
+        assert telemetry.flush() == 1
+        assert telemetry.flush() == 0
+        assert len(_rows(path, "usage_sketches")) == 1
+        assert len(_rows(path, "usage_top_keys")) == 2
+
+        restored = UsageTelemetry(path=path)
+        restored.load()
+        assert restored.heaviest("tool_views")["results"] == telemetry.heaviest("tool_views")["results"]
+        restored.record("tool_views", "2")
+        restored.record("tool_views", "2")
+        restored.record("tool_views", "2")
+        assert restored.heaviest("tool_views", 1)["results"][0] == {"key": "2", "count": 4, "error": 0}
+
+    def test_background_thread(self, tmp_path):
+        """The flush thread writes without being asked, and stopping flushes the rest."""
+        path = str(tmp_path / "usage.db")
+        telemetry = UsageTelemetry(path=path, interval=0.05)
+        telemetry.start()
+        telemetry.record("scenario_views", "uber")
+        deadline = time.time() + 5
+        while not telemetry.flushes and time.time() < deadline:
+            time.sleep(0.01)
+        assert telemetry.flushes >= 1
+        telemetry.record("scenario_views", "bitly")
+        telemetry.stop()
+        assert telemetry.thread is None
+        assert {row[1] for row in _rows(path, "usage_top_keys")} == {"uber", "bitly"}
+
+    def test_failed_flush_is_retried(self, tmp_path):
+        """Streams stay dirty when a flush fails, so the next one writes them."""
+        telemetry = UsageTelemetry(path=str(tmp_path / "missing" / "usage.db"))
+        telemetry.record("searches", "cassandra")
+        try:
+            telemetry.flush()
+        except sqlite3.Error:
+            pass
+        assert telemetry.streams["searches"].dirty
+        telemetry.path = str(tmp_path / "usage.db")
+        assert telemetry.flush() == 1
+
+
+class TestTelemetryEndpoints:
+    """Test the telemetry endpoints."""
+
+    def test_most_viewed_tools(self):
+        """Tool detail views are counted and returned with the tool's name."""
+        tool = client.get('/api/tools').json()[0]
+        before = {r['tool_id']: r['views'] for r in client.get('/api/telemetry/tools?limit=200').json()['results']}
+        for _ in range(3):
+            client.get(f"/api/tools/{tool['id']}")
+        results = client.get('/api/telemetry/tools?limit=200').json()['results']
+        entry = next(r for r in results if r['tool_id'] == tool['id'])
+        assert entry['name'] == tool['name']
+        assert entry['views'] >= before.get(tool['id'], 0) + 3
+
+    def test_top_and_zero_result_searches(self):
+        """Every search is counted; searches with no results are counted separately."""
+        client.get('/api/tools/search?q=Redis')
+        client.get('/api/tools/search?q=qqzzxxjjvv')
+        searches = [r['query'] for r in client.get('/api/telemetry/searches?limit=200').json()['results']]
+        zero = [r['query'] for r in client.get('/api/telemetry/searches/zero-results?limit=200').json()['results']]
+        assert 'redis' in searches and 'qqzzxxjjvv' in searches
+        assert 'qqzzxxjjvv' in zero and 'redis' not in zero
+
+    def test_unified_search_is_counted(self):
+        """Searches through /api/search, which the frontend uses, feed the same streams."""
+        client.get('/api/search?q=  Message   QUEUE ')
+        client.get('/api/search?q=xxqqvvjjzz')
+        searches = [r['query'] for r in client.get('/api/telemetry/searches?limit=200').json()['results']]
+        zero = [r['query'] for r in client.get('/api/telemetry/searches/zero-results?limit=200').json()['results']]
+        assert 'message queue' in searches and 'xxqqvvjjzz' in searches
+        assert 'xxqqvvjjzz' in zero and 'message queue' not in zero
+
+    def test_scenario_views(self):
+        """Scenario fetches are counted; unknown scenarios are not."""
+        client.get('/api/scenarios/uber')
+        client.get('/api/scenarios/not-a-scenario')
+        scenarios = [r['scenario'] for r in client.get('/api/telemetry/scenarios?limit=200').json()['results']]
+        assert 'uber' in scenarios and 'not-a-scenario' not in scenarios
+
+    def test_requests_do_not_write(self):
+        """Without the flush thread, requests leave everything buffered in memory."""
+        telemetry = get_usage_telemetry()
+        flushes = telemetry.flushes
+        client.get('/api/scenarios/feed')
+        assert telemetry.flushes == flushes
+        assert 'feed' in telemetry.pending['scenario_views']
+
+    def test_invalid_limit(self):
+        """Limits outside the tracked top keys are rejected."""
+        assert client.get('/api/telemetry/searches?limit=0').status_code == 422
+        assert client.get('/api/telemetry/tools?limit=100000').status_code == 422
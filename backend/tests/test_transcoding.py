@@ -0,0 +1,114 @@
+"""
+Tests for the transcoding DAG scheduler.
+
+Covers:
+- Pipeline DAG shape, task costs and critical path
+- Dependency-ordered execution on a process pool with progress tracking
+- Work stealing between worker slots
+- Retries of transient failures and giving up after the last attempt
+- Transcoding lab endpoint (/api/labs/transcoding) and its links
+"""
+
+import pytest
+from concurrent.futures import ProcessPoolExecutor
+from fastapi.testclient import TestClient
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app
+from transcoding import (MAX_ATTEMPTS, MAX_SWEEP_WORK_SECONDS, RENDITIONS, TASK_OVERHEAD_MS, build_dag, critical_path_ms,
+                         run, sweep_work_seconds)
+
+client = TestClient(app)
+
+
+@pytest.fixture(scope="module")
+def pool():
+    with ProcessPoolExecutor(2) as executor:
+        yield executor
+
+
+class TestDag:
+    """Test the pipeline DAG."""
+
+    def test_shape(self):
+        """Every segment is transcoded to every rendition, then assembled and published."""
+        tasks = build_dag(10, 3)
+        assert len(tasks) == 1 + 4 + 4 * len(RENDITIONS) + len(RENDITIONS) + 1
+        assert tasks["assemble:720p"].deps == [f"transcode:{i}:720p" for i in range(4)]
+        assert "publish" in tasks["thumbnail:3"].children
+        # The last segment is one second long
+        assert tasks["transcode:3:1080p"].cost_ms == TASK_OVERHEAD_MS + RENDITIONS["1080p"]
+
+    def test_critical_path(self):
+        """The critical path runs through the most expensive transcode."""
+        tasks = build_dag(10, 5)
+        expected = sum(tasks[name].cost_ms for name in ("split", "transcode:0:1080p", "assemble:1080p", "publish"))
+        assert critical_path_ms(tasks) == pytest.approx(expected)
+
+
+class TestScheduler:
+    """Test DAG execution on a process pool."""
+
+    def test_runs_every_task(self, pool):
+        """All tasks complete, with progress reported up to 100%."""
+        tasks = build_dag(4, 1)
+        seen = []
+        result = run(tasks, pool, 2, on_progress=lambda done, total: seen.append((done, total)))
+        assert result["completed"] == len(tasks) and result["failed"] == []
+        assert seen[-1] == (len(tasks), len(tasks))
+        assert result["progress"][-1][1] == 100.0
+        assert result["makespan_seconds"] >= result["critical_path_seconds"]
+
+    def test_idle_workers_steal(self, pool):
+        """Slots whose own deque runs dry take work from others."""
+        assert run(build_dag(4, 4), pool, 4)["steals"] > 0
+
+    def test_retries_transient_failures(self, pool):
+        """Failed attempts are retried and the DAG still completes."""
+        tasks = build_dag(4, 1)
+        result = run(tasks, pool, 2, failure_rate=0.2, seed=0)
+        assert result["retries"] > 0
+        assert result["completed"] == len(tasks)
+
+    def test_gives_up_after_last_attempt(self, pool):
+        """A task that always fails stops the tasks that depend on it."""
+        result = run(build_dag(4, 1), pool, 2, failure_rate=1.0)
+        assert result["failed"] == ["split"]
+        assert result["retries"] == MAX_ATTEMPTS - 1
+        assert result["completed"] == 0
+
+
+class TestTranscodingEndpoint:
+    """Test the API surface."""
+
+    def test_lab(self):
+        """Every segment size and worker count is run."""
+        response = client.get('/api/labs/transcoding?duration=4&segment_seconds=1,4&workers=1,2&failure_rate=0')
+        assert response.status_code == 200
+
+        runs = response.json()['runs']
+        assert [(r['segment_seconds'], r['workers']) for r in runs] == [(1, 1), (1, 2), (4, 1), (4, 2)]
+        assert all(r['completed'] == r['tasks'] for r in runs)
+
+    def test_invalid_parameters(self):
+        """Malformed lists and out-of-range sweeps are rejected."""
+        assert client.get('/api/labs/transcoding?workers=two').status_code == 422
+        assert client.get('/api/labs/transcoding?duration=10&segment_seconds=20').status_code == 400
+        assert client.get('/api/labs/transcoding?workers=1,64').status_code == 400
+        assert client.get('/api/labs/transcoding?workers=1,2,3,4,5,6,7').status_code == 400
+
+    def test_work_budget(self):
+        """Sweeps over the CPU budget are rejected; the default sweep fits."""
+        assert sweep_work_seconds(60, (1, 2, 5, 15), (1, 2, 4, 8)) <= MAX_SWEEP_WORK_SECONDS
+        response = client.get('/api/labs/transcoding?duration=600&segment_seconds=0.5&workers=1')
+        assert response.status_code == 400
+
+    def test_linked_from_scenario_and_pattern(self):
+        """Youtube and the long-running tasks pattern link to the lab."""
+        scenario = client.get('/api/scenarios/youtube').json()
+        pattern = client.get('/api/reference/patterns/managing_long_running_tasks').json()
+        assert '/api/labs/transcoding' in [lab['endpoint'] for lab in scenario['labs']]
+        assert '/api/labs/transcoding' in [lab['endpoint'] for lab in pattern['labs']]
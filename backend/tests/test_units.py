@@ -0,0 +1,124 @@
+"""
+Tests for the parsed reference numbers.
+
+Covers:
+- Parsing display strings into SI magnitudes
+- Ratio table and generated comparison text
+- Checking "Nx slower than" claims against the data
+- Compare and nearest endpoints (/api/reference/numbers/compare, /nearest)
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app
+from units import REFERENCE_NUMBERS, entry_label, parse_quantity
+from reference_data import NUMBERS_TO_KNOW
+from flashcard_questions import NUMBERS_QUESTIONS
+
+client = TestClient(app)
+
+
+class TestParsing:
+    """Test display string parsing."""
+
+    def test_time_units(self):
+        """Latencies are converted to seconds."""
+        assert parse_quantity("0.5 ns") == (5e-10, 5e-10, "s")
+        assert parse_quantity("150 μs") == (0.00015, 0.00015, "s")
+        assert parse_quantity("52.6 minutes")[0] == pytest.approx(3156)
+
+    def test_ranges_and_open_bounds(self):
+        """Ranges keep both bounds; a trailing + leaves the top open."""
+        assert parse_quantity("10,000 - 50,000") == (10000, 50000, "count")
+        assert parse_quantity("1-5 MB") == (1e6, 5e6, "B")
+        assert parse_quantity("100,000+") == (100000, None, "count")
+
+    def test_percentages_and_ratios(self):
+        """Percentages become fractions; 'N:1' becomes a ratio."""
+        assert parse_quantity("90%+") == (0.9, None, "ratio")
+        assert parse_quantity("3:1 to 10:1") == (3, 10, "ratio")
+
+    def test_every_entry_parses(self):
+        """Every NUMBERS_TO_KNOW entry is in the parsed table."""
+        total = sum(len(entries) for entries in NUMBERS_TO_KNOW.values())
+        assert len(REFERENCE_NUMBERS.quantities) == total
+
+
+class TestComparisons:
+    """Test the ratio table and generated text."""
+
+    def test_how_many(self):
+        """1,500 RAM references fit in one SSD random read."""
+        ram = REFERENCE_NUMBERS.resolve("Main memory (RAM) reference")
+        ssd = REFERENCE_NUMBERS.resolve("SSD random read")
+        assert REFERENCE_NUMBERS.how_many(ram, ssd) == pytest.approx(1500)
+
+    def test_different_units_are_not_comparable(self):
+        """Latency and storage sizes have no ratio."""
+        ssd = REFERENCE_NUMBERS.resolve("SSD random read")
+        image = REFERENCE_NUMBERS.resolve("Image size (high quality)")
+        assert REFERENCE_NUMBERS.how_many(ssd, image) is None
+
+    def test_reference_usage_claims_match_data(self):
+        """'14x slower than L1' style notes in NUMBERS_TO_KNOW are accurate."""
+        checked = 0
+        for dimension, entries in NUMBERS_TO_KNOW.items():
+            for entry in entries:
+                for claim in REFERENCE_NUMBERS.verify_claims(entry.get("usage", ""), entry_label(entry), dimension):
+                    assert claim["ok"], claim
+                    checked += 1
+        assert checked >= 2
+
+    def test_numbers_question_context_is_generated(self):
+        """Flashcard contexts comparing reference numbers come from the data."""
+        context = next(q for q in NUMBERS_QUESTIONS if q["id"] == "numbers-2")["context"]
+        assert context == "This is 1,500x slower than RAM but 67x faster than HDD"
+
+    def test_nearest_uses_log_distance(self):
+        """2 ms is closest to the 1 ms SSD sequential read."""
+        index, ratio = REFERENCE_NUMBERS.nearest(0.002, "s", limit=1)[0]
+        assert REFERENCE_NUMBERS.quantities[index].label == "SSD sequential read (1 MB)"
+        assert ratio == pytest.approx(0.5)
+
+
+class TestReferenceNumberEndpoints:
+    """Test the API surface."""
+
+    def test_compare(self):
+        """How many SSD random reads fit in an HDD seek."""
+        response = client.get('/api/reference/numbers/compare?x=SSD random read&y=HDD seek')
+        assert response.status_code == 200
+
+        data = response.json()
+        assert data['how_many'] == pytest.approx(66.67, rel=1e-3)
+        assert data['statement'] == 'HDD seek is 67x slower than SSD random read'
+
+    def test_compare_different_units(self):
+        """Comparing a latency with a size is rejected."""
+        response = client.get('/api/reference/numbers/compare?x=latency/0&y=storage/3')
+        assert response.status_code == 400
+
+    def test_compare_unknown(self):
+        """Unknown reference numbers return 404."""
+        response = client.get('/api/reference/numbers/compare?x=nope&y=HDD seek')
+        assert response.status_code == 404
+
+    def test_nearest(self):
+        """Nearest reference numbers for a throughput value."""
+        response = client.get('/api/reference/numbers/nearest?value=400 MB/s&limit=2')
+        assert response.status_code == 200
+
+        data = response.json()
+        assert data['query']['unit'] == 'B/s'
+        assert data['nearest'][0]['label'] == 'SSD throughput'
+        assert len(data['nearest']) == 2
+
+    def test_nearest_unparseable(self):
+        """Values without a known unit are rejected."""
+        response = client.get('/api/reference/numbers/nearest?value=lots')
+        assert response.status_code == 400
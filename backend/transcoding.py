@@ -0,0 +1,218 @@
+"""
+DAG task scheduler for the transcoding pipeline.
+
+Puts numbers behind the ``youtube`` blueprint's upload pipeline and the
+"Managing Long-Running Tasks" pattern. An upload of ``duration`` seconds is
+split into segments of ``segment_seconds``, each segment is transcoded to
+every rendition in ``RENDITIONS``, a thumbnail is taken per segment, and one
+manifest per rendition is assembled before the video is published:
+
+    split -> transcode(segment, rendition) -> assemble(rendition) -> publish
+          -> thumbnail(segment) -------------------------------------^
+
+Tasks are synthetic but CPU-bound: each hashes a buffer until it has used
+its cost in process CPU time, so ``W`` workers on fewer than ``W`` cores
+take as long as they would for real. A transcode costs ``TASK_OVERHEAD_MS``
+(seeking to a keyframe, starting the encoder) plus CPU time in proportion
+to the segment's length. Short segments spread across more workers but pay
+the overhead more often; long segments leave workers idle at the end.
+
+``run`` executes the DAG on a ``ProcessPoolExecutor``. The scheduler gives
+each of ``workers`` slots its own deque of ready tasks, placed by segment
+so a worker keeps to its segments, and an idle slot steals from the back
+of the longest deque. Attempts fail at ``failure_rate`` and are retried up
+to ``MAX_ATTEMPTS`` times. Completions are tracked as progress over time.
+``benchmark`` sweeps segment size and worker count on one pool; every run
+does the DAG's whole work, so ``sweep_work_seconds`` is the CPU a sweep
+burns before retries.
+"""
+
+import hashlib
+import math
+import os
+import random
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional
+
+RENDITIONS = {"1080p": 4.0, "720p": 2.0, "480p": 1.0, "360p": 0.5}
+MAX_DURATION = 600
+MAX_WORKERS = 32
+MAX_SWEEP_VALUES = 6
+# CPU seconds of task work one lab sweep may burn; the default sweep uses about 17
+MAX_SWEEP_WORK_SECONDS = 20
+MAX_ATTEMPTS = 3
+TASK_OVERHEAD_MS = 5.0
+SPLIT_MS_PER_SECOND = 0.2
+THUMBNAIL_MS = 2.0
+ASSEMBLE_MS = 3.0
+PUBLISH_MS = 1.0
+PROGRESS_POINTS = 10
+
+_BLOCK = bytes(4096)
+
+
+class TaskFailed(Exception):
+    """A transient task failure that the scheduler may retry."""
+
+
+class Task:
+    __slots__ = ("name", "cost_ms", "deps", "children", "home")
+
+    def __init__(self, name: str, cost_ms: float, deps: List[str], home: int = 0):
+        self.name = name
+        self.cost_ms = cost_ms
+        self.deps = deps
+        self.children: List[str] = []
+        self.home = home
+
+
+def build_dag(duration: float = 60, segment_seconds: float = 2, renditions: tuple = tuple(RENDITIONS)) -> Dict[str, Task]:
+    """The pipeline's tasks by name. ``home`` is the segment number, for placement."""
+    segments = math.ceil(duration / segment_seconds)
+    tasks = {"split": Task("split", SPLIT_MS_PER_SECOND * duration, [])}
+    for i in range(segments):
+        length = min(segment_seconds, duration - i * segment_seconds)
+        tasks[f"thumbnail:{i}"] = Task(f"thumbnail:{i}", THUMBNAIL_MS, ["split"], i)
+        for rendition in renditions:
+            name = f"transcode:{i}:{rendition}"
+            tasks[name] = Task(name, TASK_OVERHEAD_MS + length * RENDITIONS[rendition], ["split"], i)
+    for r, rendition in enumerate(renditions):
+        deps = [f"transcode:{i}:{rendition}" for i in range(segments)]
+        tasks[f"assemble:{rendition}"] = Task(f"assemble:{rendition}", ASSEMBLE_MS, deps, r)
+    deps = [f"assemble:{rendition}" for rendition in renditions] + [f"thumbnail:{i}" for i in range(segments)]
+    tasks["publish"] = Task("publish", PUBLISH_MS, deps)
+    for task in tasks.values():
+        for dep in task.deps:
+            tasks[dep].children.append(task.name)
+    return tasks
+
+
+def critical_path_ms(tasks: Dict[str, Task]) -> float:
+    """Longest chain of task costs, a lower bound on makespan with unlimited workers."""
+    finish: Dict[str, float] = {}
+    for name in tasks:  # build_dag inserts every task after its dependencies
+        task = tasks[name]
+        finish[name] = task.cost_ms + max((finish[dep] for dep in task.deps), default=0.0)
+    return max(finish.values())
+
+
+def _execute(name: str, cost_ms: float, attempt: int, failure_rate: float, seed: int) -> str:
+    """Burn ``cost_ms`` of this process's CPU time, failing part way through
+    at ``failure_rate``."""
+    fails = random.Random(f"{seed}:{name}:{attempt}").random() < failure_rate
+    deadline = time.process_time() + cost_ms / 1000 * (0.5 if fails else 1.0)
+    digest = _BLOCK
+    while time.process_time() < deadline:
+        for _ in range(16):
+            digest = hashlib.sha256(digest + _BLOCK).digest()
+    if fails:
+        raise TaskFailed(f"{name} attempt {attempt} failed")
+    return name
+
+
+def _warm_up(_: int) -> int:
+    return os.getpid()
+
+
+def run(tasks: Dict[str, Task], pool: ProcessPoolExecutor, workers: int, failure_rate: float = 0.0, seed: int = 0,
+        on_progress: Optional[Callable[[int, int], None]] = None) -> Dict:
+    """Execute the DAG with at most ``workers`` tasks in flight, stealing work
+    between slots and retrying failures."""
+    pending = {name: len(task.deps) for name, task in tasks.items()}
+    attempts = {name: 0 for name in tasks}
+    queues = [deque() for _ in range(workers)]
+    busy: Dict[object, tuple] = {}
+    idle = list(range(workers))
+    done, steals, retries, failed = 0, 0, 0, []
+    progress = []
+    next_mark = 1
+
+    def ready(name: str):
+        queues[tasks[name].home % workers].append(name)
+
+    for name, count in pending.items():
+        if count == 0:
+            ready(name)
+    started = time.perf_counter()
+    while done + len(failed) < len(tasks) and (busy or any(queues)):
+        for slot in list(idle):
+            if queues[slot]:
+                name = queues[slot].popleft()
+            else:
+                victim = max(range(workers), key=lambda q: len(queues[q]))
+                if not queues[victim]:
+                    break
+                # Take from the far end, where the victim would get to last
+                name = queues[victim].pop()
+                steals += 1
+            idle.remove(slot)
+            attempts[name] += 1
+            future = pool.submit(_execute, name, tasks[name].cost_ms, attempts[name], failure_rate, seed)
+            busy[future] = (slot, name)
+
+        finished, _ = wait(busy, return_when=FIRST_COMPLETED)
+        for future in finished:
+            slot, name = busy.pop(future)
+            idle.append(slot)
+            if future.exception() is not None:
+                if attempts[name] < MAX_ATTEMPTS:
+                    retries += 1
+                    queues[slot].appendleft(name)
+                else:
+                    failed.append(name)
+                continue
+            done += 1
+            if on_progress:
+                on_progress(done, len(tasks))
+            if done * PROGRESS_POINTS >= next_mark * len(tasks):
+                progress.append([round(time.perf_counter() - started, 4), round(100 * done / len(tasks), 1)])
+                next_mark = done * PROGRESS_POINTS // len(tasks) + 1
+            for child in tasks[name].children:
+                pending[child] -= 1
+                if pending[child] == 0:
+                    ready(child)
+    makespan = time.perf_counter() - started
+
+    work_ms = sum(task.cost_ms for task in tasks.values())
+    bound = max(critical_path_ms(tasks), work_ms / workers) / 1000
+    return {
+        "tasks": len(tasks),
+        "completed": done,
+        "failed": failed,
+        "makespan_seconds": round(makespan, 4),
+        "work_seconds": round(work_ms / 1000, 4),
+        "critical_path_seconds": round(critical_path_ms(tasks) / 1000, 4),
+        # Makespan over the better of the critical path and perfectly shared work
+        "bound_ratio": round(makespan / bound, 3),
+        "steals": steals,
+        "retries": retries,
+        "progress": progress,
+    }
+
+
+def sweep_work_seconds(duration: float, segment_seconds: tuple, workers: tuple) -> float:
+    """Task CPU time of a ``benchmark`` sweep, before retries."""
+    per_run_ms = sum(sum(task.cost_ms for task in build_dag(duration, seconds).values())
+                     for seconds in segment_seconds)
+    return per_run_ms * len(workers) / 1000
+
+
+@lru_cache(maxsize=16)
+def benchmark(duration: float = 60, segment_seconds: tuple = (1, 2, 5, 15), workers: tuple = (1, 2, 4, 8),
+              failure_rate: float = 0.02, seed: int = 0) -> Dict:
+    """Makespan for every segment size and worker count, on one warmed-up pool."""
+    results = []
+    with ProcessPoolExecutor(max(workers)) as pool:
+        list(pool.map(_warm_up, range(max(workers) * 2)))
+        for seconds in segment_seconds:
+            tasks = build_dag(duration, seconds)
+            for count in workers:
+                result = run(tasks, pool, count, failure_rate, seed)
+                result.pop("progress")
+                # CPU work done per second of wall time
+                result["parallelism"] = round(result["work_seconds"] / result["makespan_seconds"], 2)
+                results.append({"segment_seconds": seconds, "workers": count, **result})
+    return {"cpu_count": os.cpu_count(), "duration_seconds": duration, "runs": results}
@@ -0,0 +1,230 @@
+"""
+Parsed, comparable view of ``NUMBERS_TO_KNOW``.
+
+Reference values are stored as display strings ("0.5 ns", "150 μs",
+"10,000 - 50,000", "90%+"). They are parsed once at import time into SI
+magnitudes: seconds for latencies and downtime, bytes for sizes, bytes per
+second for throughput, plain counts, and fractions for percentages and
+ratios. Ranges keep both bounds; ``value`` is the lower bound.
+
+On top of that:
+
+- per-dimension indexes sorted by magnitude, so the nearest reference
+  numbers to any value are found by binary search
+- a pairwise ratio table (``ratios[i, j] = value_i / value_j``, NaN when the
+  units differ) answering "how many X fit in Y"
+- ``ratio_phrase`` for generating "1,500x slower than RAM" style text, and
+  ``verify_claims`` for checking such text against the data
+"""
+
+import re
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from reference_data import NUMBERS_TO_KNOW
+
+DIMENSIONS = tuple(NUMBERS_TO_KNOW)
+
+# unit -> (multiplier to SI, canonical unit)
+UNIT_SCALES: Dict[str, Tuple[float, str]] = {
+    "ns": (1e-9, "s"), "μs": (1e-6, "s"), "us": (1e-6, "s"), "ms": (1e-3, "s"),
+    "s": (1.0, "s"), "sec": (1.0, "s"), "seconds": (1.0, "s"),
+    "min": (60.0, "s"), "minutes": (60.0, "s"), "hours": (3600.0, "s"), "days": (86400.0, "s"),
+    "b": (1.0, "B"), "bytes": (1.0, "B"), "kb": (1e3, "B"), "mb": (1e6, "B"),
+    "gb": (1e9, "B"), "tb": (1e12, "B"), "pb": (1e15, "B"),
+    "b/s": (1.0, "B/s"), "kb/s": (1e3, "B/s"), "mb/s": (1e6, "B/s"),
+    "gb/s": (1e9, "B/s"), "tb/s": (1e12, "B/s"),
+    "mbps": (1e6 / 8, "B/s"), "gbps": (1e9 / 8, "B/s"),
+}
+
+# How a larger / smaller magnitude reads in each canonical unit
+COMPARATIVES = {
+    "s": ("slower", "faster"),
+    "B": ("larger", "smaller"),
+    "B/s": ("faster", "slower"),
+    "count": ("more", "fewer"),
+    "ratio": ("higher", "lower"),
+}
+
+_NUMBER = r"\d[\d,]*(?:\.\d+)?"
+_QUANTITY_RE = re.compile(
+    rf"^~?\s*(?P<low>{_NUMBER})\s*(?:-\s*(?P<high>{_NUMBER}))?\s*(?P<unit>[^\d\s+~][^\s+]*)?\s*(?P<open>\+)?"
+)
+_RATIO_RE = re.compile(rf"({_NUMBER}):1(?:\s*to\s*({_NUMBER}):1)?")
+_CLAIM_RE = re.compile(rf"({_NUMBER})x (\w+) than ([^(,]+?)(?=\s*(?:\(|,|$| but ))")
+
+
+def _number(text: str) -> float:
+    return float(text.replace(",", ""))
+
+
+def _clean(value: float) -> float:
+    return float(f"{value:.12g}")
+
+
+def entry_label(entry: Dict) -> str:
+    return entry.get("operation") or entry.get("metric") or entry.get("item") or entry.get("tier")
+
+
+def parse_quantity(text: str) -> Optional[Tuple[float, Optional[float], str]]:
+    """Parse "150 μs", "1-5 MB", "100,000+", "90%+" or "3:1 to 10:1" into ``(low, high, unit)``."""
+    text = text.strip()
+    ratio = _RATIO_RE.search(text)
+    if ratio:
+        low = _number(ratio.group(1))
+        return low, _number(ratio.group(2)) if ratio.group(2) else low, "ratio"
+
+    match = _QUANTITY_RE.match(text)
+    if not match:
+        return None
+    low = _number(match.group("low"))
+    high = _number(match.group("high")) if match.group("high") else low
+    unit = match.group("unit") or ""
+    if match.group("open"):
+        high = None
+
+    if unit.startswith("%"):
+        return low / 100, (high / 100 if high is not None else None), "ratio"
+    if not unit:
+        return low, high, "count"
+    scale = UNIT_SCALES.get(unit) or UNIT_SCALES.get(unit.lower())
+    if scale is None:
+        return None
+    multiplier, canonical = scale
+    # Round away float noise from the multiplication (7 ns -> 7e-09, not 7.000000000000001e-09)
+    return _clean(low * multiplier), (_clean(high * multiplier) if high is not None else None), canonical
+
+
+def format_ratio(ratio: float) -> str:
+    return f"{ratio:,.0f}" if ratio >= 10 else f"{ratio:.2g}"
+
+
+class Quantity:
+    __slots__ = ("id", "dimension", "label", "display", "value", "high", "unit")
+
+    def __init__(self, id: str, dimension: str, label: str, display: str, value: float, high: Optional[float], unit: str):
+        self.id = id
+        self.dimension = dimension
+        self.label = label
+        self.display = display
+        self.value = value
+        self.high = high
+        self.unit = unit
+
+    def to_dict(self) -> Dict:
+        return {
+            "id": self.id,
+            "dimension": self.dimension,
+            "label": self.label,
+            "display": self.display,
+            "value": self.value,
+            "high": self.high,
+            "unit": self.unit,
+        }
+
+
+class ReferenceNumbers:
+    def __init__(self, numbers: Dict[str, List[Dict]]):
+        self.quantities: List[Quantity] = []
+        for dimension, entries in numbers.items():
+            for i, entry in enumerate(entries):
+                # Availability tiers are compared by their downtime
+                display = entry.get("value") or entry.get("downtime_per_year")
+                parsed = parse_quantity(display)
+                if parsed is None:
+                    continue
+                low, high, unit = parsed
+                self.quantities.append(Quantity(f"{dimension}/{i}", dimension, entry_label(entry), display, low, high, unit))
+
+        self.by_id = {q.id: i for i, q in enumerate(self.quantities)}
+        self.values = np.array([q.value for q in self.quantities], dtype=np.float64)
+        units = np.array([q.unit for q in self.quantities])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratios = self.values[:, None] / self.values[None, :]
+        self.ratios = np.where(units[:, None] == units[None, :], ratios, np.nan)
+
+        # (dimension, unit) -> (sorted values, quantity indexes in the same order)
+        self.sorted: Dict[Tuple[str, str], Tuple[List[float], List[int]]] = {}
+        for i in np.argsort(self.values, kind="stable"):
+            q = self.quantities[i]
+            values, indexes = self.sorted.setdefault((q.dimension, q.unit), ([], []))
+            values.append(q.value)
+            indexes.append(int(i))
+
+    def resolve(self, key: str, dimension: Optional[str] = None) -> Optional[int]:
+        """Find a quantity by id ("latency/3"), exact label, or a unique label substring."""
+        if key in self.by_id:
+            return self.by_id[key]
+        needle = key.strip().lower()
+        candidates = [
+            i for i, q in enumerate(self.quantities)
+            if dimension is None or q.dimension == dimension
+        ]
+        for i in candidates:
+            if self.quantities[i].label.lower() == needle:
+                return i
+        partial = [i for i in candidates if needle in self.quantities[i].label.lower()]
+        return partial[0] if len(partial) == 1 else None
+
+    def how_many(self, x: int, y: int) -> Optional[float]:
+        """How many of quantity ``x`` fit in quantity ``y`` (None if the units differ)."""
+        ratio = self.ratios[y, x]
+        return None if np.isnan(ratio) else float(ratio)
+
+    def nearest(self, value: float, unit: str, dimension: Optional[str] = None, limit: int = 3) -> List[Tuple[int, float]]:
+        """Closest reference numbers on a log scale, as ``(index, ratio to value)``."""
+        candidates = []
+        for (dim, u), (values, indexes) in self.sorted.items():
+            if u != unit or (dimension and dim != dimension):
+                continue
+            pos = bisect_left(values, value)
+            for j in range(max(0, pos - limit), min(len(values), pos + limit)):
+                candidates.append(indexes[j])
+
+        def distance(i: int) -> float:
+            v = self.values[i]
+            return abs(np.log10(v / value)) if v > 0 and value > 0 else abs(v - value)
+
+        ranked = sorted(set(candidates), key=lambda i: (distance(i), i))[:limit]
+        return [(i, float(self.values[i] / value) if value else float("inf")) for i in ranked]
+
+    def ratio_phrase(self, subject: str, other: str, name: Optional[str] = None, show_value: bool = False) -> str:
+        """'1,500x slower than SSD random read (150 μs)' style comparison of two quantities."""
+        a, b = self.resolve(subject), self.resolve(other)
+        if a is None or b is None:
+            raise KeyError(subject if a is None else other)
+        ratio = self.how_many(b, a)
+        if ratio is None:
+            raise ValueError(f"{subject} and {other} are not comparable")
+        more, less = COMPARATIVES[self.quantities[a].unit]
+        word, ratio = (more, ratio) if ratio >= 1 else (less, 1 / ratio)
+        target = name or self.quantities[b].label
+        suffix = f" ({self.quantities[b].display})" if show_value else ""
+        return f"{format_ratio(ratio)}x {word} than {target}{suffix}"
+
+    def verify_claims(self, text: str, subject: str, dimension: Optional[str] = None, tolerance: float = 0.1) -> List[Dict]:
+        """Check every "Nx slower/faster than X" claim in ``text`` about ``subject``."""
+        a = self.resolve(subject, dimension)
+        results = []
+        for match in _CLAIM_RE.finditer(text):
+            claimed, word, other = _number(match.group(1)), match.group(2), match.group(3).strip()
+            b = self.resolve(other, dimension) if a is not None else None
+            actual = self.how_many(b, a) if b is not None else None
+            if actual is not None:
+                more, less = COMPARATIVES[self.quantities[a].unit]
+                if word == less:
+                    actual = 1 / actual
+                elif word != more:
+                    actual = None
+            results.append({
+                "claim": match.group(0),
+                "claimed": claimed,
+                "actual": actual,
+                "ok": actual is not None and abs(actual - claimed) <= tolerance * actual,
+            })
+        return results
+
+
+REFERENCE_NUMBERS = ReferenceNumbers(NUMBERS_TO_KNOW)
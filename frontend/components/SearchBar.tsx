@@ -1,12 +1,15 @@
 'use client'
 
-import { useRef, useEffect } from 'react'
+import { useRef, useEffect, useState } from 'react'
 import { useSearch } from '@/hooks/useSearch'
 import { useKeyboardShortcuts } from '@/hooks/useKeyboardShortcuts'
+import { AutocompleteSuggestion, autocomplete } from '@/lib/api'
 import styles from './SearchBar.module.css'
 
 export default function SearchBar() {
   const { searchQuery, setSearchQuery, loading } = useSearch()
+  const [input, setInput] = useState(searchQuery)
+  const [suggestions, setSuggestions] = useState<AutocompleteSuggestion[]>([])
   const inputRef = useRef<HTMLInputElement>(null)
 
   useKeyboardShortcuts({
@@ -19,6 +22,45 @@ export default function SearchBar() {
     inputRef.current?.focus()
   }, [])
 
+  useEffect(() => {
+    setInput(searchQuery)
+  }, [searchQuery])
+
+  // Autocomplete is a cheap prefix lookup, so it runs on every keystroke;
+  // the full search only runs once a query is committed.
+  useEffect(() => {
+    const prefix = input.trim()
+    if (!prefix || prefix === searchQuery) {
+      setSuggestions([])
+      return
+    }
+
+    let cancelled = false
+    autocomplete(prefix, 8)
+      .then(results => {
+        if (!cancelled) setSuggestions(results)
+      })
+      .catch(() => {
+        if (!cancelled) setSuggestions([])
+      })
+
+    return () => {
+      cancelled = true
+    }
+  }, [input, searchQuery])
+
+  const commit = (query: string) => {
+    setInput(query)
+    setSuggestions([])
+    setSearchQuery(query)
+  }
+
+  const clear = () => {
+    setInput('')
+    setSuggestions([])
+    setSearchQuery('')
+  }
+
   return (
     <div className={styles.searchBar}>
       <div className={styles.searchIcon}>
@@ -36,20 +78,41 @@ export default function SearchBar() {
         ref={inputRef}
         type="text"
         placeholder="Search tools... (Cmd+K)"
-        value={searchQuery}
-        onChange={(e) => setSearchQuery(e.target.value)}
+        value={input}
+        onChange={(e) => setInput(e.target.value)}
+        onKeyDown={(e) => {
+          if (e.key === 'Enter') commit(input)
+          if (e.key === 'Escape') setSuggestions([])
+        }}
         className={styles.searchInput}
       />
       {loading && <div className={styles.loadingSpinner}>●</div>}
-      {searchQuery && (
+      {input && (
         <button
-          onClick={() => setSearchQuery('')}
+          onClick={clear}
           className={styles.clearButton}
           aria-label="Clear search"
         >
           ✕
         </button>
       )}
+      {suggestions.length > 0 && (
+        <ul className={styles.suggestions} role="listbox">
+          {suggestions.map(suggestion => (
+            <li key={suggestion.id} role="option" aria-selected={false}>
+              <button
+                type="button"
+                className={styles.suggestion}
+                onMouseDown={(e) => e.preventDefault()}
+                onClick={() => commit(suggestion.text)}
+              >
+                <span>{suggestion.text}</span>
+                <span className={styles.suggestionType}>{suggestion.type}</span>
+              </button>
+            </li>
+          ))}
+        </ul>
+      )}
     </div>
   )
 }
@@ -3,7 +3,7 @@
 import { useState, useEffect, useCallback } from 'react'
 import { useSearch } from '@/hooks/useSearch'
 import { useKeyboardShortcuts } from '@/hooks/useKeyboardShortcuts'
-import { Tool, addFavorite, removeFavorite } from '@/lib/api'
+import { Tool, SearchResult, addFavorite, removeFavorite } from '@/lib/api'
 import styles from './ToolList.module.css'
 
 interface ToolListProps {
@@ -12,7 +12,7 @@ interface ToolListProps {
 }
 
 export default function ToolList({ onSelectTool, selectedToolId }: ToolListProps) {
-  const { tools, loading, error } = useSearch()
+  const { tools, contentResults, correctedQuery, didYouMean, setSearchQuery, loading, error } = useSearch()
   const [focusedIndex, setFocusedIndex] = useState(0)
 
   useEffect(() => {
@@ -72,7 +72,7 @@ export default function ToolList({ onSelectTool, selectedToolId }: ToolListProps
     )
   }
 
-  if (tools.length === 0) {
+  if (tools.length === 0 && contentResults.length === 0) {
     return (
       <div className={styles.emptyState}>
         <p>No tools found</p>
@@ -83,6 +83,26 @@ export default function ToolList({ onSelectTool, selectedToolId }: ToolListProps
 
   return (
     <div className={styles.toolList}>
+      {correctedQuery && (
+        <div className={styles.didYouMean}>
+          Showing results for <strong>{correctedQuery}</strong>
+          {didYouMean.length > 1 && (
+            <>
+              {' '}· Did you mean:{' '}
+              {didYouMean.slice(1).map(suggestion => (
+                <button
+                  key={suggestion}
+                  type="button"
+                  className={styles.suggestionLink}
+                  onClick={() => setSearchQuery(suggestion)}
+                >
+                  {suggestion}
+                </button>
+              ))}
+            </>
+          )}
+        </div>
+      )}
       {tools.map((tool, index) => (
         <div
           key={tool.id}
@@ -123,6 +143,24 @@ export default function ToolList({ onSelectTool, selectedToolId }: ToolListProps
           )}
         </div>
       ))}
+      {contentResults.length > 0 && <ContentResults results={contentResults} />}
+    </div>
+  )
+}
+
+function ContentResults({ results }: { results: SearchResult[] }) {
+  return (
+    <div className={styles.contentResults}>
+      <h4 className={styles.contentHeading}>Also in the reference</h4>
+      {results.map(result => (
+        <div key={result.id} className={styles.contentCard}>
+          <div className={styles.toolMeta}>
+            <span className={styles.sourceBadge}>{result.source}</span>
+          </div>
+          <p className={styles.contentTitle}>{result.title}</p>
+          {result.snippet && <p className={styles.toolOneliner}>{result.snippet}</p>}
+        </div>
+      ))}
     </div>
   )
 }
@@ -1,10 +1,13 @@
 'use client'
 
 import { createContext, useContext, useState, useEffect, useCallback, ReactNode } from 'react'
-import { Tool, searchTools, getTools, FilterParams } from '@/lib/api'
+import { Tool, SearchResult, searchAll, getTools, FilterParams } from '@/lib/api'
 
 interface SearchContextValue {
   tools: Tool[]
+  contentResults: SearchResult[]
+  correctedQuery: string | null
+  didYouMean: string[]
   loading: boolean
   error: string | null
   searchQuery: string
@@ -19,6 +22,9 @@ const SearchContext = createContext<SearchContextValue | undefined>(undefined)
 
 export function SearchProvider({ children }: { children: ReactNode }) {
   const [tools, setTools] = useState<Tool[]>([])
+  const [contentResults, setContentResults] = useState<SearchResult[]>([])
+  const [correctedQuery, setCorrectedQuery] = useState<string | null>(null)
+  const [didYouMean, setDidYouMean] = useState<string[]>([])
   const [loading, setLoading] = useState(false)
   const [error, setError] = useState<string | null>(null)
   const [searchQuery, setSearchQuery] = useState('')
@@ -29,18 +35,24 @@ export function SearchProvider({ children }: { children: ReactNode }) {
     setError(null)
     
     try {
-      let results: Tool[]
-      
       if (searchQuery.trim()) {
-        results = await searchTools(searchQuery)
+        const response = await searchAll(searchQuery, { limit: 100 })
+        setTools(response.results.flatMap(result => (result.tool ? [result.tool] : [])))
+        setContentResults(response.results.filter(result => result.source !== 'tool'))
+        setCorrectedQuery(response.corrected_query)
+        setDidYouMean(response.did_you_mean)
       } else {
-        results = await getTools(filters)
+        setTools(await getTools(filters))
+        setContentResults([])
+        setCorrectedQuery(null)
+        setDidYouMean([])
       }
-      
-      setTools(results)
     } catch (err) {
       setError(err instanceof Error ? err.message : 'Failed to fetch tools')
       setTools([])
+      setContentResults([])
+      setCorrectedQuery(null)
+      setDidYouMean([])
     } finally {
       setLoading(false)
     }
@@ -65,6 +77,9 @@ export function SearchProvider({ children }: { children: ReactNode }) {
 
   const value: SearchContextValue = {
     tools,
+    contentResults,
+    correctedQuery,
+    didYouMean,
     loading,
     error,
     searchQuery,
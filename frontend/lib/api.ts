@@ -129,6 +129,61 @@ export async function searchTools(query: string): Promise<Tool[]> {
   return fetchAPI<Tool[]>(`/tools/search?q=${encodeURIComponent(query)}`)
 }
 
+export type SearchSource =
+  | 'tool'
+  | 'scenario'
+  | 'pattern'
+  | 'numbers'
+  | 'framework'
+  | 'rubric'
+  | 'quiz'
+  | 'flashcard'
+
+export interface SearchResult {
+  source: SearchSource
+  id: string
+  title: string
+  snippet: string
+  score: number
+  tool_id?: number
+  tool?: Tool
+}
+
+export interface SearchResponse {
+  query: string
+  corrected_query: string | null
+  did_you_mean: string[]
+  results: SearchResult[]
+  total: number
+}
+
+export async function searchAll(
+  query: string,
+  options?: { sources?: SearchSource[]; limit?: number }
+): Promise<SearchResponse> {
+  const params = new URLSearchParams()
+  params.append('q', query)
+  if (options?.sources?.length) params.append('source', options.sources.join(','))
+  if (options?.limit) params.append('limit', String(options.limit))
+  return fetchAPI<SearchResponse>(`/search?${params.toString()}`)
+}
+
+export interface AutocompleteSuggestion {
+  text: string
+  type: 'tool' | 'category' | 'scenario' | 'pattern'
+  id: string
+}
+
+export async function autocomplete(prefix: string, limit?: number): Promise<AutocompleteSuggestion[]> {
+  const params = new URLSearchParams()
+  params.append('prefix', prefix)
+  if (limit) params.append('limit', String(limit))
+  const response = await fetchAPI<{ prefix: string; suggestions: AutocompleteSuggestion[] }>(
+    `/autocomplete?${params.toString()}`
+  )
+  return response.suggestions
+}
+
 export async function getToolDetail(toolId: number): Promise<ToolDetail> {
   return fetchAPI<ToolDetail>(`/tools/${toolId}`)
 }
@@ -233,10 +288,12 @@ export interface TestScenario {
     messages_per_day?: string
     posts_per_day?: string
     data_size?: string
+    bandwidth?: string
   }
   hints: {
     out_of_scope: string[]
     key_constraints: string[]
+    requirement_tags?: string[]
   }
 }
 